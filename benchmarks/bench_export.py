@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+bench_export.py
+---------------
+Measures hashcat 22000 export throughput (captures/sec) by worker count.
+
+Usage:
+    python benchmarks/bench_export.py captures/*.cap
+    python benchmarks/bench_export.py --synthetic 200 --frames 5000
+"""
+
+import os
+import sys
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tests"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from wlfwifi.handshake import export_hashcat  # noqa: E402
+
+
+def synthetic(directory: str, count: int, frames: int) -> list:
+    from frames import beacon, data_frame, handshake_packets, write_capture
+
+    paths = []
+    for i in range(count):
+        sta = "AA:BB:CC:DD:%02X:%02X" % (i >> 8, i & 0xFF)
+        packets = [(1000.0, beacon())]
+        packets.extend((1000.0 + n * 1e-3, data_frame()) for n in range(frames))
+        packets.extend(handshake_packets(sta=sta, start=2000.0))
+        paths.append(write_capture(os.path.join(directory, "%d.cap" % i), packets))
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="hashcat export throughput")
+    parser.add_argument("captures", nargs="*")
+    parser.add_argument("--synthetic", type=int, default=0, metavar="CAPTURES")
+    parser.add_argument("--frames", type=int, default=5000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = list(args.captures)
+        if args.synthetic:
+            paths.extend(synthetic(tmp, args.synthetic, args.frames))
+        output = os.path.join(tmp, "out.hc22000")
+        workers = 1
+        while workers <= (os.cpu_count() or 1):
+            stats = export_hashcat(paths, output, processes=workers)
+            print(f"{workers:>3} worker(s): {stats.summary()}")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+bench_merge.py
+--------------
+Measures merge_captures throughput (MB/s, frames/sec) and peak memory.
+
+Every synthetic input holds the same frame stream with per-card clock
+jitter, as if several cards listened on one channel, so most frames are
+duplicates across inputs.
+
+Usage:
+    python benchmarks/bench_merge.py captures/*.cap
+    python benchmarks/bench_merge.py --synthetic 4 --size-mb 256
+"""
+
+import os
+import sys
+import random
+import argparse
+import resource
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tests"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from wlfwifi.merge import merge_captures  # noqa: E402
+
+
+def synthetic(directory: str, count: int, size_mb: int) -> list:
+    import struct
+    from frames import data_frame, pcap_bytes
+
+    header = pcap_bytes([])
+    frame = data_frame(payload=bytes(1400))
+    frames = size_mb * (1 << 20) // (16 + len(frame))
+    paths = []
+    for i in range(count):
+        rng = random.Random(i)
+        path = os.path.join(directory, "card%d.cap" % i)
+        with open(path, "wb") as f:
+            f.write(header)
+            for n in range(frames):
+                data = data_frame(payload=bytes(1400), seq=n & 0xFFF)
+                ts = 1000.0 + n * 1e-3 + rng.uniform(0, 2e-4)
+                sec = int(ts)
+                usec = int((ts - sec) * 1e6)
+                f.write(struct.pack("<IIII", sec, usec, len(data), len(data)))
+                f.write(data)
+        paths.append(path)
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="capture merge throughput")
+    parser.add_argument("captures", nargs="*")
+    parser.add_argument("--synthetic", type=int, default=0, metavar="INPUTS")
+    parser.add_argument("--size-mb", type=int, default=64, help="MB per input")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = list(args.captures)
+        if args.synthetic:
+            paths.extend(synthetic(tmp, args.synthetic, args.size_mb))
+        size = sum(os.path.getsize(p) for p in paths)
+        stats = merge_captures(paths, os.path.join(tmp, "merged.cap"))
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        mb = size / (1 << 20)
+        print(f"input: {len(paths)} files, {mb:.0f} MB")
+        print(stats.summary())
+        print(f"{mb / stats.elapsed:.1f} MB/s, peak RSS {peak:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
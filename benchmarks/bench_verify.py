@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+bench_verify.py
+---------------
+Measures native passphrase verification on a synthetic PMKID vector.
+
+The vector and candidates are fixed, so runs are comparable across
+machines. Reports bare pbkdf2_hmac throughput, then PMKs/sec in total and
+per core for native_crack_wordlist() with 1 to N worker processes; the key
+is the last candidate, so every run tries the whole wordlist.
+
+Usage:
+    python benchmarks/bench_verify.py
+    python benchmarks/bench_verify.py --candidates 20000 --max-processes 8
+"""
+
+import os
+import sys
+import hmac
+import time
+import hashlib
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from wlfwifi.handshake import Pmkid  # noqa: E402
+from wlfwifi.verify import native_crack_wordlist  # noqa: E402
+from wlfwifi.wpa import CrackMaterial, PmkidCheck, pmk  # noqa: E402
+
+AP = "00:11:22:33:44:55"
+STA = "66:77:88:99:AA:BB"
+ESSID = b"BenchNet"
+KEY = b"bench-key-0000"
+
+
+def material() -> CrackMaterial:
+    message = b"PMK Name" + bytes.fromhex(AP.replace(":", ""))
+    message += bytes.fromhex(STA.replace(":", ""))
+    pmkid = hmac.new(pmk(KEY, ESSID), message, hashlib.sha1).digest()[:16]
+    return CrackMaterial(AP, ESSID, [PmkidCheck(Pmkid(AP, STA, pmkid, 0.0))])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="native WPA verification")
+    parser.add_argument("--candidates", type=int, default=4000)
+    parser.add_argument("--max-processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=250)
+    args = parser.parse_args()
+    target = material()
+    started = time.perf_counter()
+    for i in range(args.candidates // 4):
+        pmk(b"baseline%08d" % i, ESSID)
+    elapsed = time.perf_counter() - started
+    print(f"pbkdf2_hmac: {args.candidates // 4 / elapsed:>8.0f} PMKs/s on 1 core")
+    with tempfile.TemporaryDirectory() as tmp:
+        wordlist = os.path.join(tmp, "bench.txt")
+        with open(wordlist, "wb") as f:
+            for i in range(args.candidates - 1):
+                f.write(b"candidate%08d\n" % i)
+            f.write(KEY + b"\n")
+        for processes in range(1, args.max_processes + 1):
+            key, stats = native_crack_wordlist(
+                target, wordlist, processes, args.chunk_size, progress=None
+            )
+            assert key == KEY
+            rate = stats.candidates / stats.elapsed
+            print(
+                f"{processes:>3} processes: {rate:>8.0f} PMKs/s, "
+                f"{rate / processes:>6.0f} per core"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+bench_views.py
+--------------
+Compares frame iteration cores on one pcap: a naive f.read() loop, the
+copying CaptureReader, and zero-copy MappedCapture views. Each loop reads
+the frame type and transmitter address of every frame.
+
+Reports frames/sec, bytes copied out of the file per frame, and the peak
+memory traced while iterating.
+
+Usage:
+    python benchmarks/bench_views.py capture.cap
+    python benchmarks/bench_views.py --synthetic 200000 --payload 1400
+"""
+
+import os
+import sys
+import time
+import struct
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tests"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from wlfwifi.capture import CaptureReader, dot11_offset  # noqa: E402
+from wlfwifi.views import MappedCapture  # noqa: E402
+
+
+def synthetic(path: str, count: int, payload: int) -> None:
+    from frames import beacon, data_frame, pcap_bytes
+
+    packets = []
+    body = bytes(payload)
+    for n in range(count):
+        seq = n & 0xFFF
+        if n % 10 == 0:
+            data = beacon(seq=seq)
+        else:
+            data = data_frame(payload=body, seq=seq)
+        packets.append((1000.0 + n * 1e-4, data))
+    with open(path, "wb") as f:
+        f.write(pcap_bytes(packets))
+
+
+def naive(path: str) -> tuple:
+    frames = copied = 0
+    with open(path, "rb") as f:
+        header = f.read(24)
+        copied += len(header)
+        linktype = struct.unpack_from("<I", header, 20)[0]
+        while True:
+            record = f.read(16)
+            if len(record) < 16:
+                break
+            caplen = struct.unpack_from("<I", record, 8)[0]
+            data = f.read(caplen)
+            copied += 16 + len(data)
+            start = dot11_offset(linktype, data)
+            (data[start] >> 2) & 3, data[start + 10 : start + 16]
+            frames += 1
+    return frames, copied
+
+
+def reader(path: str) -> tuple:
+    frames = copied = 0
+    with CaptureReader(path) as r:
+        for frame in r.frames():
+            data = frame.data
+            copied += len(data)
+            start = dot11_offset(frame.linktype, data)
+            (data[start] >> 2) & 3, data[start + 10 : start + 16]
+            frames += 1
+    return frames, copied
+
+
+def views(path: str) -> tuple:
+    frames = 0
+    with MappedCapture(path) as capture:
+        for view in capture.views():
+            view.type, view.addr2
+            frames += 1
+    return frames, 0
+
+
+def measure(name: str, loop, path: str) -> None:
+    started = time.perf_counter()
+    frames, _ = loop(path)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    _, copied = loop(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(
+        f"{name:>14}: {frames / elapsed:>10.0f} frames/s, "
+        f"{copied / frames:>7.1f} bytes copied/frame, peak {peak / 1024:.0f} KiB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="frame iteration cores")
+    parser.add_argument("capture", nargs="?")
+    parser.add_argument("--synthetic", type=int, default=200000, metavar="FRAMES")
+    parser.add_argument(
+        "--payload", type=int, default=1400, help="Synthetic data frame payload"
+    )
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.capture
+        if path is None:
+            path = os.path.join(tmp, "bench.cap")
+            synthetic(path, args.synthetic, args.payload)
+        print(f"{path}: {os.path.getsize(path) / (1 << 20):.1f} MB")
+        for name, loop in (("f.read()", naive), ("CaptureReader", reader)):
+            measure(name, loop, path)
+        measure("MappedCapture", views, path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+bench_wordlist.py
+-----------------
+Compacts a wordlist and compares reading the plain and packed versions
+through WordlistReader.chunks(), as the crack pipeline does.
+
+Reports compaction lines/sec and duplicate rate, then candidates/sec and
+file size for both formats.
+
+Usage:
+    python benchmarks/bench_wordlist.py rockyou.txt
+    python benchmarks/bench_wordlist.py --synthetic 2000000 --memory 16
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from wlfwifi.compact import compact_wordlist  # noqa: E402
+from wlfwifi.wordlist import WordlistReader  # noqa: E402
+
+
+def synthetic(path: str, count: int) -> None:
+    # Roughly a third duplicates and a tenth too short, like merged lists
+    rng = random.Random(1)
+    with open(path, "wb") as f:
+        for _ in range(count):
+            length = rng.choice((6, 8, 8, 9, 10, 10, 11, 12, 14, 16))
+            word = b"%0*d" % (length, rng.randrange(count * 2 // 3))
+            f.write(word[-length:] + b"\n")
+
+
+def measure(name: str, path: str) -> None:
+    started = time.perf_counter()
+    candidates = 0
+    with WordlistReader(path) as reader:
+        for chunk in reader.chunks(20000):
+            candidates += len(chunk)
+    elapsed = time.perf_counter() - started
+    print(
+        f"{name:>7}: {candidates / elapsed:>11.0f} candidates/s, "
+        f"{candidates} candidates, {os.path.getsize(path) / (1 << 20):.1f} MB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="wordlist compaction and reading")
+    parser.add_argument("wordlist", nargs="?")
+    parser.add_argument("--synthetic", type=int, default=2000000, metavar="LINES")
+    parser.add_argument(
+        "--memory", type=int, default=64, metavar="MB", help="Sort memory budget"
+    )
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.wordlist
+        if path is None:
+            path = os.path.join(tmp, "bench.txt")
+            synthetic(path, args.synthetic)
+        packed = os.path.join(tmp, "bench.wpk")
+        stats = compact_wordlist([path], packed, memory=args.memory << 20)
+        print(
+            f"compact: {stats.lines_per_sec:.0f} lines/s, {stats.runs} runs, "
+            f"{stats.duplicates / max(stats.candidates, 1):.1%} duplicates, "
+            f"{stats.skipped} invalid"
+        )
+        measure("plain", path)
+        measure("packed", packed)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ setup(
     packages=find_packages(),
     python_requires=">=3.7",
     install_requires=[],
+    extras_require={"analytics": ["numpy"]},
     entry_points={
         "console_scripts": [
             "wlfwifi = wlfwifi.core:main"
@@ -0,0 +1,247 @@
+"""
+frames.py
+---------
+Helpers building synthetic 802.11 frames and pcap/pcapng files for tests.
+"""
+
+import hmac
+import struct
+import hashlib
+
+AP = "00:11:22:33:44:55"
+STA = "AA:BB:CC:DD:EE:01"
+ANONCE = bytes(range(1, 33))
+SNONCE = bytes(range(101, 133))
+
+KEY_INFO = {
+    1: 0x008A,
+    2: 0x010A,
+    3: 0x13CA,
+    4: 0x030A,
+}
+
+
+def mac(text):
+    return bytes(int(part, 16) for part in text.split(":"))
+
+
+def radiotap(payload, fcs=False):
+    """Wraps an 802.11 frame in a minimal radiotap header (flags field only)."""
+    if fcs:
+        return struct.pack("<BBHIBxxx", 0, 0, 12, 0x2, 0x10) + payload + b"\0" * 4
+    return struct.pack("<BBHI", 0, 0, 8, 0) + payload
+
+
+def dot11_header(fc0, flags, addr1, addr2, addr3, seq=0):
+    return (
+        struct.pack("<BBH", fc0, flags, 0)
+        + addr1
+        + addr2
+        + addr3
+        + struct.pack("<H", seq << 4)
+    )
+
+
+def eapol_key(message, replay_counter, nonce=None, mic=None, key_data=b""):
+    """Builds an EAPOL-Key frame (802.1X header included)."""
+    if nonce is None:
+        nonce = {1: ANONCE, 2: SNONCE, 3: ANONCE, 4: bytes(32)}[message]
+    if mic is None:
+        mic = bytes(16) if message == 1 else bytes([message]) * 16
+    body = (
+        struct.pack(">BHHQ", 2, KEY_INFO[message], 16, replay_counter)
+        + nonce
+        + bytes(16 + 8 + 8)
+        + mic
+        + struct.pack(">H", len(key_data))
+        + key_data
+    )
+    return struct.pack(">BBH", 1, 3, len(body)) + body
+
+
+def eapol_frame(message, replay_counter, ap=AP, sta=STA, qos=False, **kwargs):
+    """Builds a radiotap + 802.11 data frame carrying one handshake message."""
+    payload = b"\xaa\xaa\x03\x00\x00\x00\x88\x8e" + eapol_key(
+        message, replay_counter, **kwargs
+    )
+    fc0 = 0x88 if qos else 0x08
+    if message in (1, 3):
+        header = dot11_header(fc0, 0x02, mac(sta), mac(ap), mac(ap))
+    else:
+        header = dot11_header(fc0, 0x01, mac(ap), mac(sta), mac(ap))
+    if qos:
+        header += b"\0\0"
+    return radiotap(header + payload)
+
+
+def data_frame(ap=AP, sta=STA, payload=b"\0" * 32, seq=0, retry=False, iv=None):
+    """Builds a protected data frame from a station to the AP."""
+    flags = 0x41 | (0x08 if retry else 0)
+    body = payload
+    if iv is not None:
+        body = iv + b"\0" + payload
+    return radiotap(dot11_header(0x08, flags, mac(ap), mac(sta), mac(ap), seq) + body)
+
+
+def retransmit(frame):
+    """Sets the Retry flag of a radiotap-wrapped 802.11 frame."""
+    flags = struct.unpack_from("<H", frame, 2)[0] + 1
+    return frame[:flags] + bytes([frame[flags] | 0x08]) + frame[flags + 1 :]
+
+
+def mgmt_frame(subtype, addr1, addr2, addr3, body, seq=0):
+    return radiotap(dot11_header(subtype << 4, 0, addr1, addr2, addr3, seq) + body)
+
+
+def ssid_ie(essid):
+    raw = essid.encode() if isinstance(essid, str) else essid
+    return bytes([0, len(raw)]) + raw
+
+
+def beacon(ap=AP, essid="TestNet", seq=0):
+    fixed = bytes(8) + struct.pack("<HH", 100, 0x0011)
+    broadcast = b"\xff" * 6
+    return mgmt_frame(8, broadcast, mac(ap), mac(ap), fixed + ssid_ie(essid), seq)
+
+
+def probe_response(ap=AP, sta=STA, essid="TestNet", seq=0):
+    fixed = bytes(8) + struct.pack("<HH", 100, 0x0011)
+    return mgmt_frame(5, mac(sta), mac(ap), mac(ap), fixed + ssid_ie(essid), seq)
+
+
+def assoc_request(ap=AP, sta=STA, essid="TestNet", reassoc=False, seq=0):
+    """Association request, or reassociation request naming "ap" as current AP."""
+    fixed = struct.pack("<HH", 0x0011, 10)
+    if reassoc:
+        fixed += mac(ap)
+    subtype = 2 if reassoc else 0
+    return mgmt_frame(subtype, mac(ap), mac(sta), mac(ap), fixed + ssid_ie(essid), seq)
+
+
+def pcap_bytes(packets, linktype=127, nanoseconds=False, big_endian=False):
+    """Serializes (timestamp, data) pairs as a classic pcap file."""
+    e = ">" if big_endian else "<"
+    magic = 0xA1B23C4D if nanoseconds else 0xA1B2C3D4
+    out = [struct.pack(e + "IHHiIII", magic, 2, 4, 0, 0, 65535, linktype)]
+    div = 10**9 if nanoseconds else 10**6
+    for ts, data in packets:
+        sec = int(ts)
+        frac = int(round((ts - sec) * div))
+        out.append(struct.pack(e + "IIII", sec, frac, len(data), len(data)) + data)
+    return b"".join(out)
+
+
+def _pad(data):
+    return data + b"\0" * (-len(data) % 4)
+
+
+def _block(block_type, body):
+    length = 12 + len(body)
+    return struct.pack("<II", block_type, length) + body + struct.pack("<I", length)
+
+
+def pcapng_bytes(packets, linktype=127, tsresol=None):
+    """Serializes (timestamp, data) pairs as a pcapng file with one interface."""
+    shb = _block(0x0A0D0D0A, struct.pack("<IHHq", 0x1A2B3C4D, 1, 0, -1))
+    options = b""
+    div = 10**6
+    if tsresol is not None:
+        options = struct.pack("<HHB3x", 9, 1, tsresol) + struct.pack("<HH", 0, 0)
+        div = 10**tsresol
+    idb = _block(1, struct.pack("<HHI", linktype, 0, 65535) + options)
+    out = [shb, idb]
+    for ts, data in packets:
+        ticks = int(round(ts * div))
+        header = struct.pack(
+            "<IIIII", 0, ticks >> 32, ticks & 0xFFFFFFFF, len(data), len(data)
+        )
+        out.append(_block(6, header + _pad(data)))
+    return b"".join(out)
+
+
+def write_capture(path, packets, fmt="pcap", **kwargs):
+    """Writes packets to "path" as pcap or pcapng and returns the path."""
+    if fmt == "pcapng":
+        data = pcapng_bytes(packets, **kwargs)
+    else:
+        data = pcap_bytes(packets, **kwargs)
+    with open(path, "wb") as f:
+        f.write(data)
+    return str(path)
+
+
+def pmkid_kde(pmkid):
+    return b"\xdd\x14\x00\x0f\xac\x04" + pmkid
+
+
+def handshake_packets(messages=(1, 2, 3, 4), replay_counter=1, start=1000.0, **kw):
+    """Returns (timestamp, data) pairs for the given handshake messages."""
+    packets = []
+    for i, message in enumerate(messages):
+        rc = replay_counter + (1 if message in (3, 4) else 0)
+        packets.append((start + i * 0.01, eapol_frame(message, rc, **kw)))
+    return packets
+
+
+def wps_ie(locked=None):
+    """WPS vendor element, with the AP Setup Locked attribute if given."""
+    attrs = struct.pack(">HHB", 0x104A, 1, 0x10)
+    if locked is not None:
+        attrs += struct.pack(">HHB", 0x1057, 1, 1 if locked else 0)
+    value = b"\x00\x50\xf2\x04" + attrs
+    return bytes([221, len(value)]) + value
+
+
+def wps_beacon(ap=AP, essid="TestNet", locked=None, seq=0):
+    fixed = bytes(8) + struct.pack("<HH", 100, 0x0011)
+    broadcast = b"\xff" * 6
+    body = fixed + ssid_ie(essid) + wps_ie(locked)
+    return mgmt_frame(8, broadcast, mac(ap), mac(ap), body, seq)
+
+
+def radiotap_rx(payload, freq=2437, rssi=-40, tsft=False, words=1):
+    """Wraps a frame in a radiotap header with channel and dBm signal fields.
+    With "tsft", an extended present bitmap and an 8-byte TSFT field change
+    the field alignment the way many drivers do. "words" chains that many
+    present bitmaps, as multi-antenna cards do."""
+    if tsft:
+        present = struct.pack("<II", 0x8000002B, 0x00000020)
+        fields = b"\0" * 4 + struct.pack("<QBxHHbb", 1, 0, freq, 0x00A0, rssi, rssi)
+    else:
+        chain = [0x0000002A] + [0] * (words - 1)
+        chain = [w | 0x80000000 for w in chain[:-1]] + chain[-1:]
+        present = struct.pack("<%dI" % words, *chain)
+        fields = struct.pack("<BxHHb", 0, freq, 0x00A0, rssi)
+    length = 4 + len(present) + len(fields)
+    return struct.pack("<BBH", 0, 0, length) + present + fields + payload
+
+
+def signed_handshake_packets(
+    passphrase, essid="TestNet", ap=AP, sta=STA, pmkid=False, start=1000.0
+):
+    """
+    Returns (timestamp, data) pairs of a beacon and an M1/M2 exchange whose
+    MIC (HMAC-SHA1 key version) and optional PMKID match "passphrase".
+    """
+    raw_essid = essid.encode()
+    pmk = hashlib.pbkdf2_hmac("sha1", passphrase, raw_essid, 4096, 32)
+    a, s = mac(ap), mac(sta)
+    prf = (
+        b"Pairwise key expansion\x00"
+        + min(a, s)
+        + max(a, s)
+        + min(ANONCE, SNONCE)
+        + max(ANONCE, SNONCE)
+        + b"\x00"
+    )
+    kck = hmac.new(pmk, prf, hashlib.sha1).digest()[:16]
+    mic = hmac.new(kck, eapol_key(2, 1, mic=bytes(16)), hashlib.sha1).digest()[:16]
+    key_data = b""
+    if pmkid:
+        name = hmac.new(pmk, b"PMK Name" + a + s, hashlib.sha1).digest()[:16]
+        key_data = pmkid_kde(name)
+    return [
+        (start, beacon(ap, essid)),
+        (start + 0.01, eapol_frame(1, 1, ap, sta, key_data=key_data)),
+        (start + 0.02, eapol_frame(2, 1, ap, sta, mic=mic)),
+    ]
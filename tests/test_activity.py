@@ -0,0 +1,163 @@
+"""
+test_activity.py
+----------------
+Unit tests for the activity module (per-client traffic counters).
+Tests cover direction handling, the rolling window, RSSI smoothing,
+retransmissions, client eviction and the most-active query.
+"""
+
+from wlfwifi.activity import ActivityTracker, ClientActivity
+from wlfwifi.capture import Frame
+from wlfwifi.models import Client, Target
+from frames import (
+    AP,
+    STA,
+    beacon,
+    data_frame,
+    dot11_header,
+    mac,
+    pcap_bytes,
+    radiotap,
+    radiotap_rx,
+    retransmit,
+    write_capture,
+)
+
+STA2 = "AA:BB:CC:DD:EE:02"
+STA3 = "AA:BB:CC:DD:EE:03"
+OTHER_AP = "66:77:88:99:AA:BB"
+
+
+def to_ap(sta=STA, ap=AP, seq=0, rssi=None, size=32):
+    header = dot11_header(0x08, 0x01, mac(ap), mac(sta), mac(ap), seq)
+    if rssi is None:
+        return radiotap(header + b"\0" * size)
+    return radiotap_rx(header + b"\0" * size, rssi=rssi)
+
+
+def from_ap(sta=STA, ap=AP, seq=0, size=32):
+    header = dot11_header(0x08, 0x02, mac(sta), mac(ap), mac(ap), seq)
+    return radiotap(header + b"\0" * size)
+
+
+def _frame(data, ts):
+    return Frame(ts, 127, data, 0)
+
+
+class TestClientActivity:
+    """Tests for ClientActivity rolling counters."""
+
+    def test_is_a_client(self):
+        """Test that activity records are Client models."""
+        client = ClientActivity(STA, AP)
+        assert isinstance(client, Client)
+        assert client.target_bssid == AP
+
+    def test_window(self):
+        """Test that frames older than the window stop counting."""
+        client = ClientActivity(STA, AP, window=10.0, bucket=1.0)
+        for ts in (100.0, 100.5, 105.0, 109.9):
+            client.add(ts, 100)
+        assert client.recent() == (4, 400)
+        assert client.recent(110.5) == (2, 200)
+        assert client.recent(200.0) == (0, 0)
+        assert client.frames == 4
+        assert client.bytes == 400
+        assert client.first_seen == 100.0
+        assert client.last_seen == 109.9
+        assert client.frame_rate(110.5) == 0.2
+
+    def test_ring_reuse(self):
+        """Test that a slot is reset when the ring wraps around."""
+        client = ClientActivity(STA, AP, window=4.0, bucket=1.0)
+        client.add(1.0, 10)
+        client.add(5.0, 20)
+        assert client.recent() == (1, 20)
+
+
+class TestActivityTracker:
+    """Tests for ActivityTracker."""
+
+    def test_both_directions_counted(self):
+        """Test that traffic to and from a station counts for the station."""
+        tracker = ActivityTracker()
+        tracker.feed(_frame(to_ap(seq=1), 1.0))
+        tracker.feed(_frame(from_ap(seq=1), 1.1))
+        tracker.feed(_frame(from_ap(sta="FF:FF:FF:FF:FF:FF"), 1.2))
+        tracker.feed(_frame(beacon(), 1.3))
+        client = tracker.get(STA.lower())
+        assert client.frames == 2
+        assert len(tracker) == 1
+        assert tracker.frames == 4
+
+    def test_rssi_average(self):
+        """Test the RSSI moving average of frames sent by the station."""
+        tracker = ActivityTracker(alpha=0.5)
+        tracker.feed(_frame(to_ap(seq=1, rssi=-60), 1.0))
+        tracker.feed(_frame(to_ap(seq=2, rssi=-40), 1.1))
+        tracker.feed(_frame(from_ap(seq=3), 1.2))
+        assert tracker.get(STA).rssi == -50.0
+
+    def test_retries_not_counted(self):
+        """Test that retransmissions do not inflate activity."""
+        frame = to_ap(seq=9)
+        tracker = ActivityTracker()
+        tracker.feed(_frame(frame, 1.0))
+        tracker.feed(_frame(retransmit(frame), 1.01))
+        assert tracker.get(STA).frames == 1
+        tracker = ActivityTracker(drop_retries=False)
+        tracker.feed(_frame(frame, 1.0))
+        tracker.feed(_frame(retransmit(frame), 1.01))
+        assert tracker.get(STA).frames == 2
+
+    def test_most_active(self):
+        """Test ranking the clients of one BSSID by recent traffic."""
+        tracker = ActivityTracker(window=10.0)
+        seq = 0
+        for sta, count, start in ((STA, 2, 100.0), (STA2, 5, 100.0), (STA3, 9, 50.0)):
+            for i in range(count):
+                seq += 1
+                tracker.feed(_frame(to_ap(sta=sta, seq=seq), start + i * 0.1))
+        tracker.feed(_frame(to_ap(sta="AA:BB:CC:DD:EE:09", ap=OTHER_AP), 100.0))
+        ranked = tracker.most_active(AP.lower())
+        assert [c.mac for c in ranked] == [STA2, STA]
+        assert [c.mac for c in tracker.most_active(AP, count=1)] == [STA2]
+        assert tracker.most_active("00:00:00:00:00:00") == []
+
+    def test_roaming_client(self):
+        """Test that a station moving to another AP leaves the first one."""
+        tracker = ActivityTracker()
+        tracker.feed(_frame(to_ap(seq=1), 1.0))
+        tracker.feed(_frame(to_ap(ap=OTHER_AP, seq=2), 2.0))
+        assert tracker.most_active(AP) == []
+        assert [c.mac for c in tracker.most_active(OTHER_AP)] == [STA]
+
+    def test_max_clients(self):
+        """Test that the least recently seen client is evicted."""
+        tracker = ActivityTracker(max_clients=2)
+        tracker.feed(_frame(to_ap(sta=STA), 1.0))
+        tracker.feed(_frame(to_ap(sta=STA2), 2.0))
+        tracker.feed(_frame(to_ap(sta=STA, seq=1), 3.0))
+        tracker.feed(_frame(to_ap(sta=STA3), 4.0))
+        assert list(tracker.clients) == [STA, STA3]
+        assert [c.mac for c in tracker.most_active(AP)] == [STA, STA3]
+
+    def test_update_target(self):
+        """Test filling a target's client count and activity time."""
+        tracker = ActivityTracker()
+        tracker.feed(_frame(to_ap(sta=STA), 10.0))
+        tracker.feed(_frame(to_ap(sta=STA2), 12.0))
+        target = Target(AP, "TestNet", 6, "WPA2", False)
+        tracker.update_target(target)
+        assert target.clients == 2
+        assert target.last_client_seen == 12.0
+
+    def test_poll_growing_capture(self, tmp_path):
+        """Test that poll() only reads frames appended since the last call."""
+        path = write_capture(tmp_path / "a.cap", [(1.0, data_frame(seq=1))])
+        with ActivityTracker() as tracker:
+            assert tracker.poll(path) == 1
+            with open(path, "ab") as f:
+                f.write(pcap_bytes([(2.0, data_frame(seq=2))])[24:])
+            assert tracker.poll(path) == 1
+            assert tracker.get(STA).frames == 2
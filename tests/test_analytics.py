@@ -0,0 +1,177 @@
+"""
+test_analytics.py
+-----------------
+Unit tests for the analytics module (bulk header decoding).
+Tests cover channel numbers, the pure-Python decoder, and agreement of the
+NumPy decoder with it when NumPy is installed.
+"""
+
+import pytest
+from wlfwifi import analytics
+from wlfwifi.analytics import (
+    channel_utilization,
+    freq_to_channel,
+    iter_header_chunks,
+    signal_by_bssid,
+)
+from frames import (
+    AP,
+    STA,
+    beacon,
+    data_frame,
+    eapol_frame,
+    mac,
+    radiotap_rx,
+    write_capture,
+)
+
+OTHER_AP = "66:77:88:99:AA:BB"
+
+
+def mac_int(text):
+    return int.from_bytes(mac(text), "big")
+
+
+def dot11(frame):
+    # Frames from the helpers carry an 8-byte radiotap header
+    return frame[8:]
+
+
+def survey_packets():
+    return [
+        (1.0, radiotap_rx(dot11(beacon()), freq=2437, rssi=-40)),
+        (1.1, radiotap_rx(dot11(beacon()), freq=2437, rssi=-50, tsft=True)),
+        (1.2, radiotap_rx(dot11(data_frame()), freq=2437, rssi=-60)),
+        (1.3, radiotap_rx(dot11(beacon(ap=OTHER_AP)), freq=5180, rssi=-70)),
+        (1.4, eapol_frame(1, 1)),
+        (1.5, radiotap_rx(b"\xd4\x00\x00\x00" + mac(STA), freq=5180, rssi=-80)),
+    ]
+
+
+class TestHelpers:
+    """Tests for freq_to_channel."""
+
+    def test_freq_to_channel(self):
+        """Test 2.4, 5 and 6 GHz channel numbers."""
+        assert [freq_to_channel(f) for f in (2412, 2437, 2484, 5180, 5955, 900)] == [
+            1,
+            6,
+            14,
+            36,
+            1,
+            0,
+        ]
+
+
+class TestPythonDecoder:
+    """Tests for the fallback decoder used without NumPy."""
+
+    def test_records(self, tmp_path):
+        """Test the decoded fields of every frame kind."""
+        path = write_capture(tmp_path / "a.cap", survey_packets())
+        (records,) = iter_header_chunks(path, use_numpy=False)
+        first, second, data, other, eapol, ack = records
+        assert (first.rssi, first.freq, first.channel) == (-40, 2437, 6)
+        assert (second.rssi, second.channel) == (-50, 6)
+        assert (first.type, first.subtype) == (0, 8)
+        assert first.bssid == first.ta == mac_int(AP)
+        assert data.ta == mac_int(STA)
+        assert data.bssid == data.ra == mac_int(AP)
+        assert (eapol.rssi, eapol.channel) == (0, 0)
+        assert eapol.bssid == mac_int(AP)
+        assert other.channel == 36
+        assert (ack.type, ack.subtype) == (1, 13)
+        assert ack.ra == mac_int(STA)
+        assert ack.ta == ack.bssid == 0
+        assert [r.timestamp for r in records] == pytest.approx(
+            [p[0] for p in survey_packets()]
+        )
+
+    def test_chunks(self, tmp_path):
+        """Test splitting the decode into fixed-size chunks."""
+        path = write_capture(tmp_path / "a.cap", survey_packets())
+        chunks = list(iter_header_chunks(path, chunk=4, use_numpy=False))
+        assert [len(c) for c in chunks] == [4, 2]
+
+    def test_aggregates(self, tmp_path):
+        """Test per-BSSID signal and per-channel utilization."""
+        path = write_capture(tmp_path / "a.pcapng", survey_packets(), fmt="pcapng")
+        signal = signal_by_bssid(path, use_numpy=False)
+        assert signal == {
+            mac_int(AP): (3, -50.0, -60, -40),
+            mac_int(OTHER_AP): (1, -70.0, -70, -70),
+        }
+        usage = channel_utilization(path, use_numpy=False)
+        assert sorted(usage) == [0, 6, 36]
+        assert usage[6][0] == 3
+        assert usage[36][0] == 2
+        assert sum(u[1] for u in usage.values()) == sum(
+            len(p[1]) for p in survey_packets()
+        )
+
+    def test_numpy_required_when_asked(self, tmp_path, monkeypatch):
+        """Test the error raised when NumPy is requested but missing."""
+        monkeypatch.setattr(analytics, "HAVE_NUMPY", False)
+        path = write_capture(tmp_path / "a.cap", survey_packets())
+        with pytest.raises(ImportError):
+            list(iter_header_chunks(path, use_numpy=True))
+        assert len(signal_by_bssid(path)) == 2
+
+
+class TestNumpyDecoder:
+    """Tests for the vectorized decoder."""
+
+    @pytest.fixture(autouse=True)
+    def numpy(self):
+        return pytest.importorskip("numpy")
+
+    @pytest.mark.parametrize("fmt", ["pcap", "pcapng"])
+    def test_matches_python_decoder(self, tmp_path, fmt):
+        """Test that both decoders produce the same records."""
+        packets = survey_packets() * 5
+        path = write_capture(tmp_path / "a.cap", packets, fmt=fmt)
+        expected = [
+            r for c in iter_header_chunks(path, chunk=7, use_numpy=False) for r in c
+        ]
+        arrays = list(iter_header_chunks(path, chunk=7, use_numpy=True))
+        assert [len(a) for a in arrays] == [7, 7, 7, 7, 2]
+        got = [tuple(row.tolist()) for a in arrays for row in a]
+        assert got == [tuple(r) for r in expected]
+
+    def test_aggregates_match(self, tmp_path):
+        """Test that vectorized aggregations equal the fallback ones."""
+        path = write_capture(tmp_path / "a.cap", survey_packets() * 3)
+        assert signal_by_bssid(path, chunk=4, use_numpy=True) == signal_by_bssid(
+            path, chunk=4, use_numpy=False
+        )
+        assert channel_utilization(
+            path, chunk=4, use_numpy=True
+        ) == channel_utilization(path, chunk=4, use_numpy=False)
+
+    def test_long_bitmap_chain(self, tmp_path):
+        """Test that chains of more than three present words decode alike."""
+        frame = dot11(beacon())
+        packets = [
+            (1.0, radiotap_rx(frame, rssi=-40, words=6)),
+            (1.1, radiotap_rx(frame, freq=5180, rssi=-50, words=4)),
+            (1.2, radiotap_rx(frame, rssi=-60, words=3)),
+            (1.3, radiotap_rx(frame, freq=5180, rssi=-70)),
+        ]
+        path = write_capture(tmp_path / "a.cap", packets)
+        (expected,) = iter_header_chunks(path, use_numpy=False)
+        (array,) = iter_header_chunks(path, use_numpy=True)
+        assert [(r.rssi, r.freq, r.channel) for r in expected] == [
+            (-40, 2437, 6),
+            (-50, 5180, 36),
+            (-60, 2437, 6),
+            (-70, 5180, 36),
+        ]
+        assert [tuple(row.tolist()) for row in array] == [tuple(r) for r in expected]
+
+    def test_truncated_frames(self, tmp_path):
+        """Test that runt frames decode without reading past the chunk."""
+        packets = [(1.0, radiotap_rx(b"\x80\x00")), (2.0, b"\x00\x00\x40\x00")]
+        path = write_capture(tmp_path / "a.cap", packets)
+        (array,) = iter_header_chunks(path, use_numpy=True)
+        assert array["type"].tolist() == [-1, -1]
+        assert array["rssi"].tolist() == [-40, 0]
@@ -5,9 +5,19 @@ Comprehensive unit tests for the attacks module (Attack, wps_check_targets, etc.
 Tests cover abstract class behavior, WPS checking, mocking subprocess calls, and edge cases.
 """
 
+import os
+import time
 import pytest
+from subprocess import TimeoutExpired
 from unittest.mock import Mock, patch
-from wlfwifi.attacks import Attack, wps_check_targets
+from wlfwifi.attacks import (
+    Attack,
+    WEPAttack,
+    WPAAttack,
+    WPSAttack,
+    wpa_crack,
+    wps_check_targets,
+)
 from wlfwifi.models import Target
 
 
@@ -385,3 +395,457 @@ class TestAttackWithCapFile:
         attack = CaptureAttack(target, cap)
         assert "/tmp/test.cap" in attack.RunAttack()
         assert "2 handshakes" in attack.EndAttack()
+
+
+class TestWPAAttack:
+    """Tests for WPAAttack."""
+
+    def _target(self):
+        return Target("00:11:22:33:44:55", "TestNet", 6, "WPA2", False)
+
+    def test_wpa_attack_finishes_on_pmkid(self, tmp_path):
+        """Test that a clientless PMKID ends the attack and is attached."""
+        from frames import eapol_frame, pmkid_kde, write_capture
+
+        pmkid = bytes(range(16))
+        path = write_capture(
+            tmp_path / "a.cap", [(1.0, eapol_frame(1, 1, key_data=pmkid_kde(pmkid)))]
+        )
+        target = self._target()
+        attack = WPAAttack(target, path, timeout=2)
+        result = attack.RunAttack()
+        attack.EndAttack()
+        assert result.pmkid == pmkid
+        assert target.pmkid == pmkid
+
+    def test_wpa_attack_handshake_only(self, tmp_path):
+        """Test that accept_pmkid=False waits for a full handshake."""
+        from frames import eapol_frame, handshake_packets, pmkid_kde, write_capture
+        from wlfwifi.handshake import Handshake
+
+        packets = [(0.5, eapol_frame(1, 9, key_data=pmkid_kde(bytes(range(16)))))]
+        packets += handshake_packets()
+        path = write_capture(tmp_path / "a.cap", packets)
+        attack = WPAAttack(self._target(), path, timeout=2, accept_pmkid=False)
+        assert isinstance(attack.RunAttack(), Handshake)
+
+    def test_wpa_attack_timeout(self, tmp_path):
+        """Test that the attack returns None on timeout."""
+        from frames import beacon, write_capture
+
+        path = write_capture(tmp_path / "a.cap", [(1.0, beacon())])
+        attack = WPAAttack(self._target(), path, timeout=0.02, poll_interval=0.005)
+        assert attack.RunAttack() is None
+
+    @patch("wlfwifi.attacks.Popen")
+    @patch("wlfwifi.attacks.program_exists")
+    def test_wpa_attack_deauth(self, mock_exists, mock_popen, tmp_path):
+        """Test that deauthentication is started and stopped."""
+        from frames import beacon, write_capture
+
+        mock_exists.return_value = True
+        path = write_capture(tmp_path / "a.cap", [(1.0, beacon())])
+        attack = WPAAttack(
+            self._target(),
+            path,
+            timeout=0.01,
+            interface="wlan0mon",
+            poll_interval=0.005,
+        )
+        with patch("wlfwifi.attacks.send_interrupt") as mock_interrupt:
+            attack.RunAttack()
+            attack.EndAttack()
+            mock_interrupt.assert_called_once()
+        mock_popen.return_value.wait.assert_called_once_with(timeout=5)
+        mock_popen.return_value.kill.assert_not_called()
+        cmd = mock_popen.call_args[0][0]
+        assert cmd[:2] == ["aireplay-ng", "-0"]
+        assert "00:11:22:33:44:55" in cmd
+
+    @patch("wlfwifi.attacks.Popen")
+    @patch("wlfwifi.attacks.program_exists")
+    def test_wpa_attack_deauth_clients(self, mock_exists, mock_popen, tmp_path):
+        """Test that each given client is deauthenticated directly."""
+        from frames import beacon, write_capture
+
+        mock_exists.return_value = True
+        path = write_capture(tmp_path / "a.cap", [(1.0, beacon())])
+        attack = WPAAttack(
+            self._target(),
+            path,
+            timeout=0.01,
+            interface="wlan0mon",
+            poll_interval=0.005,
+            clients=["AA:BB:CC:DD:EE:01", "AA:BB:CC:DD:EE:02"],
+        )
+        with patch("wlfwifi.attacks.send_interrupt") as mock_interrupt:
+            attack.RunAttack()
+            attack.EndAttack()
+            assert mock_interrupt.call_count == 2
+        cmds = [c[0][0] for c in mock_popen.call_args_list]
+        assert [cmd[cmd.index("-c") + 1] for cmd in cmds] == [
+            "AA:BB:CC:DD:EE:01",
+            "AA:BB:CC:DD:EE:02",
+        ]
+        assert all(cmd[-1] == "wlan0mon" for cmd in cmds)
+
+    @patch("wlfwifi.attacks.Popen")
+    @patch("wlfwifi.attacks.program_exists")
+    def test_wpa_attack_deauth_killed(self, mock_exists, mock_popen, tmp_path):
+        """Test that aireplay-ng ignoring SIGINT is killed and reaped."""
+        from frames import beacon, write_capture
+
+        mock_exists.return_value = True
+        process = mock_popen.return_value
+        process.wait.side_effect = [TimeoutExpired("aireplay-ng", 5), 0]
+        path = write_capture(tmp_path / "a.cap", [(1.0, beacon())])
+        attack = WPAAttack(self._target(), path, timeout=0.01, interface="wlan0mon")
+        with patch("wlfwifi.attacks.send_interrupt"):
+            attack.RunAttack()
+            attack.EndAttack()
+        process.kill.assert_called_once_with()
+        assert process.wait.call_count == 2
+
+
+class TestWEPAttack:
+    """Tests for WEPAttack."""
+
+    def _target(self):
+        return Target("00:11:22:33:44:55", "TestWEP", 6, "WEP", False)
+
+    def _capture(self, path, ivs):
+        from frames import data_frame, write_capture
+
+        packets = [
+            (1.0 + i, data_frame(iv=bytes([0, 0, iv]))) for i, iv in enumerate(ivs)
+        ]
+        return write_capture(path, packets)
+
+    @patch("wlfwifi.attacks.Popen")
+    @patch("wlfwifi.attacks.program_exists")
+    def test_cracker_waits_for_threshold(self, mock_exists, mock_popen, tmp_path):
+        """Test that aircrack-ng is not started below the first threshold."""
+        mock_exists.return_value = True
+        path = self._capture(tmp_path / "a.cap", [1, 1, 2])
+        attack = WEPAttack(
+            self._target(), path, thresholds=(3,), timeout=0.02, poll_interval=0.005
+        )
+        assert attack.RunAttack() is None
+        assert attack.tracker.unique("00:11:22:33:44:55") == 2
+        mock_popen.assert_not_called()
+
+    @patch("wlfwifi.attacks.Popen")
+    @patch("wlfwifi.attacks.program_exists")
+    def test_cracker_restarted_until_key(self, mock_exists, mock_popen, tmp_path):
+        """Test that each threshold restarts aircrack-ng and the key is read."""
+        from frames import data_frame, pcap_bytes
+
+        mock_exists.return_value = True
+        path = self._capture(tmp_path / "a.cap", [1, 2])
+        key_path = str(tmp_path / "a.key")
+        runs = []
+
+        def start(cmd, **kwargs):
+            runs.append(cmd)
+            proc = Mock()
+            proc.poll.return_value = 1
+            if len(runs) == 1:
+                # First run fails; more IVs arrive before it is retried
+                with open(path, "ab") as f:
+                    frames = [(9.0, data_frame(iv=b"\0\0\x03"))]
+                    f.write(pcap_bytes(frames)[24:])
+            else:
+                with open(key_path, "w") as f:
+                    f.write("1234567890\n")
+            return proc
+
+        mock_popen.side_effect = start
+        attack = WEPAttack(
+            self._target(),
+            path,
+            thresholds=(2, 3),
+            timeout=2,
+            key_path=key_path,
+            poll_interval=0.005,
+        )
+        assert attack.RunAttack() == "1234567890"
+        assert attack.cracks == 2
+        assert runs[0][0] == "aircrack-ng"
+        assert "00:11:22:33:44:55" in runs[0]
+        assert runs[0][-1] == path
+
+    @patch("wlfwifi.attacks.program_exists")
+    def test_missing_aircrack(self, mock_exists, tmp_path):
+        """Test that the attack gives up without aircrack-ng."""
+        mock_exists.return_value = False
+        attack = WEPAttack(self._target(), str(tmp_path / "a.cap"))
+        assert attack.RunAttack() is None
+
+
+class TestWPSAttack:
+    """Tests for WPSAttack."""
+
+    def _reaver(self, mock_popen, output):
+        import io
+
+        process = Mock()
+        process.stdout = io.StringIO(output)
+        process.poll.return_value = 0
+        mock_popen.return_value = process
+        return process
+
+    def _target(self):
+        return Target("00:11:22:33:44:55", "TestWPS", 6, "WPA2", True)
+
+    @patch("wlfwifi.attacks.Popen")
+    @patch("wlfwifi.attacks.program_exists")
+    def test_streams_events(self, mock_exists, mock_popen):
+        """Test that reaver's output is parsed into events and the key."""
+        mock_exists.return_value = True
+        self._reaver(
+            mock_popen,
+            '[+] Trying pin "12345670"\n'
+            "[+] Received M1 message\n"
+            "[+] 90.91% complete @ 2026-01-01 10:00:00 (2 seconds/pin)\n"
+            "[+] WPS PIN: '12345670'\n"
+            "[+] WPA PSK: 'correct horse'\n",
+        )
+        events = []
+        attack = WPSAttack(
+            self._target(), "wlan0mon", on_event=events.append, poll_interval=0.01
+        )
+        assert attack.RunAttack() == "correct horse"
+        assert attack.pin == "12345670"
+        assert [e.kind for e in events] == [
+            "pin",
+            "message",
+            "progress",
+            "wps_pin",
+            "psk",
+        ]
+        assert attack.stats.pins == 1
+        assert attack.stats.progress == 0.9091
+        cmd = mock_popen.call_args[0][0]
+        assert cmd[:5] == ["reaver", "-i", "wlan0mon", "-b", "00:11:22:33:44:55"]
+        assert cmd[-2:] == ["-c", "6"]
+
+    @patch("wlfwifi.attacks.Popen")
+    @patch("wlfwifi.attacks.program_exists")
+    def test_backs_off_on_lockout(self, mock_exists, mock_popen):
+        """Test that reaver is paused and resumed after a lockout."""
+        from signal import SIGCONT, SIGSTOP
+        from wlfwifi.wps import WpsBackoff
+
+        mock_exists.return_value = True
+        process = self._reaver(mock_popen, "")
+
+        def output():
+            yield "[!] WARNING: Detected AP rate limiting, waiting 60 seconds\n"
+            # reaver is silent while stopped
+            time.sleep(0.1)
+            for pin in ("12345670", "12345671", "12345672"):
+                yield '[+] Trying pin "%s"\n' % pin
+
+        process.stdout = output()
+        attack = WPSAttack(
+            self._target(),
+            "wlan0mon",
+            backoff=WpsBackoff(base_delay=0.02),
+            timeout=0.5,
+            poll_interval=0.01,
+        )
+        assert attack.RunAttack() is None
+        signals = [c[0][0] for c in process.send_signal.call_args_list]
+        assert signals[0] == SIGSTOP
+        assert attack.stats.rate_limits == 1
+        assert attack.stats.paused == 0.02
+        assert signals[1] == SIGCONT
+        assert attack.stats.pins == 3
+
+    @patch("wlfwifi.attacks.Popen")
+    @patch("wlfwifi.attacks.program_exists")
+    def test_resumes_from_checkpoint(self, mock_exists, mock_popen, tmp_path):
+        """Test that halves ruled out in one run are skipped by the next."""
+        from wlfwifi.wps import WpsCheckpoint
+
+        mock_exists.return_value = True
+        checkpoint = WpsCheckpoint(str(tmp_path / "wps"))
+        self._reaver(
+            mock_popen,
+            '[+] Trying pin "12345670"\n'
+            "[+] Received M3 message\n"
+            "[+] Received WSC NACK\n"
+            "[!] WARNING: Detected AP rate limiting, waiting 60 seconds\n",
+        )
+        attack = WPSAttack(
+            self._target(), "wlan0mon", checkpoint=checkpoint, poll_interval=0.01
+        )
+        attack.backoff.base_delay = 0
+        assert attack.RunAttack() is None
+        assert "-s" not in mock_popen.call_args[0][0]
+        state = checkpoint.load("00:11:22:33:44:55")
+        assert state.tried_first == {"1234"}
+        assert len(state.lockouts) == 1
+
+        process = self._reaver(mock_popen, "[+] WPS PIN: '00005670'\n")
+        sessions = []
+
+        def start(cmd, **kwargs):
+            with open(cmd[cmd.index("-s") + 1]) as f:
+                sessions.append(f.read().splitlines())
+            return process
+
+        mock_popen.side_effect = start
+        attack = WPSAttack(
+            self._target(), "wlan0mon", checkpoint=checkpoint, poll_interval=0.01
+        )
+        attack.RunAttack()
+        session = sessions[0]
+        assert session[3] == "0000"
+        assert session[10002] == "1234"
+        # The lockout streak is still running
+        assert attack.backoff.lockouts == 1
+        assert attack.result == "00005670"
+        assert checkpoint.load("00:11:22:33:44:55").position == 0
+
+    @patch("wlfwifi.attacks.program_exists")
+    def test_missing_reaver(self, mock_exists):
+        """Test that the attack gives up without reaver."""
+        mock_exists.return_value = False
+        assert WPSAttack(self._target(), "wlan0mon").RunAttack() is None
+
+
+class TestWpaCrack:
+    """Tests for wpa_crack."""
+
+    @patch("wlfwifi.attacks.crack_wordlist")
+    @patch("wlfwifi.attacks.program_exists")
+    def test_wpa_crack(self, mock_exists, mock_crack):
+        """Test that the wordlist is dispatched to aircrack-ng workers."""
+        mock_exists.return_value = True
+        mock_crack.return_value = (b"password", Mock())
+        key = wpa_crack("hs.cap", "words.gz", "00:11:22:33:44:55", processes=2)
+        assert key == "password"
+        worker = mock_crack.call_args[0][1]
+        assert worker.cap_path == "hs.cap"
+        assert worker.bssid == "00:11:22:33:44:55"
+        assert mock_crack.call_args[0][2] == 2
+
+    @patch("wlfwifi.attacks.crack_wordlist")
+    @patch("wlfwifi.attacks.program_exists")
+    def test_wpa_crack_resumes(self, mock_exists, mock_crack, tmp_path):
+        """Test that a second run starts where the first one stopped."""
+        mock_exists.return_value = True
+        cap_path = str(tmp_path / "hs.cap")
+        wordlist = tmp_path / "words.txt"
+        wordlist.write_bytes(b"password\n" * 10)
+
+        def interrupted(*args, start, checkpoint):
+            checkpoint(start + 6)
+            raise KeyboardInterrupt
+
+        mock_crack.side_effect = interrupted
+        with pytest.raises(KeyboardInterrupt):
+            wpa_crack(cap_path, str(wordlist), "00:11:22:33:44:55")
+        assert os.path.exists(cap_path + ".resume")
+        mock_crack.side_effect = None
+        mock_crack.return_value = (None, Mock())
+        wpa_crack(cap_path, str(wordlist), "00:11:22:33:44:55")
+        assert mock_crack.call_args[1]["start"] == 6
+        wpa_crack(cap_path, str(wordlist), "00:11:22:33:44:55", resume=False)
+        assert mock_crack.call_args[1]["start"] == 0
+        mock_crack.return_value = (b"password", Mock())
+        wpa_crack(cap_path, str(wordlist), "00:11:22:33:44:55", start=2)
+        assert mock_crack.call_args[1]["start"] == 2
+        wpa_crack(cap_path, str(wordlist), "00:11:22:33:44:55")
+        assert mock_crack.call_args[1]["start"] == 0
+
+    @patch("wlfwifi.attacks.crack_wordlist")
+    @patch("wlfwifi.attacks.program_exists")
+    def test_wpa_crack_from_pmk_cache(self, mock_exists, mock_crack, tmp_path):
+        """Test that cached PMKs are tried before any wordlist."""
+        from frames import AP, signed_handshake_packets, write_capture
+        from wlfwifi.pmk import PmkCache
+        from wlfwifi.wpa import pmk
+
+        mock_exists.return_value = False
+        cap_path = write_capture(
+            tmp_path / "hs.cap", signed_handshake_packets(b"correct horse")
+        )
+        db = str(tmp_path / "pmk.db")
+        with PmkCache(db) as cache:
+            cache.add(
+                b"TestNet", [(b"correct horse", pmk(b"correct horse", b"TestNet"))]
+            )
+        key = wpa_crack(cap_path, "words.txt", AP, pmk_cache=db)
+        assert key == "correct horse"
+        mock_crack.assert_not_called()
+        assert wpa_crack(str(tmp_path / "missing.cap"), "w", AP, pmk_cache=db) is None
+
+    @patch("wlfwifi.attacks.crack_wordlist")
+    @patch("wlfwifi.attacks.program_exists")
+    def test_wpa_crack_known_keys(self, mock_exists, mock_crack, tmp_path):
+        """Test that known keys are verified before the wordlist."""
+        from frames import AP, signed_handshake_packets, write_capture
+
+        mock_exists.return_value = True
+        mock_crack.return_value = (None, Mock())
+        cap_path = write_capture(
+            tmp_path / "hs.cap", signed_handshake_packets(b"correct horse")
+        )
+        key = wpa_crack(cap_path, "w", AP, keys=["password", "correct horse"])
+        assert key == "correct horse"
+        mock_crack.assert_not_called()
+        assert wpa_crack(cap_path, "w", AP, keys=["password"]) is None
+        mock_crack.assert_called_once()
+
+    @patch("wlfwifi.attacks.program_exists")
+    def test_wpa_crack_native(self, mock_exists, tmp_path):
+        """Test the native engine, which does not need aircrack-ng."""
+        from frames import AP, signed_handshake_packets, write_capture
+
+        mock_exists.return_value = False
+        cap_path = write_capture(
+            tmp_path / "hs.cap", signed_handshake_packets(b"correct horse")
+        )
+        wordlist = tmp_path / "words.txt"
+        wordlist.write_bytes(b"password\n12345678\ncorrect horse\n")
+        key = wpa_crack(cap_path, str(wordlist), AP, processes=1, engine="native")
+        assert key == "correct horse"
+        missing = str(tmp_path / "missing.cap")
+        assert wpa_crack(missing, str(wordlist), AP, engine="native") is None
+        with pytest.raises(ValueError):
+            wpa_crack(cap_path, str(wordlist), AP, engine="hashcat")
+
+    @patch("wlfwifi.attacks.crack_wordlist")
+    @patch("wlfwifi.attacks.program_exists")
+    def test_wpa_crack_records_results(self, mock_exists, mock_crack, tmp_path):
+        """Test that keys are recorded and reused for new handshakes."""
+        from frames import AP, signed_handshake_packets, write_capture
+        from wlfwifi.results import ResultStore
+
+        mock_exists.return_value = True
+        mock_crack.return_value = (b"correct horse", Mock())
+        db = str(tmp_path / "results.db")
+        first = write_capture(
+            tmp_path / "a.cap", signed_handshake_packets(b"correct horse")
+        )
+        assert wpa_crack(first, "w", AP, results=db) == "correct horse"
+        assert wpa_crack(first, "w", AP, results=db) == "correct horse"
+        assert mock_crack.call_count == 1
+        # A new handshake of the same network is verified with the stored key
+        packets = signed_handshake_packets(b"correct horse", sta="02:00:00:00:00:99")
+        second = write_capture(tmp_path / "b.cap", packets)
+        assert wpa_crack(second, "w", AP, results=db) == "correct horse"
+        assert mock_crack.call_count == 1
+        with ResultStore(db) as store:
+            assert [(r.essid, r.method) for r in store] == [
+                ("TestNet", "aircrack"),
+                ("TestNet", "stored"),
+            ]
+
+    @patch("wlfwifi.attacks.program_exists")
+    def test_wpa_crack_without_aircrack(self, mock_exists):
+        """Test that wpa_crack gives up without aircrack-ng."""
+        mock_exists.return_value = False
+        assert wpa_crack("hs.cap", "words.txt", "00:11:22:33:44:55") is None
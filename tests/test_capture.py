@@ -0,0 +1,284 @@
+"""
+test_capture.py
+---------------
+Unit tests for the capture module (pcap/pcapng reading, 802.11 decoding).
+Tests cover both file formats, incremental reads of growing files, and
+header decoding edge cases.
+"""
+
+import os
+import pytest
+from wlfwifi.capture import (
+    CaptureReader,
+    Frame,
+    PcapWriter,
+    PcapngWriter,
+    open_writer,
+    beacon_essid,
+    frame_essid,
+    iter_frames,
+    iter_ies,
+    mac_str,
+    parse_dot11,
+    radiotap_layout,
+    wps_info,
+    LINKTYPE_IEEE802_11_RADIOTAP,
+)
+from frames import (
+    AP,
+    STA,
+    assoc_request,
+    beacon,
+    data_frame,
+    eapol_frame,
+    pcap_bytes,
+    pcapng_bytes,
+    probe_response,
+    radiotap_rx,
+    write_capture,
+    wps_beacon,
+)
+
+
+class TestCaptureReader:
+    """Tests for CaptureReader and iter_frames."""
+
+    def test_read_pcap(self, tmp_path):
+        """Test reading frames and timestamps from a pcap file."""
+        packets = [(1000.5, beacon()), (1001.25, data_frame())]
+        path = write_capture(tmp_path / "a.cap", packets)
+        frames = list(iter_frames(path))
+        assert [f.data for f in frames] == [p[1] for p in packets]
+        assert frames[0].timestamp == pytest.approx(1000.5)
+        assert frames[1].linktype == LINKTYPE_IEEE802_11_RADIOTAP
+        assert frames[0].offset == 24
+
+    def test_read_pcap_nanosecond_big_endian(self, tmp_path):
+        """Test nanosecond-resolution, big-endian pcap files."""
+        packets = [(12.000000001, beacon())]
+        path = write_capture(
+            tmp_path / "ns.cap", packets, nanoseconds=True, big_endian=True
+        )
+        frame = next(iter_frames(path))
+        assert frame.timestamp == pytest.approx(12.000000001)
+        assert frame.data == packets[0][1]
+
+    def test_read_pcapng(self, tmp_path):
+        """Test reading enhanced packet blocks from a pcapng file."""
+        packets = [(1000.5, beacon()), (1001.25, eapol_frame(1, 1))]
+        path = write_capture(tmp_path / "a.pcapng", packets, fmt="pcapng")
+        frames = list(iter_frames(path))
+        assert [f.data for f in frames] == [p[1] for p in packets]
+        assert frames[1].timestamp == pytest.approx(1001.25)
+
+    def test_read_pcapng_tsresol(self, tmp_path):
+        """Test honoring the if_tsresol interface option."""
+        packets = [(5.123456789, beacon())]
+        path = write_capture(tmp_path / "a.pcapng", packets, fmt="pcapng", tsresol=9)
+        assert next(iter_frames(path)).timestamp == pytest.approx(5.123456789)
+
+    def test_not_a_capture(self, tmp_path):
+        """Test that a non-capture file raises ValueError."""
+        path = tmp_path / "junk.cap"
+        path.write_bytes(b"this is not a capture file at all")
+        with pytest.raises(ValueError):
+            list(iter_frames(str(path)))
+
+    def test_missing_file_yields_nothing(self, tmp_path):
+        """Test that a capture not yet created yields no frames."""
+        reader = CaptureReader(str(tmp_path / "later.cap"))
+        assert list(reader.frames()) == []
+
+    @pytest.mark.parametrize("fmt", ["pcap", "pcapng"])
+    def test_growing_file(self, tmp_path, fmt):
+        """Test that partial records are picked up once completed."""
+        packets = [(1.0, beacon()), (2.0, data_frame()), (3.0, eapol_frame(2, 1))]
+        builder = pcapng_bytes if fmt == "pcapng" else pcap_bytes
+        blob = builder(packets)
+        path = tmp_path / "grow.cap"
+        reader = CaptureReader(str(path))
+        seen = []
+        for cut in (10, len(blob) - 30, len(blob) - 1, len(blob)):
+            path.write_bytes(blob[:cut])
+            seen.extend(f.data for f in reader.frames())
+        reader.close()
+        assert seen == [p[1] for p in packets]
+        assert reader.frames_read == 3
+
+    def test_follow_timeout(self, tmp_path):
+        """Test that follow returns existing frames and then times out."""
+        path = write_capture(tmp_path / "a.cap", [(1.0, beacon())])
+        with CaptureReader(path) as reader:
+            frames = list(reader.follow(poll_interval=0.001, timeout=0.02))
+        assert len(frames) == 1
+
+    def test_accept_stage(self, tmp_path):
+        """Test that frames rejected by "accept" are counted, not yielded."""
+        packets = [(1.0, beacon()), (2.0, data_frame()), (3.0, beacon(seq=1))]
+        path = write_capture(tmp_path / "a.cap", packets)
+        with CaptureReader(path, lambda f: f.timestamp != 2.0) as reader:
+            frames = list(reader.frames())
+        assert [f.data for f in frames] == [packets[0][1], packets[2][1]]
+        assert reader.frames_read == 2
+        assert reader.frames_dropped == 1
+
+
+class TestParseDot11:
+    """Tests for parse_dot11 and Dot11Frame."""
+
+    def test_beacon_addresses(self):
+        """Test BSSID and source of a management frame."""
+        dot11 = parse_dot11(Frame(0.0, 127, beacon(), 0))
+        assert dot11.type == 0 and dot11.subtype == 8
+        assert mac_str(dot11.bssid) == AP
+        assert mac_str(dot11.source) == AP
+
+    def test_data_to_ds(self):
+        """Test address roles of a station-to-AP data frame."""
+        dot11 = parse_dot11(Frame(0.0, 127, data_frame(seq=7), 0))
+        assert mac_str(dot11.bssid) == AP
+        assert mac_str(dot11.source) == STA
+        assert dot11.seq >> 4 == 7
+
+    def test_qos_header_length(self):
+        """Test that QoS data frames have a 26-byte header."""
+        dot11 = parse_dot11(Frame(0.0, 127, eapol_frame(1, 1, qos=True), 0))
+        assert dot11.header_len == 26
+        assert dot11.body.startswith(b"\xaa\xaa\x03")
+
+    def test_radiotap_fcs_stripped(self):
+        """Test that a trailing FCS flagged in radiotap is removed."""
+        from frames import radiotap, mac, dot11_header
+
+        frame = dot11_header(0x80, 0, mac(AP), mac(AP), mac(AP)) + b"body"
+        dot11 = parse_dot11(Frame(0.0, 127, radiotap(frame, fcs=True), 0))
+        assert dot11.data == frame
+
+    def test_unsupported_linktype(self):
+        """Test that non-802.11 link types are ignored."""
+        assert parse_dot11(Frame(0.0, 1, b"\0" * 64, 0)) is None
+
+    def test_truncated_frame(self):
+        """Test that truncated frames are ignored."""
+        assert parse_dot11(Frame(0.0, 127, beacon()[:20], 0)) is None
+
+
+class TestRadiotapLayout:
+    """Tests for radiotap_layout."""
+
+    def test_offsets(self):
+        """Test field offsets with and without extended bitmaps and TSFT."""
+        assert radiotap_layout(radiotap_rx(b"")) == (10, 14)
+        assert radiotap_layout(radiotap_rx(b"", tsft=True)) == (26, 30)
+        assert radiotap_layout(radiotap_rx(b"", words=6)) == (30, 34)
+        assert radiotap_layout(radiotap_rx(b"")[:6]) == (-1, -1)
+
+
+class TestCaptureWriters:
+    """Tests for PcapWriter, PcapngWriter and open_writer."""
+
+    @pytest.mark.parametrize("fmt", ["pcap", "pcapng"])
+    def test_round_trip(self, tmp_path, fmt):
+        """Test that written frames read back with their timestamps."""
+        packets = [(1000.25, beacon()), (1001.000001, eapol_frame(1, 1))]
+        path = str(tmp_path / ("out." + fmt))
+        with open_writer(path) as writer:
+            for ts, data in packets:
+                writer.write(Frame(ts, LINKTYPE_IEEE802_11_RADIOTAP, data, 0))
+        frames = list(iter_frames(path))
+        assert [f.data for f in frames] == [p[1] for p in packets]
+        assert frames[1].timestamp == pytest.approx(1001.000001, abs=1e-7)
+        assert writer.frames_written == 2
+        assert writer.bytes_written == os.path.getsize(path)
+
+    def test_pcap_append(self, tmp_path):
+        """Test adding frames to an existing pcap file."""
+        path = str(tmp_path / "a.cap")
+        with PcapWriter(path) as writer:
+            writer.write(Frame(1.0, 127, beacon(), 0))
+        with PcapWriter(path, append=True) as writer:
+            writer.write(Frame(2.0, 127, data_frame(), 0))
+        assert writer.bytes_written == os.path.getsize(path)
+        assert [f.timestamp for f in iter_frames(path)] == [1.0, 2.0]
+
+    def test_pcap_rejects_other_linktype(self, tmp_path):
+        """Test that a pcap file keeps a single link type."""
+        with PcapWriter(str(tmp_path / "a.cap")) as writer:
+            assert not writer.accepts(105)
+            with pytest.raises(ValueError):
+                writer.write(Frame(1.0, 105, b"x", 0))
+
+    def test_pcapng_mixed_linktypes(self, tmp_path):
+        """Test one interface per link type in pcapng output."""
+        path = str(tmp_path / "a.pcapng")
+        with PcapngWriter(path) as writer:
+            writer.write(Frame(1.0, 127, beacon(), 0))
+            writer.write(Frame(2.0, 105, b"\x80" + bytes(23), 0))
+            writer.write(Frame(3.0, 127, data_frame(), 0))
+        with CaptureReader(path) as reader:
+            frames = list(reader.frames())
+            assert reader.interfaces == [(127, 1e9), (105, 1e9)]
+        assert [f.linktype for f in frames] == [127, 105, 127]
+
+
+class TestInformationElements:
+    """Tests for iter_ies and beacon_essid."""
+
+    def test_iter_ies(self):
+        """Test iterating tagged elements and stopping at truncation."""
+        body = b"\x00\x03abc\x01\x01\x82\x30\x10abc"
+        assert list(iter_ies(body)) == [(0, b"abc"), (1, b"\x82")]
+
+    def test_beacon_essid(self):
+        """Test extracting the ESSID of a beacon."""
+        dot11 = parse_dot11(Frame(0.0, 127, beacon(essid="Cafe"), 0))
+        assert beacon_essid(dot11) == b"Cafe"
+
+    def test_hidden_essid(self):
+        """Test that blank or zeroed ESSIDs are treated as hidden."""
+        for essid in ("", "\0\0\0\0"):
+            dot11 = parse_dot11(Frame(0.0, 127, beacon(essid=essid), 0))
+            assert beacon_essid(dot11) is None
+
+    def test_non_beacon(self):
+        """Test that data frames have no beacon ESSID."""
+        assert beacon_essid(parse_dot11(Frame(0.0, 127, data_frame(), 0))) is None
+
+    def test_frame_essid(self):
+        """Test that probe responses and (re)association requests name ESSIDs."""
+        for frame in (
+            beacon(essid="Cafe"),
+            probe_response(essid="Cafe"),
+            assoc_request(essid="Cafe"),
+            assoc_request(essid="Cafe", reassoc=True),
+        ):
+            assert frame_essid(parse_dot11(Frame(0.0, 127, frame, 0))) == b"Cafe"
+        for frame in (beacon(essid=""), assoc_request(essid="\0\0"), data_frame()):
+            assert frame_essid(parse_dot11(Frame(0.0, 127, frame, 0))) is None
+
+    def test_wps_info(self):
+        """Test reading WPS presence and the AP Setup Locked attribute."""
+        for frame, expected in (
+            (beacon(), None),
+            (wps_beacon(), False),
+            (wps_beacon(locked=False), False),
+            (wps_beacon(locked=True), True),
+            (data_frame(), None),
+        ):
+            assert wps_info(parse_dot11(Frame(0.0, 127, frame, 0))) is expected
+
+    def test_wps_info_truncated_attribute(self):
+        """Test that an attribute running past the element is ignored."""
+        frame = wps_beacon(locked=True)
+        # Drop the AP Setup Locked value byte, shrinking the element with it
+        ie = frame.index(b"\x00\x50\xf2\x04") - 1
+        frame = frame[:ie] + bytes([frame[ie] - 1]) + frame[ie + 1 : -1]
+        assert wps_info(parse_dot11(Frame(0.0, 127, frame, 0))) is False
+
+
+class TestMacStr:
+    """Tests for mac_str function."""
+
+    def test_mac_str(self):
+        """Test formatting of raw MAC bytes."""
+        assert mac_str(b"\x00\x11\x22\xaa\xbb\xcc") == "00:11:22:AA:BB:CC"
@@ -0,0 +1,83 @@
+"""
+test_compact.py
+---------------
+Unit tests for the compact module (wordlist deduplication and packing).
+Tests cover length filtering, deduplication across inputs, spilled sort
+runs with multi-pass merging, and cracking from the packed output.
+"""
+
+import os
+import gzip
+from wlfwifi.compact import compact_wordlist
+from wlfwifi.crack import crack_wordlist
+from wlfwifi.wordlist import WordlistReader
+
+
+def write_lines(path, words, compress=False):
+    data = b"".join(w + b"\n" for w in words)
+    path.write_bytes(gzip.compress(data) if compress else data)
+    return str(path)
+
+
+def read_all(path):
+    with WordlistReader(path) as reader:
+        return list(reader)
+
+
+class FindWorker:
+    """Finds a fixed candidate; picklable for the process pool."""
+
+    def __call__(self, chunk):
+        return b"letmein!" if b"letmein!" in chunk else None
+
+
+class TestCompactWordlist:
+    """Tests for compact_wordlist."""
+
+    def test_dedupe_and_filter(self, tmp_path):
+        """Test that duplicates and invalid lengths are dropped."""
+        first = write_lines(
+            tmp_path / "a.txt", [b"password", b"short", b"letmein!", b"password"]
+        )
+        second = write_lines(
+            tmp_path / "b.gz", [b"letmein!", b"x" * 64, b"abcdefghij"], compress=True
+        )
+        output = str(tmp_path / "out.wpk")
+        stats = compact_wordlist([first, second], output)
+        assert read_all(output) == [b"letmein!", b"password", b"abcdefghij"]
+        assert stats.inputs == 2
+        assert stats.lines == 7
+        assert stats.skipped == 2
+        assert stats.candidates == 5
+        assert stats.duplicates == 2
+        assert stats.written == 3
+        assert stats.runs == 0
+        assert stats.bytes_written == os.path.getsize(output)
+
+    def test_spilled_runs(self, tmp_path):
+        """Test that a small memory budget spills and merges sorted runs."""
+        words = [b"word%06d" % (i * 7919 % 500) for i in range(2000)]
+        words += [b"longer-word%04d" % (i % 300) for i in range(900)]
+        path = write_lines(tmp_path / "w.txt", words)
+        expected = sorted(set(words), key=lambda w: (len(w), w))
+        in_memory = str(tmp_path / "mem.wpk")
+        spilled = str(tmp_path / "disk.wpk")
+        compact_wordlist([path], in_memory)
+        stats = compact_wordlist(
+            [path], spilled, memory=4000, tmp_dir=str(tmp_path), fan_in=3
+        )
+        assert stats.runs > 9
+        assert read_all(spilled) == expected
+        assert read_all(in_memory) == expected
+        assert stats.written == 800
+        assert sorted(os.listdir(tmp_path)) == ["disk.wpk", "mem.wpk", "w.txt"]
+
+    def test_crack_from_packed(self, tmp_path):
+        """Test that the crack pipeline reads the packed output."""
+        path = write_lines(tmp_path / "w.txt", [b"password%d" % i for i in range(50)])
+        extra = write_lines(tmp_path / "x.txt", [b"letmein!"])
+        output = str(tmp_path / "out.wpk")
+        compact_wordlist([path, extra], output)
+        key, stats = crack_wordlist(output, FindWorker(), processes=1, chunk_size=8)
+        assert key == b"letmein!"
+        assert stats.candidates == 8
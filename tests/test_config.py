@@ -188,6 +188,182 @@ class TestParseArgs:
         assert config.verbose is True
 
 
+class TestParseArgsCommands:
+    """Tests for parse_args subcommands."""
+
+    def test_parse_args_no_command(self, monkeypatch):
+        """Test that plain options select no subcommand."""
+        monkeypatch.setattr(sys, "argv", ["prog", "-i", "wlan0"])
+        config = parse_args()
+        assert config.command is None
+
+    def test_parse_args_export(self, monkeypatch):
+        """Test parsing the export subcommand."""
+        monkeypatch.setattr(
+            sys, "argv", ["prog", "export", "-o", "out.hc22000", "a.cap", "b.cap"]
+        )
+        config = parse_args()
+        assert config.command == "export"
+        assert config.options["captures"] == ["a.cap", "b.cap"]
+        assert config.options["output"] == "out.hc22000"
+        assert config.options["jobs"] is None
+
+    def test_parse_args_export_requires_output(self, monkeypatch):
+        """Test that export without -o exits."""
+        monkeypatch.setattr(sys, "argv", ["prog", "export", "a.cap"])
+        with pytest.raises(SystemExit):
+            parse_args()
+
+    def test_parse_args_merge(self, monkeypatch):
+        """Test parsing the merge subcommand and its defaults."""
+        monkeypatch.setattr(
+            sys, "argv", ["prog", "merge", "-o", "all.pcapng", "a.cap", "b.cap"]
+        )
+        config = parse_args()
+        assert config.command == "merge"
+        assert config.options["captures"] == ["a.cap", "b.cap"]
+        assert config.options["window"] == 0.05
+        assert config.options["keep_duplicates"] is False
+
+    def test_parse_args_split(self, monkeypatch):
+        """Test parsing the split subcommand with repeated BSSIDs."""
+        monkeypatch.setattr(
+            sys,
+            "argv",
+            [
+                "prog",
+                "split",
+                "-o",
+                "out",
+                "-b",
+                "00:11:22:33:44:55",
+                "-b",
+                "x",
+                "a.cap",
+            ],
+        )
+        config = parse_args()
+        assert config.command == "split"
+        assert config.options["capture"] == "a.cap"
+        assert config.options["output_dir"] == "out"
+        assert config.options["bssids"] == ["00:11:22:33:44:55", "x"]
+        assert config.options["max_open"] == 128
+        assert config.options["keep_all"] is False
+        assert config.options["keep_retries"] is False
+
+    def test_parse_args_ring(self, monkeypatch):
+        """Test parsing the ring subcommand and its caps."""
+        monkeypatch.setattr(
+            sys,
+            "argv",
+            ["prog", "ring", "-d", "ring", "--segment-mb", "8", "/dev/stdin"],
+        )
+        config = parse_args()
+        assert config.command == "ring"
+        assert config.options["source"] == "/dev/stdin"
+        assert config.options["segment_mb"] == 8
+        assert config.options["segment_seconds"] == 600.0
+        assert config.options["max_segments"] == 16
+        assert config.options["follow"] is False
+
+    def test_parse_args_crack(self, monkeypatch):
+        """Test parsing the crack subcommand with a stdin wordlist."""
+        monkeypatch.setattr(
+            sys,
+            "argv",
+            ["prog", "crack", "-w", "-", "-b", "00:11:22:33:44:55", "hs.cap"],
+        )
+        config = parse_args()
+        assert config.command == "crack"
+        assert config.options["capture"] == "hs.cap"
+        assert config.options["wordlist"] == "-"
+        assert config.options["bssid"] == "00:11:22:33:44:55"
+        assert config.options["jobs"] is None
+        assert config.options["chunk_size"] == 20000
+        assert config.options["skip"] is None
+        assert config.options["no_resume"] is False
+        assert config.options["pmk_cache"] is None
+
+    def test_parse_args_crack_resume_options(self, monkeypatch):
+        """Test the crack options choosing where the wordlist starts."""
+        monkeypatch.setattr(
+            sys,
+            "argv",
+            ["prog", "crack", "-w", "w.txt", "-b", "AP", "--skip", "500", "a.cap"],
+        )
+        assert parse_args().options["skip"] == 500
+        monkeypatch.setattr(
+            sys,
+            "argv",
+            ["prog", "crack", "-w", "w.txt", "-b", "AP", "--no-resume", "a.cap"],
+        )
+        assert parse_args().options["no_resume"] is True
+
+    def test_parse_args_crack_engine_options(self, monkeypatch):
+        """Test choosing the crack engine and known keys to verify first."""
+        argv = ["prog", "crack", "-w", "w.txt", "-b", "AP", "a.cap"]
+        monkeypatch.setattr(sys, "argv", argv)
+        options = parse_args().options
+        assert options["engine"] == "aircrack"
+        assert options["keys"] is None
+        argv += ["--engine", "native", "-k", "password", "--key", "12345678"]
+        monkeypatch.setattr(sys, "argv", argv)
+        options = parse_args().options
+        assert options["engine"] == "native"
+        assert options["keys"] == ["password", "12345678"]
+
+    def test_parse_args_wordlist_compact(self, monkeypatch):
+        """Test parsing the wordlist compact subcommand."""
+        monkeypatch.setattr(
+            sys,
+            "argv",
+            ["prog", "wordlist", "compact", "-o", "out.wpk", "a.txt", "b.gz"],
+        )
+        config = parse_args()
+        assert config.command == "wordlist"
+        assert config.options["action"] == "compact"
+        assert config.options["inputs"] == ["a.txt", "b.gz"]
+        assert config.options["output"] == "out.wpk"
+        assert config.options["memory"] == 256
+        assert config.options["tmp_dir"] is None
+
+    def test_parse_args_pmk_precompute(self, monkeypatch):
+        """Test parsing the pmk precompute subcommand."""
+        monkeypatch.setattr(
+            sys,
+            "argv",
+            ["prog", "pmk", "precompute", "-e", "Corp", "-w", "w.txt", "-c", "p.db"],
+        )
+        config = parse_args()
+        assert config.command == "pmk"
+        assert config.options["action"] == "precompute"
+        assert config.options["essid"] == "Corp"
+        assert config.options["wordlist"] == "w.txt"
+        assert config.options["cache"] == "p.db"
+        assert config.options["jobs"] is None
+
+    def test_parse_args_results(self, monkeypatch):
+        """Test parsing the results subcommand and the crack results option."""
+        monkeypatch.setattr(sys, "argv", ["prog", "results", "r.db"])
+        config = parse_args()
+        assert config.command == "results"
+        assert config.options["database"] == "r.db"
+        argv = ["prog", "crack", "-w", "w.txt", "-b", "AP", "a.cap"]
+        monkeypatch.setattr(sys, "argv", argv)
+        assert parse_args().options["results"] is None
+        monkeypatch.setattr(sys, "argv", argv + ["--results", "r.db"])
+        assert parse_args().options["results"] == "r.db"
+
+    def test_parse_args_attacks(self, monkeypatch):
+        """Test parsing the attacks subcommand."""
+        monkeypatch.setattr(sys, "argv", ["prog", "attacks"])
+        config = parse_args()
+        assert config.command == "attacks"
+        assert config.options["plugins"] is True
+        monkeypatch.setattr(sys, "argv", ["prog", "attacks", "--no-plugins"])
+        assert parse_args().options["plugins"] is False
+
+
 class TestParseArgsEdgeCases:
     """Edge case tests for parse_args."""
 
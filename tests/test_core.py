@@ -5,6 +5,8 @@ Comprehensive unit tests for the core module (main engine logic).
 Tests cover main function, logging configuration, error handling, and integration.
 """
 
+import os
+import struct
 import logging
 import pytest
 from unittest.mock import patch
@@ -284,3 +286,684 @@ class TestConfigIntegration:
 
         mock_parse_args.return_value = RunConfig(verbose=False)
         main()
+
+
+class TestTargetScoring:
+    """Tests for default_score and make_scorer."""
+
+    def test_stronger_signal_scores_higher(self):
+        """Test that a stronger signal yields a higher score."""
+        from wlfwifi.core import default_score
+        from wlfwifi.models import Target
+
+        near = Target("00:11:22:33:44:55", "Near", 6, "WPA2", False, power=-40)
+        far = Target("00:11:22:33:44:66", "Far", 6, "WPA2", False, power=-85)
+        assert default_score(near) > default_score(far)
+
+    def test_locked_wps_not_rewarded(self):
+        """Test that a locked WPS AP scores like one without WPS."""
+        from wlfwifi.core import default_score
+        from wlfwifi.models import Target
+
+        locked = Target("00:11:22:33:44:55", "A", 6, "WPA2", True, wps_locked=True)
+        no_wps = Target("00:11:22:33:44:66", "B", 6, "WPA2", False)
+        open_wps = Target("00:11:22:33:44:77", "C", 6, "WPA2", True)
+        assert default_score(locked) == default_score(no_wps)
+        assert default_score(open_wps) > default_score(locked)
+
+    def test_encryption_ranking(self):
+        """Test that each WPA generation scores by its own entry."""
+        from wlfwifi.core import default_score
+        from wlfwifi.models import Target
+
+        def score(encryption):
+            return default_score(Target("00:11:22:33:44:55", "A", 6, encryption, False))
+
+        assert score("WEP") > score("WPA") > score("WPA2") > score("WPA3")
+        assert score("WPA3-SAE") == score("WPA3")
+        assert score("WPA2 WPA") == score("WPA2")
+        assert score("UNKNOWN") == score("OPN")
+
+    def test_attempts_lower_score(self):
+        """Test that previously attacked targets sink."""
+        from wlfwifi.core import default_score
+        from wlfwifi.models import Target
+
+        fresh = Target("00:11:22:33:44:55", "A", 6, "WEP", False, power=-50)
+        retried = Target("00:11:22:33:44:66", "B", 6, "WEP", False, power=-50)
+        retried.attempts = 2
+        assert default_score(fresh) > default_score(retried)
+
+    def test_recent_activity_scores_higher(self):
+        """Test that recent client activity beats stale activity."""
+        import time
+        from wlfwifi.core import default_score
+        from wlfwifi.models import Target
+
+        now = time.time()
+        active = Target("00:11:22:33:44:55", "A", 6, "WPA2", False)
+        active.last_client_seen = now
+        stale = Target("00:11:22:33:44:66", "B", 6, "WPA2", False)
+        stale.last_client_seen = now - 3600
+        assert default_score(active) > default_score(stale)
+
+    def test_make_scorer_custom_weights(self):
+        """Test that custom weights change the ranking."""
+        from wlfwifi.core import make_scorer
+        from wlfwifi.models import Target
+
+        wep = Target("00:11:22:33:44:55", "A", 6, "WEP", False, power=-90)
+        wpa = Target("00:11:22:33:44:66", "B", 6, "WPA2", False, power=-30)
+        signal_only = make_scorer({"encryption": 0.0})
+        enc_only = make_scorer({"signal": 0.0})
+        assert signal_only(wpa) > signal_only(wep)
+        assert enc_only(wep) > enc_only(wpa)
+
+
+class TestTargetQueue:
+    """Tests for the TargetQueue priority queue."""
+
+    def _targets(self, n):
+        from wlfwifi.models import Target
+
+        return [
+            Target("00:11:22:33:44:%02X" % i, str(i), 6, "WPA2", False)
+            for i in range(n)
+        ]
+
+    def test_pop_returns_highest_score(self):
+        """Test that targets pop in descending score order."""
+        from wlfwifi.core import TargetQueue
+
+        queue = TargetQueue(scorer=lambda t: int(t.essid))
+        for t in self._targets(10):
+            queue.push(t)
+        assert [int(queue.pop().essid) for _ in range(10)] == list(range(9, -1, -1))
+
+    def test_pop_empty_raises(self):
+        """Test that popping an empty queue raises IndexError."""
+        from wlfwifi.core import TargetQueue
+
+        with pytest.raises(IndexError):
+            TargetQueue().pop()
+
+    def test_equal_scores_fifo(self):
+        """Test that equal scores are popped in insertion order."""
+        from wlfwifi.core import TargetQueue
+
+        queue = TargetQueue(scorer=lambda t: 1.0)
+        targets = self._targets(5)
+        for t in targets:
+            queue.push(t)
+        assert [queue.pop() for _ in range(5)] == targets
+
+    def test_update_moves_target(self):
+        """Test that rescoring moves a target without re-sorting."""
+        from wlfwifi.core import TargetQueue
+
+        queue = TargetQueue(scorer=lambda t: t.power)
+        targets = self._targets(5)
+        for i, t in enumerate(targets):
+            t.power = i
+            queue.push(t)
+        targets[0].power = 100
+        queue.update(targets[0])
+        assert queue.peek() is targets[0]
+        targets[0].power = -100
+        queue.update(targets[0])
+        assert queue.peek() is targets[4]
+        assert [queue.pop() for _ in range(5)][-1] is targets[0]
+
+    def test_push_existing_rescores(self):
+        """Test that pushing a queued BSSID updates rather than duplicates."""
+        from wlfwifi.core import TargetQueue
+
+        queue = TargetQueue(scorer=lambda t: t.power)
+        t = self._targets(1)[0]
+        queue.push(t)
+        t.power = 7
+        queue.push(t)
+        assert len(queue) == 1
+        assert queue.score(t.bssid) == 7
+
+    def test_remove_and_contains(self):
+        """Test removing targets by BSSID (case-insensitive)."""
+        from wlfwifi.core import TargetQueue
+
+        queue = TargetQueue(scorer=lambda t: int(t.essid))
+        targets = self._targets(6)
+        for t in targets:
+            queue.push(t)
+        assert targets[3].bssid.lower() in queue
+        assert queue.remove(targets[3].bssid.lower()) is targets[3]
+        assert targets[3].bssid not in queue
+        assert queue.remove(targets[3].bssid) is None
+        assert [int(queue.pop().essid) for _ in range(5)] == [5, 4, 2, 1, 0]
+
+    def test_set_scorer_rescores_all(self):
+        """Test that replacing the scorer reorders the queue."""
+        from wlfwifi.core import TargetQueue
+
+        queue = TargetQueue(scorer=lambda t: int(t.essid))
+        for t in self._targets(4):
+            queue.push(t)
+        queue.set_scorer(lambda t: -int(t.essid))
+        assert [t.essid for t in queue] == ["0", "1", "2", "3"]
+        assert queue.pop().essid == "0"
+
+    def test_heap_invariant_under_random_updates(self):
+        """Test ordering after many random score changes."""
+        import random
+        from wlfwifi.core import TargetQueue
+
+        rng = random.Random(1)
+        queue = TargetQueue(scorer=lambda t: t.power)
+        targets = self._targets(200)
+        for t in targets:
+            t.power = rng.randint(-90, -20)
+            queue.push(t)
+        for _ in range(2000):
+            t = rng.choice(targets)
+            t.power = rng.randint(-90, -20)
+            queue.update(t)
+        popped = [queue.pop().power for _ in range(200)]
+        assert popped == sorted(popped, reverse=True)
+
+
+class TestChannelBatching:
+    """Tests for batch_by_channel and count_channel_switches."""
+
+    def test_batch_groups_by_channel_in_priority_order(self):
+        """Test that batches follow the first target of each channel."""
+        from wlfwifi.core import batch_by_channel
+        from wlfwifi.models import Target
+
+        targets = [
+            Target("00:00:00:00:00:01", "a", 6, "WPA2", False),
+            Target("00:00:00:00:00:02", "b", 1, "WPA2", False),
+            Target("00:00:00:00:00:03", "c", 6, "WPA2", False),
+            Target("00:00:00:00:00:04", "d", 11, "WPA2", False),
+            Target("00:00:00:00:00:05", "e", 1, "WPA2", False),
+        ]
+        batches = batch_by_channel(targets)
+        assert [ch for ch, _ in batches] == [6, 1, 11]
+        assert [t.essid for t in batches[0][1]] == ["a", "c"]
+        assert [t.essid for t in batches[1][1]] == ["b", "e"]
+
+    def test_count_channel_switches(self):
+        """Test counting retunes along a channel sequence."""
+        from wlfwifi.core import count_channel_switches
+
+        assert count_channel_switches([]) == 0
+        assert count_channel_switches([6, 6, 6]) == 0
+        assert count_channel_switches([6, 1, 6, 11, 1]) == 4
+
+
+class TestAttackEngine:
+    """Tests for AttackEngine channel-batched execution."""
+
+    class FakeCapture:
+        def __init__(self, channel, log, cap_path=os.devnull):
+            self.channel = channel
+            self.log = log
+            self.cap_path = cap_path
+            log.append(("start", channel))
+
+        def stop(self):
+            self.log.append(("stop", self.channel))
+
+    def _engine(self, targets, log, fail=(), cap_path=os.devnull):
+        from wlfwifi.attacks import Attack
+        from wlfwifi.config import RunConfig
+        from wlfwifi.core import AttackEngine, TargetQueue
+
+        class FakeAttack(Attack):
+            def __init__(self, target, capture):
+                self.target = target
+                self.capture = capture
+
+            def RunAttack(self):
+                log.append(("attack", self.target.essid, self.capture.channel))
+                if self.target.essid in fail:
+                    raise RuntimeError("boom")
+                return "key-" + self.target.essid
+
+            def EndAttack(self):
+                log.append(("end", self.target.essid))
+
+        queue = TargetQueue(scorer=lambda t: -int(t.essid))
+        for t in targets:
+            queue.push(t)
+        return AttackEngine(
+            RunConfig(interface="wlan0mon"),
+            attack_factory=FakeAttack,
+            queue=queue,
+            capture_factory=lambda ch: self.FakeCapture(ch, log, cap_path),
+        )
+
+    def _targets(self, channels):
+        from wlfwifi.models import Target
+
+        return [
+            Target("00:00:00:00:00:%02X" % i, str(i), ch, "WPA2", False)
+            for i, ch in enumerate(channels)
+        ]
+
+    def test_one_capture_per_channel(self):
+        """Test that co-channel targets share a single capture."""
+        log = []
+        engine = self._engine(self._targets([1, 6, 1, 6, 11]), log)
+        stats = engine.run()
+        assert [e for e in log if e[0] == "start"] == [
+            ("start", 1),
+            ("start", 6),
+            ("start", 11),
+        ]
+        attacks = [e for e in log if e[0] == "attack"]
+        assert [a[1] for a in attacks] == ["0", "2", "1", "3", "4"]
+        assert [a[2] for a in attacks] == [1, 1, 6, 6, 11]
+        assert stats.captures == 3
+        assert stats.targets == 5
+
+    def test_stats_report_savings(self):
+        """Test switch and setup savings against one-by-one execution."""
+        log = []
+        stats = self._engine(self._targets([1, 6, 1, 6, 11]), log).run()
+        assert stats.naive_switches == 4
+        assert stats.channel_switches == 2
+        assert stats.switches_saved == 2
+        assert stats.setups_saved == 2
+        assert "2 saved" in stats.summary()
+
+    def test_results_and_attempts_recorded(self):
+        """Test that results are stored and attempts incremented."""
+        log = []
+        targets = self._targets([3, 3])
+        engine = self._engine(targets, log)
+        engine.run()
+        assert engine.results[targets[0].bssid] == "key-0"
+        assert all(t.attempts == 1 for t in targets)
+        assert len(engine.queue) == 0
+
+    def test_failed_attack_does_not_stop_batch(self):
+        """Test that an exception ends the attack and continues the batch."""
+        log = []
+        engine = self._engine(self._targets([3, 3]), log, fail=("0",))
+        engine.run()
+        assert ("end", "0") in log
+        assert ("attack", "1", 3) in log
+        assert log[-1] == ("stop", 3)
+
+    def test_hidden_essid_backfilled_from_capture(self, tmp_path):
+        """Test that a hidden target is decloaked before it is attacked."""
+        from frames import AP, STA, mac, mgmt_frame, ssid_ie, write_capture
+        from wlfwifi.models import Target
+
+        body = struct.pack("<HH", 0x11, 10) + ssid_ie("Hidden")
+        cap = str(tmp_path / "ch6-01.cap")
+        write_capture(cap, [(1.0, mgmt_frame(0, mac(AP), mac(STA), mac(AP), body))])
+        target = Target(AP, "", 6, "WPA2", False)
+        log = []
+        engine = self._engine([], log, cap_path=cap)
+        engine.queue.push(target, score=0.0)
+        engine.run()
+        assert target.essid == "Hidden"
+        assert ("attack", "Hidden", 6) in log
+        assert engine.essids.decloaked == 1
+
+    @patch("wlfwifi.core.run_airodump")
+    def test_capture_prefix_unique(self, mock_airodump, tmp_path):
+        """Test that capturing a channel again never reuses its prefix."""
+        from wlfwifi.config import RunConfig
+        from wlfwifi.core import AttackEngine
+
+        engine = AttackEngine(
+            RunConfig(interface="wlan0mon"), lambda t, c: None, temp_dir=str(tmp_path)
+        )
+        first = engine._start_capture(6)
+        second = engine._start_capture(6)
+        assert first.cap_path != second.cap_path
+        assert first.cap_path.endswith("-01.cap")
+        assert os.path.dirname(first.cap_path).startswith(str(tmp_path))
+        assert mock_airodump.call_args[0] == ("wlan0mon", second.prefix, 6)
+
+    def test_temp_dir_removed_after_run(self, tmp_path):
+        """Test that only a temporary directory the engine created is removed."""
+        from wlfwifi.config import RunConfig
+        from wlfwifi.core import AttackEngine
+
+        engine = AttackEngine(RunConfig(interface="wlan0mon"), lambda t, c: None)
+        created = engine.temp_dir
+        engine.run()
+        assert not os.path.exists(created)
+        engine.run()
+        assert not os.path.exists(engine.temp_dir)
+        given = AttackEngine(
+            RunConfig(interface="wlan0mon"), lambda t, c: None, temp_dir=str(tmp_path)
+        )
+        given.run()
+        assert os.path.isdir(str(tmp_path))
+
+    def test_successful_capture_kept(self, tmp_path):
+        """Test that the captures of cracked targets survive run()."""
+        from frames import beacon, eapol_frame, write_capture
+        from wlfwifi.capture import iter_frames
+
+        targets = self._targets([1, 6])
+        log = []
+        output_dir = str(tmp_path / "out")
+        engine = self._engine(targets, log, fail=("1",))
+        engine.output_dir = output_dir
+
+        def capture_factory(channel):
+            path = os.path.join(engine.temp_dir, "ch%d-01.cap" % channel)
+            bssid = targets[0 if channel == 1 else 1].bssid
+            write_capture(
+                path, [(1.0, beacon(ap=bssid)), (2.0, eapol_frame(1, 1, ap=bssid))]
+            )
+            with open(path[:-4] + "-%s.key" % bssid.replace(":", ""), "w") as f:
+                f.write("key")
+            return self.FakeCapture(channel, log, path)
+
+        engine.capture_factory = capture_factory
+        engine.run()
+        assert not os.path.exists(engine.temp_dir)
+        assert sorted(os.listdir(output_dir)) == [
+            "000000000000.cap",
+            "ch1-01-000000000000.key",
+        ]
+        kept = iter_frames(os.path.join(output_dir, "000000000000.cap"))
+        assert len(list(kept)) == 2
+
+    def test_capture_readers_closed_on_error(self, tmp_path):
+        """Test that a failing capture still closes the ESSID readers."""
+        from frames import AP, beacon, write_capture
+
+        cap = write_capture(tmp_path / "ch1-01.cap", [(1.0, beacon(ap=AP))])
+        log = []
+        engine = self._engine(self._targets([1, 6]), log, cap_path=cap)
+
+        def capture_factory(channel):
+            if channel == 6:
+                raise OSError("airodump-ng failed")
+            return self.FakeCapture(channel, log, cap)
+
+        engine.capture_factory = capture_factory
+        with pytest.raises(OSError):
+            engine.run()
+        assert ("stop", 1) in log
+        assert engine.essids._readers == {}
+
+    def test_solved_targets_skipped(self, tmp_path):
+        """Test that targets with a stored key are neither queued nor attacked."""
+        from wlfwifi.results import CrackResult, ResultStore
+
+        targets = self._targets([1, 6, 6])
+        log = []
+        engine = self._engine([targets[0]], log)
+        engine.store = ResultStore(str(tmp_path / "results.db"))
+        engine.store.add(CrackResult(targets[1].bssid, "1", "d", "secret12", "native"))
+        engine.store.add(CrackResult(targets[0].bssid, "0", "d", "secret12", "native"))
+        assert engine.enqueue(targets[1]) is False
+        assert engine.enqueue(targets[2]) is True
+        stats = engine.run()
+        engine.store.close()
+        assert [e[1] for e in log if e[0] == "attack"] == ["2"]
+        assert stats.solved == 1
+        assert stats.targets == 1
+        assert "1 already cracked" in stats.summary()
+
+    def test_keys_recorded_in_store(self, tmp_path):
+        """Test that keys returned by attacks are stored, so re-runs skip them."""
+        from wlfwifi.attacks import WEPAttack, WPSAttack
+        from wlfwifi.results import ResultStore
+
+        targets = self._targets([1, 1])
+        log = []
+        engine = self._engine(targets, log, fail=("1",))
+        engine.store = ResultStore(str(tmp_path / "results.db"))
+        engine.run()
+        stored = engine.store.solved(targets[0].bssid, "0")
+        assert stored.key == "key-0"
+        assert stored.method == "FakeAttack"
+        assert stored.digest == ""
+        assert engine.store.solved(targets[1].bssid, "1") is None
+        assert engine.enqueue(targets[0]) is False
+        engine.store.close()
+        assert (WEPAttack.method, WPSAttack.method) == ("wep", "wps")
+
+    def test_default_capture_requires_interface(self):
+        """Test that the airodump capture factory needs an interface."""
+        from wlfwifi.config import RunConfig
+        from wlfwifi.core import AttackEngine
+
+        engine = AttackEngine(RunConfig(), attack_factory=lambda t, c: None)
+        with pytest.raises(ValueError):
+            engine._start_capture(6)
+
+
+class TestRunCommand:
+    """Tests for subcommand dispatch."""
+
+    @patch("wlfwifi.handshake.export_hashcat")
+    def test_export_command(self, mock_export):
+        """Test that the export command calls export_hashcat."""
+        from wlfwifi.config import RunConfig
+        from wlfwifi.core import run_command
+
+        config = RunConfig(
+            command="export",
+            options={"captures": ["a.cap"], "output": "out.hc22000", "jobs": 2},
+        )
+        run_command(config)
+        mock_export.assert_called_once_with(["a.cap"], "out.hc22000", processes=2)
+
+    @patch("wlfwifi.merge.merge_captures")
+    def test_merge_command(self, mock_merge):
+        """Test that the merge command calls merge_captures."""
+        from wlfwifi.config import RunConfig
+        from wlfwifi.core import run_command
+
+        config = RunConfig(
+            command="merge",
+            options={
+                "captures": ["a.cap", "b.cap"],
+                "output": "all.cap",
+                "window": 0.1,
+                "keep_duplicates": True,
+            },
+        )
+        run_command(config)
+        mock_merge.assert_called_once_with(
+            ["a.cap", "b.cap"], "all.cap", window=0.1, dedup=False
+        )
+
+    @patch("wlfwifi.split.split_capture")
+    def test_split_command(self, mock_split):
+        """Test that the split command calls split_capture."""
+        from wlfwifi.config import RunConfig
+        from wlfwifi.core import run_command
+
+        config = RunConfig(
+            command="split",
+            options={
+                "capture": "a.cap",
+                "output_dir": "out",
+                "bssids": None,
+                "max_open": 8,
+                "keep_all": True,
+                "keep_retries": False,
+            },
+        )
+        run_command(config)
+        mock_split.assert_called_once_with(
+            "a.cap",
+            "out",
+            bssids=None,
+            max_open=8,
+            require_eapol=False,
+            drop_retries=True,
+        )
+
+    def test_ring_command(self, tmp_path):
+        """Test that the ring command copies a capture into segments."""
+        from frames import beacon, write_capture
+        from wlfwifi.config import RunConfig
+        from wlfwifi.core import run_command
+
+        source = write_capture(
+            tmp_path / "in.cap", [(float(i), beacon()) for i in range(10)]
+        )
+        config = RunConfig(
+            command="ring",
+            options={
+                "source": source,
+                "directory": str(tmp_path / "ring"),
+                "prefix": "scan",
+                "segment_mb": 64,
+                "segment_seconds": 4.0,
+                "max_segments": 2,
+                "follow": False,
+            },
+        )
+        run_command(config)
+        assert sorted(os.listdir(tmp_path / "ring")) == [
+            "scan-00002.pcapng",
+            "scan-00003.pcapng",
+        ]
+
+    @patch("wlfwifi.attacks.wpa_crack")
+    def test_crack_command(self, mock_crack):
+        """Test that the crack command calls wpa_crack."""
+        from wlfwifi.config import RunConfig
+        from wlfwifi.core import run_command
+
+        mock_crack.return_value = "password"
+        config = RunConfig(
+            command="crack",
+            options={
+                "capture": "hs.cap",
+                "wordlist": "words.txt",
+                "bssid": "00:11:22:33:44:55",
+                "jobs": 4,
+                "chunk_size": 100,
+                "skip": None,
+                "no_resume": False,
+                "pmk_cache": None,
+                "engine": "native",
+                "keys": ["12345678"],
+                "results": "results.db",
+            },
+        )
+        run_command(config)
+        mock_crack.assert_called_once_with(
+            "hs.cap",
+            "words.txt",
+            "00:11:22:33:44:55",
+            processes=4,
+            chunk_size=100,
+            resume=True,
+            start=None,
+            pmk_cache=None,
+            engine="native",
+            keys=["12345678"],
+            results="results.db",
+        )
+
+    @patch("wlfwifi.compact.compact_wordlist")
+    def test_wordlist_compact_command(self, mock_compact):
+        """Test that wordlist compact calls compact_wordlist."""
+        from wlfwifi.config import RunConfig
+        from wlfwifi.core import run_command
+
+        config = RunConfig(
+            command="wordlist",
+            options={
+                "action": "compact",
+                "inputs": ["a.txt"],
+                "output": "out.wpk",
+                "memory": 64,
+                "tmp_dir": None,
+            },
+        )
+        run_command(config)
+        mock_compact.assert_called_once_with(
+            ["a.txt"], "out.wpk", memory=64 * 1024 * 1024, tmp_dir=None
+        )
+
+    @patch("wlfwifi.pmk.precompute_pmks")
+    def test_pmk_precompute_command(self, mock_precompute):
+        """Test that pmk precompute calls precompute_pmks with a raw ESSID."""
+        from wlfwifi.config import RunConfig
+        from wlfwifi.core import run_command
+
+        config = RunConfig(
+            command="pmk",
+            options={
+                "action": "precompute",
+                "essid": "Café",
+                "wordlist": "words.txt",
+                "cache": "pmk.db",
+                "jobs": None,
+                "chunk_size": 20000,
+            },
+        )
+        run_command(config)
+        mock_precompute.assert_called_once_with(
+            "pmk.db",
+            "Café".encode("utf-8"),
+            "words.txt",
+            processes=None,
+            chunk_size=20000,
+        )
+
+    def test_results_command(self, tmp_path, caplog):
+        """Test that results lists the networks in the store."""
+        from wlfwifi.config import RunConfig
+        from wlfwifi.core import run_command
+        from wlfwifi.results import CrackResult, ResultStore
+
+        db = str(tmp_path / "results.db")
+        with ResultStore(db) as store:
+            store.add(
+                CrackResult("aa:bb:cc:dd:ee:ff", "Home", "d1", "secret12", "native")
+            )
+        with caplog.at_level(logging.INFO):
+            run_command(RunConfig(command="results", options={"database": db}))
+        assert "AA:BB:CC:DD:EE:FF 'Home': secret12 (native" in caplog.text
+        assert "1 networks cracked" in caplog.text
+
+    @patch("wlfwifi.plugins.program_exists")
+    def test_attacks_command(self, mock_exists, caplog):
+        """Test that attacks lists the registry with missing tools."""
+        from wlfwifi.config import RunConfig
+        from wlfwifi.core import run_command
+
+        mock_exists.side_effect = lambda tool: tool not in ("reaver", "aireplay-ng")
+        with caplog.at_level(logging.INFO):
+            run_command(RunConfig(command="attacks", options={"plugins": False}))
+        assert "deauthenticating clients [ready, without aireplay-ng]" in caplog.text
+        assert "wep (WEP): " in caplog.text
+        assert "wps (WPA): Brute-force the WPS PIN with reaver [missing reaver]" in (
+            caplog.text
+        )
+        assert "[ready]" in caplog.text
+
+    @patch("wlfwifi.core.run_command")
+    @patch("wlfwifi.core.parse_args")
+    def test_main_dispatches_command(self, mock_parse_args, mock_run_command):
+        """Test that main runs a selected subcommand."""
+        from wlfwifi.config import RunConfig
+        from wlfwifi.core import main
+
+        mock_parse_args.return_value = RunConfig(command="export")
+        main()
+        mock_run_command.assert_called_once()
+
+    def test_unknown_command(self):
+        """Test that an unknown command raises ValueError."""
+        from wlfwifi.config import RunConfig
+        from wlfwifi.core import run_command
+
+        with pytest.raises(ValueError):
+            run_command(RunConfig(command="nope"))
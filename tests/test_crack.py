@@ -0,0 +1,224 @@
+"""
+test_crack.py
+-------------
+Unit tests for the crack module (parallel wordlist dispatch).
+Tests cover in-process and pooled runs, early exit on a match, progress
+reporting, resume checkpoints and the aircrack-ng worker command line.
+"""
+
+import os
+import pytest
+from unittest.mock import patch
+from wlfwifi.crack import (
+    AircrackWorker,
+    CrackCheckpoint,
+    CrackStats,
+    crack_wordlist,
+    handshake_digest,
+)
+from frames import AP, handshake_packets, write_capture
+
+KEY = b"correcthorse"
+
+
+class KeyWorker:
+    """Finds KEY in a chunk; picklable so it can run in a process pool."""
+
+    def __call__(self, chunk):
+        return KEY if KEY in chunk else None
+
+
+def write_words(path, count, key_at=None):
+    words = [b"candidate%06d" % i for i in range(count)]
+    if key_at is not None:
+        words.insert(key_at, KEY)
+    path.write_bytes(b"\n".join(words) + b"\n")
+    return str(path)
+
+
+class TestCrackWordlist:
+    """Tests for crack_wordlist."""
+
+    def test_in_process(self, tmp_path):
+        """Test a single-process run that finds the key."""
+        path = write_words(tmp_path / "w.txt", 100, key_at=50)
+        key, stats = crack_wordlist(path, KeyWorker(), processes=1, chunk_size=10)
+        assert key == KEY
+        assert stats.candidates == 60
+        assert stats.chunks == 6
+
+    def test_process_pool(self, tmp_path):
+        """Test that chunks are dispatched to worker processes."""
+        path = write_words(tmp_path / "w.txt", 500, key_at=420)
+        key, stats = crack_wordlist(path, KeyWorker(), processes=2, chunk_size=50)
+        assert key == KEY
+        assert stats.processes == 2
+        # At most processes * 2 chunks are in flight: before the key's chunk
+        # (the 9th) was queued, at least 5 had finished, and it finished too
+        assert stats.chunks >= 6
+        assert stats.candidates >= 300
+        # Chunks finish out of order, but the checkpoint never skips one
+        assert stats.completed <= stats.candidates
+
+    def test_exhausted(self, tmp_path):
+        """Test a run without a match and the skipped line count."""
+        path = tmp_path / "w.txt"
+        path.write_bytes(b"short\n" + b"candidate1\n" * 30)
+        key, stats = crack_wordlist(str(path), KeyWorker(), processes=2, chunk_size=7)
+        assert key is None
+        assert stats.candidates == 30
+        assert stats.chunks == 5
+        assert stats.skipped == 1
+        assert stats.fraction == 1.0
+
+    def test_progress(self, tmp_path):
+        """Test that progress is reported with a rate and ETA."""
+        path = write_words(tmp_path / "w.txt", 100)
+        reports = []
+        crack_wordlist(
+            path,
+            KeyWorker(),
+            processes=1,
+            chunk_size=10,
+            progress=lambda s: reports.append((s.candidates, s.fraction)),
+            progress_interval=0.0,
+        )
+        assert len(reports) == 10
+        assert reports[0][0] == 10
+
+
+class TestCrackResume:
+    """Tests for starting and checkpointing crack_wordlist runs."""
+
+    def test_start(self, tmp_path):
+        """Test that a run starts at the given candidate number."""
+        path = write_words(tmp_path / "w.txt", 100, key_at=50)
+        key, stats = crack_wordlist(
+            path, KeyWorker(), processes=1, chunk_size=10, start=60
+        )
+        assert key is None
+        assert stats.candidates == 41
+        assert stats.start == 60
+        assert stats.completed == 101
+        key, stats = crack_wordlist(
+            path, KeyWorker(), processes=1, chunk_size=10, start=45
+        )
+        assert key == KEY
+        assert stats.candidates == 10
+
+    def test_checkpoint_on_interrupt(self, tmp_path):
+        """Test that an interrupted run reports the position reached."""
+        path = write_words(tmp_path / "w.txt", 100)
+        positions = []
+
+        def worker(chunk):
+            if chunk[0] == b"candidate000030":
+                raise KeyboardInterrupt
+            return None
+
+        with pytest.raises(KeyboardInterrupt):
+            crack_wordlist(
+                path,
+                worker,
+                processes=1,
+                chunk_size=10,
+                progress=None,
+                progress_interval=0.0,
+                checkpoint=positions.append,
+            )
+        assert positions == [10, 20, 30, 30]
+        key, stats = crack_wordlist(
+            path, KeyWorker(), processes=1, chunk_size=10, start=positions[-1]
+        )
+        assert stats.candidates == 70
+
+
+class TestCrackCheckpoint:
+    """Tests for CrackCheckpoint."""
+
+    def test_save_and_reload(self, tmp_path):
+        """Test that positions survive in the checkpoint file."""
+        wordlist = write_words(tmp_path / "w.txt", 10)
+        path = str(tmp_path / "a.cap.resume")
+        checkpoints = CrackCheckpoint(path)
+        assert checkpoints.position("abc", wordlist) == 0
+        checkpoints.save("abc", wordlist, 7)
+        assert not os.path.exists(path + ".tmp")
+        assert CrackCheckpoint(path).position("abc", wordlist) == 7
+        assert CrackCheckpoint(path).position("def", wordlist) == 0
+        checkpoints.clear("abc", wordlist)
+        assert CrackCheckpoint(path).position("abc", wordlist) == 0
+
+    def test_changed_wordlist_ignored(self, tmp_path):
+        """Test that a position is dropped when the wordlist size changes."""
+        wordlist = write_words(tmp_path / "w.txt", 10)
+        checkpoints = CrackCheckpoint(str(tmp_path / "a.cap.resume"))
+        checkpoints.save("abc", wordlist, 7)
+        write_words(tmp_path / "w.txt", 11)
+        assert checkpoints.position("abc", wordlist) == 0
+        checkpoints.save("abc", "-", 7)
+        assert checkpoints.position("abc", "-") == 0
+
+    def test_corrupt_file(self, tmp_path):
+        """Test that an unreadable checkpoint file starts empty."""
+        path = tmp_path / "a.cap.resume"
+        path.write_text("{not json")
+        assert CrackCheckpoint(str(path)).entries == {}
+
+    def test_handshake_digest(self, tmp_path):
+        """Test that the digest follows the handshake, not the file."""
+        packets = handshake_packets()
+        first = write_capture(tmp_path / "a.cap", packets)
+        second = write_capture(tmp_path / "b.cap", packets + packets)
+        other = write_capture(tmp_path / "c.cap", handshake_packets(mic=b"\x07" * 16))
+        digest = handshake_digest(first, AP)
+        assert digest == handshake_digest(second, AP.lower())
+        assert digest != handshake_digest(other, AP)
+        assert handshake_digest(str(tmp_path / "missing.cap"), AP) != digest
+
+
+class TestCrackStats:
+    """Tests for CrackStats."""
+
+    def test_rate_and_eta(self):
+        """Test candidates/sec and the ETA from the wordlist fraction."""
+        stats = CrackStats()
+        assert stats.eta is None
+        stats.candidates = 1000
+        stats.elapsed = 10.0
+        stats.fraction = 0.25
+        stats.processes = 4
+        assert stats.candidates_per_sec == 100.0
+        assert stats.eta == 30.0
+        assert "ETA 30s" in stats.summary()
+
+
+class TestAircrackWorker:
+    """Tests for AircrackWorker."""
+
+    @patch("wlfwifi.crack.Popen")
+    def test_command_and_key(self, mock_popen):
+        """Test the aircrack-ng command line and reading the key file."""
+
+        def communicate(data):
+            cmd = mock_popen.call_args[0][0]
+            with open(cmd[cmd.index("-l") + 1], "wb") as f:
+                f.write(KEY + b"\n")
+            assert data == b"password1\npassword2\n"
+            return b"", b""
+
+        mock_popen.return_value.communicate.side_effect = communicate
+        worker = AircrackWorker("a.cap", "00:11:22:33:44:55")
+        assert worker([b"password1", b"password2"]) == KEY
+        cmd = mock_popen.call_args[0][0]
+        assert cmd[0] == "aircrack-ng"
+        assert cmd[cmd.index("-p") + 1] == "1"
+        assert cmd[cmd.index("-w") + 1] == "-"
+        assert cmd[-1] == "a.cap"
+        assert not os.path.exists(cmd[cmd.index("-l") + 1])
+
+    @patch("wlfwifi.crack.Popen")
+    def test_no_key(self, mock_popen):
+        """Test that an empty key file means no match."""
+        mock_popen.return_value.communicate.return_value = (b"", b"")
+        assert AircrackWorker("a.cap", "00:11:22:33:44:55")([b"password1"]) is None
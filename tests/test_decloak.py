@@ -0,0 +1,119 @@
+"""
+test_decloak.py
+---------------
+Unit tests for the decloak module (hidden ESSID discovery).
+Tests cover the frames that reveal an ESSID, back-filling of registered
+targets, and polling a capture that is still being written.
+"""
+
+from wlfwifi.capture import Frame
+from wlfwifi.decloak import EssidMap, is_hidden
+from wlfwifi.models import Target
+from frames import (
+    AP,
+    assoc_request,
+    beacon,
+    data_frame,
+    pcap_bytes,
+    probe_response,
+    retransmit,
+    write_capture,
+)
+
+OTHER_AP = "66:77:88:99:AA:BB"
+
+
+def _frame(data, ts=1.0):
+    return Frame(ts, 127, data, 0)
+
+
+class TestIsHidden:
+    """Tests for is_hidden."""
+
+    def test_hidden_forms(self):
+        """Test the placeholders scans report for hidden ESSIDs."""
+        for essid in (None, "", " ", "\0\0\0", "<length:  6>", "<length: 0>"):
+            assert is_hidden(essid)
+
+    def test_visible(self):
+        """Test that real names are not hidden."""
+        assert not is_hidden("Cafe")
+        assert not is_hidden("length: 6")
+
+
+class TestEssidMap:
+    """Tests for EssidMap."""
+
+    def test_frames_reveal_essid(self):
+        """Test that probe responses and (re)association requests are used."""
+        for frame in (
+            probe_response(essid="Hidden"),
+            assoc_request(essid="Hidden"),
+            assoc_request(essid="Hidden", reassoc=True),
+        ):
+            essids = EssidMap()
+            essids.feed(_frame(frame))
+            assert essids.essid(AP.lower()) == "Hidden"
+
+    def test_hidden_beacon_ignored(self):
+        """Test that blank beacons and data frames add nothing."""
+        essids = EssidMap()
+        essids.feed(_frame(beacon(essid="")))
+        essids.feed(_frame(data_frame()))
+        assert len(essids) == 0
+        assert essids.frames == 2
+
+    def test_backfill_on_feed(self):
+        """Test that a registered hidden target is filled in when seen."""
+        seen = []
+        essids = EssidMap(on_decloak=lambda t, e: seen.append((t.bssid, e)))
+        target = Target(AP, "<length:  6>", 6, "WPA2", False)
+        other = Target(OTHER_AP, "", 6, "WPA2", False)
+        assert not essids.add_target(target)
+        essids.add_target(other)
+        assert essids.feed(_frame(probe_response(essid="Hidden"))) == AP
+        assert target.essid == "Hidden"
+        assert other.essid == ""
+        assert seen == [(AP, "Hidden")]
+        assert essids.feed(_frame(assoc_request(essid="Hidden"))) is None
+        assert essids.decloaked == 1
+
+    def test_backfill_on_register(self):
+        """Test that a target registered after its ESSID was seen is filled."""
+        essids = EssidMap()
+        essids.feed(_frame(assoc_request(essid="Hidden")))
+        target = Target(AP, "", 6, "WPA2", False)
+        assert essids.add_target(target)
+        assert target.essid == "Hidden"
+
+    def test_visible_target_untouched(self):
+        """Test that a target with a known ESSID keeps it."""
+        essids = EssidMap()
+        target = Target(AP, "Cafe", 6, "WPA2", False)
+        essids.add_target(target)
+        assert essids.feed(_frame(probe_response(essid="Other"))) is None
+        assert target.essid == "Cafe"
+
+    def test_poll_growing_capture(self, tmp_path):
+        """Test that poll() only reads frames appended since the last call."""
+        path = write_capture(tmp_path / "a.cap", [(1.0, beacon(essid=""))])
+        target = Target(AP, "", 6, "WPA2", False)
+        with EssidMap() as essids:
+            essids.add_target(target)
+            assert essids.poll(path) == 0
+            with open(path, "ab") as f:
+                f.write(pcap_bytes([(2.0, assoc_request(essid="Hidden"))])[24:])
+            assert essids.poll(path) == 1
+            assert essids.frames == 2
+        assert target.essid == "Hidden"
+
+    def test_poll_drops_retransmissions(self, tmp_path):
+        """Test that poll() inspects a retransmitted request once."""
+        request = assoc_request(essid="Hidden", seq=3)
+        path = write_capture(
+            tmp_path / "a.cap", [(1.0, request), (1.1, retransmit(request))]
+        )
+        with EssidMap() as essids:
+            essids.poll(path)
+            assert essids.frames == 1
+            assert essids.retries.dropped == 1
@@ -0,0 +1,105 @@
+"""
+test_dedup.py
+-------------
+Unit tests for the dedup module (retransmission filtering).
+Tests cover the Retry flag rule, per-transmitter and per-TID state, table
+collisions, and the dedup counters.
+"""
+
+from wlfwifi.capture import Frame, parse_dot11
+from wlfwifi.dedup import RetryFilter, dedup_frames
+from frames import (
+    AP,
+    STA,
+    beacon,
+    data_frame,
+    eapol_frame,
+    mac,
+    radiotap,
+    retransmit,
+)
+
+
+def _frame(data):
+    return Frame(1.0, 127, data, 0)
+
+
+def _qos_frame(tid, seq=0, retry=False):
+    header = bytes([0x88, 0x41 | (0x08 if retry else 0), 0, 0])
+    header += mac(AP) + mac(STA) + mac(AP) + bytes([seq << 4 & 0xFF, seq >> 4])
+    return radiotap(header + bytes([tid, 0]) + b"\0" * 16)
+
+
+class TestRetryFilter:
+    """Tests for RetryFilter."""
+
+    def test_retry_dropped(self):
+        """Test that only a flagged repeat of the last sequence is dropped."""
+        retries = RetryFilter()
+        assert retries.accept(_frame(data_frame(seq=1)))
+        assert not retries.accept(_frame(data_frame(seq=1, retry=True)))
+        assert not retries.accept(_frame(data_frame(seq=1, retry=True)))
+        assert retries.accept(_frame(data_frame(seq=2, retry=True)))
+        assert retries.accept(_frame(data_frame(seq=2)))
+        assert retries.dropped == 2
+        assert retries.frames == 5
+        assert retries.rate == 0.4
+        assert "40.0%" in retries.summary()
+
+    def test_unflagged_copies(self):
+        """Test that retry_only=False also drops copies without Retry set."""
+        frame = _frame(data_frame(seq=7))
+        assert RetryFilter().accept(frame) and RetryFilter().accept(frame)
+        retries = RetryFilter(retry_only=False)
+        assert retries.accept(frame)
+        assert not retries.accept(frame)
+
+    def test_transmitters_tracked_separately(self):
+        """Test that equal sequence numbers of other stations are kept."""
+        retries = RetryFilter()
+        assert retries.accept(_frame(data_frame(seq=3)))
+        assert retries.accept(_frame(beacon(seq=3)))
+        other = data_frame(sta="AA:BB:CC:DD:EE:02", seq=3, retry=True)
+        assert retries.accept(_frame(other))
+        assert not retries.accept(_frame(data_frame(seq=3, retry=True)))
+
+    def test_qos_tids_tracked_separately(self):
+        """Test that each QoS traffic identifier has its own sequence."""
+        retries = RetryFilter()
+        assert retries.accept(_frame(_qos_frame(0, seq=5)))
+        assert retries.accept(_frame(_qos_frame(6, seq=5, retry=True)))
+        assert not retries.accept(_frame(_qos_frame(0, seq=5, retry=True)))
+
+    def test_collision_never_drops(self):
+        """Test that a one-slot table evicts instead of dropping wrongly."""
+        retries = RetryFilter(slots=1)
+        frames = [data_frame(sta="AA:BB:CC:DD:EE:%02X" % n, seq=1) for n in range(4)]
+        for data in frames:
+            assert retries.accept(_frame(data))
+        assert retries.accept(_frame(retransmit(frames[0])))
+        assert retries.evictions == 4
+        assert retries.dropped == 0
+
+    def test_slots_rounded_up(self):
+        """Test that the table size is a power of two."""
+        assert RetryFilter(slots=1000).slots == 1024
+
+    def test_undecodable_frames_kept(self):
+        """Test that frames without a sequence number pass through."""
+        retries = RetryFilter()
+        assert retries.accept(Frame(1.0, 127, b"\0\0\x08\0", 0))
+        assert retries.frames == 0
+
+
+class TestDedupFrames:
+    """Tests for dedup_frames."""
+
+    def test_dedup_frames(self):
+        """Test filtering a frame stream with a shared filter."""
+        m1 = eapol_frame(1, 1)
+        frames = [_frame(m1), _frame(retransmit(m1)), _frame(eapol_frame(2, 1))]
+        retries = RetryFilter()
+        kept = list(dedup_frames(frames, retries))
+        assert [f.data for f in kept] == [frames[0].data, frames[2].data]
+        assert retries.dropped == 1
+        assert parse_dot11(kept[0]) is not None
@@ -0,0 +1,348 @@
+"""
+test_handshake.py
+-----------------
+Unit tests for the handshake module (EAPOL parsing and 4-way handshake
+detection). Tests cover message classification, every supported message
+pair, early detection on growing captures, and CapFile updates.
+"""
+
+import threading
+import time
+from wlfwifi.capture import Frame, parse_dot11
+from wlfwifi.handshake import (
+    HandshakeDetector,
+    capture_hash_lines,
+    export_hashcat,
+    extract_pmkid,
+    find_handshakes,
+    is_eapol,
+    hashcat_eapol_line,
+    hashcat_pmkid_line,
+    parse_eapol_key,
+    wait_for_handshake,
+    MESSAGE_PAIR_M12E2,
+    MESSAGE_PAIR_M32E2,
+    MESSAGE_PAIR_M34E4,
+)
+from wlfwifi.models import CapFile
+from frames import (
+    AP,
+    ANONCE,
+    SNONCE,
+    STA,
+    assoc_request,
+    beacon,
+    data_frame,
+    eapol_frame,
+    handshake_packets,
+    pcap_bytes,
+    pmkid_kde,
+    write_capture,
+)
+
+PMKID = bytes(range(200, 216))
+
+
+def _key(data):
+    return parse_eapol_key(parse_dot11(Frame(1.0, 127, data, 0)), 1.0)
+
+
+class TestParseEapolKey:
+    """Tests for parse_eapol_key."""
+
+    def test_message_classification(self):
+        """Test that M1-M4 are recognized from key information bits."""
+        assert [_key(eapol_frame(m, 1)).message for m in (1, 2, 3, 4)] == [1, 2, 3, 4]
+
+    def test_addresses_by_direction(self):
+        """Test that AP and station are resolved for both directions."""
+        for m in (1, 2):
+            key = _key(eapol_frame(m, 1))
+            assert key.ap == AP
+            assert key.sta == STA
+
+    def test_fields(self):
+        """Test replay counter, nonce and MIC extraction."""
+        key = _key(eapol_frame(2, 42, key_data=b"\x30\x14" + bytes(20)))
+        assert key.replay_counter == 42
+        assert key.nonce == SNONCE
+        assert key.mic == bytes([2]) * 16
+        assert len(key.key_data) == 22
+        assert key.key_version == 2
+
+    def test_qos_frame(self):
+        """Test EAPOL inside QoS data frames."""
+        assert _key(eapol_frame(1, 1, qos=True)).message == 1
+
+    def test_non_eapol_ignored(self):
+        """Test that other frames are not parsed as EAPOL."""
+        assert parse_eapol_key(parse_dot11(Frame(0.0, 127, beacon(), 0))) is None
+
+    def test_is_eapol(self):
+        """Test telling EAPOL frames from other data and management frames."""
+        assert is_eapol(parse_dot11(Frame(0.0, 127, eapol_frame(3, 1), 0)))
+        assert is_eapol(parse_dot11(Frame(0.0, 127, eapol_frame(1, 1, qos=True), 0)))
+        assert not is_eapol(parse_dot11(Frame(0.0, 127, data_frame(), 0)))
+        assert not is_eapol(parse_dot11(Frame(0.0, 127, beacon(), 0)))
+
+
+class TestHandshakeDetector:
+    """Tests for HandshakeDetector pairing."""
+
+    def _feed(self, detector, packets):
+        found = []
+        for ts, data in packets:
+            hs = detector.feed(Frame(ts, 127, data, 0))
+            if hs is not None:
+                found.append(hs)
+        return found
+
+    def test_m1_m2_detected_on_m2(self):
+        """Test that a handshake is signalled as soon as M2 arrives."""
+        detector = HandshakeDetector()
+        found = self._feed(detector, handshake_packets((1, 2)))
+        assert len(found) == 1
+        hs = found[0]
+        assert hs.message_pair == MESSAGE_PAIR_M12E2
+        assert hs.anonce == ANONCE and hs.snonce == SNONCE
+        assert hs.mic == bytes([2]) * 16
+        assert hs.eapol[81:97] == bytes(16)
+
+    def test_m2_before_m1(self):
+        """Test pairing when M2 is captured before M1."""
+        found = self._feed(HandshakeDetector(), handshake_packets((2, 1)))
+        assert len(found) == 1
+
+    def test_replay_counter_mismatch(self):
+        """Test that M1/M2 from different exchanges are not paired."""
+        packets = [(1.0, eapol_frame(1, 5)), (1.1, eapol_frame(2, 6))]
+        assert self._feed(HandshakeDetector(), packets) == []
+
+    def test_m2_m3_pair(self):
+        """Test M2+M3 pairing with M3 one replay step ahead."""
+        found = self._feed(HandshakeDetector(), handshake_packets((2, 3)))
+        assert [h.message_pair for h in found] == [MESSAGE_PAIR_M32E2]
+
+    def test_m3_m4_pair_needs_snonce(self):
+        """Test that M3+M4 only pairs when M4 carries a nonce."""
+        assert self._feed(HandshakeDetector(), handshake_packets((3, 4))) == []
+        packets = [
+            (1.0, eapol_frame(3, 2)),
+            (1.1, eapol_frame(4, 2, nonce=SNONCE)),
+        ]
+        found = self._feed(HandshakeDetector(), packets)
+        assert [h.message_pair for h in found] == [MESSAGE_PAIR_M34E4]
+
+    def test_bssid_filter(self):
+        """Test that other APs are ignored when a BSSID is set."""
+        detector = HandshakeDetector(bssid="00:00:00:00:00:01")
+        assert self._feed(detector, handshake_packets()) == []
+
+    def test_one_signal_per_station(self):
+        """Test that a full 4-way handshake signals only once."""
+        detector = HandshakeDetector()
+        found = self._feed(detector, handshake_packets() * 2)
+        assert len(found) == 1
+        assert len(detector.handshakes) == 1
+
+    def test_better_pair_replaces(self):
+        """Test that a later M1+M2 replaces an M2+M3 pair."""
+        detector = HandshakeDetector()
+        self._feed(detector, handshake_packets((2, 3)))
+        self._feed(detector, handshake_packets((1,)))
+        hs = detector.handshakes[(AP, STA)]
+        assert hs.message_pair == MESSAGE_PAIR_M12E2
+
+    def test_updates_capfile_and_callback(self):
+        """Test that CapFile.handshakes and the callback are updated."""
+        cap = CapFile("/tmp/x.cap", 0)
+        seen = []
+        detector = HandshakeDetector(cap_file=cap, on_handshake=seen.append)
+        self._feed(detector, handshake_packets())
+        self._feed(detector, handshake_packets(sta="AA:BB:CC:DD:EE:02"))
+        assert cap.handshakes == 2
+        assert len(seen) == 2
+
+
+class TestFindHandshakes:
+    """Tests for find_handshakes and wait_for_handshake."""
+
+    def test_find_handshakes(self, tmp_path):
+        """Test finding handshakes in a capture with other traffic."""
+        packets = [(999.0, beacon())] + handshake_packets()
+        path = write_capture(tmp_path / "hs.cap", packets, fmt="pcapng")
+        found = find_handshakes(path)
+        assert len(found) == 1
+        assert found[0].ap == AP
+
+    def test_wait_for_handshake_returns_early(self, tmp_path):
+        """Test that waiting ends as soon as the handshake is written."""
+        path = tmp_path / "live.cap"
+        blob = pcap_bytes([(1.0, beacon())] + handshake_packets((1, 2)))
+        path.write_bytes(blob[:-40])
+
+        def finish():
+            time.sleep(0.05)
+            with open(path, "ab") as f:
+                f.write(blob[-40:])
+
+        writer = threading.Thread(target=finish)
+        writer.start()
+        started = time.monotonic()
+        hs = wait_for_handshake(str(path), bssid=AP, timeout=5, poll_interval=0.005)
+        writer.join()
+        assert hs is not None
+        assert time.monotonic() - started < 1
+
+    def test_wait_for_handshake_timeout(self, tmp_path):
+        """Test that waiting returns None on timeout."""
+        path = write_capture(tmp_path / "none.cap", [(1.0, beacon())])
+        assert wait_for_handshake(path, timeout=0.02, poll_interval=0.005) is None
+
+
+class TestPmkid:
+    """Tests for extract_pmkid."""
+
+    def test_pmkid_from_m1(self):
+        """Test extracting the PMKID KDE of message 1."""
+        key = _key(eapol_frame(1, 1, key_data=pmkid_kde(PMKID)))
+        assert extract_pmkid(key) == PMKID
+
+    def test_zero_pmkid_ignored(self):
+        """Test that an all-zero PMKID is ignored."""
+        key = _key(eapol_frame(1, 1, key_data=pmkid_kde(bytes(16))))
+        assert extract_pmkid(key) is None
+
+    def test_no_pmkid(self):
+        """Test messages without a PMKID."""
+        assert extract_pmkid(_key(eapol_frame(1, 1))) is None
+        key = _key(eapol_frame(2, 1, key_data=pmkid_kde(PMKID)))
+        assert extract_pmkid(key) is None
+
+
+class TestPmkidDetection:
+    """Tests for PMKID capture in HandshakeDetector and wait_for_handshake."""
+
+    def test_detector_records_pmkid_on_m1(self):
+        """Test that a PMKID is recorded and signalled from M1 alone."""
+        from wlfwifi.models import Target
+
+        target = Target(AP.lower(), "TestNet", 6, "WPA2", False)
+        seen = []
+        detector = HandshakeDetector(on_pmkid=seen.append, targets=[target])
+        data = eapol_frame(1, 1, key_data=pmkid_kde(PMKID))
+        assert detector.feed(Frame(1.0, 127, data, 0)) is None
+        assert detector.pmkids[(AP, STA)].pmkid == PMKID
+        assert [p.pmkid for p in seen] == [PMKID]
+        assert target.pmkid == PMKID
+
+    def test_pmkid_signalled_once(self):
+        """Test that repeated M1s signal the PMKID only once."""
+        seen = []
+        detector = HandshakeDetector(on_pmkid=seen.append)
+        data = eapol_frame(1, 1, key_data=pmkid_kde(PMKID))
+        for _ in range(3):
+            detector.feed(Frame(1.0, 127, data, 0))
+        assert len(seen) == 1
+
+    def test_wait_returns_pmkid(self, tmp_path):
+        """Test that waiting ends on a PMKID when accepted."""
+        from wlfwifi.handshake import Pmkid
+
+        packets = [(1.0, beacon()), (1.1, eapol_frame(1, 1, key_data=pmkid_kde(PMKID)))]
+        path = write_capture(tmp_path / "p.cap", packets)
+        found = wait_for_handshake(path, timeout=1, accept_pmkid=True)
+        assert isinstance(found, Pmkid)
+        assert found.pmkid == PMKID
+
+    def test_wait_ignores_pmkid_by_default(self, tmp_path):
+        """Test that PMKIDs do not end a handshake-only wait."""
+        packets = [(1.1, eapol_frame(1, 1, key_data=pmkid_kde(PMKID)))]
+        path = write_capture(tmp_path / "p.cap", packets)
+        assert wait_for_handshake(path, timeout=0.02, poll_interval=0.005) is None
+
+
+class TestHashcatExport:
+    """Tests for hashcat 22000 formatting and batch export."""
+
+    def _capture(self, path, sta=STA, essid="TestNet", pmkid=True, beacons=True):
+        packets = [(999.0, beacon(essid=essid))] if beacons else []
+        kwargs = {"key_data": pmkid_kde(PMKID)} if pmkid else {}
+        packets.append((1000.0, eapol_frame(1, 1, sta=sta, **kwargs)))
+        packets.append((1000.1, eapol_frame(2, 1, sta=sta)))
+        return write_capture(path, packets)
+
+    def test_pmkid_line(self):
+        """Test the WPA*01 line layout."""
+        line = hashcat_pmkid_line(AP, STA, b"TestNet", PMKID)
+        assert line == "WPA*01*%s*001122334455*aabbccddee01*%s***" % (
+            PMKID.hex(),
+            b"TestNet".hex(),
+        )
+
+    def test_eapol_line(self, tmp_path):
+        """Test the WPA*02 line layout."""
+        hs = find_handshakes(self._capture(tmp_path / "a.cap", pmkid=False))[0]
+        fields = hashcat_eapol_line(hs, b"TestNet").split("*")
+        assert fields[:2] == ["WPA", "02"]
+        assert fields[2] == hs.mic.hex()
+        assert fields[6] == ANONCE.hex()
+        assert bytes.fromhex(fields[7]) == hs.eapol
+        assert fields[8] == "00"
+
+    def test_capture_hash_lines(self, tmp_path):
+        """Test extracting both a PMKID and a handshake from one capture."""
+        lines, frames, skipped = capture_hash_lines(self._capture(tmp_path / "a.cap"))
+        assert sorted(line[:6] for line in lines) == ["WPA*01", "WPA*02"]
+        assert frames == 3
+        assert skipped == 0
+
+    def test_unknown_essid_skipped(self, tmp_path):
+        """Test that hashes without a known ESSID are skipped."""
+        path = self._capture(tmp_path / "a.cap", beacons=False)
+        lines, _, skipped = capture_hash_lines(path)
+        assert lines == []
+        assert skipped == 2
+
+    def test_essid_from_association_request(self, tmp_path):
+        """Test that a hidden network's ESSID is taken from an assoc request."""
+        path = self._capture(tmp_path / "a.cap", essid="", pmkid=False)
+        with open(path, "ab") as f:
+            f.write(pcap_bytes([(1001.0, assoc_request(essid="Hidden"))])[24:])
+        lines, _, skipped = capture_hash_lines(path)
+        assert len(lines) == 1
+        assert lines[0].split("*")[5] == b"Hidden".hex()
+        assert skipped == 0
+
+    def test_bad_capture_skipped(self, tmp_path):
+        """Test that unreadable captures are skipped with no lines."""
+        path = tmp_path / "bad.cap"
+        path.write_bytes(b"garbage" * 10)
+        assert capture_hash_lines(str(path))[0] == []
+
+    def test_export_dedupes(self, tmp_path):
+        """Test that identical hashes across captures are written once."""
+        paths = [
+            self._capture(tmp_path / "a.cap"),
+            self._capture(tmp_path / "b.cap"),
+            self._capture(tmp_path / "c.cap", sta="AA:BB:CC:DD:EE:02"),
+        ]
+        out = tmp_path / "out.hc22000"
+        stats = export_hashcat(paths, str(out), processes=1)
+        assert len(out.read_text().splitlines()) == 4
+        assert stats.captures == 3
+        assert stats.lines == 4
+        assert stats.duplicates == 2
+        assert stats.captures_per_sec > 0
+
+    def test_export_process_pool(self, tmp_path):
+        """Test that a process pool produces the same lines."""
+        paths = [
+            self._capture(tmp_path / ("%d.cap" % i), sta="AA:BB:CC:DD:EE:%02X" % i)
+            for i in range(4)
+        ]
+        serial = tmp_path / "serial.hc22000"
+        pooled = tmp_path / "pooled.hc22000"
+        export_hashcat(paths, str(serial), processes=1)
+        export_hashcat(paths, str(pooled), processes=2)
+        assert serial.read_text() == pooled.read_text()
@@ -0,0 +1,170 @@
+"""
+test_index.py
+-------------
+Unit tests for the index module (sidecar frame index).
+Tests cover building and reusing the sidecar, incremental updates of growing
+captures, stale index detection, and per-BSSID random-access queries.
+"""
+
+import os
+import pytest
+from wlfwifi.capture import DOT11_MGMT, SUBTYPE_BEACON
+from wlfwifi.index import (
+    CaptureIndex,
+    ENTRY_EAPOL,
+    ENTRY_WPS,
+    index_handshakes,
+    index_wps_check_targets,
+    kind_of,
+)
+from wlfwifi.models import Target
+from frames import (
+    AP,
+    beacon,
+    data_frame,
+    handshake_packets,
+    pcap_bytes,
+    pcapng_bytes,
+    write_capture,
+    wps_beacon,
+)
+
+OTHER_AP = "66:77:88:99:AA:BB"
+
+
+def mixed_packets():
+    packets = [(1.0, beacon()), (1.5, beacon(ap=OTHER_AP, essid="Other"))]
+    packets += [(2.0 + i, data_frame(ap=OTHER_AP, seq=i)) for i in range(5)]
+    packets += handshake_packets(start=10.0)
+    packets.append((20.0, wps_beacon(ap=OTHER_AP, locked=True)))
+    return packets
+
+
+class TestCaptureIndex:
+    """Tests for CaptureIndex."""
+
+    @pytest.mark.parametrize("fmt", ["pcap", "pcapng"])
+    def test_build_and_query(self, tmp_path, fmt):
+        """Test indexing a capture and reading one BSSID's frames back."""
+        packets = mixed_packets()
+        path = write_capture(tmp_path / "a.cap", packets, fmt=fmt)
+        with CaptureIndex(path) as index:
+            assert index.update() == len(packets)
+            assert os.path.exists(path + ".idx")
+            frames = list(index.frames(bssid=AP))
+            assert [f.data for f in frames] == [packets[0][1]] + [
+                p[1] for p in packets[7:11]
+            ]
+            assert frames[1].timestamp == pytest.approx(10.0)
+            eapol = list(index.entries(bssid=AP, flags=ENTRY_EAPOL))
+            assert len(eapol) == 4
+            beacons = list(index.entries(kind=kind_of(DOT11_MGMT, SUBTYPE_BEACON)))
+            assert len(beacons) == 3
+            assert sorted(index.bssids()) == [AP, OTHER_AP]
+
+    def test_reused_across_sessions(self, tmp_path):
+        """Test that a second index instance loads the sidecar as is."""
+        path = write_capture(tmp_path / "a.cap", mixed_packets())
+        with CaptureIndex(path) as index:
+            index.update()
+        with CaptureIndex(path) as index:
+            assert len(index) == len(mixed_packets())
+            assert index.update() == 0
+            assert len(list(index.entries(bssid=OTHER_AP))) == 7
+
+    @pytest.mark.parametrize("fmt", ["pcap", "pcapng"])
+    def test_growing_capture(self, tmp_path, fmt):
+        """Test that updates only index frames appended since the last one."""
+        packets = mixed_packets()
+        builder = pcapng_bytes if fmt == "pcapng" else pcap_bytes
+        blob = builder(packets)
+        path = tmp_path / "grow.cap"
+        index = CaptureIndex(str(path))
+        added = []
+        for cut in (10, len(blob) // 2, len(blob) - 3, len(blob)):
+            path.write_bytes(blob[:cut])
+            added.append(index.update())
+            # A fresh instance must resume from the sidecar alone
+            index.close()
+            index = CaptureIndex(str(path))
+        assert sum(added) == len(packets)
+        assert added[0] == 0
+        assert [f.data for f in index.frames()] == [p[1] for p in packets]
+        index.close()
+
+    @pytest.mark.filterwarnings("error::ResourceWarning")
+    @pytest.mark.filterwarnings("error::pytest.PytestUnraisableExceptionWarning")
+    def test_update_after_read_closes_capture(self, tmp_path):
+        """Test that updating a capture that was read releases its handle."""
+        packets = mixed_packets()
+        path = write_capture(tmp_path / "a.cap", packets[:3])
+        with CaptureIndex(path) as index:
+            index.update()
+            assert len(list(index.frames())) == 3
+            opened = index._cap_file
+            with open(path, "ab") as f:
+                f.write(pcap_bytes(packets[3:])[24:])
+            index.update()
+            assert opened.closed
+            assert len(list(index.frames())) == len(packets)
+
+    def test_replaced_capture_rebuilds(self, tmp_path):
+        """Test that a sidecar describing another capture is discarded."""
+        path = write_capture(tmp_path / "a.cap", mixed_packets())
+        with CaptureIndex(path) as index:
+            index.update()
+        write_capture(tmp_path / "a.cap", [(1.0, beacon(essid="Replaced!"))])
+        with CaptureIndex(path) as index:
+            assert len(index) == 0
+            assert index.update() == 1
+            assert next(index.frames()).data == beacon(essid="Replaced!")
+
+    def test_interrupted_update_is_discarded(self, tmp_path):
+        """Test that records written past the committed offset are dropped."""
+        path = write_capture(tmp_path / "a.cap", mixed_packets())
+        with CaptureIndex(path) as index:
+            index.update()
+        idx = path + ".idx"
+        with open(idx, "rb") as f:
+            data = f.read()
+        # Rewind the committed offset to the header end: no frame is indexed
+        with open(idx, "r+b") as f:
+            f.seek(24)
+            f.write((24).to_bytes(8, "little"))
+        with CaptureIndex(path) as index:
+            assert len(index) == 0
+            assert os.path.getsize(idx) < len(data)
+            assert index.update() == len(mixed_packets())
+
+    def test_missing_capture(self, tmp_path):
+        """Test that indexing a capture not yet created is a no-op."""
+        with CaptureIndex(str(tmp_path / "later.cap")) as index:
+            assert index.update() == 0
+            assert list(index.frames()) == []
+
+
+class TestIndexChecks:
+    """Tests for index_handshakes and index_wps_check_targets."""
+
+    def test_index_handshakes(self, tmp_path):
+        """Test finding a handshake from EAPOL entries only."""
+        path = write_capture(tmp_path / "a.cap", mixed_packets())
+        with CaptureIndex(path) as index:
+            index.update()
+            assert len(index_handshakes(index, AP)) == 1
+            assert index_handshakes(index, OTHER_AP) == []
+
+    def test_index_wps_check_targets(self, tmp_path):
+        """Test setting WPS state from index flags."""
+        path = write_capture(tmp_path / "a.cap", mixed_packets())
+        targets = [
+            Target(AP, "TestNet", 6, "WPA2", True),
+            Target(OTHER_AP, "Other", 6, "WPA2", False),
+        ]
+        with CaptureIndex(path) as index:
+            index.update()
+            assert len(list(index.entries(flags=ENTRY_WPS))) == 1
+            index_wps_check_targets(targets, index)
+        assert targets[0].wps is False
+        assert targets[1].wps is True
+        assert targets[1].wps_locked is True
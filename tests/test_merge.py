@@ -0,0 +1,90 @@
+"""
+test_merge.py
+-------------
+Unit tests for the merge module (k-way capture merging).
+Tests cover timestamp ordering across pcap/pcapng inputs, duplicate frames
+captured by several cards, and output link type handling.
+"""
+
+import os
+import pytest
+from wlfwifi.capture import iter_frames
+from wlfwifi.merge import merge_captures
+from frames import beacon, data_frame, eapol_frame, write_capture
+
+
+class TestMergeCaptures:
+    """Tests for merge_captures."""
+
+    def test_orders_by_timestamp(self, tmp_path):
+        """Test interleaving frames of several inputs by timestamp."""
+        a = write_capture(
+            tmp_path / "a.cap", [(1.0, data_frame(seq=1)), (4.0, data_frame(seq=4))]
+        )
+        b = write_capture(
+            tmp_path / "b.pcapng",
+            [(2.0, data_frame(seq=2)), (3.0, data_frame(seq=3))],
+            fmt="pcapng",
+        )
+        c = write_capture(tmp_path / "c.cap", [(0.5, beacon())])
+        out = str(tmp_path / "all.cap")
+        stats = merge_captures([a, b, c], out)
+        frames = list(iter_frames(out))
+        assert [f.timestamp for f in frames] == [0.5, 1.0, 2.0, 3.0, 4.0]
+        assert stats.inputs == 3
+        assert stats.frames == stats.written == 5
+        assert stats.bytes_written == os.path.getsize(out)
+
+    def test_drops_duplicates_across_cards(self, tmp_path):
+        """Test that a frame seen by two cards is written once."""
+        a = write_capture(
+            tmp_path / "a.cap", [(1.0, eapol_frame(1, 1)), (2.0, data_frame(seq=7))]
+        )
+        b = write_capture(
+            tmp_path / "b.cap",
+            [(1.001, eapol_frame(1, 1)), (2.5, data_frame(seq=7))],
+        )
+        out = str(tmp_path / "all.cap")
+        stats = merge_captures([a, b], out, window=0.05)
+        assert stats.duplicates == 1
+        assert [f.timestamp for f in iter_frames(out)] == [1.0, 2.0, 2.5]
+
+    def test_same_sequence_different_content(self, tmp_path):
+        """Test that frames sharing a sequence number but not contents stay."""
+        a = write_capture(tmp_path / "a.cap", [(1.0, data_frame(seq=3))])
+        b = write_capture(
+            tmp_path / "b.cap", [(1.0, data_frame(seq=3, payload=b"\1" * 32))]
+        )
+        stats = merge_captures([a, b], str(tmp_path / "all.cap"))
+        assert stats.duplicates == 0
+        assert stats.written == 2
+
+    def test_keep_duplicates(self, tmp_path):
+        """Test disabling deduplication."""
+        a = write_capture(tmp_path / "a.cap", [(1.0, beacon())])
+        b = write_capture(tmp_path / "b.cap", [(1.0, beacon())])
+        stats = merge_captures([a, b], str(tmp_path / "all.cap"), dedup=False)
+        assert stats.written == 2
+
+    def test_pcap_output_skips_other_linktypes(self, tmp_path):
+        """Test that a pcap output drops frames of a second link type."""
+        a = write_capture(tmp_path / "a.cap", [(1.0, beacon())])
+        b = write_capture(tmp_path / "b.cap", [(2.0, beacon()[8:])], linktype=105)
+        stats = merge_captures([a, b], str(tmp_path / "all.cap"))
+        assert stats.skipped == 1
+        stats = merge_captures([a, b], str(tmp_path / "all.pcapng"))
+        assert stats.written == 2
+
+    def test_empty_inputs(self, tmp_path):
+        """Test that merging nothing writes an empty capture."""
+        a = write_capture(tmp_path / "a.cap", [])
+        out = str(tmp_path / "all.cap")
+        assert merge_captures([a], out).written == 0
+        assert list(iter_frames(out)) == []
+
+    def test_bad_input(self, tmp_path):
+        """Test that a non-capture input raises ValueError."""
+        bad = tmp_path / "bad.cap"
+        bad.write_bytes(b"not a capture file, really not")
+        with pytest.raises(ValueError):
+            merge_captures([str(bad)], str(tmp_path / "all.cap"))
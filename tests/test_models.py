@@ -136,6 +136,36 @@ class TestTarget:
         )
         assert t.encryption == "wpa2"
 
+    def test_target_scoring_defaults(self):
+        """Test that scoring attributes default to neutral values."""
+        t = Target("00:11:22:33:44:55", "Defaults", 6, "WPA2", False)
+        assert t.power == 0
+        assert t.clients == 0
+        assert t.last_client_seen == 0.0
+        assert t.wps_locked is False
+        assert t.attempts == 0
+        assert t.pmkid is None
+
+    def test_target_scoring_attributes(self):
+        """Test Target with scoring attributes set."""
+        t = Target(
+            "00:11:22:33:44:55",
+            "Busy",
+            6,
+            "WPA2",
+            True,
+            power=-42,
+            clients=3,
+            last_client_seen=1700000000.0,
+            wps_locked=True,
+            attempts=2,
+        )
+        assert t.power == -42
+        assert t.clients == 3
+        assert t.last_client_seen == 1700000000.0
+        assert t.wps_locked is True
+        assert t.attempts == 2
+
 
 class TestClient:
     """Tests for the Client class."""
@@ -0,0 +1,164 @@
+"""
+test_plugins.py
+---------------
+Unit tests for the plugins module (registry of attack types).
+Tests cover the built-in attacks, lazy loading of attack classes,
+lookups by encryption and discovering plugins through entry points.
+"""
+
+import sys
+import subprocess
+import pytest
+from unittest.mock import patch
+from wlfwifi.attacks import WPSAttack
+from wlfwifi.plugins import (
+    BUILTIN_ATTACKS,
+    AttackRegistry,
+    AttackSpec,
+    registry,
+)
+
+SPEC_MODULE = """\
+from wlfwifi.plugins import AttackSpec
+
+SPEC = AttackSpec(
+    "pmkid",
+    "wlfwifi_pmkid_attack:PMKIDAttack",
+    ["wpa2"],
+    ["hcxdumptool"],
+    "Capture a PMKID without clients",
+)
+NOT_A_SPEC = 42
+"""
+
+ATTACK_MODULE = """\
+from wlfwifi.attacks import Attack
+
+
+class PMKIDAttack(Attack):
+    def __init__(self, target):
+        self.target = target
+
+    def RunAttack(self):
+        return self.target
+
+    def EndAttack(self):
+        pass
+"""
+
+ENTRY_POINTS = """\
+[wlfwifi.attacks]
+pmkid = wlfwifi_pmkid_spec:SPEC
+broken = wlfwifi_pmkid_spec:NOT_A_SPEC
+missing = wlfwifi_no_such_module:SPEC
+wps = wlfwifi_pmkid_spec:SPEC
+"""
+
+
+@pytest.fixture
+def plugin(tmp_path, monkeypatch):
+    """An installed plugin distribution advertising attack specs."""
+    (tmp_path / "wlfwifi_pmkid_spec.py").write_text(SPEC_MODULE)
+    (tmp_path / "wlfwifi_pmkid_attack.py").write_text(ATTACK_MODULE)
+    info = tmp_path / "wlfwifi_pmkid-0.1.dist-info"
+    info.mkdir()
+    (info / "METADATA").write_text("Name: wlfwifi-pmkid\nVersion: 0.1\n")
+    (info / "entry_points.txt").write_text(ENTRY_POINTS)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield
+    for name in ("wlfwifi_pmkid_spec", "wlfwifi_pmkid_attack"):
+        sys.modules.pop(name, None)
+
+
+class TestAttackSpec:
+    """Tests for AttackSpec."""
+
+    def test_lazy_load(self):
+        """Test that the class is imported and checked on first use."""
+        spec = AttackSpec("wps", "wlfwifi.attacks:WPSAttack", ["wpa"], ["reaver"])
+        assert not spec.loaded
+        assert spec.load() is WPSAttack
+        assert spec.loaded
+        with pytest.raises(TypeError):
+            AttackSpec("bad", "wlfwifi.plugins:AttackSpec").load()
+        with pytest.raises(ValueError):
+            AttackSpec("bad", "wlfwifi.attacks.WPSAttack")
+
+    def test_supports(self):
+        """Test that encryption types match as prefixes."""
+        spec = AttackSpec("wpa", "wlfwifi.attacks:WPAAttack", ["wpa"])
+        assert spec.supports("WPA2")
+        assert spec.supports("wpa")
+        assert not spec.supports("WEP")
+
+    @patch("wlfwifi.plugins.program_exists")
+    def test_missing_tools(self, mock_exists):
+        """Test that only the tools not installed are reported."""
+        mock_exists.side_effect = lambda tool: tool == "aireplay-ng"
+        spec = AttackSpec("x", "m:C", tools=["aireplay-ng", "hcxdumptool"])
+        assert spec.missing_tools() == ["hcxdumptool"]
+
+    @patch("wlfwifi.plugins.program_exists")
+    def test_optional_tools(self, mock_exists):
+        """Test that optional tools are reported apart from required ones."""
+        mock_exists.return_value = False
+        wpa = BUILTIN_ATTACKS[0]
+        assert wpa.missing_tools() == []
+        assert wpa.missing_tools(optional=True) == ["aireplay-ng"]
+
+
+class TestAttackRegistry:
+    """Tests for AttackRegistry."""
+
+    def test_builtin(self):
+        """Test the built-in attacks and lookups by encryption."""
+        attacks = registry(plugins=False)
+        assert [spec.name for spec in attacks] == ["wpa", "wep", "wps"]
+        assert [spec.name for spec in attacks.for_encryption("WPA2")] == [
+            "wpa",
+            "wps",
+        ]
+        assert attacks.load("wps") is WPSAttack
+        with pytest.raises(KeyError):
+            attacks.get("pmkid")
+
+    def test_no_attack_module_imported(self):
+        """Test that building the registry does not import the attacks."""
+        code = (
+            "import sys\n"
+            "from wlfwifi.plugins import registry\n"
+            "registry(plugins=False)\n"
+            "print(sorted(m for m in sys.modules if m.startswith('wlfwifi')))\n"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        ).stdout
+        assert "wlfwifi.attacks" not in out
+        assert "wlfwifi.core" not in out
+
+    def test_duplicate_name(self):
+        """Test that a name can only be registered once."""
+        attacks = AttackRegistry(BUILTIN_ATTACKS)
+        with pytest.raises(ValueError):
+            attacks.register(AttackSpec("wep", "m:C"))
+
+    def test_discover_plugins(self, plugin, caplog):
+        """Test that plugins are registered without importing their attacks."""
+        attacks = registry()
+        assert "pmkid" in attacks
+        assert len(attacks) == 4
+        assert "Skipping plugin broken" in caplog.text
+        assert "Skipping plugin missing" in caplog.text
+        assert "Skipping plugin wps" in caplog.text
+        spec = attacks.get("pmkid")
+        assert spec.encryption == ("WPA2",)
+        assert "wlfwifi_pmkid_attack" not in sys.modules
+        attack = spec.create("target")
+        assert attack.RunAttack() == "target"
+        assert "wlfwifi_pmkid_attack" in sys.modules
+
+    @patch("wlfwifi.plugins.entry_points", None)
+    def test_without_importlib_metadata(self, plugin):
+        """Test that only built-in attacks are listed without entry points."""
+        assert registry().discover() == 0
+        assert len(registry()) == 3
@@ -0,0 +1,84 @@
+"""
+test_pmk.py
+-----------
+Unit tests for the pmk module (on-disk PMK cache and precomputation).
+Tests cover storing and looking up PMKs, in-process and pooled
+precomputation that skips cached entries, and cracking from the cache.
+"""
+
+from wlfwifi.pmk import PmkCache, precompute_pmks
+from wlfwifi.wpa import load_material, pmk
+from frames import AP, signed_handshake_packets, write_capture
+
+ESSID = b"TestNet"
+PASSPHRASE = b"correct horse"
+
+
+def write_words(path, words):
+    path.write_bytes(b"".join(w + b"\n" for w in words))
+    return str(path)
+
+
+class TestPmkCache:
+    """Tests for PmkCache."""
+
+    def test_add_and_get(self, tmp_path):
+        """Test storing PMKs and looking them up by ESSID and passphrase."""
+        path = str(tmp_path / "pmk.db")
+        with PmkCache(path) as cache:
+            assert cache.add(ESSID, [(b"password", b"k" * 32)]) == 1
+            assert cache.add(ESSID, [(b"password", b"x" * 32)]) == 0
+            cache.add(b"Other", [(b"password", b"o" * 32)])
+        with PmkCache(path) as cache:
+            assert cache.get(ESSID, b"password") == b"k" * 32
+            assert cache.get(ESSID, b"letmein!") is None
+            assert cache.missing(ESSID, [b"password", b"letmein!"]) == [b"letmein!"]
+            assert cache.count() == 2
+            assert cache.count(ESSID) == 1
+            assert sorted(cache.essids()) == [b"Other", ESSID]
+            assert list(cache.pmks(b"Other")) == [(b"password", b"o" * 32)]
+
+    def test_find(self, tmp_path):
+        """Test cracking a handshake from cached PMKs only."""
+        capture = write_capture(
+            tmp_path / "a.cap", signed_handshake_packets(PASSPHRASE, essid="TestNet")
+        )
+        material = load_material(capture, AP)
+        with PmkCache(str(tmp_path / "pmk.db")) as cache:
+            assert cache.find(material) is None
+            cache.add(ESSID, [(b"password", pmk(b"password", ESSID))])
+            assert cache.find(material) is None
+            cache.add(ESSID, [(PASSPHRASE, pmk(PASSPHRASE, ESSID))])
+            assert cache.find(material) == PASSPHRASE
+
+
+class TestPrecomputePmks:
+    """Tests for precompute_pmks."""
+
+    def test_in_process(self, tmp_path):
+        """Test that missing PMKs are derived and cached ones skipped."""
+        words = [b"password%d" % i for i in range(6)]
+        wordlist = write_words(tmp_path / "w.txt", words)
+        path = str(tmp_path / "pmk.db")
+        stats = precompute_pmks(path, ESSID, wordlist, processes=1, chunk_size=4)
+        assert stats.candidates == 6
+        assert stats.computed == 6
+        assert stats.cached == 0
+        with PmkCache(path) as cache:
+            assert cache.get(ESSID, b"password3") == pmk(b"password3", ESSID)
+        write_words(tmp_path / "w.txt", words + [b"letmein!"])
+        stats = precompute_pmks(path, ESSID, wordlist, processes=1)
+        assert stats.computed == 1
+        assert stats.cached == 6
+
+    def test_process_pool(self, tmp_path):
+        """Test deriving PMKs in worker processes."""
+        words = [b"password%d" % i for i in range(12)]
+        wordlist = write_words(tmp_path / "w.txt", words)
+        path = str(tmp_path / "pmk.db")
+        stats = precompute_pmks(path, ESSID, wordlist, processes=2, chunk_size=2)
+        assert stats.computed == 12
+        assert stats.processes == 2
+        with PmkCache(path) as cache:
+            assert cache.count(ESSID) == 12
+            assert cache.get(ESSID, b"password11") == pmk(b"password11", ESSID)
@@ -0,0 +1,52 @@
+"""
+test_results.py
+---------------
+Unit tests for the results module (store of cracked networks).
+Tests cover recording results, lookups per handshake and per network,
+and reloading the store from disk.
+"""
+
+from wlfwifi.results import CrackResult, ResultStore
+
+BSSID = "00:11:22:33:44:55"
+
+
+class TestResultStore:
+    """Tests for ResultStore."""
+
+    def test_add_and_lookup(self, tmp_path):
+        """Test lookups by handshake digest and by network."""
+        with ResultStore(str(tmp_path / "results.db")) as store:
+            store.add(CrackResult(BSSID.lower(), "Home", "d1", "secret12", "native"))
+            result = store.get(BSSID, "Home", "d1")
+            assert result.key == "secret12"
+            assert result.bssid == BSSID
+            assert store.get(BSSID, "Home", "d2") is None
+            assert store.solved(BSSID.lower(), "Home") is result
+            assert store.solved(BSSID, "Other") is None
+            assert len(store) == 1
+
+    def test_latest_result_per_network(self, tmp_path):
+        """Test that a network maps to its most recent result."""
+        with ResultStore(str(tmp_path / "results.db")) as store:
+            store.add(
+                CrackResult(BSSID, "Home", "d1", "old-key1", "aircrack", 5.0, 1.0)
+            )
+            store.add(CrackResult(BSSID, "Home", "d2", "new-key1", "stored", 0.1, 2.0))
+            assert store.solved(BSSID, "Home").key == "new-key1"
+            assert [r.digest for r in store] == ["d1", "d2"]
+            assert [r.key for r in store.networks()] == ["new-key1"]
+
+    def test_reloaded_from_disk(self, tmp_path):
+        """Test that results survive reopening the database."""
+        path = str(tmp_path / "results.db")
+        with ResultStore(path) as store:
+            store.add(CrackResult(BSSID, "Home", "d1", "secret12", "pmk-cache", 2.5))
+            store.add(CrackResult(BSSID, "Home", "d1", "secret34", "native", 9.0))
+        with ResultStore(path) as store:
+            assert len(store) == 1
+            result = store.get(BSSID, "Home", "d1")
+            assert result.key == "secret34"
+            assert result.method == "native"
+            assert result.elapsed == 9.0
+            assert store.solved(BSSID, "Home") is result
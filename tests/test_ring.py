@@ -0,0 +1,107 @@
+"""
+test_ring.py
+------------
+Unit tests for the ring module (rotating capture segments).
+Tests cover size and time caps, recycling of old segments, and pinning of
+segments that hold handshakes or PMKIDs.
+"""
+
+import os
+import pytest
+from wlfwifi.capture import Frame, iter_frames
+from wlfwifi.ring import RingCaptureWriter, ring_capture
+from frames import beacon, data_frame, eapol_frame, pmkid_kde, write_capture
+
+
+def frame(ts, data=None):
+    return Frame(ts, 127, data if data is not None else data_frame(), 0)
+
+
+class TestRingCaptureWriter:
+    """Tests for RingCaptureWriter."""
+
+    def test_time_cap_rotates(self, tmp_path):
+        """Test that a segment spans at most segment_seconds."""
+        with RingCaptureWriter(str(tmp_path), segment_seconds=10.0) as ring:
+            for ts in range(0, 35, 5):
+                ring.write(frame(float(ts)))
+        assert [s.frames for s in ring.segments] == [2, 2, 2, 1]
+        assert ring.segments[1].first_ts == 10.0
+        assert ring.segments[1].last_ts == 15.0
+
+    def test_size_cap_rotates(self, tmp_path):
+        """Test that a segment is closed once it reaches segment_bytes."""
+        with RingCaptureWriter(str(tmp_path), segment_bytes=1000) as ring:
+            for i in range(20):
+                ring.write(frame(float(i)))
+        assert len(ring.segments) > 1
+        for segment in ring.segments:
+            assert segment.size == os.path.getsize(segment.path)
+            assert segment.size < 1000 + 200
+
+    def test_recycles_oldest_segments(self, tmp_path):
+        """Test that disk usage is bounded by max_segments."""
+        ring = RingCaptureWriter(str(tmp_path), segment_seconds=1.0, max_segments=3)
+        for i in range(10):
+            ring.write(frame(float(i)))
+        ring.close()
+        assert [s.number for s in ring.segments] == [8, 9, 10]
+        assert ring.recycled == 7
+        assert sorted(os.listdir(tmp_path)) == [
+            "ring-00008.pcapng",
+            "ring-00009.pcapng",
+            "ring-00010.pcapng",
+        ]
+        assert ring.disk_usage == sum(
+            os.path.getsize(tmp_path / f) for f in os.listdir(tmp_path)
+        )
+
+    def test_handshake_segments_pinned(self, tmp_path):
+        """Test that both segments of a split handshake survive recycling."""
+        pinned = []
+        ring = RingCaptureWriter(
+            str(tmp_path), segment_seconds=1.0, max_segments=2, on_pin=pinned.append
+        )
+        ring.write(frame(0.0, eapol_frame(1, 1)))
+        ring.write(frame(1.0, eapol_frame(2, 1)))
+        for i in range(2, 10):
+            ring.write(frame(float(i)))
+        ring.close()
+        assert [s.number for s in ring.pinned] == [1, 2]
+        assert pinned == ring.pinned
+        assert [s.number for s in ring.segments] == [1, 2, 9, 10]
+        assert [f.data for f in iter_frames(ring.segments[0].path)] == [
+            eapol_frame(1, 1)
+        ]
+
+    def test_pmkid_segment_pinned(self, tmp_path):
+        """Test that a segment with a PMKID in M1 is pinned."""
+        m1 = eapol_frame(1, 1, key_data=pmkid_kde(bytes(range(16))))
+        with RingCaptureWriter(
+            str(tmp_path), segment_seconds=1.0, max_segments=1
+        ) as ring:
+            ring.write(frame(0.0))
+            ring.write(frame(1.0, m1))
+            ring.write(frame(2.0))
+            ring.write(frame(3.0))
+        assert [s.number for s in ring.pinned] == [2]
+        assert [s.number for s in ring.segments] == [2, 4]
+
+    def test_invalid_max_segments(self, tmp_path):
+        """Test that at least one segment must be kept."""
+        with pytest.raises(ValueError):
+            RingCaptureWriter(str(tmp_path), max_segments=0)
+
+
+class TestRingCapture:
+    """Tests for ring_capture."""
+
+    def test_copies_stream(self, tmp_path):
+        """Test copying a capture into segments and closing the writer."""
+        packets = [(float(i), beacon(seq=i)) for i in range(6)]
+        source = write_capture(tmp_path / "in.cap", packets)
+        ring = RingCaptureWriter(str(tmp_path / "ring"), segment_seconds=2.0)
+        assert ring_capture(source, ring) == 6
+        assert ring.current is None
+        copied = [f.data for s in ring.segments for f in iter_frames(s.path)]
+        assert copied == [p[1] for p in packets]
@@ -0,0 +1,224 @@
+"""
+test_scheduler.py
+-----------------
+Unit tests for the scheduler module (concurrent attack lifecycle).
+Tests cover the lifecycle phases and their timeouts, progress events,
+cancelling the other attacks once one succeeds, turns per interface and
+tearing down child processes.
+"""
+
+import os
+import time
+import asyncio
+import threading
+from subprocess import TimeoutExpired
+from unittest.mock import Mock
+from wlfwifi.attacks import Attack
+from wlfwifi.scheduler import (
+    EVENT_DONE,
+    EVENT_PROGRESS,
+    EVENT_START,
+    EVENT_TIMEOUT,
+    AttackScheduler,
+    reap,
+    run_lifecycle,
+)
+
+
+class FakeAttack(Attack):
+    """Returns "result" after "delay" seconds unless ended first."""
+
+    def __init__(self, result=None, delay=0.0, interface=None, progress=()):
+        self.result = result
+        self.delay = delay
+        self.interface = interface
+        self.progress = progress
+        self.ended = threading.Event()
+        self.phases = []
+
+    async def prepare(self):
+        self.phases.append("prepare")
+
+    async def cleanup(self):
+        self.phases.append("cleanup")
+
+    def RunAttack(self):
+        self.phases.append("run")
+        for detail in self.progress:
+            self.report(detail)
+        if self.ended.wait(self.delay):
+            return None
+        return self.result
+
+    def EndAttack(self):
+        self.phases.append("cancel")
+        self.ended.set()
+
+
+def process(exits_on_terminate=True):
+    proc = Mock(pid=1234)
+    proc.poll.return_value = None
+    if not exits_on_terminate:
+        proc.wait.side_effect = [TimeoutExpired("cmd", 0), 0]
+    return proc
+
+
+class TestRunLifecycle:
+    """Tests for run_lifecycle()."""
+
+    def test_phases_and_events(self):
+        """Test that a finished attack goes through every phase but cancel."""
+        events = []
+        attack = FakeAttack("key", progress=["1 of 2", "2 of 2"])
+        outcome = asyncio.run(run_lifecycle(attack, events.append))
+        assert outcome.succeeded
+        assert outcome.result == "key"
+        assert attack.phases == ["prepare", "run", "cleanup"]
+        steps = [(e.phase, e.kind) for e in events if e.kind != EVENT_PROGRESS]
+        assert steps == [
+            ("prepare", EVENT_START),
+            ("prepare", EVENT_DONE),
+            ("run", EVENT_START),
+            ("run", EVENT_DONE),
+            ("cleanup", EVENT_START),
+            ("cleanup", EVENT_DONE),
+        ]
+        progress = [e.detail for e in events if e.kind == EVENT_PROGRESS]
+        assert progress == ["1 of 2", "2 of 2"]
+
+    def test_run_timeout_cancels(self):
+        """Test that a run past its timeout is cancelled and cleaned up."""
+        events = []
+        attack = FakeAttack("key", delay=30)
+        outcome = asyncio.run(
+            run_lifecycle(attack, events.append, timeouts={"run": 0.05})
+        )
+        assert outcome.result is None
+        assert outcome.timed_out == ["run"]
+        assert not outcome.cancelled
+        assert attack.phases == ["prepare", "run", "cancel", "cleanup"]
+        assert ("run", EVENT_TIMEOUT) in [(e.phase, e.kind) for e in events]
+
+    def test_prepare_timeout_skips_run(self):
+        """Test that a prepare past its timeout skips run but not cleanup."""
+
+        class SlowPrepare(FakeAttack):
+            async def prepare(self):
+                await asyncio.sleep(30)
+
+        attack = SlowPrepare("key")
+        outcome = asyncio.run(run_lifecycle(attack, timeouts={"prepare": 0.05}))
+        assert outcome.timed_out == ["prepare"]
+        assert attack.phases == ["cleanup"]
+
+    def test_errors_recorded(self):
+        """Test that an exception in run is recorded, not raised."""
+
+        class Broken(FakeAttack):
+            def RunAttack(self):
+                raise RuntimeError("no interface")
+
+        outcome = asyncio.run(run_lifecycle(Broken("key")))
+        assert not outcome.succeeded
+        assert outcome.error == "run: no interface"
+
+    def test_children_reaped(self):
+        """Test that child processes left running are terminated."""
+        attack = FakeAttack("key")
+        child = process()
+        attack._children = [child]
+        asyncio.run(run_lifecycle(attack))
+        child.terminate.assert_called_once_with()
+
+
+class TestAttackTimeouts:
+    """Tests for Attack.timeouts."""
+
+    def test_copied_per_attack(self):
+        """Test that changing one attack's timeouts leaves the others alone."""
+        from wlfwifi.attacks import DEFAULT_PHASE_TIMEOUTS
+
+        first, second = FakeAttack(), FakeAttack()
+        first.timeouts["run"] = 1.0
+        assert second.timeouts["run"] is None
+        assert DEFAULT_PHASE_TIMEOUTS["run"] is None
+        second.timeouts = {"prepare": 2.0}
+        assert second.timeouts == {"prepare": 2.0}
+
+
+class TestReap:
+    """Tests for reap()."""
+
+    def test_kills_stubborn_processes(self):
+        """Test that processes ignoring SIGTERM are killed."""
+        polite, stubborn, done = process(), process(False), process()
+        done.poll.return_value = 0
+        reap([polite, stubborn, done], timeout=0.01)
+        polite.terminate.assert_called_once_with()
+        polite.kill.assert_not_called()
+        stubborn.kill.assert_called_once_with()
+        done.terminate.assert_not_called()
+
+
+class TestAttackScheduler:
+    """Tests for AttackScheduler."""
+
+    def test_winner_cancels_others(self):
+        """Test that the first result cancels the attacks still running."""
+        fast = FakeAttack("key", delay=0.01, interface="wlan0mon")
+        slow = FakeAttack("other", delay=30, interface="wlan1mon")
+        scheduler = AttackScheduler(kill_timeout=1.0)
+        started = time.monotonic()
+        winner = scheduler.run_sync([slow, fast])
+        assert time.monotonic() - started < 5
+        assert winner.attack is fast
+        assert winner.result == "key"
+        loser = scheduler.outcomes[0]
+        assert loser.cancelled
+        assert loser.result is None
+        assert "cancel" in slow.phases
+
+    def test_more_attacks_than_pool_workers(self):
+        """Test that losers are cancelled however many attacks block."""
+        workers = min(32, (os.cpu_count() or 1) + 4)
+        losers = [FakeAttack("other", delay=30) for _ in range(workers + 3)]
+        winner = FakeAttack("key", delay=0.2)
+        scheduler = AttackScheduler(kill_timeout=1.0)
+        started = time.monotonic()
+        assert scheduler.run_sync(losers + [winner]).attack is winner
+        assert time.monotonic() - started < 5
+        assert all(o.cancelled for o in scheduler.outcomes[:-1])
+        assert all("cancel" in attack.phases for attack in losers)
+
+    def test_abandoned_run_does_not_block_shutdown(self):
+        """Test that a run ignoring EndAttack() is left behind in bounded time."""
+
+        class Stubborn(FakeAttack):
+            def EndAttack(self):
+                self.phases.append("cancel")
+
+        stubborn = Stubborn("other", delay=30)
+        scheduler = AttackScheduler(kill_timeout=0.1)
+        started = time.monotonic()
+        winner = scheduler.run_sync([stubborn, FakeAttack("key", delay=0.05)])
+        assert winner.result == "key"
+        assert time.monotonic() - started < 5
+        assert scheduler.outcomes[0].cancelled
+
+    def test_one_attack_per_interface(self):
+        """Test that attacks on one interface take turns."""
+        first = FakeAttack("key", delay=0.01, interface="wlan0mon")
+        second = FakeAttack("other", interface="wlan0mon")
+        scheduler = AttackScheduler()
+        winner = scheduler.run_sync([first, second])
+        assert winner.attack is first
+        assert scheduler.outcomes[1].cancelled
+        assert second.phases == []
+
+    def test_no_winner(self):
+        """Test that every attack runs when none succeeds."""
+        attacks = [FakeAttack(interface="wlan0mon"), FakeAttack()]
+        scheduler = AttackScheduler()
+        assert scheduler.run_sync(attacks) is None
+        assert [o.cancelled for o in scheduler.outcomes] == [False, False]
+        assert all(a.phases == ["prepare", "run", "cleanup"] for a in attacks)
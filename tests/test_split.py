@@ -0,0 +1,98 @@
+"""
+test_split.py
+-------------
+Unit tests for the split module (per-BSSID minimal captures).
+Tests cover which frames are kept, BSSID filtering, and output handle
+eviction with more BSSIDs than open files.
+"""
+
+import os
+from wlfwifi.capture import iter_frames
+from wlfwifi.handshake import find_handshakes
+from wlfwifi.split import split_capture
+from frames import (
+    AP,
+    beacon,
+    data_frame,
+    eapol_frame,
+    handshake_packets,
+    retransmit,
+    write_capture,
+)
+
+OTHER_AP = "66:77:88:99:AA:BB"
+
+
+def ap_mac(n):
+    return "02:00:00:00:%02X:%02X" % (n >> 8, n & 0xFF)
+
+
+class TestSplitCapture:
+    """Tests for split_capture."""
+
+    def test_keeps_beacon_and_eapol(self, tmp_path):
+        """Test that only one named beacon and the EAPOL frames are kept."""
+        packets = [(1.0, beacon(essid="")), (1.1, beacon()), (1.2, beacon())]
+        packets += [(2.0 + i, data_frame(seq=i)) for i in range(50)]
+        packets += handshake_packets(start=100.0)
+        path = write_capture(tmp_path / "full.cap", packets)
+        stats = split_capture(path, str(tmp_path / "out"))
+        out = os.path.join(str(tmp_path / "out"), "001122334455.cap")
+        assert stats.outputs == {AP: out}
+        frames = list(iter_frames(out))
+        assert [f.data for f in frames] == [packets[1][1]] + [
+            p[1] for p in packets[-4:]
+        ]
+        assert len(find_handshakes(out)) == 1
+        assert stats.kept == 5
+        assert stats.bytes_out == os.path.getsize(out)
+        assert stats.ratio > 1
+
+    def test_requires_eapol_by_default(self, tmp_path):
+        """Test that BSSIDs without EAPOL get no capture unless asked."""
+        packets = [(1.0, beacon()), (1.5, beacon(ap=OTHER_AP, essid="Other"))]
+        packets.append((2.0, eapol_frame(1, 1)))
+        path = write_capture(tmp_path / "full.cap", packets)
+        stats = split_capture(path, str(tmp_path / "a"))
+        assert list(stats.outputs) == [AP]
+        stats = split_capture(path, str(tmp_path / "b"), require_eapol=False)
+        assert sorted(stats.outputs) == [AP, OTHER_AP]
+
+    def test_bssid_filter(self, tmp_path):
+        """Test restricting the split to some BSSIDs."""
+        packets = handshake_packets(start=1.0)
+        packets += handshake_packets(ap=OTHER_AP, start=2.0)
+        path = write_capture(tmp_path / "full.cap", packets)
+        stats = split_capture(path, str(tmp_path / "out"), bssids=[OTHER_AP.lower()])
+        assert list(stats.outputs) == [OTHER_AP]
+
+    def test_more_bssids_than_open_files(self, tmp_path):
+        """Test that evicted outputs are reopened in append mode."""
+        packets = []
+        for rnd in range(3):
+            for n in range(10):
+                packets.append(
+                    (rnd * 10.0 + n * 0.1, eapol_frame(1, rnd + 1, ap=ap_mac(n)))
+                )
+        path = write_capture(tmp_path / "full.cap", packets)
+        stats = split_capture(path, str(tmp_path / "out"), max_open=3)
+        assert len(stats.outputs) == 10
+        assert stats.reopened == 20
+        for out in stats.outputs.values():
+            assert len(list(iter_frames(out))) == 3
+        assert stats.bytes_out == sum(
+            os.path.getsize(p) for p in stats.outputs.values()
+        )
+
+    def test_retries_dropped(self, tmp_path):
+        """Test that retransmitted EAPOL frames are written once."""
+        packets = handshake_packets(start=1.0)
+        packets.insert(1, (1.001, retransmit(packets[0][1])))
+        path = write_capture(tmp_path / "full.cap", packets)
+        stats = split_capture(path, str(tmp_path / "a"), require_eapol=False)
+        assert stats.kept == 4
+        assert stats.retries == 1
+        stats = split_capture(
+            path, str(tmp_path / "b"), require_eapol=False, drop_retries=False
+        )
+        assert stats.kept == 5
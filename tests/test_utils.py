@@ -210,6 +210,36 @@ class TestProgramExists:
         assert result is False
 
 
+class TestRunAirodump:
+    """Tests for run_airodump function."""
+
+    @patch("wlfwifi.utils.Popen")
+    def test_run_airodump_locks_channel(self, mock_popen):
+        """Test that a channel is passed to airodump-ng."""
+        utils.run_airodump("wlan0mon", "/tmp/scan", 6)
+        cmd = mock_popen.call_args[0][0]
+        assert cmd[0] == "airodump-ng"
+        assert cmd[cmd.index("-c") + 1] == "6"
+        assert cmd[cmd.index("-w") + 1] == "/tmp/scan"
+        assert cmd[-1] == "wlan0mon"
+
+    @patch("wlfwifi.utils.Popen")
+    def test_run_airodump_hops_without_channel(self, mock_popen):
+        """Test that no channel lock is set when channel is None."""
+        utils.run_airodump("wlan0mon", "/tmp/scan")
+        assert "-c" not in mock_popen.call_args[0][0]
+
+    @patch("wlfwifi.utils.Popen")
+    def test_run_airodump_output_discarded(self, mock_popen):
+        """Test that airodump-ng output is not piped, so it never blocks."""
+        from subprocess import DEVNULL
+
+        utils.run_airodump("wlan0mon", "/tmp/scan")
+        kwargs = mock_popen.call_args[1]
+        assert kwargs["stdout"] == DEVNULL
+        assert kwargs["stderr"] == DEVNULL
+
+
 class TestSendInterrupt:
     """Tests for send_interrupt function."""
 
@@ -0,0 +1,123 @@
+"""
+test_verify.py
+--------------
+Unit tests for the verify module (in-process passphrase verification).
+Tests cover NativeWorker, passing chunks through shared memory slots,
+native cracking in-process and in a pool, and verifying known keys.
+"""
+
+import pytest
+from wlfwifi.models import CapFile
+from wlfwifi.verify import (
+    NativeWorker,
+    SharedChunkExecutor,
+    native_crack_wordlist,
+    verify_keys,
+)
+from wlfwifi.wpa import CrackMaterial, load_material
+from frames import AP, signed_handshake_packets, write_capture
+
+PASSPHRASE = b"correct horse"
+
+
+@pytest.fixture
+def material(tmp_path):
+    path = write_capture(tmp_path / "hs.cap", signed_handshake_packets(PASSPHRASE))
+    return load_material(path, AP)
+
+
+def write_words(path, count, key_at=None):
+    words = [b"candidate%03d" % i for i in range(count)]
+    if key_at is not None:
+        words.insert(key_at, PASSPHRASE)
+    path.write_bytes(b"\n".join(words) + b"\n")
+    return str(path)
+
+
+class TestNativeWorker:
+    """Tests for NativeWorker."""
+
+    def test_finds_key(self, material):
+        """Test that the worker returns the matching candidate of a chunk."""
+        worker = NativeWorker(material)
+        assert worker([b"password", PASSPHRASE, b"12345678"]) == PASSPHRASE
+        assert worker([b"password", b"12345678"]) is None
+
+    def test_needs_material(self):
+        """Test that material without an ESSID or checks is refused."""
+        with pytest.raises(ValueError):
+            NativeWorker(CrackMaterial(AP, None, []))
+        with pytest.raises(ValueError):
+            NativeWorker(CrackMaterial(AP, b"TestNet", []))
+
+
+class TestSharedChunkExecutor:
+    """Tests for SharedChunkExecutor."""
+
+    def test_runs_chunks(self, material):
+        """Test that chunks written to the slots reach the worker intact."""
+        worker = NativeWorker(material)
+        long_word = b"x" * 62 + b"y"
+        with SharedChunkExecutor(worker, 2, 4) as executor:
+            futures = [
+                executor.submit(worker, [b"password", long_word]),
+                executor.submit(worker, [long_word, PASSPHRASE, b"12345678"]),
+            ]
+            # More chunks than slots wait for earlier ones to finish
+            futures += [executor.submit(worker, [b"password"]) for _ in range(6)]
+            results = [f.result() for f in futures]
+        assert results[:2] == [None, PASSPHRASE]
+        assert results[2:] == [None] * 6
+
+    def test_refuses_other_chunks(self, material):
+        """Test that oversized chunks and other callables are refused."""
+        worker = NativeWorker(material)
+        with SharedChunkExecutor(worker, 2, 2) as executor:
+            with pytest.raises(ValueError):
+                executor.submit(worker, [b"password"] * 3)
+            with pytest.raises(ValueError):
+                executor.submit(NativeWorker(material), [b"password"])
+
+
+class TestNativeCrackWordlist:
+    """Tests for native_crack_wordlist."""
+
+    def test_in_process(self, material, tmp_path):
+        """Test cracking without a pool."""
+        wordlist = write_words(tmp_path / "words.txt", 10, key_at=7)
+        key, stats = native_crack_wordlist(material, wordlist, 1, 4, progress=None)
+        assert key == PASSPHRASE
+        assert stats.processes == 1
+
+    def test_shared_memory_pool(self, material, tmp_path):
+        """Test cracking with chunks passed through shared memory."""
+        wordlist = write_words(tmp_path / "words.txt", 30, key_at=25)
+        key, stats = native_crack_wordlist(material, wordlist, 2, 4, progress=None)
+        assert key == PASSPHRASE
+        assert stats.processes == 2
+
+    def test_not_found(self, material, tmp_path):
+        """Test that every candidate is tried when the key is missing."""
+        wordlist = write_words(tmp_path / "words.txt", 12)
+        key, stats = native_crack_wordlist(material, wordlist, 2, 5, progress=None)
+        assert key is None
+        assert stats.candidates == 12
+
+
+class TestVerifyKeys:
+    """Tests for verify_keys."""
+
+    def test_known_keys(self, material):
+        """Test that the first matching key is returned."""
+        assert verify_keys(material, ["password", "correct horse"]) == PASSPHRASE
+        assert verify_keys(material, [b"password", b"12345678"]) is None
+
+    def test_skips_invalid_keys(self, material):
+        """Test that keys too short or long for WPA are not tried."""
+        assert verify_keys(material, ["short", "x" * 64]) is None
+
+    def test_from_cap_file(self, tmp_path):
+        """Test loading the material of a CapFile."""
+        path = write_capture(tmp_path / "hs.cap", signed_handshake_packets(PASSPHRASE))
+        material = load_material(CapFile(path, 1), AP)
+        assert verify_keys(material, ["correct horse"]) == PASSPHRASE
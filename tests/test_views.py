@@ -0,0 +1,131 @@
+"""
+test_views.py
+-------------
+Unit tests for the views module (zero-copy frames over mmap).
+Tests cover both file formats, lazily decoded header fields, view reuse,
+and agreement with the copying CaptureReader.
+"""
+
+import pytest
+from wlfwifi.capture import iter_frames
+from wlfwifi.views import MappedCapture, iter_views
+from frames import (
+    AP,
+    STA,
+    beacon,
+    data_frame,
+    eapol_frame,
+    mac,
+    pcap_bytes,
+    pcapng_bytes,
+    radiotap,
+    write_capture,
+)
+
+
+def mac_int(text):
+    return int.from_bytes(mac(text), "big")
+
+
+PACKETS = [
+    (1000.5, beacon(seq=9)),
+    (1001.25, data_frame(seq=3)),
+    (1002.0, eapol_frame(1, 1)),
+]
+
+
+class TestMappedCapture:
+    """Tests for MappedCapture and FrameView."""
+
+    @pytest.mark.parametrize("fmt", ["pcap", "pcapng"])
+    def test_matches_capture_reader(self, tmp_path, fmt):
+        """Test that views expose the same frames as CaptureReader."""
+        path = write_capture(tmp_path / "a.cap", PACKETS, fmt=fmt)
+        expected = list(iter_frames(path))
+        with MappedCapture(path) as capture:
+            assert capture.format == fmt
+            for view, frame in zip(capture, expected):
+                assert view.tobytes() == frame.data
+                assert bytes(view.data) == frame.data
+                assert view.timestamp == pytest.approx(frame.timestamp)
+                assert view.offset == frame.offset
+                assert view.linktype == frame.linktype
+            assert len(list(capture.views())) == len(PACKETS)
+
+    def test_header_fields(self, tmp_path):
+        """Test lazily decoded 802.11 header fields."""
+        path = write_capture(tmp_path / "a.cap", PACKETS)
+        with MappedCapture(path) as capture:
+            views = capture.views(reuse=False)
+            first, second, third = views
+            assert (first.type, first.subtype) == (0, 8)
+            assert first.seq >> 4 == 9
+            assert first.bssid == mac_int(AP)
+            assert first.addr1 == 0xFFFFFFFFFFFF
+            assert second.flags & 0x41 == 0x41
+            assert second.addr2 == mac_int(STA)
+            assert second.bssid == mac_int(AP)
+            assert third.bssid == mac_int(AP)
+            assert third.dot11().addr2 == mac(AP)
+
+    def test_reuse(self, tmp_path):
+        """Test that one view object serves every frame unless disabled."""
+        path = write_capture(tmp_path / "a.cap", PACKETS)
+        with MappedCapture(path) as capture:
+            assert len({id(v) for v in capture.views()}) == 1
+            kept = list(capture.views(reuse=False))
+            assert len({id(v) for v in kept}) == 3
+            frames = [v.to_frame() for v in capture.views()]
+        assert [f.data for f in frames] == [p[1] for p in PACKETS]
+
+    def test_views_kept_across_sections(self, tmp_path):
+        """Test that kept views keep their own section's timestamp resolution."""
+        path = tmp_path / "a.pcapng"
+        path.write_bytes(
+            pcapng_bytes(PACKETS[:2]) + pcapng_bytes(PACKETS[2:], tsresol=9)
+        )
+        with MappedCapture(str(path)) as capture:
+            views = list(capture.views(reuse=False))
+            assert [v.timestamp for v in views] == pytest.approx(
+                [ts for ts, _ in PACKETS]
+            )
+
+    def test_truncated_tail_and_short_frames(self, tmp_path):
+        """Test that a partial last record is ignored and runts decode to -1."""
+        blob = pcap_bytes([(1.0, radiotap(b"\x80\x00")), (2.0, beacon())])
+        path = tmp_path / "a.cap"
+        path.write_bytes(blob[:-5])
+        with MappedCapture(str(path)) as capture:
+            views = list(capture.views(reuse=False))
+            assert len(views) == 1
+            assert views[0].frame_control == -1
+            assert views[0].addr2 == -1
+            assert views[0].bssid == -1
+
+    def test_ieee80211_linktype(self, tmp_path):
+        """Test frames without a radiotap header."""
+        path = write_capture(tmp_path / "a.cap", [(1.0, beacon()[8:])], linktype=105)
+        with MappedCapture(path) as capture:
+            view = next(capture.views())
+            assert view.dot11_start == 40
+            assert view.subtype == 8
+
+    @pytest.mark.filterwarnings("error::ResourceWarning")
+    @pytest.mark.filterwarnings("error::pytest.PytestUnraisableExceptionWarning")
+    def test_empty_and_invalid(self, tmp_path):
+        """Test empty files yield nothing and junk raises ValueError."""
+        empty = tmp_path / "empty.cap"
+        empty.write_bytes(b"")
+        assert list(iter_views(str(empty))) == []
+        junk = tmp_path / "junk.cap"
+        junk.write_bytes(b"this is not a capture file at all")
+        with pytest.raises(ValueError):
+            MappedCapture(str(junk))
+
+    def test_close_with_live_slice(self, tmp_path):
+        """Test that close() tolerates a data slice still being referenced."""
+        path = write_capture(tmp_path / "a.cap", PACKETS)
+        capture = MappedCapture(path)
+        data = next(capture.views()).data
+        capture.close()
+        assert bytes(data) == PACKETS[0][1]
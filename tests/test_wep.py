@@ -0,0 +1,111 @@
+"""
+test_wep.py
+-----------
+Unit tests for the wep module (unique IV tracking).
+Tests cover IV extraction, the bitmap set, per-BSSID threshold signalling,
+and polling a capture that is still being written.
+"""
+
+import struct
+from wlfwifi.capture import Frame, parse_dot11
+from wlfwifi.wep import IV_SPACE, IvBitmap, IvTracker, wep_iv
+from frames import AP, beacon, data_frame, pcap_bytes, retransmit, write_capture
+
+OTHER_AP = "66:77:88:99:AA:BB"
+
+
+def iv_bytes(iv):
+    return struct.pack(">I", iv)[1:]
+
+
+def wep_frame(iv, ap=AP, seq=0):
+    return data_frame(ap=ap, iv=iv_bytes(iv), seq=seq)
+
+
+def _frame(data):
+    return Frame(1.0, 127, data, 0)
+
+
+class TestWepIv:
+    """Tests for wep_iv."""
+
+    def test_iv(self):
+        """Test reading the IV of a WEP data frame."""
+        assert wep_iv(parse_dot11(_frame(wep_frame(0x123456)))) == 0x123456
+
+    def test_not_wep(self):
+        """Test that ExtIV (TKIP/CCMP), short and management frames are ignored."""
+        ext_iv = data_frame(payload=b"\0" * 4, iv=b"\x01\x02\x03")
+        ext_iv = ext_iv[:-5] + b"\x20" + ext_iv[-4:]
+        for data in (ext_iv, data_frame(payload=b"", iv=b"\0\0\0"), beacon()):
+            assert wep_iv(parse_dot11(_frame(data))) is None
+
+
+class TestIvBitmap:
+    """Tests for IvBitmap."""
+
+    def test_add_and_contains(self):
+        """Test that each IV is counted once."""
+        bitmap = IvBitmap()
+        assert len(bitmap.bits) == 2 << 20
+        assert bitmap.add(0)
+        assert bitmap.add(IV_SPACE - 1)
+        assert not bitmap.add(0)
+        assert len(bitmap) == 2
+        assert 0 in bitmap and IV_SPACE - 1 in bitmap
+        assert 1 not in bitmap and IV_SPACE not in bitmap
+
+
+class TestIvTracker:
+    """Tests for IvTracker."""
+
+    def test_unique_per_bssid(self):
+        """Test that repeated IVs and other BSSIDs are kept apart."""
+        tracker = IvTracker()
+        for iv in (1, 2, 2, 3):
+            tracker.feed(_frame(wep_frame(iv)))
+        tracker.feed(_frame(wep_frame(1, ap=OTHER_AP)))
+        tracker.feed(_frame(beacon()))
+        assert tracker.unique(AP) == 3
+        assert tracker.unique(OTHER_AP.lower()) == 1
+        assert tracker.wep_frames == 5
+        assert tracker.frames == 6
+
+    def test_thresholds_signalled_once(self):
+        """Test that each threshold fires once, when it is reached."""
+        seen = []
+        tracker = IvTracker((3, 5), on_threshold=lambda b, c: seen.append((b, c)))
+        for iv in range(10):
+            tracker.feed(_frame(wep_frame(iv)))
+            tracker.feed(_frame(wep_frame(iv)))
+        assert seen == [(AP, 3), (AP, 5)]
+
+    def test_bssid_filter(self):
+        """Test that untracked BSSIDs get no bitmap."""
+        tracker = IvTracker(bssids=[OTHER_AP.lower()])
+        assert not tracker.feed(_frame(wep_frame(1)))
+        assert tracker.feed(_frame(wep_frame(1, ap=OTHER_AP)))
+        assert list(tracker.bitmaps) == [OTHER_AP]
+
+    def test_poll_growing_capture(self, tmp_path):
+        """Test that poll() only reads frames appended since the last call."""
+        path = write_capture(tmp_path / "a.cap", [(1.0, wep_frame(1))])
+        with IvTracker() as tracker:
+            assert tracker.poll(path) == 1
+            with open(path, "ab") as f:
+                f.write(pcap_bytes([(2.0, wep_frame(1)), (3.0, wep_frame(2))])[24:])
+            assert tracker.poll(path) == 1
+            assert tracker.unique(AP) == 2
+
+    def test_poll_drops_retransmissions(self, tmp_path):
+        """Test that poll() counts a retransmitted WEP frame once."""
+        frame = wep_frame(1, seq=7)
+        packets = [(1.0, frame), (1.1, retransmit(frame)), (2.0, wep_frame(2, seq=8))]
+        path = write_capture(tmp_path / "a.cap", packets)
+        with IvTracker() as tracker:
+            tracker.poll(path)
+        assert tracker.wep_frames == 2
+        assert tracker.retries.dropped == 1
+        with IvTracker(drop_retries=False) as tracker:
+            tracker.poll(path)
+        assert tracker.wep_frames == 3
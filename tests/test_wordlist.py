@@ -0,0 +1,228 @@
+"""
+test_wordlist.py
+----------------
+Unit tests for the wordlist module (streaming wordlist access).
+Tests cover plain, gzip and stdin input, length filtering, chunking,
+progress reporting, the sparse offset index, starting mid-wordlist and
+the packed format.
+"""
+
+import io
+import os
+import sys
+import gzip
+import pytest
+from wlfwifi.wordlist import (
+    PackedWriter,
+    WordlistIndex,
+    WordlistReader,
+    is_passphrase,
+    packed_directory,
+)
+
+WORDS = [b"short", b"password", b"x" * 63, b"y" * 64, b"letmein!", b""]
+
+
+def write_wordlist(path, words=WORDS, compress=False, newline=b"\n"):
+    data = b"".join(w + newline for w in words)
+    if compress:
+        data = gzip.compress(data)
+    path.write_bytes(data)
+    return str(path)
+
+
+def numbered_words(count):
+    # Every third line is too short to be a candidate
+    words = []
+    for i in range(count):
+        words.append(b"word%06d" % i)
+        if i % 2:
+            words.append(b"no%d" % i)
+    return words
+
+
+class TestWordlistReader:
+    """Tests for WordlistReader."""
+
+    def test_length_filter(self, tmp_path):
+        """Test that only 8-63 byte candidates are yielded."""
+        with WordlistReader(write_wordlist(tmp_path / "w.txt")) as reader:
+            assert list(reader) == [b"password", b"x" * 63, b"letmein!"]
+            assert reader.lines == 6
+            assert reader.skipped == 3
+            assert reader.progress == 1.0
+
+    def test_gzip_and_crlf(self, tmp_path):
+        """Test gzip detection by content and CRLF line endings."""
+        path = write_wordlist(tmp_path / "w.lst", compress=True, newline=b"\r\n")
+        with WordlistReader(path) as reader:
+            assert list(reader) == [b"password", b"x" * 63, b"letmein!"]
+            assert reader.progress == 1.0
+
+    def test_stdin(self, monkeypatch):
+        """Test reading candidates from standard input."""
+        stdin = io.TextIOWrapper(io.BytesIO(b"password\nletmein!\n"))
+        monkeypatch.setattr(sys, "stdin", stdin)
+        with WordlistReader("-") as reader:
+            assert list(reader) == [b"password", b"letmein!"]
+            assert reader.size is None
+            assert reader.progress is None
+
+    def test_chunks(self, tmp_path):
+        """Test splitting candidates into fixed-size chunks."""
+        words = [b"password%02d" % i for i in range(10)]
+        with WordlistReader(write_wordlist(tmp_path / "w.txt", words)) as reader:
+            chunks = list(reader.chunks(4))
+        assert [len(c) for c in chunks] == [4, 4, 2]
+        assert chunks[2][-1] == b"password09"
+
+    def test_is_passphrase(self):
+        """Test the WPA passphrase length bounds."""
+        assert is_passphrase(b"x" * 8) and is_passphrase(b"x" * 63)
+        assert not is_passphrase(b"x" * 7) and not is_passphrase(b"x" * 64)
+
+
+class TestWordlistIndex:
+    """Tests for WordlistIndex."""
+
+    def test_locate(self, tmp_path):
+        """Test seeking to candidate numbers between index entries."""
+        path = write_wordlist(tmp_path / "w.txt", numbered_words(100))
+        index = WordlistIndex(path, step=16)
+        assert len(index) == 100
+        assert index.lines == 150
+        assert os.path.exists(path + ".widx")
+        with open(path, "rb") as f:
+            for number in (0, 1, 15, 16, 17, 99):
+                offset, line = index.locate(number)
+                f.seek(offset)
+                assert f.readline() == b"word%06d\n" % number
+                assert line == number + number // 2
+        assert index.locate(100) == (index.size, 150)
+
+    def test_sidecar_reused(self, tmp_path):
+        """Test that the sidecar is loaded again, not rebuilt."""
+        path = write_wordlist(tmp_path / "w.txt", numbered_words(50))
+        WordlistIndex(path, step=8)
+        with open(path + ".widx", "rb") as f:
+            before = f.read()
+        os.utime(path + ".widx", (0, 0))
+        index = WordlistIndex(path, step=99)
+        assert index.step == 8
+        assert os.stat(path + ".widx").st_mtime == 0
+        with open(path + ".widx", "rb") as f:
+            assert f.read() == before
+
+    def test_stale_sidecar_rebuilt(self, tmp_path):
+        """Test that a replaced wordlist of the same size is reindexed."""
+        path = write_wordlist(tmp_path / "w.txt", [b"password", b"letmein!"])
+        assert len(WordlistIndex(path)) == 2
+        write_wordlist(tmp_path / "w.txt", [b"password", b"short\nxx"])
+        assert len(WordlistIndex(path)) == 1
+
+    def test_gzip_rejected(self, tmp_path):
+        """Test that compressed wordlists cannot be indexed."""
+        path = write_wordlist(tmp_path / "w.gz", compress=True)
+        with pytest.raises(ValueError):
+            WordlistIndex(path)
+
+
+class TestWordlistReaderStart:
+    """Tests for WordlistReader starting at a candidate number."""
+
+    def test_plain_seeks_through_index(self, tmp_path):
+        """Test that a plain wordlist is read from the indexed offset."""
+        path = write_wordlist(tmp_path / "w.txt", numbered_words(40))
+        with WordlistReader(path, start=25) as reader:
+            assert reader.index is not None
+            assert next(iter(reader)) == b"word000025"
+            assert reader.position == 26
+            rest = list(reader)
+        assert len(rest) == 14
+        assert reader.lines == 60
+        assert reader.skipped == 20
+
+    def test_gzip_skips(self, tmp_path):
+        """Test that a gzip wordlist skips the candidates before start."""
+        path = write_wordlist(tmp_path / "w.gz", numbered_words(40), compress=True)
+        with WordlistReader(path, start=25) as reader:
+            assert reader.index is None
+            assert list(reader)[0] == b"word000025"
+            assert reader.position == 40
+
+    def test_start_past_end(self, tmp_path):
+        """Test that starting past the last candidate yields nothing."""
+        path = write_wordlist(tmp_path / "w.txt", numbered_words(5))
+        with WordlistReader(path, start=10) as reader:
+            assert list(reader) == []
+            assert reader.position == 5
+
+
+def write_packed(path, buckets):
+    with PackedWriter(str(path)) as writer:
+        for length, words in buckets:
+            writer.write(length, words)
+    return str(path)
+
+
+class TestPackedWordlist:
+    """Tests for packed wordlists."""
+
+    BUCKETS = [(8, [b"aaaaaaaa", b"password"]), (10, [b"0123456789"] * 3)]
+
+    def test_round_trip(self, tmp_path):
+        """Test that packed candidates are read back by WordlistReader."""
+        path = write_packed(tmp_path / "w.wpk", self.BUCKETS)
+        assert not os.path.exists(path + ".tmp")
+        with WordlistReader(path) as reader:
+            assert [b[:2] for b in reader.packed] == [(8, 2), (10, 3)]
+            assert list(reader) == [b"aaaaaaaa", b"password"] + [b"0123456789"] * 3
+            assert reader.lines == 5
+            assert reader.skipped == 0
+            assert reader.progress == 1.0
+
+    def test_start(self, tmp_path):
+        """Test seeking to a candidate number by bucket arithmetic."""
+        path = write_packed(tmp_path / "w.wpk", self.BUCKETS)
+        with WordlistReader(path, start=1) as reader:
+            assert next(iter(reader)) == b"password"
+            assert next(iter(reader)) == b"0123456789"
+            assert reader.position == 3
+        with WordlistReader(path, start=1) as reader:
+            assert list(reader.chunks(2)) == [
+                [b"password", b"0123456789"],
+                [b"0123456789", b"0123456789"],
+            ]
+        with WordlistReader(path, start=9) as reader:
+            assert list(reader) == []
+            assert reader.position == 5
+
+    def test_chunks_across_blocks(self, tmp_path):
+        """Test reading buckets larger than one block."""
+        words = [b"w%09d" % i for i in range(10000)]
+        path = write_packed(tmp_path / "w.wpk", [(10, words)])
+        with WordlistReader(path) as reader:
+            chunks = list(reader.chunks(3000))
+        assert [len(c) for c in chunks] == [3000, 3000, 3000, 1000]
+        assert chunks[-1][-1] == words[-1]
+
+    def test_writer_checks(self, tmp_path):
+        """Test that bad buckets are refused and abort removes the file."""
+        writer = PackedWriter(str(tmp_path / "w.wpk"))
+        writer.write(9, [b"123456789"])
+        with pytest.raises(ValueError):
+            writer.write(9, [])
+        with pytest.raises(ValueError):
+            writer.write(12, [b"short"])
+        with pytest.raises(ValueError):
+            writer.write(64, [])
+        writer.abort()
+        assert os.listdir(tmp_path) == []
+
+    def test_plain_file_not_packed(self, tmp_path):
+        """Test that plain wordlists have no packed directory."""
+        path = write_wordlist(tmp_path / "w.txt")
+        with open(path, "rb") as f:
+            assert packed_directory(f) is None
+        with WordlistReader(path) as reader:
+            assert reader.packed is None
@@ -0,0 +1,68 @@
+"""
+test_wpa.py
+-----------
+Unit tests for the wpa module (PMK derivation and MIC/PMKID checks).
+Tests cover the IEEE 802.11i PMK test vector, handshake and PMKID
+verification on synthetic captures, and unsupported key versions.
+"""
+
+import pytest
+from wlfwifi.handshake import Handshake, find_handshakes
+from wlfwifi.wpa import CrackMaterial, MicCheck, load_material, pmk
+from frames import AP, signed_handshake_packets, write_capture
+
+PASSPHRASE = b"correct horse"
+
+
+class TestPmk:
+    """Tests for PMK derivation."""
+
+    def test_ieee_vector(self):
+        """Test the IEEE 802.11i-2004 H.4 PBKDF2 test vector."""
+        assert pmk(b"password", b"IEEE").hex() == (
+            "f42c6fc52df0ebef9ebb4b90b38a5f902e83fe1b135a70e23aed762e9710a12e"
+        )
+
+
+class TestLoadMaterial:
+    """Tests for load_material and the checks it builds."""
+
+    def test_handshake(self, tmp_path):
+        """Test that the MIC check accepts only the right PMK."""
+        path = write_capture(tmp_path / "a.cap", signed_handshake_packets(PASSPHRASE))
+        material = load_material(path, AP.lower())
+        assert material.bssid == AP
+        assert material.essid == b"TestNet"
+        assert len(material.checks) == 1
+        assert material.verify(PASSPHRASE)
+        assert not material.verify(b"wrong horse")
+        assert material.matches(pmk(PASSPHRASE, b"TestNet"))
+        assert not material.matches(pmk(PASSPHRASE, b"OtherNet"))
+
+    def test_pmkid(self, tmp_path):
+        """Test that a PMKID alone is enough to verify a passphrase."""
+        packets = signed_handshake_packets(PASSPHRASE, pmkid=True)[:2]
+        path = write_capture(tmp_path / "a.cap", packets)
+        material = load_material(path, AP)
+        assert [type(c).__name__ for c in material.checks] == ["PmkidCheck"]
+        assert material.verify(PASSPHRASE)
+        assert not material.verify(b"wrong horse")
+
+    def test_no_essid(self, tmp_path):
+        """Test that nothing verifies without the ESSID."""
+        path = write_capture(
+            tmp_path / "a.cap", signed_handshake_packets(PASSPHRASE)[1:]
+        )
+        material = load_material(path, AP)
+        assert material.essid is None
+        assert not material.verify(PASSPHRASE)
+        assert not CrackMaterial(AP, b"TestNet", []).verify(PASSPHRASE)
+
+    def test_unsupported_key_version(self, tmp_path):
+        """Test that AES-CMAC handshakes are refused."""
+        path = write_capture(tmp_path / "a.cap", signed_handshake_packets(PASSPHRASE))
+        handshake = find_handshakes(path)[0]
+        assert isinstance(handshake, Handshake)
+        handshake.key_version = 3
+        with pytest.raises(ValueError):
+            MicCheck(handshake)
@@ -0,0 +1,282 @@
+"""
+test_wps.py
+-----------
+Unit tests for the wps module (reaver output parsing and pacing).
+Tests cover turning reaver lines into events, attempts/sec and ETA,
+back-off after lockouts and timeouts, and saving and resuming the PIN
+halves ruled out per AP.
+"""
+
+import os
+from wlfwifi.wps import (
+    EVENT_FAILURE,
+    EVENT_MESSAGE,
+    EVENT_NACK,
+    EVENT_PIN,
+    EVENT_PROGRESS,
+    EVENT_PSK,
+    EVENT_RATE_LIMIT,
+    EVENT_TIMEOUT,
+    EVENT_WPS_PIN,
+    ReaverParser,
+    WpsBackoff,
+    WpsCheckpoint,
+    WpsEvent,
+    WpsState,
+    WpsStats,
+)
+
+REAVER_OUTPUT = """\
+[+] Switching wlan0mon to channel 6
+[+] Waiting for beacon from 00:11:22:33:44:55
+[+] Trying pin "12345670"
+[+] Sending EAPOL START request
+[+] Received M1 message
+[+] Sending M2 message
+[+] Received M3 message
+[!] WARNING: Receive timeout occurred
+[+] Received WSC NACK
+[+] 0.05% complete @ 2026-01-01 10:00:00 (4 seconds/pin)
+[!] WARNING: Detected AP rate limiting, waiting 60 seconds before re-checking
+[!] WARNING: 10 failed connections in a row
+[+] Trying pin "00005678"
+[+] Received M5 message
+[+] WPS PIN: '00005678'
+[+] WPA PSK: 'correct horse'
+[+] AP SSID: 'TestNet'
+"""
+
+
+def event(kind, value=None):
+    return WpsEvent(kind, value, None, "")
+
+
+def feed(state, lines):
+    parser = ReaverParser()
+    changed = []
+    for line in lines:
+        e = parser.feed(line)
+        if e is not None:
+            changed.append(state.record(e))
+    return changed
+
+
+FIRST_HALF_REJECTED = [
+    '[+] Trying pin "12345670"',
+    "[+] Received M1 message",
+    "[+] Received M3 message",
+    "[+] Sending M4 message",
+    "[+] Received WSC NACK",
+]
+
+
+class TestReaverParser:
+    """Tests for ReaverParser."""
+
+    def test_events(self):
+        """Test that every line of interest becomes one event."""
+        parser = ReaverParser()
+        events = [parser.feed(line) for line in REAVER_OUTPUT.splitlines(True)]
+        events = [(e.kind, e.value, e.pin) for e in events if e is not None]
+        assert events == [
+            (EVENT_PIN, "12345670", "12345670"),
+            (EVENT_MESSAGE, "M1", "12345670"),
+            (EVENT_MESSAGE, "M3", "12345670"),
+            (EVENT_TIMEOUT, "M3", "12345670"),
+            (EVENT_NACK, "M3", "12345670"),
+            (EVENT_PROGRESS, "0.05", "12345670"),
+            (EVENT_RATE_LIMIT, None, "12345670"),
+            (EVENT_FAILURE, "10", "12345670"),
+            (EVENT_PIN, "00005678", "00005678"),
+            (EVENT_MESSAGE, "M5", "00005678"),
+            (EVENT_WPS_PIN, "00005678", "00005678"),
+            (EVENT_PSK, "correct horse", "00005678"),
+        ]
+
+    def test_timeout_before_any_message(self):
+        """Test that a timeout right after a new PIN has no last message."""
+        parser = ReaverParser()
+        parser.feed("[+] Received M3 message\n")
+        parser.feed('[+] Trying pin "11112222"\n')
+        timeout = parser.feed("[!] WARNING: Receive timeout occurred\n")
+        assert timeout.value is None
+        assert timeout.line == "[!] WARNING: Receive timeout occurred"
+
+
+class TestWpsStats:
+    """Tests for WpsStats."""
+
+    def test_counters(self):
+        """Test that events update the counters."""
+        stats = WpsStats()
+        parser = ReaverParser()
+        for line in REAVER_OUTPUT.splitlines():
+            e = parser.feed(line)
+            if e is not None:
+                stats.record(e)
+        assert stats.pins == 2
+        assert stats.timeouts == 1
+        assert stats.failures == 1
+        assert stats.rate_limits == 1
+        assert stats.progress == 0.0005
+
+    def test_retried_pin_counted_once(self):
+        """Test that reaver retrying a PIN after a timeout is one attempt."""
+        stats = WpsStats()
+        state = WpsState("00:11:22:33:44:55")
+        parser = ReaverParser()
+        lines = [
+            '[+] Trying pin "12345670"',
+            "[!] WARNING: Receive timeout occurred",
+            '[+] Trying pin "12345670"',
+            "[+] Received WSC NACK",
+            '[+] Trying pin "12345670"',
+            '[+] Trying pin "00005678"',
+        ]
+        events = [parser.feed(line) for line in lines]
+        for e in events:
+            stats.record(e)
+            state.record(e)
+        assert [e.repeat for e in events if e.kind == EVENT_PIN] == [
+            False,
+            True,
+            True,
+            False,
+        ]
+        assert stats.pins == 2
+        assert state.pins == 2
+
+    def test_rate_and_eta(self):
+        """Test attempts/sec and the ETA from progress or PIN count."""
+        stats = WpsStats()
+        assert stats.eta is None
+        stats.pins = 100
+        stats.elapsed = 50.0
+        assert stats.attempts_per_sec == 2.0
+        assert stats.eta == (11000 - 100) / 2.0
+        stats.progress = 0.5
+        assert stats.eta == 5500 / 2.0
+        assert "50.00% done" in stats.summary()
+
+
+class TestWpsBackoff:
+    """Tests for WpsBackoff."""
+
+    def test_lockouts_double(self):
+        """Test that lockouts in a row double the pause up to the maximum."""
+        backoff = WpsBackoff(base_delay=60, max_delay=200)
+        delays = [backoff.delay(event(EVENT_RATE_LIMIT)) for _ in range(3)]
+        assert delays == [60, 120, 200]
+        assert backoff.delay(event(EVENT_MESSAGE, "M1")) == 0
+        assert backoff.delay(event(EVENT_RATE_LIMIT)) == 60
+
+    def test_timeouts_in_a_row(self):
+        """Test that only repeated timeouts cause a pause."""
+        backoff = WpsBackoff(timeout_limit=3, timeout_delay=30)
+        assert backoff.delay(event(EVENT_TIMEOUT)) == 0
+        assert backoff.delay(event(EVENT_FAILURE, "10")) == 0
+        assert backoff.delay(event(EVENT_TIMEOUT)) == 30
+        assert backoff.delay(event(EVENT_TIMEOUT)) == 0
+        backoff.delay(event(EVENT_TIMEOUT))
+        backoff.delay(event(EVENT_MESSAGE, "M1"))
+        assert backoff.delay(event(EVENT_TIMEOUT)) == 0
+        assert backoff.delay(event(EVENT_PIN, "12345670")) == 0
+
+
+class TestWpsState:
+    """Tests for WpsState."""
+
+    def test_halves_ruled_out(self):
+        """Test that NACKs after M4 and M6 rule out the matching half."""
+        state = WpsState("00:11:22:33:44:55")
+        assert any(feed(state, FIRST_HALF_REJECTED))
+        assert state.tried_first == {"1234"}
+        assert state.position == 1
+        feed(
+            state,
+            [
+                '[+] Trying pin "56785670"',
+                "[+] Received M3 message",
+                "[+] Received M5 message",
+                "[+] Received WSC NACK",
+            ],
+        )
+        assert state.first_half == "5678"
+        assert state.tried_second == {"567"}
+        assert state.position == 10001
+        assert state.pins == 2
+
+    def test_timeouts_rule_out_nothing(self):
+        """Test that an attempt without a NACK is not counted as tried."""
+        state = WpsState("00:11:22:33:44:55")
+        changed = feed(
+            state,
+            [
+                '[+] Trying pin "12345670"',
+                "[+] Received M3 message",
+                "[!] WARNING: Receive timeout occurred",
+            ],
+        )
+        assert not any(changed)
+        assert state.position == 0
+
+    def test_lockouts(self):
+        """Test that lockouts are recorded with their time."""
+        state = WpsState("00:11:22:33:44:55")
+        assert feed(state, ["[!] WARNING: Detected AP rate limiting"]) == [True]
+        assert state.lockouts_since(0) == 1
+        assert state.lockouts_since(state.lockouts[0] + 1) == 0
+
+    def test_session_tries_untried_first(self):
+        """Test that the session file lists ruled-out halves last."""
+        state = WpsState("00:11:22:33:44:55")
+        state.tried_first = {"0000", "0001"}
+        lines = state.session().splitlines()
+        assert lines[:3] == ["0", "0", "0"]
+        first, second = lines[3:10003], lines[10003:]
+        assert first[0] == "0002"
+        assert first[-2:] == ["0000", "0001"]
+        assert len(second) == 1000
+        state.first_half = "4321"
+        state.tried_second = {"000"}
+        lines = state.session().splitlines()
+        assert lines[2] == "1"
+        assert lines[3] == "4321"
+        assert lines[10003] == "001"
+        assert lines[-1] == "000"
+
+
+class TestWpsCheckpoint:
+    """Tests for WpsCheckpoint."""
+
+    def test_save_and_load(self, tmp_path):
+        """Test that a saved state is restored per BSSID."""
+        checkpoint = WpsCheckpoint(str(tmp_path / "wps"))
+        state = WpsState("00:11:22:33:44:55")
+        feed(state, FIRST_HALF_REJECTED)
+        state.elapsed = 12.5
+        checkpoint.save(state)
+        restored = checkpoint.load("00:11:22:33:44:55".lower())
+        assert restored.tried_first == {"1234"}
+        assert restored.pins == 1
+        assert restored.elapsed == 12.5
+        assert checkpoint.load("66:77:88:99:AA:BB").position == 0
+        assert not os.path.exists(checkpoint.path(state.bssid) + ".tmp")
+
+    def test_unreadable_state(self, tmp_path):
+        """Test that a corrupt file gives a fresh state."""
+        checkpoint = WpsCheckpoint(str(tmp_path))
+        with open(checkpoint.path("00:11:22:33:44:55"), "w") as f:
+            f.write("{not json")
+        assert checkpoint.load("00:11:22:33:44:55").position == 0
+
+    def test_clear(self, tmp_path):
+        """Test that clearing removes the state and session files."""
+        checkpoint = WpsCheckpoint(str(tmp_path))
+        state = WpsState("00:11:22:33:44:55")
+        checkpoint.save(state)
+        session = checkpoint.write_session(state)
+        checkpoint.clear(state.bssid)
+        checkpoint.clear(state.bssid)
+        assert not os.path.exists(session)
+        assert not os.path.exists(checkpoint.path(state.bssid))
@@ -11,11 +11,33 @@ Package Structure
 - core: Main engine and workflow orchestration
 - models: Data classes (Target, Client, CapFile)
 - attacks: Attack implementations and WPS checking
+- capture: Native pcap/pcapng reading and 802.11 header decoding
+- handshake: Streaming WPA 4-way handshake detection
+- index: Sidecar frame index for random access into large captures
+- merge: Timestamp-ordered merging of several captures into one
+- split: Per-BSSID minimal captures (beacon + EAPOL) from full dumps
+- ring: Rotating capture segments that keep handshakes and PMKIDs
+- views: Zero-copy, lazily decoded frame views over mmapped captures
+- analytics: Bulk header decoding into NumPy arrays (optional NumPy)
+- decloak: Hidden ESSID discovery from probe and association frames
+- wep: Unique WEP IV counting per BSSID with crack thresholds
+- dedup: Retransmission filtering by per-transmitter sequence numbers
+- activity: Rolling per-client traffic counters and most-active queries
+- wordlist: Streaming plain/gzip/stdin wordlists and their offset index
+- crack: Wordlist attacks dispatched to a pool of cracker processes
+- compact: Deduplicated, length-bucketed packed wordlists
+- wpa: PMK derivation and handshake MIC / PMKID verification
+- pmk: SQLite cache of PMKs per ESSID and their precomputation
+- verify: In-process passphrase verification over shared memory chunks
+- results: Store of cracked networks with key, method and time to crack
+- wps: reaver output events, rate/ETA, lockout back-off and PIN checkpoints
+- scheduler: Concurrent attack lifecycles with timeouts and cancellation
+- plugins: Registry of built-in and entry point attacks, imported lazily
 - utils: Utility functions for file ops, MAC handling, etc.
 
 Quick Start
 -----------
-    from wlfwifi.core import main
+    from wlfwifi.core import main, TargetQueue
     main()
 
 Or run from command line:
@@ -35,8 +57,12 @@ config
 core
     Core engine logic and main entry point.
     
+    Classes:
+        TargetQueue - Priority queue of targets with pluggable scoring
+
     Functions:
         main() - Entry point for wlfwifi
+        make_scorer() - Build a weighted target scoring function
 
 models
     Data models for wireless targets and captures.
@@ -55,6 +81,25 @@ attacks
     Functions:
         wps_check_targets() - Check targets for WPS support
 
+capture
+    Native pcap/pcapng reading and 802.11 header decoding.
+
+    Classes:
+        CaptureReader - Incremental reader that can follow a growing capture
+        Frame - A captured packet
+        Dot11Frame - Decoded 802.11 header
+
+handshake
+    Streaming WPA 4-way handshake detection.
+
+    Classes:
+        HandshakeDetector - Pairs EAPOL messages per (AP, station)
+        Handshake - A crackable message pair
+
+    Functions:
+        find_handshakes() - All handshakes in a capture file
+        wait_for_handshake() - Tail a capture until a handshake appears
+
 utils
     Utility functions used throughout wlfwifi.
     
@@ -88,16 +133,41 @@ __version__ = "1.0.0"
 __author__ = "derv82, ballastsec, Mike, and contributors"
 __license__ = "GPL-2.0"
 
-# Expose main entry point
-from wlfwifi.core import main
+import importlib
+from typing import Any
+
+# Names exposed for convenient imports, by the module defining them. They
+# are imported on first access, so importing a submodule such as
+# wlfwifi.plugins does not load the engine and every attack with it.
+_EXPORTS = {
+    "main": "wlfwifi.core",
+    "TargetQueue": "wlfwifi.core",
+    "Target": "wlfwifi.models",
+    "Client": "wlfwifi.models",
+    "CapFile": "wlfwifi.models",
+    "RunConfig": "wlfwifi.config",
+    "parse_args": "wlfwifi.config",
+    "Attack": "wlfwifi.attacks",
+    "wps_check_targets": "wlfwifi.attacks",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(_EXPORTS))
 
-# Expose key classes for convenient imports
-from wlfwifi.models import Target, Client, CapFile
-from wlfwifi.config import RunConfig, parse_args
-from wlfwifi.attacks import Attack, wps_check_targets
 
 __all__ = [
     "main",
+    "TargetQueue",
     "Target",
     "Client", 
     "CapFile",
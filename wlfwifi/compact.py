@@ -0,0 +1,206 @@
+"""
+compact.py
+----------
+Compaction of wordlists into deduplicated packed wordlists.
+
+Merged wordlists repeat the same words many times and hold lines that can
+never be WPA passphrases. compact_wordlist() reads any number of plain,
+gzip or stdin wordlists, drops lines outside 8-63 bytes and removes
+duplicates with an external merge sort: candidates are collected per length
+up to a memory budget, each batch is deduplicated, sorted and spilled as a
+packed run file, and the runs are then merged length by length, at most
+"fan_in" files at a time. Memory use depends on the budget, not on the size
+of the input. The output is a packed wordlist (see wordlist.py) that
+WordlistReader reads without splitting lines. Candidates come out sorted
+by length, then bytes, not in their input order.
+
+Functions and Classes:
+    CompactStats: Counters for a compact_wordlist() run.
+    compact_wordlist: Deduplicates wordlists into a packed wordlist.
+"""
+
+import os
+import time
+import heapq
+import logging
+import itertools
+import tempfile
+from contextlib import ExitStack
+from typing import Dict, Iterable, Iterator, List, Optional
+from wlfwifi.wordlist import (
+    MAX_PASSPHRASE,
+    MIN_PASSPHRASE,
+    PACKED_SUFFIX,
+    PackedWriter,
+    WordlistReader,
+    packed_directory,
+    packed_records,
+)
+
+# Default memory budget for candidates held before a run is spilled
+DEFAULT_MEMORY = 256 * 1024 * 1024
+# Run files merged at once
+DEFAULT_FAN_IN = 64
+
+# Approximate memory taken by one candidate besides its bytes: the bytes
+# object header and its list and set slots
+_CANDIDATE_OVERHEAD = 96
+
+
+class CompactStats:
+    """
+    Counters for a compact_wordlist() run.
+    Attributes:
+            inputs (int): Wordlists read.
+            lines (int): Lines read across all inputs.
+            skipped (int): Lines dropped for their length.
+            candidates (int): Valid candidates read, duplicates included.
+            written (int): Unique candidates written to the output.
+            runs (int): Sorted runs spilled to disk.
+            bytes_written (int): Size of the output file.
+            elapsed (float): Wall-clock seconds spent.
+    """
+
+    inputs: int
+    lines: int
+    skipped: int
+    candidates: int
+    written: int
+    runs: int
+    bytes_written: int
+    elapsed: float
+
+    def __init__(self) -> None:
+        self.inputs = 0
+        self.lines = 0
+        self.skipped = 0
+        self.candidates = 0
+        self.written = 0
+        self.runs = 0
+        self.bytes_written = 0
+        self.elapsed = 0.0
+
+    @property
+    def duplicates(self) -> int:
+        return self.candidates - self.written
+
+    @property
+    def lines_per_sec(self) -> float:
+        return self.lines / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.inputs} inputs, {self.lines} lines "
+            f"({self.lines_per_sec:.0f}/s), {self.skipped} invalid, "
+            f"{self.duplicates} duplicates, {self.written} written "
+            f"({self.bytes_written} bytes, {self.runs} runs)"
+        )
+
+
+def _unique(candidates: Iterable[bytes]) -> Iterator[bytes]:
+    # Drops repeats from a sorted stream
+    previous = None
+    for candidate in candidates:
+        if candidate != previous:
+            yield candidate
+            previous = candidate
+
+
+def _spill(buckets: Dict[int, List[bytes]], path: str) -> None:
+    with PackedWriter(path) as writer:
+        for length in sorted(buckets):
+            writer.write(length, sorted(set(buckets[length])))
+    buckets.clear()
+
+
+def _merge(runs: List[str], output: str) -> None:
+    with ExitStack() as stack:
+        files = [stack.enter_context(open(run, "rb")) for run in runs]
+        directories = [{b[0]: b for b in packed_directory(f) or ()} for f in files]
+        with PackedWriter(output) as writer:
+            for length in range(MIN_PASSPHRASE, MAX_PASSPHRASE + 1):
+                sources = [
+                    packed_records(f, directory[length])
+                    for f, directory in zip(files, directories)
+                    if length in directory
+                ]
+                if sources:
+                    writer.write(length, _unique(heapq.merge(*sources)))
+
+
+def compact_wordlist(
+    paths: Iterable[str],
+    output: str,
+    memory: int = DEFAULT_MEMORY,
+    tmp_dir: Optional[str] = None,
+    fan_in: int = DEFAULT_FAN_IN,
+) -> CompactStats:
+    """
+    Writes the unique valid candidates of "paths" to the packed wordlist
+    "output".
+    Args:
+            paths: Plain or gzip wordlists, "-" for stdin.
+            output: File to write.
+            memory: Approximate bytes of candidates held before spilling.
+            tmp_dir: Directory for run files (system default if None).
+            fan_in: Run files merged at once, at least 2.
+    Returns:
+            CompactStats: Counters of the run.
+    """
+    paths = list(paths)
+    stats = CompactStats()
+    stats.inputs = len(paths)
+    fan_in = max(2, fan_in)
+    started = time.monotonic()
+    buckets: Dict[int, List[bytes]] = {}
+    held = 0
+    runs: List[str] = []
+    numbers = itertools.count()
+    with tempfile.TemporaryDirectory(prefix="wlfwifi-compact-", dir=tmp_dir) as work:
+
+        def run_path() -> str:
+            return os.path.join(work, f"run{next(numbers):06d}{PACKED_SUFFIX}")
+
+        for path in paths:
+            with WordlistReader(path) as reader:
+                for candidate in reader:
+                    bucket = buckets.get(len(candidate))
+                    if bucket is None:
+                        bucket = buckets[len(candidate)] = []
+                    bucket.append(candidate)
+                    held += len(candidate) + _CANDIDATE_OVERHEAD
+                    if held >= memory:
+                        stats.runs += 1
+                        runs.append(run_path())
+                        _spill(buckets, runs[-1])
+                        held = 0
+                stats.lines += reader.lines
+                stats.skipped += reader.skipped
+                stats.candidates += reader.position
+        if not runs:
+            # Everything fit in memory: no run files needed
+            _spill(buckets, output)
+        else:
+            if buckets:
+                stats.runs += 1
+                runs.append(run_path())
+                _spill(buckets, runs[-1])
+            while len(runs) > fan_in:
+                merged = []
+                for i in range(0, len(runs), fan_in):
+                    group = runs[i : i + fan_in]
+                    if len(group) == 1:
+                        merged.append(group[0])
+                        continue
+                    merged.append(run_path())
+                    _merge(group, merged[-1])
+                    for run in group:
+                        os.remove(run)
+                runs = merged
+            _merge(runs, output)
+    with open(output, "rb") as f:
+        stats.written = sum(b[1] for b in packed_directory(f) or ())
+    stats.bytes_written = os.path.getsize(output)
+    stats.elapsed = time.monotonic() - started
+    logging.info(f"[compact_wordlist] {output}: {stats.summary()}")
+    return stats
@@ -10,7 +10,7 @@ Functions and Classes:
 
 import argparse
 import logging
-from typing import Optional
+from typing import Any, Dict, Optional
 
 
 class RunConfig:
@@ -21,12 +21,16 @@ class RunConfig:
     interface: Optional[str]
     channel: Optional[int]
     verbose: bool
+    command: Optional[str]
+    options: Dict[str, Any]
 
     def __init__(
         self,
         interface: Optional[str] = None,
         channel: Optional[int] = None,
         verbose: bool = False,
+        command: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
     ) -> None:
         if interface is not None and not isinstance(interface, str):
             logging.error("interface must be a string or None")
@@ -37,6 +41,8 @@ class RunConfig:
         self.interface = interface
         self.channel = channel
         self.verbose = verbose
+        self.command = command
+        self.options = options if options is not None else {}
 
 
 def parse_args() -> RunConfig:
@@ -51,10 +57,205 @@ def parse_args() -> RunConfig:
     parser.add_argument(
         "-v", "--verbose", action="store_true", help="Enable verbose output"
     )
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    export = commands.add_parser(
+        "export", help="Convert captures to a hashcat 22000 hash file"
+    )
+    export.add_argument("captures", nargs="+", help="pcap/pcapng files to convert")
+    export.add_argument(
+        "-o", "--output", required=True, help="Hash file to write (.hc22000)"
+    )
+    export.add_argument(
+        "-j", "--jobs", type=int, help="Worker processes (default: CPU count)"
+    )
+    merge = commands.add_parser(
+        "merge", help="Merge captures into one file ordered by timestamp"
+    )
+    merge.add_argument("captures", nargs="+", help="pcap/pcapng files to merge")
+    merge.add_argument(
+        "-o", "--output", required=True, help="Capture to write (.cap/.pcapng)"
+    )
+    merge.add_argument(
+        "-w",
+        "--window",
+        type=float,
+        default=0.05,
+        help="Seconds within which a frame seen again is a duplicate",
+    )
+    merge.add_argument(
+        "--keep-duplicates",
+        action="store_true",
+        help="Write frames captured by several cards more than once",
+    )
+    split = commands.add_parser(
+        "split", help="Split a capture into minimal per-BSSID captures"
+    )
+    split.add_argument("capture", help="pcap/pcapng file to split")
+    split.add_argument(
+        "-o", "--output-dir", required=True, help="Directory for the captures"
+    )
+    split.add_argument(
+        "-b",
+        "--bssid",
+        action="append",
+        dest="bssids",
+        help="Only keep this BSSID (repeatable)",
+    )
+    split.add_argument(
+        "--max-open", type=int, default=128, help="Output files kept open at once"
+    )
+    split.add_argument(
+        "--all",
+        action="store_true",
+        dest="keep_all",
+        help="Also write BSSIDs without any EAPOL frame",
+    )
+    split.add_argument(
+        "--keep-retries",
+        action="store_true",
+        help="Also write retransmitted frames",
+    )
+    ring = commands.add_parser(
+        "ring", help="Copy a capture stream into rotating pcapng segments"
+    )
+    ring.add_argument(
+        "source", help="Capture to read, e.g. /dev/stdin fed by 'tcpdump -w -'"
+    )
+    ring.add_argument(
+        "-d", "--directory", required=True, help="Directory for the segments"
+    )
+    ring.add_argument("--prefix", default="ring", help="Segment file name prefix")
+    ring.add_argument(
+        "--segment-mb", type=int, default=64, help="Size cap of one segment (MB)"
+    )
+    ring.add_argument(
+        "--segment-seconds",
+        type=float,
+        default=600.0,
+        help="Capture time cap of one segment",
+    )
+    ring.add_argument(
+        "--max-segments",
+        type=int,
+        default=16,
+        help="Segments without handshakes kept on disk",
+    )
+    ring.add_argument(
+        "--follow", action="store_true", help="Keep reading a growing file"
+    )
+    crack = commands.add_parser(
+        "crack", help="Crack a captured WPA handshake with a wordlist"
+    )
+    crack.add_argument("capture", help="pcap/pcapng file holding the handshake")
+    crack.add_argument(
+        "-w",
+        "--wordlist",
+        required=True,
+        help="Plain or gzip wordlist, - for stdin",
+    )
+    crack.add_argument("-b", "--bssid", required=True, help="Access point to crack")
+    crack.add_argument(
+        "-j", "--jobs", type=int, help="Worker processes (default: CPU count)"
+    )
+    crack.add_argument(
+        "--chunk-size",
+        type=int,
+        default=20000,
+        help="Candidates handed to a worker at once",
+    )
+    crack.add_argument(
+        "--skip",
+        type=int,
+        metavar="N",
+        help="Start at candidate N instead of the saved position",
+    )
+    crack.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="Ignore the saved position and start from the beginning",
+    )
+    crack.add_argument(
+        "--pmk-cache", help="Try the PMKs cached for the ESSID in this database first"
+    )
+    crack.add_argument(
+        "--engine",
+        choices=("aircrack", "native"),
+        default="aircrack",
+        help="Run aircrack-ng, or verify candidates in-process (default: aircrack)",
+    )
+    crack.add_argument(
+        "-k",
+        "--key",
+        dest="keys",
+        action="append",
+        metavar="KEY",
+        help="Known or default key to verify before the wordlist (repeatable)",
+    )
+    crack.add_argument(
+        "--results", help="Record the key in this database and reuse stored keys"
+    )
+    wordlist = commands.add_parser("wordlist", help="Prepare wordlists for cracking")
+    actions = wordlist.add_subparsers(dest="action", metavar="ACTION")
+    actions.required = True
+    compact = actions.add_parser(
+        "compact", help="Deduplicate wordlists into a packed wordlist"
+    )
+    compact.add_argument(
+        "inputs", nargs="+", help="Plain or gzip wordlists, - for stdin"
+    )
+    compact.add_argument("-o", "--output", required=True, help="Packed file to write")
+    compact.add_argument(
+        "--memory",
+        type=int,
+        default=256,
+        metavar="MB",
+        help="Memory for sorting before spilling to temporary files",
+    )
+    compact.add_argument("--tmp-dir", help="Directory for temporary sort runs")
+    pmk = commands.add_parser("pmk", help="Manage the PMK cache")
+    pmk_actions = pmk.add_subparsers(dest="action", metavar="ACTION")
+    pmk_actions.required = True
+    precompute = pmk_actions.add_parser(
+        "precompute", help="Derive and cache the PMKs of a wordlist for an ESSID"
+    )
+    precompute.add_argument("-e", "--essid", required=True, help="Network name")
+    precompute.add_argument(
+        "-w", "--wordlist", required=True, help="Plain, gzip or packed wordlist"
+    )
+    precompute.add_argument("-c", "--cache", required=True, help="PMK database")
+    precompute.add_argument(
+        "-j", "--jobs", type=int, help="Worker processes (default: CPU count)"
+    )
+    precompute.add_argument(
+        "--chunk-size",
+        type=int,
+        default=20000,
+        help="Candidates handed to a worker at once",
+    )
+    results = commands.add_parser("results", help="List the networks cracked so far")
+    results.add_argument("database", help="Results database written by crack")
+    attacks = commands.add_parser(
+        "attacks", help="List the built-in and plugin attacks"
+    )
+    attacks.add_argument(
+        "--no-plugins",
+        dest="plugins",
+        action="store_false",
+        help="Only list the built-in attacks",
+    )
     try:
         args = parser.parse_args()
+        options = {
+            k: v
+            for k, v in vars(args).items()
+            if k not in ("interface", "channel", "verbose", "command")
+        }
         return RunConfig(
-            interface=args.interface, channel=args.channel, verbose=args.verbose
+            interface=args.interface,
+            channel=args.channel,
+            verbose=args.verbose,
+            command=args.command,
+            options=options,
         )
     except Exception as e:
         logging.error(f"[parse_args] Error parsing arguments: {e}")
@@ -5,11 +5,716 @@ Implements the core engine logic for wlfwifi, including the main attack loop and
 
 Functions and Classes:
         main: Entry point for running the attack engine.
+        run_command: Runs an offline subcommand (e.g. export).
         AttackEngine: Coordinates scanning, selection, and attack execution.
+        TargetQueue: Priority queue of targets ordered by attack yield.
+        make_scorer: Builds a weighted target scoring function.
+        default_score: Default scoring function used by TargetQueue.
+        ChannelCapture: One airodump-ng capture shared by co-channel targets.
+        SessionStats: Channel switch and setup overhead counters for a session.
+        batch_by_channel: Groups targets by channel, preserving priority.
 """
 
+import os
+import glob
+import math
+import time
 import logging
+import shutil
+import tempfile
+import itertools
+from subprocess import Popen, TimeoutExpired
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
 from .config import parse_args, RunConfig
+from .models import Target
+from .attacks import Attack
+from .decloak import EssidMap
+from .results import CrackResult, ResultStore
+from .utils import run_airodump, send_interrupt
+
+ScoreFunction = Callable[[Target], float]
+
+# Relative weight of each scoring component used by default_score().
+DEFAULT_SCORE_WEIGHTS: Dict[str, float] = {
+    "signal": 3.0,
+    "clients": 2.0,
+    "activity": 2.0,
+    "wps": 1.5,
+    "encryption": 2.5,
+}
+
+# Ease of attack per encryption type, 1.0 being the easiest.
+ENCRYPTION_SCORES: Dict[str, float] = {
+    "WEP": 1.0,
+    "WPA": 0.6,
+    "WPA2": 0.5,
+    "WPA3": 0.1,
+    "OPN": 0.0,
+}
+
+# Directory the captures of successful attacks are kept in
+DEFAULT_OUTPUT_DIR = "captures"
+
+# Seconds after which client activity counts for ~37% (1/e) of a fresh one.
+ACTIVITY_DECAY = 60.0
+
+
+def make_scorer(
+    weights: Optional[Dict[str, float]] = None, decay: float = ACTIVITY_DECAY
+) -> ScoreFunction:
+    """
+    Builds a scoring function from per-component weights.
+    Each component is normalized to [0, 1] before weighting; the weighted sum
+    is then divided by (1 + target.attempts) so that retried targets sink.
+    Args:
+            weights (dict): Overrides for DEFAULT_SCORE_WEIGHTS.
+            decay (float): Client activity decay constant in seconds.
+    Returns:
+            ScoreFunction: Callable mapping a Target to its score.
+    """
+    w = dict(DEFAULT_SCORE_WEIGHTS)
+    if weights:
+        w.update(weights)
+
+    def score(target: Target) -> float:
+        # airodump reports -1 (or 0) when the signal is unknown
+        signal = 0.0
+        if target.power < -1:
+            signal = min(max((target.power + 100) / 70.0, 0.0), 1.0)
+        clients = min(target.clients, 5) / 5.0
+        activity = 0.0
+        if target.last_client_seen > 0:
+            age = max(time.time() - target.last_client_seen, 0.0)
+            activity = math.exp(-age / decay)
+        wps = 1.0 if target.wps and not target.wps_locked else 0.0
+        # Longest matching prefix, so "WPA3-SAE" scores as WPA3, not WPA
+        enc = target.encryption.upper()
+        matches = [name for name in ENCRYPTION_SCORES if enc.startswith(name)]
+        encryption = ENCRYPTION_SCORES[max(matches, key=len)] if matches else 0.0
+        total = (
+            w["signal"] * signal
+            + w["clients"] * clients
+            + w["activity"] * activity
+            + w["wps"] * wps
+            + w["encryption"] * encryption
+        )
+        return total / (1 + max(target.attempts, 0))
+
+    return score
+
+
+default_score: ScoreFunction = make_scorer()
+
+
+class TargetQueue:
+    """
+    Max-priority queue of targets keyed by BSSID.
+    Backed by an indexed binary heap so a score change moves the target in
+    O(log n) instead of re-sorting the whole queue. Targets with equal
+    scores are popped in insertion order.
+    Attributes:
+            scorer (ScoreFunction): Function used to score targets.
+    """
+
+    scorer: ScoreFunction
+
+    def __init__(self, scorer: Optional[ScoreFunction] = None) -> None:
+        self.scorer = scorer or default_score
+        # Entries are [-score, seq, target]; lists so scores update in place.
+        self._heap: List[list] = []
+        self._index: Dict[str, int] = {}
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, bssid: object) -> bool:
+        return isinstance(bssid, str) and bssid.upper() in self._index
+
+    def __iter__(self) -> Iterator[Target]:
+        """Iterates targets from highest to lowest score without popping."""
+        for entry in sorted(self._heap, key=lambda e: (e[0], e[1])):
+            yield entry[2]
+
+    def push(self, target: Target, score: Optional[float] = None) -> None:
+        """
+        Adds a target, or rescores it if its BSSID is already queued.
+        """
+        key = target.bssid.upper()
+        if key in self._index:
+            self.update(target, score)
+            return
+        if score is None:
+            score = self.scorer(target)
+        self._heap.append([-score, next(self._counter), target])
+        self._index[key] = len(self._heap) - 1
+        self._sift_up(len(self._heap) - 1)
+
+    def update(self, target: Target, score: Optional[float] = None) -> None:
+        """
+        Rescores a queued target in place (decrease/increase-key).
+        Raises:
+                KeyError: If the target is not queued.
+        """
+        pos = self._index[target.bssid.upper()]
+        if score is None:
+            score = self.scorer(target)
+        entry = self._heap[pos]
+        old = entry[0]
+        entry[0] = -score
+        entry[2] = target
+        if entry[0] < old:
+            self._sift_up(pos)
+        elif entry[0] > old:
+            self._sift_down(pos)
+
+    def pop(self) -> Target:
+        """
+        Removes and returns the highest scoring target.
+        Raises:
+                IndexError: If the queue is empty.
+        """
+        if not self._heap:
+            raise IndexError("pop from an empty TargetQueue")
+        return self._remove_at(0)
+
+    def peek(self) -> Optional[Target]:
+        """Returns the highest scoring target without removing it."""
+        return self._heap[0][2] if self._heap else None
+
+    def remove(self, bssid: str) -> Optional[Target]:
+        """Removes a target by BSSID; returns None if it is not queued."""
+        pos = self._index.get(bssid.upper())
+        if pos is None:
+            return None
+        return self._remove_at(pos)
+
+    def score(self, bssid: str) -> float:
+        """Returns the current score of a queued target."""
+        return -self._heap[self._index[bssid.upper()]][0]
+
+    def set_scorer(self, scorer: ScoreFunction) -> None:
+        """
+        Replaces the scoring function and rescores every queued target.
+        """
+        self.scorer = scorer
+        for entry in self._heap:
+            entry[0] = -scorer(entry[2])
+        self._heap.sort(key=lambda e: (e[0], e[1]))
+        self._index = {e[2].bssid.upper(): i for i, e in enumerate(self._heap)}
+
+    def _remove_at(self, pos: int) -> Target:
+        entry = self._heap[pos]
+        last = self._heap.pop()
+        del self._index[entry[2].bssid.upper()]
+        if pos < len(self._heap):
+            self._heap[pos] = last
+            self._index[last[2].bssid.upper()] = pos
+            self._sift_up(pos)
+            self._sift_down(self._index[last[2].bssid.upper()])
+        return entry[2]
+
+    def _less(self, i: int, j: int) -> bool:
+        a, b = self._heap[i], self._heap[j]
+        return (a[0], a[1]) < (b[0], b[1])
+
+    def _swap(self, i: int, j: int) -> None:
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._index[heap[i][2].bssid.upper()] = i
+        self._index[heap[j][2].bssid.upper()] = j
+
+    def _sift_up(self, pos: int) -> None:
+        while pos > 0:
+            parent = (pos - 1) >> 1
+            if not self._less(pos, parent):
+                break
+            self._swap(pos, parent)
+            pos = parent
+
+    def _sift_down(self, pos: int) -> None:
+        size = len(self._heap)
+        while True:
+            child = 2 * pos + 1
+            if child >= size:
+                break
+            if child + 1 < size and self._less(child + 1, child):
+                child += 1
+            if not self._less(child, pos):
+                break
+            self._swap(pos, child)
+            pos = child
+
+
+class ChannelCapture:
+    """
+    A single airodump-ng capture locked to one channel. Every target
+    attacked while the radio sits on that channel shares this capture.
+    Attributes:
+            interface (str): Monitor mode interface.
+            channel (int): Channel the capture is locked to.
+            prefix (str): airodump-ng output prefix, unique to this
+                    capture so airodump-ng always writes its "-01" file.
+            process (Popen): Running airodump-ng process, if started.
+    """
+
+    interface: str
+    channel: int
+    prefix: str
+    process: Optional[Popen]
+
+    def __init__(self, interface: str, channel: int, prefix: str) -> None:
+        self.interface = interface
+        self.channel = channel
+        self.prefix = prefix
+        self.process = None
+
+    @property
+    def cap_path(self) -> str:
+        """Path of the pcap file airodump-ng writes for this capture."""
+        return self.prefix + "-01.cap"
+
+    def start(self) -> "ChannelCapture":
+        self.process = run_airodump(self.interface, self.prefix, self.channel)
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self.process is None:
+            return
+        send_interrupt(self.process)
+        try:
+            self.process.wait(timeout=timeout)
+        except TimeoutExpired:
+            logging.warning(
+                f"[ChannelCapture] airodump-ng on channel {self.channel} "
+                "ignored SIGINT, killing"
+            )
+            self.process.kill()
+        self.process = None
+
+
+class SessionStats:
+    """
+    Counters describing how much radio retuning a session needed.
+    Attributes:
+            targets (int): Targets attacked.
+            captures (int): Capture processes started.
+            channel_switches (int): Channel changes actually performed.
+            naive_switches (int): Channel changes one-target-at-a-time would need.
+            setup_time (float): Seconds spent starting capture processes.
+            solved (int): Targets skipped because they were already cracked.
+    """
+
+    targets: int
+    captures: int
+    channel_switches: int
+    naive_switches: int
+    setup_time: float
+    solved: int
+
+    def __init__(self) -> None:
+        self.targets = 0
+        self.captures = 0
+        self.channel_switches = 0
+        self.naive_switches = 0
+        self.setup_time = 0.0
+        self.solved = 0
+
+    @property
+    def switches_saved(self) -> int:
+        return self.naive_switches - self.channel_switches
+
+    @property
+    def setups_saved(self) -> int:
+        return self.targets - self.captures
+
+    @property
+    def setup_time_saved(self) -> float:
+        """Estimated seconds saved, from the mean measured capture setup."""
+        if self.captures == 0:
+            return 0.0
+        return self.setups_saved * self.setup_time / self.captures
+
+    def summary(self) -> str:
+        return (
+            f"{self.targets} targets on {self.captures} captures, "
+            f"{self.channel_switches} channel switches "
+            f"({self.switches_saved} saved), "
+            f"{self.setups_saved} capture setups saved "
+            f"(~{self.setup_time_saved:.1f}s), "
+            f"{self.solved} already cracked"
+        )
+
+
+def count_channel_switches(channels: List[int]) -> int:
+    """
+    Counts how often the radio retunes when visiting channels in order.
+    """
+    return sum(1 for a, b in zip(channels, channels[1:]) if a != b)
+
+
+def batch_by_channel(targets: List[Target]) -> List[Tuple[int, List[Target]]]:
+    """
+    Groups targets by channel. Channels are ordered by their best (first)
+    target and targets keep their relative order within a channel, so a
+    priority-ordered input stays priority-ordered per batch.
+    """
+    batches: Dict[int, List[Target]] = {}
+    for target in targets:
+        batches.setdefault(target.channel, []).append(target)
+    return list(batches.items())
+
+
+AttackFactory = Callable[[Target, ChannelCapture], Optional[Attack]]
+CaptureFactory = Callable[[int], ChannelCapture]
+
+
+class AttackEngine:
+    """
+    Coordinates target selection and attack execution.
+    Queued targets are drained in priority order and batched per channel:
+    one capture is started per channel and every co-channel target is
+    attacked back-to-back on it before the radio retunes. Targets that the
+    result store already holds a key for are not attacked again, and the
+    keys attacks return are recorded there. Before a temporary directory
+    the engine created is removed, every capture that produced a result is
+    split into per-BSSID captures in "output_dir", together with the key
+    files written next to it.
+    Attributes:
+            config (RunConfig): Runtime configuration.
+            queue (TargetQueue): Targets waiting to be attacked.
+            results (dict): Attack results keyed by upper-case BSSID.
+            stats (SessionStats): Counters for the last run().
+            essids (EssidMap): ESSIDs seen in the captures, used to fill in
+                    hidden targets before they are attacked.
+            store (ResultStore): Networks cracked before, None to attack all.
+            output_dir (str): Directory the successful captures are kept in.
+    """
+
+    config: RunConfig
+    queue: TargetQueue
+    results: Dict[str, Any]
+    stats: SessionStats
+    essids: EssidMap
+    store: Optional[ResultStore]
+    output_dir: str
+
+    def __init__(
+        self,
+        config: RunConfig,
+        attack_factory: AttackFactory,
+        queue: Optional[TargetQueue] = None,
+        capture_factory: Optional[CaptureFactory] = None,
+        temp_dir: Optional[str] = None,
+        store: Optional[ResultStore] = None,
+        output_dir: Optional[str] = None,
+    ) -> None:
+        self.config = config
+        self.attack_factory = attack_factory
+        self.queue = queue if queue is not None else TargetQueue()
+        self.capture_factory = capture_factory or self._start_capture
+        # A directory created here is removed at the end of every run()
+        self._owns_temp_dir = temp_dir is None
+        self.temp_dir = temp_dir or tempfile.mkdtemp(prefix="wlfwifi-")
+        self.results = {}
+        self.stats = SessionStats()
+        self.essids = EssidMap()
+        self.store = store
+        self.output_dir = output_dir or DEFAULT_OUTPUT_DIR
+        # BSSIDs that got a result, by the capture they were attacked on
+        self._productive: Dict[str, Set[str]] = {}
+
+    def solved(self, target: Target) -> bool:
+        """Whether the result store holds a key for "target"."""
+        if self.store is None:
+            return False
+        result = self.store.solved(target.bssid, target.essid)
+        if result is None:
+            return False
+        logging.info(
+            f"[AttackEngine] {target.bssid} ({target.essid}) already cracked "
+            f"by {result.method}, skipping"
+        )
+        return True
+
+    def enqueue(self, target: Target, score: Optional[float] = None) -> bool:
+        """
+        Queues "target" unless it is already cracked.
+        Returns:
+                bool: Whether the target was queued.
+        """
+        if self.solved(target):
+            return False
+        self.queue.push(target, score)
+        return True
+
+    def _start_capture(self, channel: int) -> ChannelCapture:
+        if self.config.interface is None:
+            raise ValueError("an interface is required to start a capture")
+        # A fresh directory per capture: reusing a prefix makes airodump-ng
+        # number its files -02, -03... and cap_path would name a stale one
+        directory = tempfile.mkdtemp(prefix="ch%d-" % channel, dir=self.temp_dir)
+        prefix = os.path.join(directory, "wlfwifi")
+        return ChannelCapture(self.config.interface, channel, prefix).start()
+
+    def run(self) -> SessionStats:
+        """
+        Attacks every queued target, one channel at a time.
+        Returns:
+                SessionStats: Channel switch and setup counters for this run.
+        """
+        if self._owns_temp_dir and not os.path.isdir(self.temp_dir):
+            self.temp_dir = tempfile.mkdtemp(prefix="wlfwifi-")
+        order = [self.queue.pop() for _ in range(len(self.queue))]
+        stats = SessionStats()
+        for target in order:
+            self.essids.add_target(target)
+        queued = len(order)
+        # Hidden targets may have been named since they were queued
+        order = [t for t in order if not self.solved(t)]
+        stats.solved = queued - len(order)
+        stats.targets = len(order)
+        stats.naive_switches = count_channel_switches([t.channel for t in order])
+        self.stats = stats
+        current: Optional[int] = None
+        try:
+            for channel, batch in batch_by_channel(order):
+                if current is not None and channel != current:
+                    stats.channel_switches += 1
+                current = channel
+                started = time.monotonic()
+                capture = self.capture_factory(channel)
+                stats.setup_time += time.monotonic() - started
+                stats.captures += 1
+                logging.info(
+                    f"[AttackEngine] channel {channel}: {len(batch)} target(s)"
+                )
+                try:
+                    for target in batch:
+                        self._attack(target, capture)
+                finally:
+                    capture.stop()
+        finally:
+            self.essids.close()
+            if self._owns_temp_dir:
+                self._keep_captures()
+                shutil.rmtree(self.temp_dir, ignore_errors=True)
+            self._productive.clear()
+        logging.info(f"[AttackEngine] {stats.summary()}")
+        return stats
+
+    def _attack(self, target: Target, capture: ChannelCapture) -> None:
+        try:
+            # Hidden ESSIDs show up in the capture once a station associates
+            self.essids.poll(capture.cap_path)
+        except (OSError, ValueError) as e:
+            logging.debug(f"[AttackEngine] Could not read {capture.cap_path}: {e}")
+        attack = self.attack_factory(target, capture)
+        if attack is None:
+            return
+        target.attempts += 1
+        started = time.monotonic()
+        try:
+            result = self.results[target.bssid.upper()] = attack.RunAttack()
+            if result is not None:
+                bssids = self._productive.setdefault(capture.cap_path, set())
+                bssids.add(target.bssid.upper())
+            if self.store is not None and isinstance(result, str):
+                method = attack.method or type(attack).__name__
+                elapsed = time.monotonic() - started
+                self.store.add(
+                    CrackResult(
+                        target.bssid, target.essid or "", "", result, method, elapsed
+                    )
+                )
+        except Exception as e:
+            logging.error(f"[AttackEngine] Attack on {target.bssid} failed: {e}")
+        finally:
+            try:
+                attack.EndAttack()
+            except Exception as e:
+                logging.warning(f"[AttackEngine] EndAttack failed: {e}")
+
+    def _keep_captures(self) -> None:
+        from .split import split_capture
+
+        temp_dir = os.path.join(os.path.abspath(self.temp_dir), "")
+        for cap_path, bssids in self._productive.items():
+            if not os.path.abspath(cap_path).startswith(temp_dir):
+                continue
+            try:
+                if os.path.exists(cap_path):
+                    stats = split_capture(
+                        cap_path, self.output_dir, bssids, require_eapol=False
+                    )
+                    for bssid, path in stats.outputs.items():
+                        logging.info(f"[AttackEngine] {bssid}: capture kept in {path}")
+                for key_path in glob.glob(os.path.splitext(cap_path)[0] + "-*.key"):
+                    os.makedirs(self.output_dir, exist_ok=True)
+                    shutil.move(key_path, self.output_dir)
+            except (OSError, ValueError) as e:
+                logging.error(f"[AttackEngine] Could not keep {cap_path}: {e}")
+
+
+def _cmd_export(config: RunConfig) -> None:
+    from .handshake import export_hashcat
+
+    opts = config.options
+    export_hashcat(opts["captures"], opts["output"], processes=opts.get("jobs"))
+
+
+def _cmd_merge(config: RunConfig) -> None:
+    from .merge import merge_captures
+
+    opts = config.options
+    merge_captures(
+        opts["captures"],
+        opts["output"],
+        window=opts["window"],
+        dedup=not opts["keep_duplicates"],
+    )
+
+
+def _cmd_split(config: RunConfig) -> None:
+    from .split import split_capture
+
+    opts = config.options
+    split_capture(
+        opts["capture"],
+        opts["output_dir"],
+        bssids=opts["bssids"],
+        max_open=opts["max_open"],
+        require_eapol=not opts["keep_all"],
+        drop_retries=not opts["keep_retries"],
+    )
+
+
+def _cmd_ring(config: RunConfig) -> None:
+    from .ring import RingCaptureWriter, ring_capture
+
+    opts = config.options
+    writer = RingCaptureWriter(
+        opts["directory"],
+        prefix=opts["prefix"],
+        segment_bytes=opts["segment_mb"] << 20,
+        segment_seconds=opts["segment_seconds"],
+        max_segments=opts["max_segments"],
+    )
+    try:
+        ring_capture(opts["source"], writer, follow=opts["follow"])
+    except KeyboardInterrupt:
+        logging.info("[ring] Interrupted by user")
+    logging.info(
+        f"[ring] {len(writer.segments)} segments on disk "
+        f"({len(writer.pinned)} pinned), {writer.recycled} recycled"
+    )
+
+
+def _cmd_crack(config: RunConfig) -> None:
+    from .attacks import wpa_crack
+
+    opts = config.options
+    try:
+        key = wpa_crack(
+            opts["capture"],
+            opts["wordlist"],
+            opts["bssid"],
+            processes=opts["jobs"],
+            chunk_size=opts["chunk_size"],
+            resume=not opts["no_resume"],
+            start=opts["skip"],
+            pmk_cache=opts["pmk_cache"],
+            engine=opts["engine"],
+            keys=opts["keys"],
+            results=opts["results"],
+        )
+    except KeyboardInterrupt:
+        logging.info("[crack] Interrupted by user, position saved")
+        return
+    if key is None:
+        logging.info(f"[crack] No key found for {opts['bssid']}")
+    else:
+        logging.info(f"[crack] KEY FOUND for {opts['bssid']}: {key}")
+
+
+def _cmd_wordlist(config: RunConfig) -> None:
+    from .compact import compact_wordlist
+
+    opts = config.options
+    if opts["action"] == "compact":
+        stats = compact_wordlist(
+            opts["inputs"],
+            opts["output"],
+            memory=opts["memory"] * 1024 * 1024,
+            tmp_dir=opts["tmp_dir"],
+        )
+        logging.info(f"[wordlist] {stats.summary()}")
+
+
+def _cmd_pmk(config: RunConfig) -> None:
+    from .pmk import precompute_pmks
+
+    opts = config.options
+    if opts["action"] == "precompute":
+        stats = precompute_pmks(
+            opts["cache"],
+            opts["essid"].encode("utf-8"),
+            opts["wordlist"],
+            processes=opts["jobs"],
+            chunk_size=opts["chunk_size"],
+        )
+        logging.info(f"[pmk] {stats.summary()}")
+
+
+def _cmd_results(config: RunConfig) -> None:
+    from .results import ResultStore
+
+    with ResultStore(config.options["database"]) as store:
+        networks = store.networks()
+        for r in networks:
+            logging.info(
+                f"[results] {r.bssid} {r.essid!r}: {r.key} "
+                f"({r.method}, {r.elapsed:.1f}s)"
+            )
+        logging.info(f"[results] {len(networks)} networks cracked")
+
+
+def _cmd_attacks(config: RunConfig) -> None:
+    from .plugins import registry
+
+    for spec in registry(config.options["plugins"]):
+        missing = spec.missing_tools()
+        status = f"missing {', '.join(missing)}" if missing else "ready"
+        optional = spec.missing_tools(optional=True)
+        if optional:
+            status += f", without {', '.join(optional)}"
+        logging.info(
+            f"[attacks] {spec.name} ({'/'.join(spec.encryption)}): "
+            f"{spec.description} [{status}]"
+        )
+
+
+COMMANDS: Dict[str, Callable[[RunConfig], None]] = {
+    "export": _cmd_export,
+    "merge": _cmd_merge,
+    "split": _cmd_split,
+    "ring": _cmd_ring,
+    "crack": _cmd_crack,
+    "wordlist": _cmd_wordlist,
+    "pmk": _cmd_pmk,
+    "results": _cmd_results,
+    "attacks": _cmd_attacks,
+}
+
+
+def run_command(config: RunConfig) -> None:
+    """
+    Runs the offline subcommand selected on the command line.
+    """
+    handler = COMMANDS.get(config.command or "")
+    if handler is None:
+        raise ValueError(f"unknown command: {config.command}")
+    handler(config)
 
 
 def main() -> None:
@@ -23,6 +728,9 @@ def main() -> None:
     )
     try:
         config: RunConfig = parse_args()
+        if config.command is not None:
+            run_command(config)
+            return
         logging.info(
             f"[wlfwifi] Starting with interface={config.interface}, channel={config.channel}, verbose={config.verbose}"
         )
@@ -0,0 +1,368 @@
+"""
+crack.py
+--------
+Parallel dictionary attacks on captured WPA handshakes.
+
+A wordlist is streamed in chunks of candidates that are handed to a pool of
+worker processes, one per CPU by default. Only a few chunks are in flight
+at a time, so memory use does not depend on the wordlist size, and the
+first worker that finds the key stops the run. Progress, candidates/sec
+and an ETA are reported while it runs.
+
+Runs can be resumed: the number of candidates tried without a gap is
+checkpointed per (handshake, wordlist) in a "<capture>.resume" file, and
+the next run starts from there.
+
+Functions and Classes:
+    CrackStats: Counters, throughput and ETA of a crack_wordlist() run.
+    CrackCheckpoint: Resume positions per handshake and wordlist.
+    AircrackWorker: Tries a chunk of candidates with one aircrack-ng process.
+    handshake_digest: Identifies the handshakes of an AP in a capture.
+    crack_wordlist: Dispatches a wordlist to a pool of workers.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from subprocess import DEVNULL, PIPE, Popen
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from wlfwifi.capture import CaptureReader
+from wlfwifi.handshake import HandshakeDetector
+from wlfwifi.wordlist import STDIN, WordlistReader
+
+DEFAULT_CHUNK = 20000
+DEFAULT_PROGRESS_INTERVAL = 10.0
+
+CHECKPOINT_SUFFIX = ".resume"
+
+# Crack engines: aircrack-ng processes, or in-process verification
+ENGINE_AIRCRACK = "aircrack"
+ENGINE_NATIVE = "native"
+ENGINES = (ENGINE_AIRCRACK, ENGINE_NATIVE)
+
+# A worker tries a chunk of candidates and returns the key if one matched
+Worker = Callable[[List[bytes]], Optional[bytes]]
+ProgressCallback = Callable[["CrackStats"], None]
+# Called with the number of candidates tried without a gap
+CheckpointCallback = Callable[[int], None]
+
+
+class CrackStats:
+    """
+    Counters for a crack_wordlist() run.
+    Attributes:
+            candidates (int): Candidates tried.
+            skipped (int): Wordlist lines dropped for their length.
+            chunks (int): Chunks completed.
+            processes (int): Workers used.
+            start (int): Candidate number the run started at.
+            completed (int): Candidate number up to which every chunk is done.
+            fraction (float): Share of the wordlist read, None if unknown.
+            elapsed (float): Wall-clock seconds spent.
+    """
+
+    candidates: int
+    skipped: int
+    chunks: int
+    processes: int
+    start: int
+    completed: int
+    fraction: Optional[float]
+    elapsed: float
+
+    def __init__(self) -> None:
+        self.candidates = 0
+        self.skipped = 0
+        self.chunks = 0
+        self.processes = 0
+        self.start = 0
+        self.completed = 0
+        self.fraction = None
+        self.elapsed = 0.0
+
+    @property
+    def candidates_per_sec(self) -> float:
+        return self.candidates / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Seconds left, estimated from the share of the wordlist read."""
+        if not self.fraction or not self.elapsed:
+            return None
+        return self.elapsed * (1.0 - self.fraction) / self.fraction
+
+    def summary(self) -> str:
+        done = "" if self.fraction is None else f" ({self.fraction:.1%})"
+        eta = "" if self.eta is None else f", ETA {self.eta:.0f}s"
+        start = f" from #{self.start}" if self.start else ""
+        return (
+            f"{self.candidates} candidates{start}{done} on {self.processes} "
+            f"workers, {self.candidates_per_sec:.0f}/s{eta}"
+        )
+
+
+class CrackCheckpoint:
+    """
+    Resume positions of wordlist runs, stored as JSON and replaced
+    atomically so an interrupted write never loses the previous state.
+    Entries are keyed by handshake digest and wordlist path; an entry whose
+    wordlist changed size is ignored.
+    Attributes:
+            path (str): The checkpoint file.
+            entries (dict): Stored entries by key.
+    """
+
+    path: str
+    entries: Dict[str, Dict[str, Any]]
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.entries = {}
+        try:
+            with open(path, "r") as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logging.warning(f"[CrackCheckpoint] Ignoring unreadable {path}: {e}")
+
+    @staticmethod
+    def _key(digest: str, wordlist: str) -> str:
+        return f"{digest}:{os.path.abspath(wordlist)}"
+
+    @staticmethod
+    def _size(wordlist: str) -> Optional[int]:
+        try:
+            return os.path.getsize(wordlist)
+        except OSError:
+            return None
+
+    def position(self, digest: str, wordlist: str) -> int:
+        """Candidate number to resume "wordlist" at, 0 if unknown."""
+        if wordlist == STDIN:
+            return 0
+        entry = self.entries.get(self._key(digest, wordlist))
+        if entry is None or entry.get("size") != self._size(wordlist):
+            return 0
+        return int(entry.get("position", 0))
+
+    def save(self, digest: str, wordlist: str, position: int) -> None:
+        if wordlist == STDIN:
+            return
+        self.entries[self._key(digest, wordlist)] = {
+            "position": position,
+            "size": self._size(wordlist),
+            "updated": time.time(),
+        }
+        self._write()
+
+    def clear(self, digest: str, wordlist: str) -> None:
+        if self.entries.pop(self._key(digest, wordlist), None) is not None:
+            self._write()
+
+    def _write(self) -> None:
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+class AircrackWorker:
+    """
+    Tries candidates against a capture with aircrack-ng, reading the
+    wordlist from stdin on a single core ("-p 1"), so that one worker per
+    CPU keeps every core busy.
+    Attributes:
+            cap_path (str): Capture holding the handshake.
+            bssid (str): Access point whose handshake is attacked.
+    """
+
+    cap_path: str
+    bssid: str
+
+    def __init__(self, cap_path: str, bssid: str) -> None:
+        self.cap_path = cap_path
+        self.bssid = bssid
+
+    def __call__(self, chunk: List[bytes]) -> Optional[bytes]:
+        fd, key_path = tempfile.mkstemp(prefix="wlfwifi-", suffix=".key")
+        os.close(fd)
+        try:
+            cmd = [
+                "aircrack-ng",
+                "-q",
+                "-a",
+                "2",
+                "-p",
+                "1",
+                "-b",
+                self.bssid,
+                "-l",
+                key_path,
+                "-w",
+                "-",
+                self.cap_path,
+            ]
+            proc = Popen(cmd, stdin=PIPE, stdout=DEVNULL, stderr=DEVNULL)
+            proc.communicate(b"\n".join(chunk) + b"\n")
+            with open(key_path, "rb") as f:
+                key = f.read().rstrip(b"\r\n")
+            return key or None
+        finally:
+            os.remove(key_path)
+
+
+def handshake_digest(cap_path: str, bssid: str) -> str:
+    """
+    Hex digest of the handshakes and PMKIDs of "bssid" in a capture, so a
+    checkpoint follows the handshake even if the capture is renamed or more
+    frames are appended. Falls back to the BSSID and capture path when the
+    capture holds neither or cannot be read.
+    """
+    digest = hashlib.sha1(bssid.upper().encode())
+    detector = HandshakeDetector(bssid=bssid)
+    try:
+        with CaptureReader(cap_path) as reader:
+            for frame in reader.frames():
+                detector.feed(frame)
+    except (OSError, ValueError):
+        pass
+    material = [
+        h.sta.encode() + h.anonce + h.snonce + h.mic
+        for h in detector.handshakes.values()
+    ]
+    material += [p.sta.encode() + p.pmkid for p in detector.pmkids.values()]
+    if not material:
+        material.append(os.path.abspath(cap_path).encode())
+    for item in sorted(material):
+        digest.update(item)
+    return digest.hexdigest()
+
+
+def _log_progress(stats: CrackStats) -> None:
+    logging.info(f"[crack_wordlist] {stats.summary()}")
+
+
+def crack_wordlist(
+    wordlist: str,
+    worker: Worker,
+    processes: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK,
+    progress: Optional[ProgressCallback] = _log_progress,
+    progress_interval: float = DEFAULT_PROGRESS_INTERVAL,
+    start: int = 0,
+    checkpoint: Optional[CheckpointCallback] = None,
+    executor: Optional[Executor] = None,
+) -> Tuple[Optional[bytes], CrackStats]:
+    """
+    Tries every valid candidate of "wordlist" with "worker".
+    Chunks are run in a process pool ("processes" workers, CPU count by
+    default; 1 runs them in-process) with at most two chunks queued per
+    worker. "worker" must be picklable to run in a pool. A caller-owned
+    "executor" is used instead of a new pool and is left running.
+    Args:
+            wordlist: Plain or gzip wordlist, or "-" for stdin.
+            worker: Callable returning the key found in a chunk, or None.
+            processes: Number of worker processes.
+            chunk_size: Candidates per chunk.
+            progress: Called with the stats every "progress_interval" seconds.
+            start: Number of the first candidate to try, counted from 0.
+            checkpoint: Called with CrackStats.completed along with
+                    "progress" and when the run ends or is interrupted.
+            executor: Runs the chunks; "processes" should match its workers.
+    Returns:
+            tuple: (key or None, CrackStats).
+    """
+    stats = CrackStats()
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = max(1, processes)
+    stats.processes = processes
+    started = time.monotonic()
+    last_report = started
+    key: Optional[bytes] = None
+    reader = WordlistReader(wordlist, start)
+    stats.start = stats.completed = reader.position
+    owned = executor is None and processes > 1
+    if owned:
+        executor = ProcessPoolExecutor(processes)
+    pending: Set[Future] = set()
+    # Chunk number of each future, and sizes of chunks in flight
+    numbers: Dict[Future, int] = {}
+    sizes: Dict[int, int] = {}
+    done: Set[int] = set()
+    queued = first_pending = 0
+
+    def finish(number: int, result: Optional[bytes]) -> Optional[bytes]:
+        nonlocal first_pending
+        stats.candidates += sizes[number]
+        stats.chunks += 1
+        done.add(number)
+        # The checkpoint only moves over chunks done without a gap
+        while first_pending in done:
+            done.remove(first_pending)
+            stats.completed += sizes.pop(first_pending)
+            first_pending += 1
+        return result
+
+    try:
+        chunks = reader.chunks(chunk_size)
+        for chunk in chunks:
+            number = queued
+            sizes[number] = len(chunk)
+            queued += 1
+            if executor is None:
+                key = finish(number, worker(chunk))
+            else:
+                future = executor.submit(worker, chunk)
+                numbers[future] = number
+                pending.add(future)
+                if len(pending) < processes * 2:
+                    continue
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    key = finish(numbers.pop(future), future.result()) or key
+            if key is not None:
+                break
+            now = time.monotonic()
+            if now - last_report >= progress_interval:
+                last_report = now
+                stats.elapsed = now - started
+                stats.skipped = reader.skipped
+                stats.fraction = reader.progress
+                if progress is not None:
+                    progress(stats)
+                if checkpoint is not None:
+                    checkpoint(stats.completed)
+        while pending and key is None:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                key = finish(numbers.pop(future), future.result()) or key
+    finally:
+        for future in pending:
+            future.cancel()
+        if owned:
+            executor.shutdown(wait=True)
+        stats.skipped = reader.skipped
+        stats.fraction = reader.progress
+        reader.close()
+        if checkpoint is not None:
+            checkpoint(stats.completed)
+    stats.elapsed = time.monotonic() - started
+    if key is not None:
+        logging.info(f"[crack_wordlist] Key found after {stats.summary()}")
+    else:
+        logging.info(f"[crack_wordlist] Exhausted: {stats.summary()}")
+    return key, stats
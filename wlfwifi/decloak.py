@@ -0,0 +1,155 @@
+"""
+decloak.py
+----------
+Discovery of hidden ESSIDs while a capture runs.
+
+An AP that hides its ESSID still names it in probe responses, and stations
+name it in every association or reassociation request. EssidMap watches
+those frames and keeps a BSSID -> ESSID map; targets registered with it get
+their ESSID filled in as soon as it is seen, so WPA attacks no longer need
+the name to be known when the scan starts.
+
+Functions and Classes:
+    is_hidden: Whether an ESSID as reported by a scan is hidden.
+    EssidMap: BSSID to ESSID map fed from capture frames.
+"""
+
+import logging
+from typing import Callable, Dict, Optional
+from wlfwifi.capture import CaptureReader, Frame, frame_essid, mac_str, parse_dot11
+from wlfwifi.dedup import RetryFilter
+from wlfwifi.models import Target
+
+DecloakCallback = Callable[[Target, str], None]
+
+
+def is_hidden(essid: Optional[str]) -> bool:
+    """
+    True for the ESSIDs scans report for hidden networks: empty, NUL
+    padded, or airodump-ng's "<length: N>" placeholder.
+    """
+    if essid is None:
+        return True
+    essid = essid.strip()
+    return not essid.strip("\0") or essid.startswith("<length:")
+
+
+class EssidMap:
+    """
+    BSSID -> ESSID map built from beacons, probe responses and association
+    requests. Hidden targets registered with add_target() are back-filled
+    as soon as their ESSID is seen. Captures read by poll() go through a
+    RetryFilter, so retransmitted beacons and requests are inspected once.
+    Attributes:
+            essids (Dict[str, bytes]): Raw ESSID by upper-case BSSID.
+            targets (Dict[str, Target]): Registered targets by upper-case BSSID.
+            frames (int): Frames inspected.
+            decloaked (int): Hidden targets back-filled so far.
+            retries (RetryFilter): Retransmission filter of poll(), if any.
+            on_decloak (DecloakCallback): Called with (target, essid) on back-fill.
+    """
+
+    essids: Dict[str, bytes]
+    targets: Dict[str, Target]
+    frames: int
+    decloaked: int
+    retries: Optional[RetryFilter]
+    on_decloak: Optional[DecloakCallback]
+
+    def __init__(
+        self,
+        on_decloak: Optional[DecloakCallback] = None,
+        drop_retries: bool = True,
+    ) -> None:
+        self.essids = {}
+        self.targets = {}
+        self.frames = 0
+        self.decloaked = 0
+        self.retries = RetryFilter() if drop_retries else None
+        self.on_decloak = on_decloak
+        self._readers: Dict[str, CaptureReader] = {}
+
+    def __enter__(self) -> "EssidMap":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.essids)
+
+    def essid(self, bssid: str) -> Optional[str]:
+        """ESSID seen for "bssid", if any."""
+        raw = self.essids.get(bssid.upper())
+        if raw is None:
+            return None
+        return raw.decode("utf-8", errors="replace")
+
+    def add_target(self, target: Target) -> bool:
+        """
+        Registers a target for back-filling.
+        Returns:
+                bool: True if its hidden ESSID was already known and filled in.
+        """
+        key = target.bssid.upper()
+        self.targets[key] = target
+        return key in self.essids and self._backfill(key)
+
+    def feed(self, frame: Frame) -> Optional[str]:
+        """
+        Inspects one frame.
+        Returns:
+                str: BSSID of a registered target decloaked by this frame.
+        """
+        self.frames += 1
+        dot11 = parse_dot11(frame)
+        if dot11 is None:
+            return None
+        essid = frame_essid(dot11)
+        if essid is None:
+            return None
+        raw_bssid = dot11.bssid
+        if raw_bssid is None:
+            return None
+        key = mac_str(raw_bssid)
+        if self.essids.get(key) == essid:
+            return None
+        self.essids[key] = essid
+        if key in self.targets and self._backfill(key):
+            return key
+        return None
+
+    def poll(self, path: str) -> int:
+        """
+        Feeds the frames appended to "path" since the previous poll.
+        Returns:
+                int: Number of targets decloaked.
+        Raises:
+                ValueError: If the file is neither pcap nor pcapng.
+        """
+        reader = self._readers.get(path)
+        if reader is None:
+            accept = self.retries.accept if self.retries is not None else None
+            reader = self._readers[path] = CaptureReader(path, accept)
+        found = 0
+        for frame in reader.frames():
+            if self.feed(frame) is not None:
+                found += 1
+        return found
+
+    def close(self) -> None:
+        for reader in self._readers.values():
+            reader.close()
+        self._readers.clear()
+
+    def _backfill(self, key: str) -> bool:
+        target = self.targets[key]
+        if not is_hidden(target.essid):
+            return False
+        essid = self.essids[key].decode("utf-8", errors="replace")
+        target.essid = essid
+        self.decloaked += 1
+        logging.info(f"[EssidMap] Decloaked {target.bssid}: {essid!r}")
+        if self.on_decloak is not None:
+            self.on_decloak(target, essid)
+        return True
@@ -0,0 +1,136 @@
+"""
+dedup.py
+--------
+Removal of retransmitted frames by sequence number.
+
+A transmitter that gets no ACK resends the frame with the Retry flag set
+and the same sequence control field. Like an 802.11 receiver, RetryFilter
+remembers the last sequence control seen from each transmitter (and each
+QoS traffic class) and drops a retry that repeats it. The cache is a
+fixed-size table indexed by a hash of the transmitter, so memory use and
+the cost per frame are constant however many stations are on the air;
+a collision only evicts an entry, it never drops a frame wrongly.
+Passing RetryFilter.accept to CaptureReader drops retransmissions before
+any consumer sees them; IvTracker, EssidMap and the handshake readers do so
+by default.
+
+Functions and Classes:
+    RetryFilter: Fixed-size per-transmitter sequence cache dropping retries.
+    dedup_frames: Filters an iterable of frames through a RetryFilter.
+"""
+
+from typing import Iterable, Iterator, List, Optional
+from wlfwifi.capture import (
+    DOT11_DATA,
+    FLAG_FROM_DS,
+    FLAG_RETRY,
+    FLAG_TO_DS,
+    Dot11Frame,
+    Frame,
+    parse_dot11,
+)
+
+DEFAULT_SLOTS = 4096
+
+# Fibonacci hashing constant, spreads similar MAC addresses over the table
+_HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+
+
+def _cache_key(dot11: Dot11Frame) -> int:
+    # QoS data frames number each traffic identifier separately
+    tid = 0
+    if dot11.type == DOT11_DATA and dot11.subtype & 0x8:
+        qos = 24
+        if dot11.flags & FLAG_TO_DS and dot11.flags & FLAG_FROM_DS:
+            qos += 6
+        tid = (dot11.data[qos] & 0xF) + 1
+    return (int.from_bytes(dot11.addr2, "big") << 5) | tid
+
+
+class RetryFilter:
+    """
+    Per-transmitter sequence number cache.
+    Attributes:
+            slots (int): Table size, rounded up to a power of two.
+            retry_only (bool): Only drop repeats that have the Retry flag set,
+                    as 802.11 receivers do. False also drops unflagged copies,
+                    e.g. the same frame captured by two cards.
+            frames (int): Frames checked.
+            dropped (int): Frames dropped as retransmissions.
+            evictions (int): Cache entries replaced by another transmitter.
+    """
+
+    slots: int
+    retry_only: bool
+    frames: int
+    dropped: int
+    evictions: int
+
+    def __init__(self, slots: int = DEFAULT_SLOTS, retry_only: bool = True) -> None:
+        size = 1
+        while size < slots:
+            size <<= 1
+        self.slots = size
+        self.retry_only = retry_only
+        self.frames = 0
+        self.dropped = 0
+        self.evictions = 0
+        self._mask = size - 1
+        self._keys: List[int] = [-1] * size
+        self._seqs: List[int] = [0] * size
+
+    @property
+    def rate(self) -> float:
+        """Fraction of the checked frames that were dropped."""
+        return self.dropped / self.frames if self.frames else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.frames} frames, {self.dropped} retransmissions dropped "
+            f"({self.rate:.1%}), {self.evictions} cache evictions"
+        )
+
+    def duplicate(self, dot11: Dot11Frame) -> bool:
+        """
+        Checks one decoded frame and records its sequence number.
+        Returns:
+                bool: True if it repeats the previous frame of its transmitter.
+        """
+        self.frames += 1
+        key = _cache_key(dot11)
+        slot = ((key * _HASH_MULTIPLIER) >> 40) & self._mask
+        stored = self._keys[slot]
+        if stored == key:
+            if self._seqs[slot] == dot11.seq and (
+                not self.retry_only or dot11.flags & FLAG_RETRY
+            ):
+                self.dropped += 1
+                return True
+        else:
+            if stored != -1:
+                self.evictions += 1
+            self._keys[slot] = key
+        self._seqs[slot] = dot11.seq
+        return False
+
+    def accept(self, frame: Frame) -> bool:
+        """
+        Returns False for a retransmission. Frames that cannot be decoded,
+        such as control frames, carry no sequence number and are accepted.
+        """
+        dot11 = parse_dot11(frame)
+        return dot11 is None or not self.duplicate(dot11)
+
+
+def dedup_frames(
+    frames: Iterable[Frame], retries: Optional[RetryFilter] = None
+) -> Iterator[Frame]:
+    """
+    Yields the frames that are not retransmissions. Pass "retries" to read
+    its counters afterwards or to share it across several inputs.
+    """
+    if retries is None:
+        retries = RetryFilter()
+    for frame in frames:
+        if retries.accept(frame):
+            yield frame
@@ -0,0 +1,656 @@
+"""
+handshake.py
+------------
+Native detection of WPA/WPA2 4-way handshakes in capture files.
+
+EAPOL-Key frames are paired per (AP, station) by replay counter and nonce as
+they are read, so a crackable handshake is reported as soon as the frame that
+completes it has been written, instead of at the next external check.
+
+Functions and Classes:
+    EapolKey: A decoded EAPOL-Key frame (one of the 4-way handshake messages).
+    Handshake: A crackable message pair for one (AP, station).
+    Pmkid: A PMKID taken from message 1 (crackable without a client).
+    HandshakeDetector: Streaming EAPOL pairing state machine.
+    is_eapol: Tells whether an 802.11 frame carries EAPOL.
+    parse_eapol_key: Decodes an EAPOL-Key frame from an 802.11 data frame.
+    find_handshakes: Returns every handshake in a capture file.
+    wait_for_handshake: Tails a growing capture until a handshake or PMKID appears.
+    extract_pmkid: Returns the PMKID carried in the key data of an M1.
+    capture_hash_lines: Hashcat 22000 lines for every hash in a capture.
+    export_hashcat: Converts many captures in parallel into one 22000 file.
+    ExportStats: Counters and throughput of an export run.
+"""
+
+import os
+import time
+import struct
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+from wlfwifi.capture import (
+    DOT11_DATA,
+    DOT11_MGMT,
+    FLAG_PROTECTED,
+    IE_VENDOR,
+    CaptureReader,
+    Dot11Frame,
+    Frame,
+    frame_essid,
+    iter_ies,
+    mac_str,
+    parse_dot11,
+)
+from wlfwifi.dedup import RetryFilter
+from wlfwifi.models import CapFile, Target
+
+# LLC/SNAP header announcing an 802.1X (EAPOL) payload
+EAPOL_SNAP = b"\xaa\xaa\x03\x00\x00\x00\x88\x8e"
+EAPOL_TYPE_KEY = 3
+
+# Key information bits
+KEY_INFO_VERSION_MASK = 0x0007
+KEY_INFO_PAIRWISE = 0x0008
+KEY_INFO_INSTALL = 0x0040
+KEY_INFO_ACK = 0x0080
+KEY_INFO_MIC = 0x0100
+KEY_INFO_SECURE = 0x0200
+
+# Offsets inside the EAPOL frame (802.1X header included)
+EAPOL_REPLAY_OFFSET = 9
+EAPOL_NONCE_OFFSET = 17
+EAPOL_MIC_OFFSET = 81
+EAPOL_KEY_DATA_LEN_OFFSET = 97
+EAPOL_KEY_DATA_OFFSET = 99
+
+# Message pair identifiers, as used by hashcat mode 22000
+MESSAGE_PAIR_M12E2 = 0
+MESSAGE_PAIR_M32E2 = 2
+MESSAGE_PAIR_M34E4 = 5
+
+ZERO_NONCE = bytes(32)
+
+# PMKID key data encapsulation (IEEE 802.11 OUI, data type 4)
+PMKID_KDE_OUI = b"\x00\x0f\xac"
+PMKID_KDE_TYPE = 4
+ZERO_PMKID = bytes(16)
+
+# Unanswered messages kept per (AP, station) and message number
+PENDING_LIMIT = 8
+
+
+class EapolKey:
+    """
+    A decoded EAPOL-Key frame.
+    Attributes:
+            ap (str): BSSID of the access point.
+            sta (str): MAC address of the station.
+            message (int): Handshake message number, 1 to 4.
+            key_info (int): Key information field.
+            replay_counter (int): Replay counter.
+            nonce (bytes): Key nonce (ANonce for M1/M3, SNonce for M2/M4).
+            mic (bytes): Key MIC.
+            key_data (bytes): Key data field.
+            eapol (bytes): The whole EAPOL frame, 802.1X header included.
+            timestamp (float): Capture timestamp of the frame.
+    """
+
+    __slots__ = (
+        "ap",
+        "sta",
+        "message",
+        "key_info",
+        "replay_counter",
+        "nonce",
+        "mic",
+        "key_data",
+        "eapol",
+        "timestamp",
+    )
+
+    def __init__(
+        self,
+        ap: str,
+        sta: str,
+        message: int,
+        key_info: int,
+        replay_counter: int,
+        nonce: bytes,
+        mic: bytes,
+        key_data: bytes,
+        eapol: bytes,
+        timestamp: float,
+    ) -> None:
+        self.ap = ap
+        self.sta = sta
+        self.message = message
+        self.key_info = key_info
+        self.replay_counter = replay_counter
+        self.nonce = nonce
+        self.mic = mic
+        self.key_data = key_data
+        self.eapol = eapol
+        self.timestamp = timestamp
+
+    @property
+    def key_version(self) -> int:
+        return self.key_info & KEY_INFO_VERSION_MASK
+
+
+class Handshake:
+    """
+    A crackable handshake: the nonces of both sides plus the MIC and the
+    EAPOL frame it was computed over.
+    Attributes:
+            ap (str): BSSID of the access point.
+            sta (str): MAC address of the station.
+            anonce (bytes): Authenticator nonce.
+            snonce (bytes): Supplicant nonce.
+            mic (bytes): MIC of the EAPOL frame.
+            eapol (bytes): EAPOL frame with its MIC field zeroed.
+            key_version (int): Key descriptor version (1 HMAC-MD5, 2 HMAC-SHA1).
+            message_pair (int): Which messages were paired (MESSAGE_PAIR_*).
+            replay_counter (int): Replay counter of the EAPOL frame.
+            timestamp (float): Capture timestamp of the completing frame.
+    """
+
+    ap: str
+    sta: str
+    anonce: bytes
+    snonce: bytes
+    mic: bytes
+    eapol: bytes
+    key_version: int
+    message_pair: int
+    replay_counter: int
+    timestamp: float
+
+    def __init__(
+        self, anonce: bytes, mic_frame: EapolKey, snonce: bytes, message_pair: int
+    ) -> None:
+        self.ap = mic_frame.ap
+        self.sta = mic_frame.sta
+        self.anonce = anonce
+        self.snonce = snonce
+        self.mic = mic_frame.mic
+        eapol = mic_frame.eapol
+        self.eapol = (
+            eapol[:EAPOL_MIC_OFFSET] + bytes(16) + eapol[EAPOL_MIC_OFFSET + 16 :]
+        )
+        self.key_version = mic_frame.key_version
+        self.message_pair = message_pair
+        self.replay_counter = mic_frame.replay_counter
+        self.timestamp = mic_frame.timestamp
+
+
+def _classify(key_info: int, nonce: bytes, key_data_len: int) -> int:
+    if not key_info & KEY_INFO_PAIRWISE:
+        return 0
+    if key_info & KEY_INFO_ACK:
+        return 3 if key_info & KEY_INFO_MIC else 1
+    if not key_info & KEY_INFO_MIC:
+        return 0
+    if key_info & KEY_INFO_SECURE:
+        return 4
+    # WPA1 M4 does not set Secure; it carries no key data and a zero nonce
+    if key_data_len == 0 and nonce == ZERO_NONCE:
+        return 4
+    return 2
+
+
+def is_eapol(dot11: Dot11Frame) -> bool:
+    """
+    Tells whether an 802.11 frame is an unprotected EAPOL (802.1X) frame.
+    """
+    if dot11.type != DOT11_DATA or dot11.flags & FLAG_PROTECTED:
+        return False
+    start = dot11.header_len
+    return dot11.data[start : start + 8] == EAPOL_SNAP
+
+
+def parse_eapol_key(dot11: Dot11Frame, timestamp: float = 0.0) -> Optional[EapolKey]:
+    """
+    Decodes a 4-way handshake message from an 802.11 data frame.
+    Returns None if the frame does not carry a pairwise EAPOL-Key message.
+    """
+    if dot11.type != DOT11_DATA or dot11.flags & FLAG_PROTECTED:
+        return None
+    data = dot11.data
+    start = dot11.header_len
+    if data[start : start + 8] != EAPOL_SNAP:
+        return None
+    start += 8
+    if len(data) < start + EAPOL_KEY_DATA_OFFSET or data[start + 1] != EAPOL_TYPE_KEY:
+        return None
+    body_len = struct.unpack_from(">H", data, start + 2)[0]
+    eapol = data[start : start + 4 + body_len]
+    if len(eapol) < EAPOL_KEY_DATA_OFFSET:
+        return None
+    key_info = struct.unpack_from(">H", eapol, 5)[0]
+    nonce = eapol[EAPOL_NONCE_OFFSET : EAPOL_NONCE_OFFSET + 32]
+    key_data_len = struct.unpack_from(">H", eapol, EAPOL_KEY_DATA_LEN_OFFSET)[0]
+    message = _classify(key_info, nonce, key_data_len)
+    if message == 0:
+        return None
+    bssid = dot11.bssid
+    if bssid is None:
+        return None
+    if message in (1, 3):
+        sta = dot11.destination
+    else:
+        sta = dot11.source
+    return EapolKey(
+        ap=mac_str(bssid),
+        sta=mac_str(sta),
+        message=message,
+        key_info=key_info,
+        replay_counter=struct.unpack_from(">Q", eapol, EAPOL_REPLAY_OFFSET)[0],
+        nonce=nonce,
+        mic=eapol[EAPOL_MIC_OFFSET : EAPOL_MIC_OFFSET + 16],
+        key_data=eapol[EAPOL_KEY_DATA_OFFSET : EAPOL_KEY_DATA_OFFSET + key_data_len],
+        eapol=eapol,
+        timestamp=timestamp,
+    )
+
+
+def extract_pmkid(key: EapolKey) -> Optional[bytes]:
+    """
+    Returns the PMKID an AP placed in the key data of message 1, or None.
+    """
+    if key.message != 1:
+        return None
+    for tag, value in iter_ies(key.key_data):
+        if (
+            tag == IE_VENDOR
+            and len(value) >= 20
+            and value[:3] == PMKID_KDE_OUI
+            and value[3] == PMKID_KDE_TYPE
+            and value[4:20] != ZERO_PMKID
+        ):
+            return value[4:20]
+    return None
+
+
+class Pmkid:
+    """
+    A PMKID an AP announced in message 1 of a handshake.
+    Attributes:
+            ap (str): BSSID of the access point.
+            sta (str): MAC address of the station the M1 was sent to.
+            pmkid (bytes): The 16-byte PMKID.
+            timestamp (float): Capture timestamp of the M1.
+    """
+
+    ap: str
+    sta: str
+    pmkid: bytes
+    timestamp: float
+
+    def __init__(self, ap: str, sta: str, pmkid: bytes, timestamp: float) -> None:
+        self.ap = ap
+        self.sta = sta
+        self.pmkid = pmkid
+        self.timestamp = timestamp
+
+
+class _Exchange:
+    # Unanswered messages of one (AP, station), keyed by replay counter
+    __slots__ = ("m1", "m2", "m3")
+
+    def __init__(self) -> None:
+        self.m1: Dict[int, EapolKey] = {}
+        self.m2: Dict[int, EapolKey] = {}
+        self.m3: Dict[int, EapolKey] = {}
+
+    @staticmethod
+    def remember(pending: Dict[int, EapolKey], key: EapolKey) -> None:
+        pending[key.replay_counter] = key
+        if len(pending) > PENDING_LIMIT:
+            del pending[next(iter(pending))]
+
+
+HandshakeCallback = Callable[[Handshake], None]
+PmkidCallback = Callable[[Pmkid], None]
+
+
+class HandshakeDetector:
+    """
+    Streaming 4-way handshake detector.
+    Frames are fed one at a time; EAPOL-Key messages are paired per
+    (AP, station) as soon as both halves of a crackable pair are seen:
+    M1+M2 with equal replay counters, M2+M3 where M3 is one replay step
+    ahead, or M3+M4 when M4 carries the SNonce. PMKIDs are taken from
+    M1 as it arrives and attached to the matching target, if one was given.
+    Attributes:
+            bssid (str): Only handshakes of this AP are tracked, if set.
+            handshakes (dict): Best handshake per (AP, station).
+            pmkids (dict): First PMKID per (AP, station).
+            frames (int): Frames fed so far.
+            cap_file (CapFile): Has its handshakes count kept up to date, if set.
+            targets (dict): Targets receiving PMKIDs, keyed by upper-case BSSID.
+    """
+
+    bssid: Optional[str]
+    handshakes: Dict[Tuple[str, str], Handshake]
+    pmkids: Dict[Tuple[str, str], Pmkid]
+    frames: int
+    cap_file: Optional[CapFile]
+    targets: Dict[str, Target]
+
+    def __init__(
+        self,
+        bssid: Optional[str] = None,
+        cap_file: Optional[CapFile] = None,
+        on_handshake: Optional[HandshakeCallback] = None,
+        on_pmkid: Optional[PmkidCallback] = None,
+        targets: Optional[Iterable[Target]] = None,
+    ) -> None:
+        self.bssid = bssid.upper() if bssid else None
+        self.cap_file = cap_file
+        self.on_handshake = on_handshake
+        self.on_pmkid = on_pmkid
+        self.targets = {t.bssid.upper(): t for t in targets or ()}
+        self.handshakes = {}
+        self.pmkids = {}
+        self.frames = 0
+        self._exchanges: Dict[Tuple[str, str], _Exchange] = {}
+
+    def feed(self, frame: Frame) -> Optional[Handshake]:
+        """
+        Processes one captured frame.
+        Returns:
+                Handshake: The handshake this frame completed, if any.
+        """
+        self.frames += 1
+        dot11 = parse_dot11(frame)
+        if dot11 is None or dot11.type != DOT11_DATA:
+            return None
+        key = parse_eapol_key(dot11, frame.timestamp)
+        if key is None:
+            return None
+        return self.feed_key(key)
+
+    def feed_key(self, key: EapolKey) -> Optional[Handshake]:
+        """
+        Processes one decoded EAPOL-Key message.
+        """
+        if self.bssid is not None and key.ap != self.bssid:
+            return None
+        ident = (key.ap, key.sta)
+        ex = self._exchanges.get(ident)
+        if ex is None:
+            ex = self._exchanges[ident] = _Exchange()
+        rc = key.replay_counter
+        found: Optional[Handshake] = None
+        if key.message == 1:
+            ex.remember(ex.m1, key)
+            if ident not in self.pmkids:
+                self._record_pmkid(key)
+            m2 = ex.m2.get(rc)
+            if m2 is not None:
+                found = Handshake(key.nonce, m2, m2.nonce, MESSAGE_PAIR_M12E2)
+        elif key.message == 2:
+            ex.remember(ex.m2, key)
+            m1 = ex.m1.get(rc)
+            m3 = ex.m3.get(rc + 1)
+            if m1 is not None:
+                found = Handshake(m1.nonce, key, key.nonce, MESSAGE_PAIR_M12E2)
+            elif m3 is not None:
+                found = Handshake(m3.nonce, key, key.nonce, MESSAGE_PAIR_M32E2)
+        elif key.message == 3:
+            ex.remember(ex.m3, key)
+            m2 = ex.m2.get(rc - 1)
+            if m2 is not None:
+                found = Handshake(key.nonce, m2, m2.nonce, MESSAGE_PAIR_M32E2)
+        else:
+            m3 = ex.m3.get(rc)
+            if m3 is not None and key.nonce != ZERO_NONCE:
+                found = Handshake(m3.nonce, key, key.nonce, MESSAGE_PAIR_M34E4)
+        if found is None:
+            return None
+        return self._record(found)
+
+    def _record_pmkid(self, key: EapolKey) -> None:
+        value = extract_pmkid(key)
+        if value is None:
+            return
+        pmkid = Pmkid(key.ap, key.sta, value, key.timestamp)
+        self.pmkids[(key.ap, key.sta)] = pmkid
+        target = self.targets.get(key.ap)
+        if target is not None and target.pmkid is None:
+            target.pmkid = value
+        if self.on_pmkid is not None:
+            self.on_pmkid(pmkid)
+
+    def _record(self, handshake: Handshake) -> Optional[Handshake]:
+        ident = (handshake.ap, handshake.sta)
+        known = self.handshakes.get(ident)
+        # M1+M2 is the most reliable pair; keep it over any other
+        if known is not None and (
+            known.message_pair == MESSAGE_PAIR_M12E2
+            or handshake.message_pair != MESSAGE_PAIR_M12E2
+        ):
+            return None
+        self.handshakes[ident] = handshake
+        if known is not None:
+            return None
+        if self.cap_file is not None:
+            self.cap_file.handshakes = len(self.handshakes)
+        if self.on_handshake is not None:
+            self.on_handshake(handshake)
+        return handshake
+
+
+def find_handshakes(
+    path: str, bssid: Optional[str] = None, drop_retries: bool = True
+) -> List[Handshake]:
+    """
+    Returns the best handshake of every (AP, station) in a capture file.
+    Retransmitted frames are skipped unless "drop_retries" is False.
+    """
+    detector = HandshakeDetector(bssid=bssid)
+    with CaptureReader(path, _retry_stage(drop_retries)) as reader:
+        for frame in reader.frames():
+            detector.feed(frame)
+    return list(detector.handshakes.values())
+
+
+def wait_for_handshake(
+    path: str,
+    bssid: Optional[str] = None,
+    timeout: Optional[float] = None,
+    poll_interval: float = 0.01,
+    stop: Optional[Callable[[], bool]] = None,
+    cap_file: Optional[CapFile] = None,
+    accept_pmkid: bool = False,
+    targets: Optional[Iterable[Target]] = None,
+    drop_retries: bool = True,
+) -> Optional[Union[Handshake, Pmkid]]:
+    """
+    Follows a capture that is being written and returns as soon as it holds
+    a handshake (for "bssid" if given), or a PMKID when "accept_pmkid" is
+    set. Returns None on timeout or when "stop" returns True. Retransmitted
+    frames are skipped unless "drop_retries" is False.
+    """
+    pmkids: List[Pmkid] = []
+    detector = HandshakeDetector(
+        bssid=bssid,
+        cap_file=cap_file,
+        on_pmkid=pmkids.append if accept_pmkid else None,
+        targets=targets,
+    )
+    started = time.monotonic()
+    with CaptureReader(path, _retry_stage(drop_retries)) as reader:
+        for frame in reader.follow(poll_interval, timeout, stop):
+            found: Optional[Union[Handshake, Pmkid]] = detector.feed(frame)
+            if found is None and pmkids:
+                found = pmkids[0]
+            if found is not None:
+                kind = "PMKID" if isinstance(found, Pmkid) else "handshake"
+                logging.info(
+                    f"[wait_for_handshake] {kind} {found.ap} <-> "
+                    f"{found.sta} after {detector.frames} frames, "
+                    f"{time.monotonic() - started:.3f}s"
+                )
+                return found
+    return None
+
+
+def _retry_stage(drop_retries: bool) -> Optional[Callable[[Frame], bool]]:
+    return RetryFilter().accept if drop_retries else None
+
+
+def _hex_mac(mac: str) -> str:
+    return mac.replace(":", "").lower()
+
+
+def hashcat_pmkid_line(ap: str, sta: str, essid: bytes, pmkid: bytes) -> str:
+    """
+    Formats a PMKID as a hashcat mode 22000 line (WPA*01).
+    """
+    return "WPA*01*%s*%s*%s*%s***" % (
+        pmkid.hex(),
+        _hex_mac(ap),
+        _hex_mac(sta),
+        essid.hex(),
+    )
+
+
+def hashcat_eapol_line(handshake: Handshake, essid: bytes) -> str:
+    """
+    Formats a handshake as a hashcat mode 22000 line (WPA*02).
+    """
+    return "WPA*02*%s*%s*%s*%s*%s*%s*%02x" % (
+        handshake.mic.hex(),
+        _hex_mac(handshake.ap),
+        _hex_mac(handshake.sta),
+        essid.hex(),
+        handshake.anonce.hex(),
+        handshake.eapol.hex(),
+        handshake.message_pair,
+    )
+
+
+def capture_hash_lines(path: str) -> Tuple[List[str], int, int]:
+    """
+    Extracts every handshake and PMKID of a capture as 22000 lines.
+    Hashes of networks whose ESSID never appears in the capture are skipped,
+    since hashcat needs it as the PBKDF2 salt.
+    Returns:
+            tuple: (lines, frames read, hashes skipped for lack of an ESSID).
+    """
+    detector = HandshakeDetector()
+    essids: Dict[str, bytes] = {}
+    try:
+        with CaptureReader(path) as reader:
+            for frame in reader.frames():
+                detector.frames += 1
+                dot11 = parse_dot11(frame)
+                if dot11 is None:
+                    continue
+                if dot11.type == DOT11_MGMT:
+                    essid = frame_essid(dot11)
+                    if essid is not None:
+                        essids[mac_str(dot11.addr3)] = essid
+                    continue
+                key = parse_eapol_key(dot11, frame.timestamp)
+                if key is not None:
+                    detector.feed_key(key)
+    except (OSError, ValueError) as e:
+        logging.warning(f"[capture_hash_lines] Skipping {path}: {e}")
+    lines = []
+    skipped = 0
+    for (ap, sta), pmkid in detector.pmkids.items():
+        if ap in essids:
+            lines.append(hashcat_pmkid_line(ap, sta, essids[ap], pmkid.pmkid))
+        else:
+            skipped += 1
+    for handshake in detector.handshakes.values():
+        if handshake.ap in essids:
+            lines.append(hashcat_eapol_line(handshake, essids[handshake.ap]))
+        else:
+            skipped += 1
+    return lines, detector.frames, skipped
+
+
+class ExportStats:
+    """
+    Counters for an export_hashcat() run.
+    Attributes:
+            captures (int): Capture files processed.
+            frames (int): Frames read across all captures.
+            lines (int): Unique hash lines written.
+            duplicates (int): Hash lines dropped as duplicates.
+            skipped (int): Hashes dropped because their ESSID was unknown.
+            elapsed (float): Wall-clock seconds spent.
+    """
+
+    captures: int
+    frames: int
+    lines: int
+    duplicates: int
+    skipped: int
+    elapsed: float
+
+    def __init__(self) -> None:
+        self.captures = 0
+        self.frames = 0
+        self.lines = 0
+        self.duplicates = 0
+        self.skipped = 0
+        self.elapsed = 0.0
+
+    @property
+    def captures_per_sec(self) -> float:
+        return self.captures / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.captures} captures ({self.captures_per_sec:.1f}/s), "
+            f"{self.frames} frames, {self.lines} hashes written, "
+            f"{self.duplicates} duplicates, {self.skipped} without ESSID"
+        )
+
+
+def export_hashcat(
+    paths: Iterable[str], output: str, processes: Optional[int] = None
+) -> ExportStats:
+    """
+    Converts captures into a single deduplicated hashcat 22000 file.
+    Captures are parsed in a process pool ("processes" workers, CPU count by
+    default; 1 parses in-process) and lines are written as results arrive.
+    Returns:
+            ExportStats: Counters and throughput of the run.
+    """
+    paths = list(paths)
+    stats = ExportStats()
+    seen = set()
+    started = time.monotonic()
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = max(1, min(processes, len(paths) or 1))
+    executor = ProcessPoolExecutor(processes) if processes > 1 else None
+    try:
+        if executor is not None:
+            chunksize = max(1, len(paths) // (processes * 4))
+            results = executor.map(capture_hash_lines, paths, chunksize=chunksize)
+        else:
+            results = map(capture_hash_lines, paths)
+        with open(output, "w") as out:
+            for lines, frames, skipped in results:
+                stats.captures += 1
+                stats.frames += frames
+                stats.skipped += skipped
+                for line in lines:
+                    if line in seen:
+                        stats.duplicates += 1
+                        continue
+                    seen.add(line)
+                    out.write(line + "\n")
+                    stats.lines += 1
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    stats.elapsed = time.monotonic() - started
+    logging.info(f"[export_hashcat] {stats.summary()}")
+    return stats
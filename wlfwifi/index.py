@@ -0,0 +1,432 @@
+"""
+index.py
+--------
+Sidecar frame index for large capture files.
+
+One streaming pass over a capture records, for every frame, its file offset,
+captured length, timestamp, BSSID and frame type in a fixed-size binary
+sidecar ("<capture>.idx"). Later passes only index what was appended since,
+so the index can follow a capture that is still being written. Per-BSSID
+questions are then answered from the index, and only the matching frames
+are read from the capture through mmap.
+
+Functions and Classes:
+    IndexEntry: One indexed frame.
+    CaptureIndex: Builds, updates and queries the sidecar index of a capture.
+    index_handshakes: Handshakes of one AP, reading only its EAPOL frames.
+    index_wps_check_targets: Sets Target.wps / wps_locked from the index alone.
+"""
+
+import os
+import mmap
+import struct
+import logging
+import zlib
+from array import array
+from collections import namedtuple
+from typing import Dict, Iterator, List, Optional, Tuple
+from wlfwifi.capture import (
+    DOT11_MGMT,
+    FLAG_PROTECTED,
+    FLAG_RETRY,
+    PCAPNG_SPB,
+    CaptureReader,
+    Frame,
+    mac_str,
+    parse_dot11,
+    wps_info,
+)
+from wlfwifi.handshake import Handshake, HandshakeDetector, is_eapol
+from wlfwifi.models import Target
+
+INDEX_SUFFIX = ".idx"
+INDEX_MAGIC = b"WLFIDX\x01\x00"
+
+# magic, format, big endian, pcap link type, pcap ts divisor, indexed offset,
+# fingerprint length, fingerprint crc32
+_HEADER = struct.Struct("<8sBBxxIdQII")
+# offset, captured length, timestamp, bssid, kind, flags, link type
+_RECORD = struct.Struct("<QIdQBBH")
+
+_FORMATS = {None: 0, "pcap": 1, "pcapng": 2}
+_FORMAT_NAMES = {v: k for k, v in _FORMATS.items()}
+
+# Bytes of the capture start compared to detect a replaced file
+FINGERPRINT_LEN = 64
+
+# Entry kinds besides (type << 4 | subtype) of 802.11 frames
+KIND_OTHER = 0xFD
+KIND_SECTION = 0xFE
+KIND_INTERFACE = 0xFF
+
+# Entry flags
+ENTRY_EAPOL = 0x01
+ENTRY_RETRY = 0x02
+ENTRY_PROTECTED = 0x04
+ENTRY_WPS = 0x08
+ENTRY_WPS_LOCKED = 0x10
+
+IndexEntry = namedtuple(
+    "IndexEntry", "offset caplen timestamp bssid kind flags linktype"
+)
+
+
+def mac_to_int(mac: str) -> int:
+    """
+    Converts "AA:BB:CC:DD:EE:FF" to the integer stored in index entries.
+    """
+    return int(mac.replace(":", "").replace("-", ""), 16)
+
+
+def kind_of(frame_type: int, subtype: int) -> int:
+    """
+    Returns the index entry kind of an 802.11 frame type and subtype.
+    """
+    return (frame_type << 4) | subtype
+
+
+def _classify(frame: Frame) -> Tuple[int, int, int]:
+    dot11 = parse_dot11(frame)
+    if dot11 is None:
+        return 0, KIND_OTHER, 0
+    bssid = dot11.bssid
+    flags = 0
+    if dot11.flags & FLAG_RETRY:
+        flags |= ENTRY_RETRY
+    if dot11.flags & FLAG_PROTECTED:
+        flags |= ENTRY_PROTECTED
+    elif is_eapol(dot11):
+        flags |= ENTRY_EAPOL
+    elif dot11.type == DOT11_MGMT:
+        locked = wps_info(dot11)
+        if locked is not None:
+            flags |= ENTRY_WPS | (ENTRY_WPS_LOCKED if locked else 0)
+    return (
+        int.from_bytes(bssid, "big") if bssid is not None else 0,
+        kind_of(dot11.type, dot11.subtype),
+        flags,
+    )
+
+
+class CaptureIndex:
+    """
+    Sidecar index of a pcap/pcapng capture.
+    Call update() to index frames appended since the last call; the sidecar
+    is extended in place and reused across sessions as long as the capture
+    it describes was not replaced.
+    Attributes:
+            cap_path (str): The indexed capture file.
+            index_path (str): The sidecar file (cap_path + ".idx" by default).
+            indexed (int): Capture offset up to which frames are indexed.
+    """
+
+    cap_path: str
+    index_path: str
+    indexed: int
+
+    def __init__(self, cap_path: str, index_path: Optional[str] = None) -> None:
+        self.cap_path = cap_path
+        self.index_path = index_path or cap_path + INDEX_SUFFIX
+        self.indexed = 0
+        self._format: Optional[str] = None
+        self._big_endian = False
+        self._linktype = 0
+        self._ts_div = 1e6
+        self._frames = 0
+        self._interfaces: List[Tuple[int, float]] = []
+        self._by_bssid: Dict[int, array] = {}
+        self._kinds: array = array("B")
+        self._flags: array = array("B")
+        self._index_map: Optional[mmap.mmap] = None
+        self._cap_file = None
+        self._cap_map: Optional[mmap.mmap] = None
+        self._load()
+
+    def __enter__(self) -> "CaptureIndex":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        """Number of indexed frames."""
+        return self._frames
+
+    def close(self) -> None:
+        for handle in (self._index_map, self._cap_map, self._cap_file):
+            if handle is not None:
+                handle.close()
+        self._index_map = self._cap_map = self._cap_file = None
+
+    def _fingerprint(self, length: int) -> int:
+        with open(self.cap_path, "rb") as f:
+            return zlib.crc32(f.read(length))
+
+    def _reset(self) -> None:
+        self.close()
+        self.indexed = 0
+        self._format = None
+        self._frames = 0
+        self._interfaces = []
+        self._by_bssid = {}
+        self._kinds = array("B")
+        self._flags = array("B")
+        with open(self.index_path, "wb") as f:
+            f.write(self._header(0, 0))
+
+    def _header(self, fp_len: int, fp_crc: int) -> bytes:
+        return _HEADER.pack(
+            INDEX_MAGIC,
+            _FORMATS[self._format],
+            self._big_endian,
+            self._linktype,
+            self._ts_div,
+            self.indexed,
+            fp_len,
+            fp_crc,
+        )
+
+    def _load(self) -> None:
+        if not os.path.exists(self.index_path):
+            self._reset()
+            return
+        with open(self.index_path, "rb") as f:
+            header = f.read(_HEADER.size)
+        try:
+            magic, fmt, big, linktype, ts_div, indexed, fp_len, fp_crc = _HEADER.unpack(
+                header
+            )
+        except struct.error:
+            magic = b""
+        cap_size = (
+            os.path.getsize(self.cap_path) if os.path.exists(self.cap_path) else 0
+        )
+        if (
+            magic != INDEX_MAGIC
+            or indexed > cap_size
+            or (fp_len and self._fingerprint(fp_len) != fp_crc)
+        ):
+            logging.info(f"[CaptureIndex] Rebuilding stale index {self.index_path}")
+            self._reset()
+            return
+        self._format = _FORMAT_NAMES.get(fmt)
+        self._big_endian = bool(big)
+        self._linktype = linktype
+        self._ts_div = ts_div
+        self.indexed = indexed
+        size = os.path.getsize(self.index_path)
+        count = (size - _HEADER.size) // _RECORD.size
+        if count == 0:
+            return
+        with open(self.index_path, "rb") as f:
+            f.seek(_HEADER.size)
+            data = f.read(count * _RECORD.size)
+        for record in _RECORD.iter_unpack(data):
+            # Records past the committed offset come from an interrupted update
+            if record[0] >= indexed:
+                break
+            self._add(IndexEntry(*record))
+        if len(self._kinds) < count:
+            with open(self.index_path, "r+b") as f:
+                f.truncate(_HEADER.size + len(self._kinds) * _RECORD.size)
+
+    def _add(self, entry: IndexEntry) -> None:
+        position = len(self._kinds)
+        self._kinds.append(entry.kind)
+        self._flags.append(entry.flags)
+        if entry.kind == KIND_SECTION:
+            self._interfaces = []
+            return
+        if entry.kind == KIND_INTERFACE:
+            self._interfaces.append((entry.linktype, entry.timestamp))
+            return
+        self._frames += 1
+        postings = self._by_bssid.get(entry.bssid)
+        if postings is None:
+            postings = self._by_bssid[entry.bssid] = array("I")
+        postings.append(position)
+
+    def update(self) -> int:
+        """
+        Indexes frames appended to the capture since the last update.
+        Returns:
+                int: Number of frames added to the index.
+        Raises:
+                ValueError: If the capture is neither pcap nor pcapng.
+        """
+        if not os.path.exists(self.cap_path):
+            return 0
+        if os.path.getsize(self.cap_path) < self.indexed:
+            self._reset()
+        before = len(self)
+        records: List[IndexEntry] = []
+        end = self.indexed
+        with CaptureReader(self.cap_path) as reader:
+            if self.indexed:
+                if not reader.resume(self.indexed, self._interfaces):
+                    return 0
+            known = list(self._interfaces)
+            for frame in reader.frames():
+                if reader.interfaces != known:
+                    records.extend(self._interface_records(known, reader, frame))
+                    known = reader.interfaces
+                bssid, kind, flags = _classify(frame)
+                records.append(
+                    IndexEntry(
+                        frame.offset,
+                        len(frame.data),
+                        frame.timestamp,
+                        bssid,
+                        kind,
+                        flags,
+                        frame.linktype,
+                    )
+                )
+                # Stop after the last frame: trailing pcapng interface blocks
+                # are read again next time, together with the frames they describe
+                end = reader.offset
+            if self._format is None:
+                self._format = reader.format
+                self._big_endian = reader._endian == ">"
+                self._linktype = reader._linktype
+                self._ts_div = reader._ts_div
+        if end == self.indexed:
+            return 0
+        for entry in records:
+            self._add(entry)
+        packed = b"".join(_RECORD.pack(*entry) for entry in records)
+        with open(self.index_path, "r+b") as f:
+            f.seek(0, os.SEEK_END)
+            f.write(packed)
+            f.flush()
+            os.fsync(f.fileno())
+            # The header is committed last so a crash leaves a usable index
+            self.indexed = end
+            fp_len = min(FINGERPRINT_LEN, end)
+            f.seek(0)
+            f.write(self._header(fp_len, self._fingerprint(fp_len)))
+        if self._index_map is not None:
+            self._index_map.close()
+            self._index_map = None
+        # The capture is mapped again, at its new size, on the next read
+        for handle in (self._cap_map, self._cap_file):
+            if handle is not None:
+                handle.close()
+        self._cap_map = self._cap_file = None
+        added = len(self) - before
+        logging.debug(f"[CaptureIndex] {self.cap_path}: +{added} frames indexed")
+        return added
+
+    def _interface_records(
+        self, known: List[Tuple[int, float]], reader: CaptureReader, frame: Frame
+    ) -> List[IndexEntry]:
+        # Interface tables are stored as entries so update() can resume pcapng
+        current = reader.interfaces
+        out = []
+        if current[: len(known)] != known:
+            out.append(IndexEntry(frame.offset, 0, 0.0, 0, KIND_SECTION, 0, 0))
+            known = []
+        for linktype, resolution in current[len(known) :]:
+            out.append(
+                IndexEntry(frame.offset, 0, resolution, 0, KIND_INTERFACE, 0, linktype)
+            )
+        return out
+
+    def _entry_map(self) -> mmap.mmap:
+        if self._index_map is None:
+            with open(self.index_path, "rb") as f:
+                self._index_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._index_map
+
+    def _capture_map(self) -> mmap.mmap:
+        if self._cap_map is None:
+            self._cap_file = open(self.cap_path, "rb")
+            self._cap_map = mmap.mmap(
+                self._cap_file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        return self._cap_map
+
+    def _entry(self, record_number: int) -> IndexEntry:
+        return IndexEntry(
+            *_RECORD.unpack_from(
+                self._entry_map(), _HEADER.size + record_number * _RECORD.size
+            )
+        )
+
+    def _positions(
+        self,
+        bssid: Optional[str],
+        kind: Optional[int],
+        flags: int,
+    ) -> Iterator[int]:
+        kinds, all_flags = self._kinds, self._flags
+        if bssid is not None:
+            candidates = self._by_bssid.get(mac_to_int(bssid), array("I"))
+        else:
+            candidates = (i for i, k in enumerate(kinds) if k < KIND_SECTION)
+        for position in candidates:
+            if kind is not None and kinds[position] != kind:
+                continue
+            if flags and all_flags[position] & flags != flags:
+                continue
+            yield position
+
+    def entries(
+        self, bssid: Optional[str] = None, kind: Optional[int] = None, flags: int = 0
+    ) -> Iterator[IndexEntry]:
+        """
+        Yields index entries matching a BSSID, an entry kind (see kind_of)
+        and/or entry flags (all of them must be set), in capture order.
+        """
+        for position in self._positions(bssid, kind, flags):
+            yield self._entry(position)
+
+    def frames(
+        self, bssid: Optional[str] = None, kind: Optional[int] = None, flags: int = 0
+    ) -> Iterator[Frame]:
+        """
+        Reads the frames matching entries() from the capture via mmap.
+        """
+        endian = ">" if self._big_endian else "<"
+        for entry in self.entries(bssid, kind, flags):
+            yield Frame(
+                entry.timestamp,
+                entry.linktype,
+                self._record_data(self._capture_map(), entry, endian),
+                entry.offset,
+            )
+
+    def _record_data(self, mm: mmap.mmap, entry: IndexEntry, endian: str) -> bytes:
+        offset = entry.offset
+        if self._format == "pcap":
+            return mm[offset + 16 : offset + 16 + entry.caplen]
+        block_type = struct.unpack_from(endian + "I", mm, offset)[0]
+        if block_type == PCAPNG_SPB:
+            return mm[offset + 12 : offset + 12 + entry.caplen]
+        return mm[offset + 28 : offset + 28 + entry.caplen]
+
+    def bssids(self) -> List[str]:
+        """BSSIDs with at least one indexed frame."""
+        return [mac_str(b.to_bytes(6, "big")) for b in self._by_bssid if b]
+
+
+def index_handshakes(index: CaptureIndex, bssid: str) -> List[Handshake]:
+    """
+    Finds the handshakes of one AP by reading only its EAPOL frames.
+    """
+    detector = HandshakeDetector(bssid=bssid)
+    for frame in index.frames(bssid=bssid, flags=ENTRY_EAPOL):
+        detector.feed(frame)
+    return list(detector.handshakes.values())
+
+
+def index_wps_check_targets(targets: List[Target], index: CaptureIndex) -> None:
+    """
+    Sets Target.wps and Target.wps_locked from the flags recorded in the
+    index, without reading the capture or running tshark.
+    """
+    for target in targets:
+        entries = list(index._positions(target.bssid, None, ENTRY_WPS))
+        target.wps = bool(entries)
+        if entries:
+            target.wps_locked = bool(index._flags[entries[-1]] & ENTRY_WPS_LOCKED)
@@ -0,0 +1,153 @@
+"""
+merge.py
+--------
+Merging of several capture files into one, ordered by timestamp.
+
+Inputs are read as streams and combined with a heap-based k-way merge, so
+memory use depends on the number of inputs, not their size. Frames captured
+by more than one card are written once: a frame is a duplicate when its
+transmitter address, sequence control field and 802.11 contents match a
+frame seen less than "window" seconds earlier.
+
+Functions and Classes:
+    MergeStats: Counters for a merge_captures() run.
+    merge_captures: Merges pcap/pcapng files into a single capture.
+"""
+
+import time
+import heapq
+import logging
+import zlib
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional, Tuple
+from wlfwifi.capture import (
+    DOT11_CTRL,
+    LINKTYPE_IEEE802_11_RADIOTAP,
+    Frame,
+    iter_frames,
+    open_writer,
+    parse_dot11,
+)
+
+# Default duplicate window: clocks of cards on one host agree far better
+DEFAULT_WINDOW = 0.05
+
+DuplicateKey = Tuple[bytes, int, int]
+
+
+class MergeStats:
+    """
+    Counters for a merge_captures() run.
+    Attributes:
+            inputs (int): Capture files merged.
+            frames (int): Frames read across all inputs.
+            written (int): Frames written to the output.
+            duplicates (int): Frames dropped as seen by another card.
+            skipped (int): Frames dropped because the output link type differs.
+            bytes_written (int): Size of the output file.
+            elapsed (float): Wall-clock seconds spent.
+    """
+
+    inputs: int
+    frames: int
+    written: int
+    duplicates: int
+    skipped: int
+    bytes_written: int
+    elapsed: float
+
+    def __init__(self) -> None:
+        self.inputs = 0
+        self.frames = 0
+        self.written = 0
+        self.duplicates = 0
+        self.skipped = 0
+        self.bytes_written = 0
+        self.elapsed = 0.0
+
+    @property
+    def frames_per_sec(self) -> float:
+        return self.frames / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.inputs} inputs, {self.frames} frames "
+            f"({self.frames_per_sec:.0f}/s), {self.written} written, "
+            f"{self.duplicates} duplicates, {self.skipped} skipped"
+        )
+
+
+def _duplicate_key(frame: Frame) -> Optional[DuplicateKey]:
+    # Control frames carry no sequence number and are never deduplicated
+    dot11 = parse_dot11(frame)
+    if dot11 is None or dot11.type == DOT11_CTRL:
+        return None
+    return dot11.addr2, dot11.seq, zlib.crc32(dot11.data)
+
+
+def merge_captures(
+    paths: Iterable[str],
+    output: str,
+    window: float = DEFAULT_WINDOW,
+    dedup: bool = True,
+) -> MergeStats:
+    """
+    Merges captures into "output" in timestamp order.
+    Each input is expected to be in timestamp order itself, as written by
+    airodump-ng. The output is pcapng for "*.pcapng" paths and pcap
+    otherwise; a pcap output takes the link type of the first frame.
+    Args:
+            paths: Input pcap/pcapng files.
+            output: File to write.
+            window: Seconds within which a repeated frame is a duplicate.
+            dedup: False keeps every frame.
+    Raises:
+            ValueError: If an input is neither pcap nor pcapng.
+    """
+    paths = list(paths)
+    stats = MergeStats()
+    stats.inputs = len(paths)
+    started = time.monotonic()
+    merged = heapq.merge(
+        *(iter_frames(path) for path in paths), key=lambda f: f.timestamp
+    )
+    # Keys of the frames written within the last "window" seconds, oldest first
+    recent: Dict[DuplicateKey, float] = {}
+    expiry: Deque[Tuple[float, DuplicateKey]] = deque()
+    writer = None
+    try:
+        for frame in merged:
+            stats.frames += 1
+            if dedup:
+                key = _duplicate_key(frame)
+                if key is not None:
+                    horizon = frame.timestamp - window
+                    while expiry and expiry[0][0] < horizon:
+                        old_ts, old_key = expiry.popleft()
+                        if recent.get(old_key) == old_ts:
+                            del recent[old_key]
+                    if key in recent:
+                        stats.duplicates += 1
+                        continue
+                    recent[key] = frame.timestamp
+                    expiry.append((frame.timestamp, key))
+            if writer is None:
+                writer = open_writer(output, frame.linktype)
+            if not writer.accepts(frame.linktype):
+                if not stats.skipped:
+                    logging.warning(
+                        f"[merge_captures] {output}: dropping frames with link "
+                        f"type {frame.linktype}; write a .pcapng to keep them"
+                    )
+                stats.skipped += 1
+                continue
+            writer.write(frame)
+            stats.written += 1
+    finally:
+        if writer is None:
+            writer = open_writer(output, LINKTYPE_IEEE802_11_RADIOTAP)
+        writer.close()
+    stats.bytes_written = writer.bytes_written
+    stats.elapsed = time.monotonic() - started
+    logging.info(f"[merge_captures] {stats.summary()}")
+    return stats
@@ -9,6 +9,8 @@ Classes:
         CapFile: Represents a capture file containing handshake or packet data.
 """
 
+from typing import Optional
+
 
 class Target:
     """
@@ -19,6 +21,12 @@ class Target:
             channel (int): The channel the target is operating on.
             encryption (str): The encryption type (WEP, WPA, WPA2, etc.).
             wps (bool): Whether WPS is enabled.
+            power (int): Last observed signal strength in dBm (0 if unknown).
+            clients (int): Number of clients seen associated with the target.
+            last_client_seen (float): Epoch time of the last client activity.
+            wps_locked (bool): Whether the AP reports WPS setup as locked.
+            attempts (int): Number of attacks already run against the target.
+            pmkid (bytes): PMKID captured from the AP, if any.
     """
 
     bssid: str
@@ -26,15 +34,37 @@ class Target:
     channel: int
     encryption: str
     wps: bool
+    power: int
+    clients: int
+    last_client_seen: float
+    wps_locked: bool
+    attempts: int
+    pmkid: Optional[bytes]
 
     def __init__(
-        self, bssid: str, essid: str, channel: int, encryption: str, wps: bool
+        self,
+        bssid: str,
+        essid: str,
+        channel: int,
+        encryption: str,
+        wps: bool,
+        power: int = 0,
+        clients: int = 0,
+        last_client_seen: float = 0.0,
+        wps_locked: bool = False,
+        attempts: int = 0,
     ) -> None:
         self.bssid = bssid
         self.essid = essid
         self.channel = channel
         self.encryption = encryption
         self.wps = wps
+        self.power = power
+        self.clients = clients
+        self.last_client_seen = last_client_seen
+        self.wps_locked = wps_locked
+        self.attempts = attempts
+        self.pmkid = None
 
 
 class Client:
@@ -0,0 +1,238 @@
+"""
+plugins.py
+----------
+Registry of attack types, built in and from installed plugins.
+
+An attack type is described by an AttackSpec: its name, the encryption
+it applies to, the external tools it needs or can use, and the
+"module:Class" path of its Attack subclass. Only the spec is read when
+the registry is built; the module holding the attack is imported the
+first time the attack is used, so installed plugins cost nothing until
+then.
+
+Plugins advertise their specs through the "wlfwifi.attacks" entry point
+group, each entry naming an AttackSpec in a module kept free of heavy
+imports, e.g. in the plugin's pyproject.toml:
+
+    [project.entry-points."wlfwifi.attacks"]
+    pmkid = "wlfwifi_pmkid.spec:SPEC"
+
+Entry points are read with importlib.metadata, or the importlib_metadata
+backport on Python 3.7; without either only built-in attacks are listed.
+
+Functions and Classes:
+    AttackSpec: Metadata of an attack type and lazy access to its class.
+    AttackRegistry: Attack specs by name.
+    registry: Builds the registry of built-in and plugin attacks.
+"""
+
+import logging
+import importlib
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Type
+from wlfwifi.utils import program_exists
+
+try:
+    from importlib.metadata import entry_points
+except ImportError:  # pragma: no cover - Python 3.7
+    try:
+        from importlib_metadata import entry_points
+    except ImportError:
+        entry_points = None
+
+ENTRY_POINT_GROUP = "wlfwifi.attacks"
+
+
+class AttackSpec:
+    """
+    Metadata of an attack type and lazy access to its class.
+    Attributes:
+            name (str): Unique name of the attack, e.g. "wps".
+            target (str): "module:Class" path of the Attack subclass.
+            encryption (tuple): Encryption types it applies to, matched
+                    as prefixes of Target.encryption ("WPA" covers "WPA2").
+            tools (tuple): External programs it needs.
+            description (str): One line for listings.
+            optional_tools (tuple): External programs it uses when they are
+                    installed but runs without.
+    """
+
+    name: str
+    target: str
+    encryption: Sequence[str]
+    tools: Sequence[str]
+    description: str
+    optional_tools: Sequence[str]
+
+    def __init__(
+        self,
+        name: str,
+        target: str,
+        encryption: Sequence[str] = (),
+        tools: Sequence[str] = (),
+        description: str = "",
+        optional_tools: Sequence[str] = (),
+    ) -> None:
+        if ":" not in target:
+            raise ValueError(f"attack path must be module:Class, got {target!r}")
+        self.name = name
+        self.target = target
+        self.encryption = tuple(e.upper() for e in encryption)
+        self.tools = tuple(tools)
+        self.description = description
+        self.optional_tools = tuple(optional_tools)
+        self._cls: Optional[Type[Any]] = None
+
+    def __repr__(self) -> str:
+        return f"<AttackSpec {self.name} {self.target}>"
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the attack's module has been imported."""
+        return self._cls is not None
+
+    def supports(self, encryption: str) -> bool:
+        """Whether the attack applies to networks with this encryption."""
+        encryption = encryption.upper()
+        return any(encryption.startswith(e) for e in self.encryption)
+
+    def missing_tools(self, optional: bool = False) -> List[str]:
+        """
+        The required programs that are not installed, or with "optional"
+        the optional ones.
+        """
+        tools = self.optional_tools if optional else self.tools
+        return [tool for tool in tools if not program_exists(tool)]
+
+    def load(self) -> Type[Any]:
+        """
+        Imports the attack's module on first use.
+        Returns:
+                type: The Attack subclass.
+        """
+        if self._cls is None:
+            # Imported here: importing attacks at module level would load
+            # every built-in attack with the registry
+            from wlfwifi.attacks import Attack
+
+            module, _, attr = self.target.partition(":")
+            cls: Any = importlib.import_module(module)
+            for part in attr.split("."):
+                cls = getattr(cls, part)
+            if not (isinstance(cls, type) and issubclass(cls, Attack)):
+                raise TypeError(f"{self.target} is not an Attack subclass")
+            self._cls = cls
+        return self._cls
+
+    def create(self, *args: Any, **kwargs: Any) -> Any:
+        """Loads the attack and instantiates it with the given arguments."""
+        return self.load()(*args, **kwargs)
+
+
+BUILTIN_ATTACKS = (
+    AttackSpec(
+        "wpa",
+        "wlfwifi.attacks:WPAAttack",
+        ("WPA",),
+        (),
+        "Capture a WPA handshake or PMKID, deauthenticating clients",
+        ("aireplay-ng",),
+    ),
+    AttackSpec(
+        "wep",
+        "wlfwifi.attacks:WEPAttack",
+        ("WEP",),
+        ("aircrack-ng",),
+        "Crack the WEP key once enough unique IVs are captured",
+    ),
+    AttackSpec(
+        "wps",
+        "wlfwifi.attacks:WPSAttack",
+        ("WPA",),
+        ("reaver",),
+        "Brute-force the WPS PIN with reaver",
+    ),
+)
+
+
+class AttackRegistry:
+    """
+    Attack specs by name, in registration order.
+    """
+
+    def __init__(self, specs: Sequence[AttackSpec] = ()) -> None:
+        self._specs: Dict[str, AttackSpec] = {}
+        for spec in specs:
+            self.register(spec)
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def __iter__(self) -> Iterator[AttackSpec]:
+        return iter(self._specs.values())
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._specs
+
+    def register(self, spec: AttackSpec) -> None:
+        """Adds "spec"; a name already registered raises ValueError."""
+        if spec.name in self._specs:
+            raise ValueError(f"attack {spec.name!r} is already registered")
+        self._specs[spec.name] = spec
+
+    def get(self, name: str) -> AttackSpec:
+        """The spec named "name"; KeyError if there is none."""
+        try:
+            return self._specs[name]
+        except KeyError:
+            raise KeyError(f"unknown attack: {name}") from None
+
+    def load(self, name: str) -> Type[Any]:
+        """The Attack subclass named "name", imported on first use."""
+        return self.get(name).load()
+
+    def for_encryption(self, encryption: str) -> List[AttackSpec]:
+        """The specs of attacks applying to "encryption"."""
+        return [spec for spec in self if spec.supports(encryption)]
+
+    def discover(self, group: str = ENTRY_POINT_GROUP) -> int:
+        """
+        Registers the specs advertised by installed plugins in "group".
+        Plugins that fail to load or clash with a registered name are
+        logged and skipped.
+        Returns:
+                int: The number of specs registered.
+        """
+        found = 0
+        for ep in _entry_points(group):
+            try:
+                spec = ep.load()
+                if not isinstance(spec, AttackSpec):
+                    raise TypeError(f"{ep.value} is not an AttackSpec")
+                self.register(spec)
+            except Exception as e:
+                logging.warning(f"[AttackRegistry] Skipping plugin {ep.name}: {e}")
+                continue
+            found += 1
+        return found
+
+
+def _entry_points(group: str) -> List[Any]:
+    if entry_points is None:
+        return []
+    eps = entry_points()
+    if hasattr(eps, "select"):
+        return list(eps.select(group=group))
+    # Python 3.8/3.9: a dict of lists by group
+    return list(eps.get(group, ()))
+
+
+def registry(plugins: bool = True) -> AttackRegistry:
+    """
+    Builds the registry of built-in attacks, and those of installed
+    plugins unless "plugins" is False. Attack modules are not imported
+    until an attack is loaded.
+    """
+    result = AttackRegistry(BUILTIN_ATTACKS)
+    if plugins:
+        result.discover()
+    return result
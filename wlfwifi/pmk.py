@@ -0,0 +1,228 @@
+"""
+pmk.py
+------
+On-disk cache of pairwise master keys per ESSID.
+
+A PMK depends only on the ESSID and the passphrase, and deriving it (4096
+rounds of PBKDF2-HMAC-SHA1) is the expensive part of WPA cracking. PmkCache
+stores PMKs in an SQLite table keyed by (ESSID, passphrase), so networks
+that share an ESSID across sites and visits are attacked from the stored
+PMKs with only the cheap per-handshake MIC or PMKID check. The cache is
+filled by precompute_pmks(), which derives the missing PMKs of a wordlist
+in a process pool.
+
+Functions and Classes:
+    PmkCache: SQLite store of PMKs keyed by (ESSID, passphrase).
+    PrecomputeStats: Counters of a precompute_pmks() run.
+    precompute_pmks: Derives and stores the PMKs of a wordlist for an ESSID.
+"""
+
+import os
+import time
+import sqlite3
+import logging
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+from wlfwifi.crack import DEFAULT_CHUNK
+from wlfwifi.wordlist import WordlistReader
+from wlfwifi.wpa import CrackMaterial, pmk
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pmk (
+    essid BLOB NOT NULL,
+    passphrase BLOB NOT NULL,
+    pmk BLOB NOT NULL,
+    PRIMARY KEY (essid, passphrase)
+) WITHOUT ROWID
+"""
+
+
+class PmkCache:
+    """
+    PMKs stored in an SQLite database. Lookups by (ESSID, passphrase) and
+    scans of one ESSID both use the primary key index.
+    Attributes:
+            path (str): The database file.
+    """
+
+    path: str
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(_SCHEMA)
+        self._db.commit()
+
+    def __enter__(self) -> "PmkCache":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def get(self, essid: bytes, passphrase: bytes) -> Optional[bytes]:
+        row = self._db.execute(
+            "SELECT pmk FROM pmk WHERE essid = ? AND passphrase = ?",
+            (essid, passphrase),
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def missing(self, essid: bytes, passphrases: Iterable[bytes]) -> List[bytes]:
+        """The passphrases that have no PMK stored for "essid"."""
+        query = "SELECT 1 FROM pmk WHERE essid = ? AND passphrase = ?"
+        return [
+            p
+            for p in passphrases
+            if self._db.execute(query, (essid, p)).fetchone() is None
+        ]
+
+    def add(self, essid: bytes, entries: Iterable[Tuple[bytes, bytes]]) -> int:
+        """
+        Stores (passphrase, PMK) pairs in one transaction.
+        Returns:
+                int: Number of new entries.
+        """
+        before = self._db.total_changes
+        with self._db:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO pmk (essid, passphrase, pmk) VALUES (?, ?, ?)",
+                ((essid, p, k) for p, k in entries),
+            )
+        return self._db.total_changes - before
+
+    def count(self, essid: Optional[bytes] = None) -> int:
+        if essid is None:
+            return self._db.execute("SELECT COUNT(*) FROM pmk").fetchone()[0]
+        return self._db.execute(
+            "SELECT COUNT(*) FROM pmk WHERE essid = ?", (essid,)
+        ).fetchone()[0]
+
+    def essids(self) -> List[bytes]:
+        return [r[0] for r in self._db.execute("SELECT DISTINCT essid FROM pmk")]
+
+    def pmks(self, essid: bytes) -> Iterator[Tuple[bytes, bytes]]:
+        """Yields the (passphrase, PMK) pairs stored for "essid"."""
+        cursor = self._db.execute(
+            "SELECT passphrase, pmk FROM pmk WHERE essid = ?", (essid,)
+        )
+        yield from cursor
+
+    def find(self, material: CrackMaterial) -> Optional[bytes]:
+        """
+        Tests every PMK stored for the ESSID of "material" against its
+        handshakes and PMKIDs.
+        Returns:
+                bytes: The matching passphrase, or None.
+        """
+        if material.essid is None or not material.checks:
+            return None
+        tried = 0
+        for passphrase, key in self.pmks(material.essid):
+            tried += 1
+            if material.matches(key):
+                logging.info(
+                    f"[PmkCache] {material.bssid} cracked from {tried} cached PMKs"
+                )
+                return passphrase
+        logging.info(f"[PmkCache] {material.bssid}: none of {tried} cached PMKs match")
+        return None
+
+
+class PrecomputeStats:
+    """
+    Counters for a precompute_pmks() run.
+    Attributes:
+            candidates (int): Wordlist candidates read.
+            cached (int): Candidates whose PMK was already stored.
+            computed (int): PMKs derived and stored.
+            processes (int): Workers used.
+            elapsed (float): Wall-clock seconds spent.
+    """
+
+    candidates: int
+    cached: int
+    computed: int
+    processes: int
+    elapsed: float
+
+    def __init__(self) -> None:
+        self.candidates = 0
+        self.cached = 0
+        self.computed = 0
+        self.processes = 0
+        self.elapsed = 0.0
+
+    @property
+    def pmks_per_sec(self) -> float:
+        return self.computed / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.candidates} candidates, {self.computed} PMKs computed "
+            f"({self.pmks_per_sec:.0f}/s on {self.processes} workers), "
+            f"{self.cached} already cached"
+        )
+
+
+def _derive(essid: bytes, passphrases: List[bytes]) -> List[Tuple[bytes, bytes]]:
+    return [(p, pmk(p, essid)) for p in passphrases]
+
+
+def precompute_pmks(
+    cache_path: str,
+    essid: bytes,
+    wordlist: str,
+    processes: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK,
+) -> PrecomputeStats:
+    """
+    Derives the PMKs of every candidate of "wordlist" for "essid" that the
+    cache does not hold yet, in a process pool ("processes" workers, CPU
+    count by default; 1 derives them in-process) with at most two chunks
+    queued per worker. Each finished chunk is committed, so an interrupted
+    run keeps what it computed.
+    Returns:
+            PrecomputeStats: Counters of the run.
+    """
+    stats = PrecomputeStats()
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = max(1, processes)
+    stats.processes = processes
+    started = time.monotonic()
+    executor = ProcessPoolExecutor(processes) if processes > 1 else None
+    pending: Set[Future] = set()
+    with PmkCache(cache_path) as cache, WordlistReader(wordlist) as reader:
+        try:
+            for chunk in reader.chunks(chunk_size):
+                stats.candidates += len(chunk)
+                todo = cache.missing(essid, chunk)
+                stats.cached += len(chunk) - len(todo)
+                if not todo:
+                    continue
+                if executor is None:
+                    stats.computed += cache.add(essid, _derive(essid, todo))
+                    continue
+                pending.add(executor.submit(_derive, essid, todo))
+                if len(pending) < processes * 2:
+                    continue
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stats.computed += cache.add(essid, future.result())
+            for future in pending:
+                stats.computed += cache.add(essid, future.result())
+            pending = set()
+        finally:
+            for future in pending:
+                future.cancel()
+            if executor is not None:
+                executor.shutdown(wait=True)
+    stats.elapsed = time.monotonic() - started
+    logging.info(f"[precompute_pmks] {essid!r}: {stats.summary()}")
+    return stats
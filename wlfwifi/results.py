@@ -0,0 +1,160 @@
+"""
+results.py
+----------
+Persistent store of cracked networks.
+
+ResultStore records every key found, with the method that found it and
+how long it took, in an SQLite table keyed by (BSSID, ESSID, handshake
+digest). The table is small, so it is also held in memory when the store
+is opened: looking up a handshake, or whether a network has been cracked
+at all, is a dictionary lookup. AttackEngine uses the store to skip
+networks that are already solved and records the keys its attacks return
+(WEP, WPS); wpa_crack() records its keys there too, and re-verifies the
+stored key of a network against a new handshake before running a wordlist.
+
+Functions and Classes:
+    CrackResult: A key found for one handshake of a network.
+    ResultStore: SQLite store of CrackResults with in-memory lookups.
+"""
+
+import time
+import sqlite3
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# How a key was found, besides the crack engines
+METHOD_PMK_CACHE = "pmk-cache"
+METHOD_KNOWN_KEY = "known-key"
+METHOD_STORED = "stored"
+METHOD_WEP = "wep"
+METHOD_WPS = "wps"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    bssid TEXT NOT NULL,
+    essid TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    key TEXT NOT NULL,
+    method TEXT NOT NULL,
+    elapsed REAL NOT NULL,
+    cracked_at REAL NOT NULL,
+    PRIMARY KEY (bssid, essid, digest)
+) WITHOUT ROWID
+"""
+
+
+class CrackResult:
+    """
+    A key found for one handshake of a network.
+    Attributes:
+            bssid (str): Upper-case BSSID.
+            essid (str): ESSID of the network, "" if unknown.
+            digest (str): handshake_digest() of the cracked handshakes.
+            key (str): The passphrase.
+            method (str): What found it: a crack engine, "pmk-cache",
+                    "known-key", "stored", "wep" or "wps".
+            elapsed (float): Seconds the crack took.
+            cracked_at (float): Epoch time the key was found.
+    """
+
+    bssid: str
+    essid: str
+    digest: str
+    key: str
+    method: str
+    elapsed: float
+    cracked_at: float
+
+    def __init__(
+        self,
+        bssid: str,
+        essid: str,
+        digest: str,
+        key: str,
+        method: str,
+        elapsed: float = 0.0,
+        cracked_at: Optional[float] = None,
+    ) -> None:
+        self.bssid = bssid.upper()
+        self.essid = essid
+        self.digest = digest
+        self.key = key
+        self.method = method
+        self.elapsed = elapsed
+        self.cracked_at = time.time() if cracked_at is None else cracked_at
+
+    def __repr__(self) -> str:
+        return f"<CrackResult {self.bssid} {self.essid!r} by {self.method}>"
+
+
+class ResultStore:
+    """
+    Cracked networks stored in an SQLite database and indexed in memory.
+    Attributes:
+            path (str): The database file.
+    """
+
+    path: str
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(_SCHEMA)
+        self._db.commit()
+        self._results: Dict[Tuple[str, str, str], CrackResult] = {}
+        # Latest result per (BSSID, ESSID)
+        self._networks: Dict[Tuple[str, str], CrackResult] = {}
+        rows = self._db.execute("SELECT * FROM results ORDER BY cracked_at")
+        for row in rows:
+            self._index(CrackResult(*row))
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def __iter__(self) -> Iterator[CrackResult]:
+        """Yields the results, oldest first."""
+        return iter(sorted(self._results.values(), key=lambda r: r.cracked_at))
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _index(self, result: CrackResult) -> None:
+        self._results[(result.bssid, result.essid, result.digest)] = result
+        self._networks[(result.bssid, result.essid)] = result
+
+    def add(self, result: CrackResult) -> None:
+        """Stores "result", replacing an earlier one for the same handshake."""
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    result.bssid,
+                    result.essid,
+                    result.digest,
+                    result.key,
+                    result.method,
+                    result.elapsed,
+                    result.cracked_at,
+                ),
+            )
+        self._index(result)
+
+    def get(self, bssid: str, essid: str, digest: str) -> Optional[CrackResult]:
+        """The result for one handshake of a network, or None."""
+        return self._results.get((bssid.upper(), essid, digest))
+
+    def solved(self, bssid: str, essid: str) -> Optional[CrackResult]:
+        """The latest result for any handshake of a network, or None."""
+        return self._networks.get((bssid.upper(), essid))
+
+    def networks(self) -> List[CrackResult]:
+        """The latest result of every cracked network, oldest first."""
+        return sorted(self._networks.values(), key=lambda r: r.cracked_at)
@@ -0,0 +1,248 @@
+"""
+ring.py
+-------
+Ring-buffer capture writer for long-running scans.
+
+Frames are written to a rotating set of pcapng segments, each capped by
+size and by capture time. Segments that hold a handshake or a PMKID are
+pinned and kept; the oldest of the other segments are deleted once more
+than "max_segments" of them exist, so disk usage stays bounded however
+long the capture runs.
+
+Functions and Classes:
+    RingSegment: One pcapng segment of a ring capture.
+    RingCaptureWriter: Writes frames to rotating segments, pinning handshakes.
+    ring_capture: Copies a capture stream into a ring of segments.
+"""
+
+import os
+import logging
+from collections import deque
+from typing import Callable, Deque, List, Optional, Set, Tuple
+from wlfwifi.capture import CaptureReader, Frame, PcapngWriter, parse_dot11
+from wlfwifi.handshake import Handshake, HandshakeDetector, Pmkid, parse_eapol_key
+
+DEFAULT_SEGMENT_BYTES = 64 << 20
+DEFAULT_SEGMENT_SECONDS = 600.0
+DEFAULT_MAX_SEGMENTS = 16
+
+
+class RingSegment:
+    """
+    One pcapng segment of a ring capture.
+    Attributes:
+            path (str): Segment file.
+            number (int): Sequence number of the segment in the ring.
+            first_ts (float): Timestamp of the first frame, 0.0 while empty.
+            last_ts (float): Timestamp of the last frame.
+            frames (int): Frames written.
+            size (int): Size of the segment file.
+            pinned (bool): True once a handshake or PMKID was written to it.
+            stations (Set[Tuple[str, str]]): (AP, station) pairs with EAPOL here.
+    """
+
+    path: str
+    number: int
+    first_ts: float
+    last_ts: float
+    frames: int
+    size: int
+    pinned: bool
+    stations: Set[Tuple[str, str]]
+
+    def __init__(self, path: str, number: int) -> None:
+        self.path = path
+        self.number = number
+        self.first_ts = 0.0
+        self.last_ts = 0.0
+        self.frames = 0
+        self.size = 0
+        self.pinned = False
+        self.stations = set()
+
+    def __repr__(self) -> str:
+        pinned = ", pinned" if self.pinned else ""
+        return f"<RingSegment {self.path}: {self.frames} frames{pinned}>"
+
+
+class RingCaptureWriter:
+    """
+    Writes frames to a ring of pcapng segments.
+    A segment is closed once it reaches "segment_bytes" or spans
+    "segment_seconds" of capture time. Every frame also goes through a
+    HandshakeDetector: the segment that completes a handshake is pinned,
+    along with earlier live segments holding EAPOL frames of the same
+    station, and a segment holding a PMKID is pinned too.
+    Attributes:
+            directory (str): Directory holding the segments.
+            prefix (str): Segment file name prefix.
+            segment_bytes (int): Size cap of one segment.
+            segment_seconds (float): Capture time cap of one segment.
+            max_segments (int): Unpinned segments kept, the current one included.
+            segments (Deque[RingSegment]): Segments on disk, oldest first.
+            recycled (int): Segments deleted so far.
+            on_pin (Callable): Called with each newly pinned RingSegment.
+    """
+
+    directory: str
+    prefix: str
+    segment_bytes: int
+    segment_seconds: float
+    max_segments: int
+    segments: Deque[RingSegment]
+    recycled: int
+    on_pin: Optional[Callable[[RingSegment], None]]
+
+    def __init__(
+        self,
+        directory: str,
+        prefix: str = "ring",
+        segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+        segment_seconds: float = DEFAULT_SEGMENT_SECONDS,
+        max_segments: int = DEFAULT_MAX_SEGMENTS,
+        on_pin: Optional[Callable[[RingSegment], None]] = None,
+    ) -> None:
+        if max_segments < 1:
+            raise ValueError("max_segments must be at least 1")
+        self.directory = directory
+        self.prefix = prefix
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.max_segments = max_segments
+        self.segments = deque()
+        self.recycled = 0
+        self.on_pin = on_pin
+        self._number = 0
+        self._writer: Optional[PcapngWriter] = None
+        self._detector = HandshakeDetector(
+            on_handshake=self._on_handshake, on_pmkid=self._on_pmkid
+        )
+        os.makedirs(directory, exist_ok=True)
+
+    def __enter__(self) -> "RingCaptureWriter":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    @property
+    def current(self) -> Optional[RingSegment]:
+        """The segment being written, if any."""
+        return self.segments[-1] if self._writer is not None else None
+
+    @property
+    def pinned(self) -> List[RingSegment]:
+        return [s for s in self.segments if s.pinned]
+
+    @property
+    def disk_usage(self) -> int:
+        """Total size of the segments on disk."""
+        return sum(s.size for s in self.segments)
+
+    def write(self, frame: Frame) -> None:
+        """Appends a frame, rotating to a new segment when a cap is reached."""
+        segment = self.current
+        if segment is not None and (
+            segment.size >= self.segment_bytes
+            or frame.timestamp - segment.first_ts >= self.segment_seconds
+        ):
+            self.rotate()
+            segment = None
+        if segment is None:
+            segment = self._open_segment()
+        writer = self._writer
+        writer.write(frame)
+        if not segment.frames:
+            segment.first_ts = frame.timestamp
+        segment.last_ts = frame.timestamp
+        segment.frames += 1
+        segment.size = writer.bytes_written
+        dot11 = parse_dot11(frame)
+        if dot11 is None:
+            return
+        key = parse_eapol_key(dot11, frame.timestamp)
+        if key is not None:
+            segment.stations.add((key.ap, key.sta))
+            self._detector.feed_key(key)
+
+    def rotate(self) -> None:
+        """Closes the current segment; the next frame starts a new one."""
+        if self._writer is None:
+            return
+        self._writer.close()
+        self._writer = None
+        self._recycle()
+
+    def close(self) -> None:
+        self.rotate()
+
+    def _open_segment(self) -> RingSegment:
+        self._number += 1
+        name = f"{self.prefix}-{self._number:05d}.pcapng"
+        segment = RingSegment(os.path.join(self.directory, name), self._number)
+        self._writer = PcapngWriter(segment.path)
+        segment.size = self._writer.bytes_written
+        self.segments.append(segment)
+        self._recycle()
+        return segment
+
+    def _recycle(self) -> None:
+        unpinned = [s for s in self.segments if not s.pinned]
+        current = self.current
+        for segment in unpinned[: max(0, len(unpinned) - self.max_segments)]:
+            if segment is current:
+                continue
+            self.segments.remove(segment)
+            try:
+                os.remove(segment.path)
+            except OSError as e:
+                logging.warning(f"[RingCaptureWriter] Could not remove segment: {e}")
+            self.recycled += 1
+            logging.debug(f"[RingCaptureWriter] Recycled {segment.path}")
+
+    def _pin(self, segment: RingSegment) -> None:
+        if segment.pinned:
+            return
+        segment.pinned = True
+        logging.info(f"[RingCaptureWriter] Pinned {segment.path}")
+        if self.on_pin is not None:
+            self.on_pin(segment)
+
+    def _on_handshake(self, handshake: Handshake) -> None:
+        station = (handshake.ap, handshake.sta)
+        for segment in self.segments:
+            if station in segment.stations:
+                self._pin(segment)
+
+    def _on_pmkid(self, pmkid: Pmkid) -> None:
+        segment = self.current
+        if segment is not None:
+            self._pin(segment)
+
+
+def ring_capture(
+    source: str,
+    writer: RingCaptureWriter,
+    follow: bool = False,
+    poll_interval: float = 0.5,
+    stop: Optional[Callable[[], bool]] = None,
+) -> int:
+    """
+    Copies every frame of a capture into "writer". "source" may be a pipe
+    such as /dev/stdin fed by "tcpdump -w -"; with "follow", a regular file
+    that is still being written is tailed until "stop" returns True.
+    Returns:
+            int: Number of frames copied.
+    """
+    reader = CaptureReader(source)
+    try:
+        if follow:
+            frames = reader.follow(poll_interval=poll_interval, stop=stop)
+        else:
+            frames = reader.frames()
+        for frame in frames:
+            writer.write(frame)
+        return reader.frames_read
+    finally:
+        reader.close()
+        writer.close()
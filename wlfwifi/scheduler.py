@@ -0,0 +1,303 @@
+"""
+scheduler.py
+------------
+Concurrent execution of attacks through their asynchronous lifecycle.
+
+run_lifecycle() takes one Attack through prepare, run, cancel (only when
+it is stopped early or runs out of time) and cleanup, each phase bounded
+by its timeout, and reports every step as an AttackEvent. Whatever the
+outcome, child processes the attack left running are terminated, then
+killed, within "kill_timeout" seconds. AttackScheduler runs several
+attacks at once, one at a time per interface, and cancels the others as
+soon as one of them succeeds.
+
+Functions and Classes:
+    AttackEvent: A lifecycle step or progress report of an attack.
+    AttackOutcome: How one attack ended.
+    reap: Terminates, then kills, child processes within a time limit.
+    run_lifecycle: Runs one attack through its lifecycle phases.
+    AttackScheduler: Runs attacks concurrently until one succeeds.
+"""
+
+import time
+import asyncio
+import logging
+from subprocess import Popen, TimeoutExpired
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from wlfwifi.attacks import Attack
+
+EVENT_START = "start"
+EVENT_DONE = "done"
+EVENT_TIMEOUT = "timeout"
+EVENT_ERROR = "error"
+EVENT_PROGRESS = "progress"
+
+DEFAULT_KILL_TIMEOUT = 5.0
+
+
+class AttackEvent:
+    """
+    A lifecycle step or progress report of an attack.
+    Attributes:
+            attack (Attack): The attack concerned.
+            kind (str): One of the EVENT_* constants.
+            phase (str): "prepare", "run", "cancel" or "cleanup".
+            detail: The progress report, error message or phase result.
+            timestamp (float): Epoch time of the event.
+    """
+
+    attack: Attack
+    kind: str
+    phase: str
+    detail: Any
+    timestamp: float
+
+    def __init__(self, attack: Attack, kind: str, phase: str, detail: Any = None):
+        self.attack = attack
+        self.kind = kind
+        self.phase = phase
+        self.detail = detail
+        self.timestamp = time.time()
+
+    def __repr__(self) -> str:
+        name = type(self.attack).__name__
+        return f"<AttackEvent {name} {self.phase} {self.kind} {self.detail!r}>"
+
+
+EventCallback = Callable[[AttackEvent], None]
+
+
+class AttackOutcome:
+    """
+    How one attack ended.
+    Attributes:
+            attack (Attack): The attack.
+            result: What run() returned, None if it failed or was cancelled.
+            error (str): The first error raised by a phase, if any.
+            cancelled (bool): Whether the attack was stopped early.
+            timed_out (list): Phases that ran out of time.
+            elapsed (float): Seconds from prepare to the end of cleanup.
+    """
+
+    attack: Attack
+    result: Any
+    error: Optional[str]
+    cancelled: bool
+    timed_out: List[str]
+    elapsed: float
+
+    def __init__(self, attack: Attack) -> None:
+        self.attack = attack
+        self.result = None
+        self.error = None
+        self.cancelled = False
+        self.timed_out = []
+        self.elapsed = 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"<AttackOutcome {type(self.attack).__name__} result={self.result!r} "
+            f"cancelled={self.cancelled}>"
+        )
+
+    @property
+    def succeeded(self) -> bool:
+        return self.result is not None and self.error is None
+
+
+def reap(processes: Iterable[Popen], timeout: float = DEFAULT_KILL_TIMEOUT) -> None:
+    """
+    Terminates "processes", and kills those still running after "timeout"
+    seconds in total. Blocks for at most about twice "timeout".
+    """
+    processes = [p for p in processes if p.poll() is None]
+    for process in processes:
+        process.terminate()
+    deadline = time.monotonic() + timeout
+    for process in processes:
+        try:
+            process.wait(timeout=max(deadline - time.monotonic(), 0))
+        except TimeoutExpired:
+            logging.warning(f"[reap] Killing pid {process.pid}")
+            process.kill()
+            try:
+                process.wait(timeout=timeout)
+            except TimeoutExpired:
+                logging.error(f"[reap] pid {process.pid} survived SIGKILL")
+
+
+async def run_lifecycle(
+    attack: Attack,
+    on_event: Optional[EventCallback] = None,
+    stop: Optional[asyncio.Event] = None,
+    timeouts: Optional[Dict[str, Optional[float]]] = None,
+    kill_timeout: float = DEFAULT_KILL_TIMEOUT,
+) -> AttackOutcome:
+    """
+    Runs "attack" through prepare, run and cleanup. When "stop" is set or
+    run exceeds its timeout, the attack is cancelled, then given
+    "kill_timeout" seconds for run to return. "timeouts" override the
+    attack's own phase timeouts. Progress reports of the attack are
+    delivered to "on_event" in the event loop's thread.
+    Returns:
+            AttackOutcome: How the attack ended.
+    """
+    loop = asyncio.get_running_loop()
+    limits = dict(attack.timeouts)
+    limits.update(timeouts or {})
+    outcome = AttackOutcome(attack)
+    started = time.monotonic()
+
+    def emit(kind: str, phase: str, detail: Any = None) -> None:
+        if on_event is not None:
+            on_event(AttackEvent(attack, kind, phase, detail))
+
+    def progress(_: Attack, detail: Any) -> None:
+        loop.call_soon_threadsafe(emit, EVENT_PROGRESS, "run", detail)
+
+    async def phase(name: str, coroutine: Any) -> None:
+        emit(EVENT_START, name)
+        try:
+            result = await asyncio.wait_for(coroutine, limits.get(name))
+        except asyncio.TimeoutError:
+            outcome.timed_out.append(name)
+            emit(EVENT_TIMEOUT, name)
+        except Exception as e:
+            outcome.error = outcome.error or f"{name}: {e}"
+            emit(EVENT_ERROR, name, str(e))
+        else:
+            emit(EVENT_DONE, name, result)
+
+    attack.set_listener(progress)
+    try:
+        await phase("prepare", attack.prepare())
+        if outcome.error is None and not outcome.timed_out:
+            await _run(attack, outcome, emit, phase, stop, limits, kill_timeout)
+        await phase("cleanup", attack.cleanup())
+    finally:
+        attack.set_listener(None)
+        children = attack.children()
+        if children:
+            await loop.run_in_executor(None, reap, children, kill_timeout)
+    outcome.elapsed = time.monotonic() - started
+    return outcome
+
+
+async def _run(
+    attack: Attack,
+    outcome: AttackOutcome,
+    emit: Callable[..., None],
+    phase: Callable[..., Any],
+    stop: Optional[asyncio.Event],
+    limits: Dict[str, Optional[float]],
+    kill_timeout: float,
+) -> None:
+    emit(EVENT_START, "run")
+    running = asyncio.ensure_future(attack.run())
+    waits = {running}
+    stopping = None
+    if stop is not None:
+        stopping = asyncio.ensure_future(stop.wait())
+        waits.add(stopping)
+    try:
+        await asyncio.wait(
+            waits, timeout=limits.get("run"), return_when=asyncio.FIRST_COMPLETED
+        )
+    finally:
+        if stopping is not None:
+            stopping.cancel()
+    if not running.done():
+        if stop is not None and stop.is_set():
+            outcome.cancelled = True
+        else:
+            outcome.timed_out.append("run")
+            emit(EVENT_TIMEOUT, "run")
+        await phase("cancel", attack.cancel())
+        # RunAttack() runs in a daemon thread: give it a bounded time to
+        # return, after which it is abandoned
+        await asyncio.wait({running}, timeout=kill_timeout)
+        if not running.done():
+            logging.warning(f"[run_lifecycle] {attack!r} did not stop")
+            return
+    try:
+        result = running.result()
+    except Exception as e:
+        outcome.error = outcome.error or f"run: {e}"
+        emit(EVENT_ERROR, "run", str(e))
+        return
+    if not outcome.cancelled and not outcome.timed_out:
+        outcome.result = result
+    emit(EVENT_DONE, "run", result)
+
+
+class AttackScheduler:
+    """
+    Runs attacks concurrently. Attacks with the same "interface"
+    attribute take turns, since one card can only follow one channel;
+    others run at once. The first attack returning a result wins: the
+    others are cancelled, and those still waiting for their interface are
+    skipped.
+    Attributes:
+            on_event (callable): Called with every AttackEvent, if given.
+            timeouts (dict): Phase timeouts overriding the attacks' own.
+            kill_timeout (float): Seconds for child processes and
+                    cancelled runs to stop.
+            outcomes (list): AttackOutcome of every attack of the last run.
+    """
+
+    on_event: Optional[EventCallback]
+    timeouts: Dict[str, Optional[float]]
+    kill_timeout: float
+    outcomes: List[AttackOutcome]
+
+    def __init__(
+        self,
+        on_event: Optional[EventCallback] = None,
+        timeouts: Optional[Dict[str, Optional[float]]] = None,
+        kill_timeout: float = DEFAULT_KILL_TIMEOUT,
+    ) -> None:
+        self.on_event = on_event
+        self.timeouts = dict(timeouts or {})
+        self.kill_timeout = kill_timeout
+        self.outcomes = []
+
+    async def run(self, attacks: Iterable[Attack]) -> Optional[AttackOutcome]:
+        """
+        Runs "attacks" until one succeeds or all have ended.
+        Returns:
+                AttackOutcome: The winning attack's outcome, or None.
+        """
+        attacks = list(attacks)
+        stop = asyncio.Event()
+        locks: Dict[str, asyncio.Lock] = {}
+        winner: Optional[AttackOutcome] = None
+
+        async def one(attack: Attack) -> AttackOutcome:
+            nonlocal winner
+            interface = getattr(attack, "interface", None)
+            if interface is None:
+                outcome = await self._lifecycle(attack, stop)
+            else:
+                async with locks.setdefault(interface, asyncio.Lock()):
+                    if stop.is_set():
+                        outcome = AttackOutcome(attack)
+                        outcome.cancelled = True
+                        return outcome
+                    outcome = await self._lifecycle(attack, stop)
+            if outcome.succeeded and winner is None:
+                winner = outcome
+                logging.info(f"[AttackScheduler] {attack!r} succeeded")
+                stop.set()
+            return outcome
+
+        self.outcomes = list(await asyncio.gather(*(one(a) for a in attacks)))
+        return winner
+
+    def _lifecycle(self, attack: Attack, stop: asyncio.Event) -> Any:
+        return run_lifecycle(
+            attack, self.on_event, stop, self.timeouts, self.kill_timeout
+        )
+
+    def run_sync(self, attacks: Iterable[Attack]) -> Optional[AttackOutcome]:
+        """Runs "attacks" in a new event loop; see run()."""
+        return asyncio.run(self.run(attacks))
@@ -0,0 +1,206 @@
+"""
+split.py
+--------
+Splitting of full captures into minimal per-BSSID captures.
+
+Only the frames needed to crack a network are kept: one frame naming the
+ESSID (beacon, probe response, or for hidden networks an association
+request), and every EAPOL frame (handshake messages and the M1 frames that
+carry PMKIDs). Retransmissions of those frames are dropped by a
+RetryFilter. The input is read once; output files are kept
+open in a small LRU cache and reopened in append mode when needed again, so
+captures with thousands of BSSIDs do not run into file descriptor limits.
+
+Functions and Classes:
+    SplitStats: Counters for a split_capture() run.
+    split_capture: Fans out a capture into one minimal capture per BSSID.
+"""
+
+import os
+import time
+import logging
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set
+from wlfwifi.capture import (
+    Frame,
+    PcapWriter,
+    frame_essid,
+    iter_frames,
+    mac_str,
+    parse_dot11,
+)
+from wlfwifi.dedup import RetryFilter
+from wlfwifi.handshake import is_eapol
+
+DEFAULT_MAX_OPEN = 128
+
+
+class SplitStats:
+    """
+    Counters for a split_capture() run.
+    Attributes:
+            frames (int): Frames read.
+            kept (int): Frames written to per-BSSID captures.
+            retries (int): Retransmitted frames dropped.
+            outputs (Dict[str, str]): Capture written for each BSSID.
+            reopened (int): Times an evicted output had to be opened again.
+            bytes_in (int): Size of the input capture.
+            bytes_out (int): Total size of the captures written.
+            elapsed (float): Wall-clock seconds spent.
+    """
+
+    frames: int
+    kept: int
+    retries: int
+    outputs: Dict[str, str]
+    reopened: int
+    bytes_in: int
+    bytes_out: int
+    elapsed: float
+
+    def __init__(self) -> None:
+        self.frames = 0
+        self.kept = 0
+        self.retries = 0
+        self.outputs = {}
+        self.reopened = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.elapsed = 0.0
+
+    @property
+    def ratio(self) -> float:
+        """Input size divided by output size."""
+        return self.bytes_in / self.bytes_out if self.bytes_out else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.frames} frames, {self.kept} kept in "
+            f"{len(self.outputs)} captures, {self.retries} retries dropped, "
+            f"{self.bytes_in} -> "
+            f"{self.bytes_out} bytes ({self.ratio:.0f}x smaller)"
+        )
+
+
+class _WriterCache:
+    """
+    LRU cache of open per-BSSID writers.
+    """
+
+    def __init__(self, max_open: int, stats: SplitStats) -> None:
+        self._max_open = max(1, max_open)
+        self._stats = stats
+        self._open: "OrderedDict[str, PcapWriter]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+
+    def get(self, path: str, linktype: int) -> PcapWriter:
+        writer = self._open.get(path)
+        if writer is not None:
+            self._open.move_to_end(path)
+            return writer
+        if path in self._sizes:
+            self._stats.reopened += 1
+        if len(self._open) >= self._max_open:
+            _, oldest = self._open.popitem(last=False)
+            self._release(oldest)
+        writer = PcapWriter(path, linktype, append=path in self._sizes)
+        self._open[path] = writer
+        return writer
+
+    def _release(self, writer: PcapWriter) -> None:
+        writer.close()
+        self._sizes[writer.path] = writer.bytes_written
+
+    def close(self) -> int:
+        """Closes every writer and returns the total size written."""
+        while self._open:
+            self._release(self._open.popitem()[1])
+        return sum(self._sizes.values())
+
+
+def split_capture(
+    path: str,
+    output_dir: str,
+    bssids: Optional[Iterable[str]] = None,
+    max_open: int = DEFAULT_MAX_OPEN,
+    require_eapol: bool = True,
+    drop_retries: bool = True,
+) -> SplitStats:
+    """
+    Writes one minimal capture per BSSID into "output_dir", named after the
+    BSSID without separators (e.g. "001122334455.cap").
+    Args:
+            path: pcap/pcapng capture to split.
+            output_dir: Directory for the per-BSSID captures (created).
+            bssids: Only split these BSSIDs (default: all).
+            max_open: Maximum number of output files open at once.
+            require_eapol: Skip BSSIDs without any EAPOL frame; their beacon
+                    is held in memory until the first EAPOL frame shows up.
+            drop_retries: Skip frames repeating the sequence number of the
+                    previous frame of their transmitter with Retry set.
+    Raises:
+            ValueError: If the input is neither pcap nor pcapng.
+    """
+    stats = SplitStats()
+    started = time.monotonic()
+    wanted: Optional[Set[str]] = None
+    if bssids is not None:
+        wanted = {b.upper() for b in bssids}
+    os.makedirs(output_dir, exist_ok=True)
+    writers = _WriterCache(max_open, stats)
+    named: Set[str] = set()
+    pending: Dict[str, Frame] = {}
+    retries = RetryFilter() if drop_retries else None
+    skipped_linktypes = 0
+    try:
+        for frame in iter_frames(path):
+            stats.frames += 1
+            dot11 = parse_dot11(frame)
+            if dot11 is None:
+                continue
+            if retries is not None and retries.duplicate(dot11):
+                continue
+            eapol = is_eapol(dot11)
+            if not eapol and frame_essid(dot11) is None:
+                continue
+            raw_bssid = dot11.bssid
+            if raw_bssid is None:
+                continue
+            bssid = mac_str(raw_bssid)
+            if wanted is not None and bssid not in wanted:
+                continue
+            if not eapol:
+                if bssid in named:
+                    continue
+                named.add(bssid)
+                if require_eapol and bssid not in stats.outputs:
+                    pending[bssid] = frame
+                    continue
+            frames: List[Frame] = [frame]
+            early = pending.pop(bssid, None)
+            if early is not None:
+                frames.insert(0, early)
+            out_path = stats.outputs.get(bssid)
+            if out_path is None:
+                out_path = os.path.join(output_dir, bssid.replace(":", "") + ".cap")
+                stats.outputs[bssid] = out_path
+            writer = writers.get(out_path, frames[0].linktype)
+            for item in frames:
+                if not writer.accepts(item.linktype):
+                    skipped_linktypes += 1
+                    continue
+                writer.write(item)
+                stats.kept += 1
+    finally:
+        stats.bytes_out = writers.close()
+        if retries is not None:
+            stats.retries = retries.dropped
+    if skipped_linktypes:
+        logging.warning(
+            f"[split_capture] {path}: {skipped_linktypes} frames dropped, "
+            f"link type differs from the first frame of their BSSID"
+        )
+    stats.bytes_in = os.path.getsize(path)
+    stats.elapsed = time.monotonic() - started
+    logging.info(f"[split_capture] {stats.summary()}")
+    return stats
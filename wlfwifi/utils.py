@@ -10,6 +10,7 @@ Functions:
     program_exists: Checks if a program is installed on the system.
     sec_to_hms: Converts seconds to h:mm:ss format.
     send_interrupt: Sends an interrupt signal to a process.
+    run_airodump: Starts an airodump-ng capture process.
     ...
 """
 
@@ -18,9 +19,9 @@ import errno
 import random
 import time
 import logging
-from typing import Any
+from typing import Any, Optional
 from shutil import copy
-from subprocess import Popen, PIPE
+from subprocess import Popen, PIPE, DEVNULL
 from signal import SIGINT
 
 
@@ -102,6 +103,28 @@ def send_interrupt(process: Any) -> None:
         logging.warning(f"[send_interrupt] Failed to send interrupt: {e}")
 
 
+def run_airodump(
+    interface: str, output_prefix: str, channel: Optional[int] = None
+) -> Popen:
+    """
+    Starts airodump-ng writing pcap and csv output to "output_prefix".
+    Locks the card to "channel" when given, otherwise hops.
+    Returns the running Popen object. Its output is discarded: airodump-ng
+    redraws its table continuously and would block on a full pipe.
+    """
+    cmd = [
+        "airodump-ng",
+        "--output-format",
+        "pcap,csv",
+        "-w",
+        output_prefix,
+    ]
+    if channel:
+        cmd.extend(["-c", str(channel)])
+    cmd.append(interface)
+    return Popen(cmd, stdout=DEVNULL, stderr=DEVNULL)
+
+
 def get_mac_address(iface: str) -> str:
     """
     Returns MAC address of "iface".
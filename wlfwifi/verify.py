@@ -0,0 +1,185 @@
+"""
+verify.py
+---------
+In-process verification of WPA passphrases.
+
+NativeWorker tests candidates against the handshakes and PMKIDs of one
+access point by itself: hashlib.pbkdf2_hmac for the PMK, then the MIC or
+PMKID HMACs of wpa.py. It plugs into crack_wordlist() like AircrackWorker,
+without starting a process per chunk. SharedChunkExecutor runs it on
+several cores: each chunk is copied into a shared memory slot and the
+worker process reads it from there, so candidates are never pickled and
+the NativeWorker itself is sent once per process. Without
+multiprocessing.shared_memory (Python 3.7), chunks are pickled instead.
+verify_keys() quickly tries a few known or default keys in-process.
+
+Functions and Classes:
+    NativeWorker: Tries a chunk of candidates with pbkdf2_hmac and HMAC checks.
+    SharedChunkExecutor: Process pool receiving chunks through shared memory.
+    native_crack_wordlist: crack_wordlist() with native workers.
+    verify_keys: Returns the first of a few keys that matches.
+"""
+
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Any, Iterable, List, Optional, Tuple, Union
+from wlfwifi.crack import DEFAULT_CHUNK, CrackStats, crack_wordlist
+from wlfwifi.wordlist import MAX_PASSPHRASE, is_passphrase
+from wlfwifi.wpa import CrackMaterial
+
+try:
+    from multiprocessing.shared_memory import SharedMemory
+except ImportError:  # Python 3.7
+    SharedMemory = None
+
+# Slot record: one length byte, then the candidate
+RECORD_SIZE = MAX_PASSPHRASE + 1
+
+
+class NativeWorker:
+    """
+    Tries candidates against the material of one access point in the
+    calling process.
+    Attributes:
+            material (CrackMaterial): ESSID, handshakes and PMKIDs to test.
+    """
+
+    material: CrackMaterial
+
+    def __init__(self, material: CrackMaterial) -> None:
+        if material.essid is None or not material.checks:
+            raise ValueError(f"No ESSID or handshake to verify for {material.bssid}")
+        self.material = material
+
+    def __call__(self, chunk: List[bytes]) -> Optional[bytes]:
+        for candidate in chunk:
+            if self.material.verify(candidate):
+                return candidate
+        return None
+
+
+# Shared memory slots and worker of a SharedChunkExecutor process
+_slots: List[Any] = []
+_worker: Optional[NativeWorker] = None
+
+
+def _attach(names: List[str], worker: NativeWorker) -> None:
+    global _slots, _worker
+    _slots = [SharedMemory(name=name) for name in names]
+    _worker = worker
+
+
+def _run_slot(slot: int, count: int) -> Optional[bytes]:
+    buf = _slots[slot].buf
+    chunk = []
+    for offset in range(0, count * RECORD_SIZE, RECORD_SIZE):
+        chunk.append(bytes(buf[offset + 1 : offset + 1 + buf[offset]]))
+    return _worker(chunk)
+
+
+class SharedChunkExecutor(Executor):
+    """
+    Process pool running one NativeWorker per process on chunks written to
+    shared memory. There are two slots per process, matching the chunks
+    crack_wordlist() keeps in flight; submit() waits for a free slot.
+    Attributes:
+            worker (NativeWorker): The worker every process runs.
+            processes (int): Worker processes.
+            chunk_size (int): Most candidates a slot holds.
+    """
+
+    worker: NativeWorker
+    processes: int
+    chunk_size: int
+
+    def __init__(self, worker: NativeWorker, processes: int, chunk_size: int) -> None:
+        if SharedMemory is None:
+            raise RuntimeError("multiprocessing.shared_memory needs Python 3.8")
+        self.worker = worker
+        self.processes = processes
+        self.chunk_size = chunk_size
+        size = chunk_size * RECORD_SIZE
+        self._slots = [
+            SharedMemory(create=True, size=size) for _ in range(2 * processes)
+        ]
+        self._free = list(range(len(self._slots)))
+        self._released = threading.Condition()
+        self._pool = ProcessPoolExecutor(
+            processes,
+            initializer=_attach,
+            initargs=([s.name for s in self._slots], worker),
+        )
+
+    def submit(self, fn: Any, chunk: List[bytes]) -> Future:  # type: ignore[override]
+        if fn is not self.worker:
+            raise ValueError("SharedChunkExecutor only runs its own worker")
+        if len(chunk) > self.chunk_size:
+            raise ValueError(f"Chunk of {len(chunk)} exceeds {self.chunk_size}")
+        with self._released:
+            while not self._free:
+                self._released.wait()
+            slot = self._free.pop()
+        buf = self._slots[slot].buf
+        offset = 0
+        for candidate in chunk:
+            buf[offset] = len(candidate)
+            buf[offset + 1 : offset + 1 + len(candidate)] = candidate
+            offset += RECORD_SIZE
+        future = self._pool.submit(_run_slot, slot, len(chunk))
+        future.add_done_callback(lambda _, slot=slot: self._release(slot))
+        return future
+
+    def _release(self, slot: int) -> None:
+        with self._released:
+            self._free.append(slot)
+            self._released.notify()
+
+    def shutdown(self, wait: bool = True, **kwargs: Any) -> None:
+        self._pool.shutdown(wait=wait, **kwargs)
+        for shm in self._slots:
+            shm.close()
+            shm.unlink()
+        self._slots = []
+
+
+def native_crack_wordlist(
+    material: CrackMaterial,
+    wordlist: str,
+    processes: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK,
+    **kwargs: Any,
+) -> Tuple[Optional[bytes], CrackStats]:
+    """
+    Runs crack_wordlist() with a NativeWorker for "material", on a
+    SharedChunkExecutor when more than one process is used and shared
+    memory is available. Other keyword arguments go to crack_wordlist().
+    Raises:
+            ValueError: If "material" has no ESSID or nothing to check.
+    """
+    worker = NativeWorker(material)
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = max(1, processes)
+    if processes == 1 or SharedMemory is None:
+        return crack_wordlist(wordlist, worker, processes, chunk_size, **kwargs)
+    with SharedChunkExecutor(worker, processes, chunk_size) as executor:
+        return crack_wordlist(
+            wordlist, worker, processes, chunk_size, executor=executor, **kwargs
+        )
+
+
+def verify_keys(
+    material: CrackMaterial, keys: Iterable[Union[str, bytes]]
+) -> Optional[bytes]:
+    """
+    Tests known or default keys in-process, skipping those that cannot be
+    WPA passphrases.
+    Returns:
+            bytes: The first matching key, or None.
+    """
+    for key in keys:
+        raw = key.encode("utf-8") if isinstance(key, str) else key
+        if is_passphrase(raw) and material.verify(raw):
+            return raw
+    return None
@@ -0,0 +1,377 @@
+"""
+views.py
+--------
+Zero-copy iteration over memory-mapped capture files.
+
+MappedCapture maps a finished pcap/pcapng file and yields FrameView objects
+that only hold offsets into the mapping. Nothing is copied while iterating:
+the timestamp, 802.11 header fields and addresses are decoded on access,
+and the frame bytes are only materialized by tobytes() or to_frame().
+
+By default a single FrameView is reused for every frame, so iterating does
+not allocate one object per frame either. A consumer that keeps frames
+around must call to_frame(), or iterate with views(reuse=False).
+
+Functions and Classes:
+    FrameView: Lazily decoded view of one frame inside a mapped capture.
+    MappedCapture: Memory-mapped capture yielding FrameViews.
+    iter_views: Iterates over FrameViews of a capture file.
+"""
+
+import os
+import mmap
+import struct
+import logging
+from typing import Iterator, List, Optional, Tuple
+from wlfwifi.capture import (
+    DOT11_DATA,
+    FLAG_FROM_DS,
+    FLAG_TO_DS,
+    LINKTYPE_IEEE802_11_RADIOTAP,
+    PCAP_MAGIC_NS,
+    PCAP_MAGIC_US,
+    PCAPNG_BOM,
+    PCAPNG_EPB,
+    PCAPNG_IDB,
+    PCAPNG_OPB,
+    PCAPNG_SHB,
+    PCAPNG_SPB,
+    Dot11Frame,
+    Frame,
+    dot11_offset,
+    idb_resolution,
+    parse_dot11,
+)
+
+
+class FrameView:
+    """
+    View of one frame inside a MappedCapture. Fields are decoded from the
+    mapping when they are read; only the 802.11 header offset is remembered.
+    Attributes:
+            offset (int): File offset of the frame's record.
+            start (int): File offset of the frame's first byte.
+            caplen (int): Captured length of the frame.
+            linktype (int): Link type of the frame.
+    """
+
+    __slots__ = (
+        "_capture",
+        "_map",
+        "offset",
+        "start",
+        "caplen",
+        "linktype",
+        "_endian",
+        "_resolution",
+        "_dot11",
+    )
+
+    offset: int
+    start: int
+    caplen: int
+    linktype: int
+
+    def __init__(self, capture: "MappedCapture") -> None:
+        self._capture = capture
+        self._map = capture._map
+        self.offset = 0
+        self.start = 0
+        self.caplen = 0
+        self.linktype = 0
+        # Byte order and timestamp ticks per second of the frame's section
+        # and interface, resolved when the view is filled in: a later
+        # pcapng section resets the capture's own
+        self._endian = capture._endian
+        self._resolution = capture._ts_div
+        self._dot11 = -2
+
+    @property
+    def timestamp(self) -> float:
+        return self._capture._timestamp(self.offset, self._endian, self._resolution)
+
+    @property
+    def data(self) -> memoryview:
+        """The frame bytes, as a memoryview into the mapping."""
+        return self._capture._view[self.start : self.start + self.caplen]
+
+    def tobytes(self) -> bytes:
+        return self._map[self.start : self.start + self.caplen]
+
+    def to_frame(self) -> Frame:
+        """Copies the frame out of the mapping."""
+        return Frame(self.timestamp, self.linktype, self.tobytes(), self.offset)
+
+    def dot11(self) -> Optional[Dot11Frame]:
+        """Fully decodes the 802.11 header (copies the frame)."""
+        return parse_dot11(self.to_frame())
+
+    @property
+    def dot11_start(self) -> int:
+        """File offset of the 802.11 header, or -1 if there is none."""
+        if self._dot11 != -2:
+            return self._dot11
+        mm = self._map
+        start = self.start
+        if self.linktype == LINKTYPE_IEEE802_11_RADIOTAP:
+            # Radiotap, the common case, is decoded without any slicing
+            header = -1
+            if self.caplen >= 4:
+                header = mm[start + 2] | (mm[start + 3] << 8)
+        else:
+            header = dot11_offset(self.linktype, self.data[:8])
+        if header < 0 or self.caplen < header + 24:
+            self._dot11 = -1
+        else:
+            self._dot11 = start + header
+        return self._dot11
+
+    @property
+    def frame_control(self) -> int:
+        """Frame control field as little-endian int, or -1 if truncated."""
+        pos = self.dot11_start
+        if pos < 0:
+            return -1
+        mm = self._map
+        return mm[pos] | (mm[pos + 1] << 8)
+
+    @property
+    def type(self) -> int:
+        fc = self.frame_control
+        return -1 if fc < 0 else (fc >> 2) & 0x3
+
+    @property
+    def subtype(self) -> int:
+        fc = self.frame_control
+        return -1 if fc < 0 else (fc >> 4) & 0xF
+
+    @property
+    def flags(self) -> int:
+        fc = self.frame_control
+        return -1 if fc < 0 else fc >> 8
+
+    def _address(self, index: int) -> int:
+        pos = self.dot11_start
+        if pos < 0:
+            return -1
+        pos += 4 + 6 * index
+        high, low = struct.unpack_from(">HI", self._map, pos)
+        return (high << 32) | low
+
+    @property
+    def addr1(self) -> int:
+        return self._address(0)
+
+    @property
+    def addr2(self) -> int:
+        return self._address(1)
+
+    @property
+    def addr3(self) -> int:
+        return self._address(2)
+
+    @property
+    def seq(self) -> int:
+        """Sequence control field (sequence << 4 | fragment), -1 if truncated."""
+        pos = self.dot11_start
+        if pos < 0:
+            return -1
+        mm = self._map
+        return mm[pos + 22] | (mm[pos + 23] << 8)
+
+    @property
+    def bssid(self) -> int:
+        """BSSID as int, -1 for WDS (4-address) and truncated frames."""
+        fc = self.frame_control
+        if fc < 0:
+            return -1
+        if (fc >> 2) & 0x3 != DOT11_DATA:
+            return self.addr3
+        ds = (fc >> 8) & (FLAG_TO_DS | FLAG_FROM_DS)
+        if ds == 0:
+            return self.addr3
+        if ds == FLAG_TO_DS:
+            return self.addr1
+        if ds == FLAG_FROM_DS:
+            return self.addr2
+        return -1
+
+
+class MappedCapture:
+    """
+    A finished pcap/pcapng file mapped into memory.
+    Unlike CaptureReader, it does not follow files that are still growing:
+    the mapping covers the file as it was when opened. FrameView.data
+    memoryviews must be released before close().
+    Attributes:
+            path (str): Path of the capture file.
+            format (str): "pcap", "pcapng", or None for an empty file.
+    """
+
+    path: str
+    format: Optional[str]
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.format = None
+        self._file = open(path, "rb")
+        self._map: Optional[mmap.mmap] = None
+        self._view: Optional[memoryview] = None
+        self._endian = "<"
+        self._linktype = 0
+        self._ts_div = 1e6
+        self._interfaces: List[Tuple[int, float]] = []
+        try:
+            if os.fstat(self._file.fileno()).st_size == 0:
+                return
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._map)
+            self._read_header()
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self) -> "MappedCapture":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[FrameView]:
+        return self.views()
+
+    def close(self) -> None:
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # A caller still holds a FrameView.data slice; the mapping
+                # is unmapped once that slice is garbage collected
+                logging.debug(f"[MappedCapture] {self.path}: mapping still in use")
+            self._map = None
+        self._file.close()
+
+    def _read_header(self) -> None:
+        mm = self._map
+        if len(mm) < 24:
+            raise ValueError(f"{self.path}: truncated capture header")
+        magic = struct.unpack_from("<I", mm, 0)[0]
+        if magic == PCAPNG_SHB:
+            self.format = "pcapng"
+            return
+        for endian in ("<", ">"):
+            magic = struct.unpack_from(endian + "I", mm, 0)[0]
+            if magic in (PCAP_MAGIC_US, PCAP_MAGIC_NS):
+                self.format = "pcap"
+                self._endian = endian
+                self._ts_div = 1e9 if magic == PCAP_MAGIC_NS else 1e6
+                self._linktype = struct.unpack_from(endian + "I", mm, 20)[0]
+                return
+        raise ValueError(f"{self.path}: not a pcap or pcapng file")
+
+    def _timestamp(self, offset: int, endian: str, resolution: float) -> float:
+        mm = self._map
+        if self.format == "pcap":
+            sec, frac = struct.unpack_from(endian + "II", mm, offset)
+            return sec + frac / resolution
+        if resolution <= 0:
+            return 0.0
+        hi, lo = struct.unpack_from(endian + "II", mm, offset + 12)
+        return ((hi << 32) | lo) / resolution
+
+    def views(self, reuse: bool = True) -> Iterator[FrameView]:
+        """
+        Yields a FrameView per frame. With "reuse", the same FrameView is
+        updated in place for every frame and is only valid until the next.
+        Raises:
+                ValueError: On a corrupt pcapng block.
+        """
+        if self.format == "pcap":
+            return self._pcap_views(reuse)
+        if self.format == "pcapng":
+            return self._pcapng_views(reuse)
+        return iter(())
+
+    def _pcap_views(self, reuse: bool) -> Iterator[FrameView]:
+        mm = self._map
+        size = len(mm)
+        caplen_at = struct.Struct(self._endian + "I").unpack_from
+        linktype = self._linktype
+        view = FrameView(self)
+        view.linktype = linktype
+        off = 24
+        while off + 16 <= size:
+            caplen = caplen_at(mm, off + 8)[0]
+            end = off + 16 + caplen
+            if end > size:
+                return
+            if not reuse:
+                view = FrameView(self)
+                view.linktype = linktype
+            view.offset = off
+            view.start = off + 16
+            view.caplen = caplen
+            view._dot11 = -2
+            yield view
+            off = end
+
+    def _pcapng_views(self, reuse: bool) -> Iterator[FrameView]:
+        mm = self._map
+        size = len(mm)
+        view = FrameView(self)
+        off = 0
+        while off + 12 <= size:
+            if struct.unpack_from("<I", mm, off)[0] == PCAPNG_SHB:
+                bom = struct.unpack_from("<I", mm, off + 8)[0]
+                self._endian = "<" if bom == PCAPNG_BOM else ">"
+                self._interfaces = []
+            e = self._endian
+            block_type, length = struct.unpack_from(e + "II", mm, off)
+            if length < 12:
+                raise ValueError(f"{self.path}: corrupt pcapng block at {off}")
+            if off + length > size:
+                return
+            iface = -1
+            if block_type == PCAPNG_IDB:
+                linktype = struct.unpack_from(e + "H", mm, off + 8)[0]
+                resolution = idb_resolution(mm, off, length, e)
+                self._interfaces.append((linktype, resolution))
+            elif block_type in (PCAPNG_EPB, PCAPNG_OPB):
+                if block_type == PCAPNG_EPB:
+                    iface = struct.unpack_from(e + "I", mm, off + 8)[0]
+                else:
+                    iface = struct.unpack_from(e + "H", mm, off + 8)[0]
+                caplen = struct.unpack_from(e + "I", mm, off + 20)[0]
+                start = off + 28
+            elif block_type == PCAPNG_SPB:
+                iface = 0
+                caplen = struct.unpack_from(e + "I", mm, off + 8)[0]
+                caplen = min(caplen, length - 16)
+                start = off + 12
+            if 0 <= iface < len(self._interfaces):
+                if not reuse:
+                    view = FrameView(self)
+                view.offset = off
+                view.start = start
+                view.caplen = caplen
+                view._dot11 = -2
+                view.linktype, resolution = self._interfaces[iface]
+                view._endian = e
+                # Simple packet blocks carry no timestamp
+                view._resolution = resolution if block_type != PCAPNG_SPB else 0.0
+                yield view
+            elif iface >= 0:
+                logging.warning(f"[MappedCapture] {self.path}: unknown interface")
+            off += length
+
+
+def iter_views(path: str) -> Iterator[FrameView]:
+    """
+    Iterates over a reused FrameView for every frame of a capture file.
+    """
+    with MappedCapture(path) as capture:
+        for view in capture.views():
+            yield view
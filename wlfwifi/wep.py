@@ -0,0 +1,222 @@
+"""
+wep.py
+------
+Native tracking of the WEP initialization vectors seen per BSSID.
+
+Every WEP data frame carries a 24-bit IV in clear text. The number of
+distinct IVs, not the number of frames, decides whether a statistical
+attack (PTW, FMS/KoreK) can succeed, so each BSSID gets a 2^24-bit bitmap
+(2 MB) recording which IVs were seen. Retransmissions and replayed ARP
+requests are therefore counted once, and the cracker is started only when
+enough unique IVs are available.
+
+Functions and Classes:
+    wep_iv: Returns the IV of a WEP-encrypted data frame.
+    IvBitmap: Set of 24-bit IVs backed by a 2 MB bitmap.
+    IvTracker: Counts unique IVs per BSSID and signals crack thresholds.
+"""
+
+import logging
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set
+from wlfwifi.capture import (
+    DOT11_DATA,
+    FLAG_PROTECTED,
+    CaptureReader,
+    Dot11Frame,
+    Frame,
+    mac_str,
+    parse_dot11,
+)
+from wlfwifi.dedup import RetryFilter
+
+IV_SPACE = 1 << 24
+
+# Key ID octet bit set by TKIP and CCMP, never by WEP
+WEP_EXT_IV = 0x20
+
+# IV(3) + key ID(1) + ICV(4)
+WEP_OVERHEAD = 8
+
+# Unique IVs at which the cracker is (re)started; PTW usually recovers a
+# 104-bit key with 20000-40000 IVs, FMS/KoreK needs far more
+DEFAULT_IV_THRESHOLDS = (10000, 20000, 40000, 80000, 160000)
+
+ThresholdCallback = Callable[[str, int], None]
+
+
+def wep_iv(dot11: Dot11Frame) -> Optional[int]:
+    """
+    Returns the 24-bit IV of a WEP-encrypted data frame, or None for other
+    frames (unprotected, TKIP/CCMP, or truncated).
+    """
+    if dot11.type != DOT11_DATA or not dot11.flags & FLAG_PROTECTED:
+        return None
+    data, pos = dot11.data, dot11.header_len
+    if len(data) - pos < WEP_OVERHEAD or data[pos + 3] & WEP_EXT_IV:
+        return None
+    return (data[pos] << 16) | (data[pos + 1] << 8) | data[pos + 2]
+
+
+class IvBitmap:
+    """
+    Set of 24-bit IVs, one bit per possible IV.
+    Attributes:
+            bits (bytearray): The 2 MB bitmap.
+            count (int): Number of distinct IVs added.
+    """
+
+    __slots__ = ("bits", "count")
+
+    bits: bytearray
+    count: int
+
+    def __init__(self) -> None:
+        self.bits = bytearray(IV_SPACE >> 3)
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, iv: object) -> bool:
+        if not isinstance(iv, int) or not 0 <= iv < IV_SPACE:
+            return False
+        return bool(self.bits[iv >> 3] & (1 << (iv & 7)))
+
+    def add(self, iv: int) -> bool:
+        """
+        Records an IV.
+        Returns:
+                bool: True if it had not been seen before.
+        """
+        byte = iv >> 3
+        mask = 1 << (iv & 7)
+        bits = self.bits
+        if bits[byte] & mask:
+            return False
+        bits[byte] |= mask
+        self.count += 1
+        return True
+
+
+class IvTracker:
+    """
+    Counts unique WEP IVs per BSSID as frames are fed.
+    Each time a BSSID's unique IV count reaches the next entry of
+    "thresholds", "on_threshold" is called with the BSSID and the count, so
+    the caller can start the cracker, or restart it with the larger IV set.
+    Bitmaps are only allocated for BSSIDs that send WEP frames. Captures
+    read by poll() go through a RetryFilter, so "wep_frames" counts each
+    retransmitted frame once.
+    Attributes:
+            thresholds (List[int]): Ascending unique IV counts to signal.
+            bssids (set): Only these upper-case BSSIDs are tracked, if set.
+            bitmaps (Dict[str, IvBitmap]): Seen IVs by upper-case BSSID.
+            frames (int): Frames fed.
+            wep_frames (int): WEP data frames among them.
+            retries (RetryFilter): Retransmission filter of poll(), if any.
+            on_threshold (ThresholdCallback): Called as (bssid, unique IVs).
+    """
+
+    thresholds: List[int]
+    bitmaps: Dict[str, IvBitmap]
+    frames: int
+    wep_frames: int
+    retries: Optional[RetryFilter]
+    on_threshold: Optional[ThresholdCallback]
+
+    def __init__(
+        self,
+        thresholds: Sequence[int] = DEFAULT_IV_THRESHOLDS,
+        on_threshold: Optional[ThresholdCallback] = None,
+        bssids: Optional[Iterable[str]] = None,
+        drop_retries: bool = True,
+    ) -> None:
+        self.thresholds = sorted(thresholds)
+        self.on_threshold = on_threshold
+        self.bssids = {b.upper() for b in bssids} if bssids is not None else None
+        self.bitmaps = {}
+        self.frames = 0
+        self.wep_frames = 0
+        self.retries = RetryFilter() if drop_retries else None
+        # Bitmap and index of its next threshold, by raw BSSID
+        self._by_raw: Dict[bytes, IvBitmap] = {}
+        self._next: Dict[bytes, int] = {}
+        self._ignored: Set[bytes] = set()
+        self._readers: Dict[str, CaptureReader] = {}
+
+    def __enter__(self) -> "IvTracker":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def unique(self, bssid: str) -> int:
+        """Number of distinct IVs seen from "bssid"."""
+        bitmap = self.bitmaps.get(bssid.upper())
+        return bitmap.count if bitmap is not None else 0
+
+    def feed(self, frame: Frame) -> bool:
+        """
+        Processes one captured frame.
+        Returns:
+                bool: True if it carried a new IV.
+        """
+        self.frames += 1
+        dot11 = parse_dot11(frame)
+        if dot11 is None:
+            return False
+        iv = wep_iv(dot11)
+        if iv is None:
+            return False
+        raw_bssid = dot11.bssid
+        if raw_bssid is None:
+            return False
+        self.wep_frames += 1
+        bitmap = self._by_raw.get(raw_bssid)
+        if bitmap is None:
+            if raw_bssid in self._ignored:
+                return False
+            bitmap = self._bitmap(raw_bssid)
+            if bitmap is None:
+                return False
+        if not bitmap.add(iv):
+            return False
+        index = self._next[raw_bssid]
+        if index < len(self.thresholds) and bitmap.count >= self.thresholds[index]:
+            self._next[raw_bssid] = index + 1
+            bssid = mac_str(raw_bssid)
+            logging.info(f"[IvTracker] {bssid}: {bitmap.count} unique IVs")
+            if self.on_threshold is not None:
+                self.on_threshold(bssid, bitmap.count)
+        return True
+
+    def poll(self, path: str) -> int:
+        """
+        Feeds the frames appended to "path" since the previous poll.
+        Returns:
+                int: Number of new unique IVs.
+        Raises:
+                ValueError: If the file is neither pcap nor pcapng.
+        """
+        reader = self._readers.get(path)
+        if reader is None:
+            accept = self.retries.accept if self.retries is not None else None
+            reader = self._readers[path] = CaptureReader(path, accept)
+        new = 0
+        for frame in reader.frames():
+            new += self.feed(frame)
+        return new
+
+    def close(self) -> None:
+        for reader in self._readers.values():
+            reader.close()
+        self._readers.clear()
+
+    def _bitmap(self, raw_bssid: bytes) -> Optional[IvBitmap]:
+        bssid = mac_str(raw_bssid)
+        if self.bssids is not None and bssid not in self.bssids:
+            self._ignored.add(raw_bssid)
+            return None
+        bitmap = self._by_raw[raw_bssid] = self.bitmaps[bssid] = IvBitmap()
+        self._next[raw_bssid] = 0
+        return bitmap
